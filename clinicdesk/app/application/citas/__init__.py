@@ -1,3 +1,11 @@
+from clinicdesk.app.application.citas.agenda_disponibilidad import (
+    BuscarHuecosLibres,
+    BuscarHuecosRequest,
+    ConflictoSerieDTO,
+    ReservarSerieCitas,
+    SerieCitasRequest,
+    SerieConConflictosError,
+)
 from clinicdesk.app.application.citas.atributos import (
     ATRIBUTOS_CITA,
     SensibilidadAtributo,
@@ -28,7 +36,9 @@ from clinicdesk.app.application.citas.usecases import (
     BuscarCitasParaCalendario,
     BuscarCitasParaLista,
     PaginacionCitasDTO,
+    PaginacionCitasKeysetDTO,
     ResultadoListadoDTO,
+    ResultadoListadoKeysetDTO,
 )
 from clinicdesk.app.application.citas.navigation_intent import CitasNavigationIntentDTO, es_intent_calidad
 
@@ -36,9 +46,17 @@ __all__ = [
     "ATRIBUTOS_CITA",
     "BuscarCitasParaCalendario",
     "BuscarCitasParaLista",
+    "BuscarHuecosLibres",
+    "BuscarHuecosRequest",
+    "ConflictoSerieDTO",
+    "ReservarSerieCitas",
+    "SerieCitasRequest",
+    "SerieConConflictosError",
     "FiltrosCitasDTO",
     "PaginacionCitasDTO",
+    "PaginacionCitasKeysetDTO",
     "ResultadoListadoDTO",
+    "ResultadoListadoKeysetDTO",
     "SensibilidadAtributo",
     "ErrorValidacionDTO",
     "HitoAtencion",
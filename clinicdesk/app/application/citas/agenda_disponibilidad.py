@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Protocol, Sequence
+
+from clinicdesk.app.application.auditoria.audit_service import AuditService
+from clinicdesk.app.application.ports.unidad_trabajo_port import UnidadDeTrabajo
+from clinicdesk.app.application.prediccion_ausencias.scores_riesgo import (
+    PuntuarRiesgoAusenciaCitas,
+    puntuar_citas_nuevas,
+)
+from clinicdesk.app.application.security import Action, AutorizadorAcciones, UserContext
+from clinicdesk.app.bootstrap_logging import get_logger
+from clinicdesk.app.domain.agenda_disponibilidad import AgendaDisponibilidad, HuecoLibre
+from clinicdesk.app.domain.enums import EstadoCita
+from clinicdesk.app.domain.exceptions import ValidationError
+from clinicdesk.app.domain.modelos import Cita
+
+LOGGER = get_logger(__name__)
+
+_MAX_REPETICIONES_SERIE = 104
+_MAX_DIAS_BUSQUEDA = 31
+
+
+class AgendaDisponibilidadPort(Protocol):
+    def cargar_agenda(
+        self,
+        desde: datetime,
+        hasta: datetime,
+        *,
+        medico_ids: Sequence[int],
+        sala_ids: Sequence[int],
+    ) -> AgendaDisponibilidad: ...
+
+    def listar_salas_activas(self) -> list[int]: ...
+
+
+class CitasCreacionPort(Protocol):
+    def create(self, cita: Cita) -> int: ...
+
+
+@dataclass(frozen=True, slots=True)
+class BuscarHuecosRequest:
+    medico_ids: tuple[int, ...]
+    desde: datetime
+    hasta: datetime
+    duracion_minutos: int
+    sala_ids: tuple[int, ...] = ()
+    paso_minutos: int = 15
+    limite: int = 10
+
+
+@dataclass(frozen=True, slots=True)
+class BuscarHuecosLibres:
+    """Próximos huecos libres con una sola carga de la agenda del rango (sala vacía = cualquier sala activa)."""
+
+    agenda: AgendaDisponibilidadPort
+
+    def ejecutar(self, request: BuscarHuecosRequest) -> list[HuecoLibre]:
+        if not request.medico_ids:
+            raise ValidationError("Indica al menos un médico.")
+        if request.duracion_minutos <= 0 or request.paso_minutos <= 0:
+            raise ValidationError("duracion_minutos y paso_minutos deben ser positivos.")
+        if request.hasta <= request.desde or request.hasta - request.desde > timedelta(days=_MAX_DIAS_BUSQUEDA):
+            raise ValidationError(f"El rango de búsqueda debe ser positivo y de como máximo {_MAX_DIAS_BUSQUEDA} días.")
+        sala_ids = request.sala_ids or tuple(self.agenda.listar_salas_activas())
+        agenda = self.agenda.cargar_agenda(
+            request.desde, request.hasta, medico_ids=request.medico_ids, sala_ids=sala_ids
+        )
+        return agenda.huecos_libres(
+            medico_ids=request.medico_ids,
+            sala_ids=sala_ids,
+            desde=request.desde,
+            hasta=request.hasta,
+            duracion=timedelta(minutes=request.duracion_minutos),
+            paso=timedelta(minutes=request.paso_minutos),
+            limite=request.limite,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class SerieCitasRequest:
+    paciente_id: int
+    medico_id: int
+    sala_id: int
+    primer_inicio: datetime
+    duracion_minutos: int
+    repeticiones: int
+    cada_dias: int = 7
+    motivo: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ConflictoSerieDTO:
+    inicio: datetime
+    codigos: tuple[str, ...]
+
+
+class SerieConConflictosError(ValidationError):
+    """Ninguna cita de la serie se guarda si alguna choca con la agenda."""
+
+    def __init__(self, conflictos: list[ConflictoSerieDTO]) -> None:
+        super().__init__(f"La serie tiene {len(conflictos)} cita(s) sin disponibilidad; no se ha reservado ninguna.")
+        self.conflictos = conflictos
+
+
+@dataclass(frozen=True, slots=True)
+class ReservarSerieCitas:
+    """
+    Reserva una serie periódica de citas en una única transacción.
+
+    La agenda del rango completo se carga una vez dentro de la transacción de escritura y
+    cada ocurrencia se comprueba en memoria (incluidas las de la propia serie). Si alguna
+    choca, se deshace todo y se devuelven los conflictos; no hay overrides en lote.
+    """
+
+    agenda: AgendaDisponibilidadPort
+    citas_repo: CitasCreacionPort
+    unidad_trabajo: UnidadDeTrabajo
+    user_context: UserContext
+    autorizador_acciones: AutorizadorAcciones
+    audit_service: AuditService | None = None
+    puntuar_riesgo_uc: PuntuarRiesgoAusenciaCitas | None = None
+
+    def ejecutar(self, request: SerieCitasRequest) -> tuple[int, ...]:
+        self.autorizador_acciones.exigir(self.user_context, Action.CITA_CREAR)
+        ocurrencias = _ocurrencias(request)
+        with self.unidad_trabajo.transaccion():
+            if request.sala_id not in self.agenda.listar_salas_activas():
+                raise ValidationError("La sala no existe o está inactiva.")
+            agenda = self.agenda.cargar_agenda(
+                ocurrencias[0][0],
+                ocurrencias[-1][1],
+                medico_ids=(request.medico_id,),
+                sala_ids=(request.sala_id,),
+            )
+            conflictos: list[ConflictoSerieDTO] = []
+            for inicio, fin in ocurrencias:
+                codigos = agenda.conflictos(request.medico_id, request.sala_id, inicio, fin)
+                if codigos:
+                    conflictos.append(ConflictoSerieDTO(inicio=inicio, codigos=codigos))
+                agenda.reservar(request.medico_id, request.sala_id, inicio, fin)
+            if conflictos:
+                raise SerieConConflictosError(conflictos)
+            cita_ids = tuple(self.citas_repo.create(_cita(request, inicio, fin)) for inicio, fin in ocurrencias)
+        puntuar_citas_nuevas(self.puntuar_riesgo_uc, cita_ids)
+        self._auditar(request, len(cita_ids))
+        LOGGER.info(
+            "citas_serie_reservada",
+            extra={"action": "citas_serie_reservada", "medico_id": request.medico_id, "citas": len(cita_ids)},
+        )
+        return cita_ids
+
+    def _auditar(self, request: SerieCitasRequest, total: int) -> None:
+        if self.audit_service is None:
+            return
+        self.audit_service.registrar(
+            action="CITA_CREAR",
+            outcome="ok",
+            actor_username=self.user_context.username,
+            actor_role=self.user_context.role,
+            correlation_id=self.user_context.run_id,
+            metadata={"medico_id": request.medico_id, "sala_id": request.sala_id, "n_appointments": total},
+        )
+
+
+def _ocurrencias(request: SerieCitasRequest) -> list[tuple[datetime, datetime]]:
+    if request.paciente_id <= 0 or request.medico_id <= 0 or request.sala_id <= 0:
+        raise ValidationError("paciente_id, medico_id y sala_id deben ser positivos.")
+    if request.duracion_minutos <= 0:
+        raise ValidationError("duracion_minutos debe ser positivo.")
+    if not 1 <= request.repeticiones <= _MAX_REPETICIONES_SERIE:
+        raise ValidationError(f"repeticiones debe estar entre 1 y {_MAX_REPETICIONES_SERIE}.")
+    if request.cada_dias <= 0:
+        raise ValidationError("cada_dias debe ser positivo.")
+    duracion = timedelta(minutes=request.duracion_minutos)
+    return [
+        (inicio, inicio + duracion)
+        for inicio in (
+            request.primer_inicio + timedelta(days=request.cada_dias * indice) for indice in range(request.repeticiones)
+        )
+    ]
+
+
+def _cita(request: SerieCitasRequest, inicio: datetime, fin: datetime) -> Cita:
+    return Cita(
+        paciente_id=request.paciente_id,
+        medico_id=request.medico_id,
+        sala_id=request.sala_id,
+        inicio=inicio,
+        fin=fin,
+        motivo=request.motivo,
+        estado=EstadoCita.PROGRAMADA,
+    )
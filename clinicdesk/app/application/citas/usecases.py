@@ -5,6 +5,17 @@ from typing import Protocol
 
 from clinicdesk.app.application.citas.atributos import sanear_columnas_citas
 from clinicdesk.app.application.citas.filtros import FiltrosCitasDTO
+from clinicdesk.app.application.usecases.paginacion_incremental import (
+    DIRECCION_ANTERIOR,
+    DIRECCION_SIGUIENTE,
+    decodificar_cursor,
+    recortar_pagina_keyset,
+)
+from clinicdesk.app.bootstrap_logging import get_logger
+
+LOGGER = get_logger(__name__)
+
+CLAVES_ORDEN_LISTADO_CITAS = ("inicio_ts", "cita_id")
 
 
 @dataclass(frozen=True, slots=True)
@@ -19,6 +30,25 @@ class ResultadoListadoDTO:
     total: int
 
 
+@dataclass(frozen=True, slots=True)
+class PaginacionCitasKeysetDTO:
+    """Página por cursor sobre (inicio, id); `total_conocido` evita recontar al navegar."""
+
+    limit: int
+    cursor: str | None = None
+    direccion: str = DIRECCION_SIGUIENTE
+    incluir_total: bool = False
+    total_conocido: int | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ResultadoListadoKeysetDTO:
+    items: list[dict[str, object]]
+    cursor_siguiente: str | None
+    cursor_anterior: str | None
+    total: int | None
+
+
 class CitasBusquedaPort(Protocol):
     def buscar_citas_listado(
         self,
@@ -28,6 +58,16 @@ class CitasBusquedaPort(Protocol):
         offset: int,
     ) -> tuple[list[dict[str, object]], int]: ...
 
+    def buscar_citas_listado_keyset(
+        self,
+        filtros_norm: FiltrosCitasDTO,
+        campos_requeridos: tuple[str, ...],
+        limit: int,
+        clave: tuple[int, ...] | None,
+        hacia_atras: bool,
+        contar_total: bool,
+    ) -> tuple[list[dict[str, object]], int | None]: ...
+
     def buscar_citas_calendario(
         self,
         filtros_norm: FiltrosCitasDTO,
@@ -54,6 +94,50 @@ class BuscarCitasParaLista:
         )
         return ResultadoListadoDTO(items=items, total=total)
 
+    def ejecutar_keyset(
+        self,
+        filtros_norm: FiltrosCitasDTO,
+        columnas: tuple[str, ...],
+        paginacion: PaginacionCitasKeysetDTO,
+    ) -> ResultadoListadoKeysetDTO:
+        columnas_saneadas, _ = sanear_columnas_citas(columnas)
+        clave = (
+            decodificar_cursor(paginacion.cursor, aridad=len(CLAVES_ORDEN_LISTADO_CITAS)) if paginacion.cursor else None
+        )
+        direccion = paginacion.direccion if clave is not None else DIRECCION_SIGUIENTE
+        filas, total = self.queries.buscar_citas_listado_keyset(
+            filtros_norm=filtros_norm,
+            campos_requeridos=columnas_saneadas,
+            limit=max(1, paginacion.limit) + 1,
+            clave=clave,
+            hacia_atras=direccion == DIRECCION_ANTERIOR,
+            contar_total=paginacion.incluir_total and paginacion.total_conocido is None,
+        )
+        recorte = recortar_pagina_keyset(
+            _filas_con_clave_orden(filas),
+            limit=paginacion.limit,
+            direccion=direccion,
+            con_cursor=clave is not None,
+            claves_orden=CLAVES_ORDEN_LISTADO_CITAS,
+        )
+        return ResultadoListadoKeysetDTO(
+            items=recorte.filas,
+            cursor_siguiente=recorte.cursores.siguiente,
+            cursor_anterior=recorte.cursores.anterior,
+            total=paginacion.total_conocido if paginacion.total_conocido is not None else total,
+        )
+
+
+def _filas_con_clave_orden(filas: list[dict[str, object]]) -> list[dict[str, object]]:
+    # `inicio_ts` es NULL si `inicio` no es una fecha válida; esas filas no pueden dar cursor.
+    validas = [fila for fila in filas if all(fila.get(clave) is not None for clave in CLAVES_ORDEN_LISTADO_CITAS)]
+    if len(validas) != len(filas):
+        LOGGER.warning(
+            "citas_keyset_filas_sin_clave",
+            extra={"action": "citas_keyset_filas_sin_clave", "descartadas": len(filas) - len(validas)},
+        )
+    return validas
+
 
 @dataclass(frozen=True, slots=True)
 class BuscarCitasParaCalendario:
@@ -1,14 +1,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import date, datetime
 
 from clinicdesk.app.application.confirmaciones.dtos import (
     FilaConfirmacionDTO,
     FiltrosConfirmacionesDTO,
     ResultadoConfirmacionesDTO,
 )
-from clinicdesk.app.application.prediccion_ausencias.dtos import CitaParaPrediccionDTO
 from clinicdesk.app.queries.confirmaciones_queries import (
     ConfirmacionesQueries,
     FiltrosConfirmacionesQuery,
@@ -23,8 +21,16 @@ class PaginacionConfirmacionesDTO:
 
 @dataclass(slots=True)
 class ObtenerConfirmacionesCitas:
+    """
+    Listado de confirmaciones con el riesgo leído de `riesgo_ausencia_citas`.
+
+    El listado no puntúa: solo lee las puntuaciones del modelo activo, que se calculan al
+    activarlo, al crear citas y en segundo plano. Así el filtro por riesgo se aplica en SQL
+    y las páginas salen completas.
+    """
+
     queries: ConfirmacionesQueries
-    obtener_riesgo_uc: object
+    puntuar_riesgo_uc: object | None
     obtener_salud_uc: object
 
     def ejecutar(
@@ -32,14 +38,18 @@ class ObtenerConfirmacionesCitas:
         filtros: FiltrosConfirmacionesDTO,
         paginacion: PaginacionConfirmacionesDTO,
     ) -> ResultadoConfirmacionesDTO:
+        modelo_version = None
+        if self.puntuar_riesgo_uc is not None:
+            modelo_version = self.puntuar_riesgo_uc.version_activa()
         query_filters = FiltrosConfirmacionesQuery(
             desde=filtros.desde,
             hasta=filtros.hasta,
             texto_paciente=filtros.texto_paciente,
             recordatorio_filtro=filtros.recordatorio_filtro,
+            riesgo_filtro=filtros.riesgo_filtro,
+            modelo_version=modelo_version,
         )
         rows, total = self.queries.buscar_citas_confirmaciones(query_filters, paginacion.limit, paginacion.offset)
-        riesgos = self.obtener_riesgo_uc.ejecutar([self._to_cita_prediccion(row) for row in rows])
         items = [
             FilaConfirmacionDTO(
                 cita_id=row.cita_id,
@@ -47,39 +57,16 @@ class ObtenerConfirmacionesCitas:
                 paciente=row.paciente_nombre,
                 medico=row.medico_nombre,
                 estado_cita=row.estado_cita,
-                riesgo=riesgos.get(row.cita_id, "NO_DISPONIBLE"),
+                riesgo=row.riesgo,
                 recordatorio_estado=row.recordatorio_estado_global,
                 tiene_telefono=row.tiene_telefono,
             )
             for row in rows
         ]
-        items_filtrados = self._filtrar_por_riesgo(items, filtros.riesgo_filtro)
         salud = self.obtener_salud_uc.ejecutar()
         return ResultadoConfirmacionesDTO(
             total=total,
-            mostrados=len(items_filtrados),
-            items=items_filtrados,
+            mostrados=len(items),
+            items=items,
             salud_prediccion=salud,
         )
-
-    @staticmethod
-    def _to_cita_prediccion(row) -> CitaParaPrediccionDTO:
-        inicio_dt = datetime.fromisoformat(row.inicio)
-        antelacion = max((inicio_dt.date() - date.today()).days, 0)
-        return CitaParaPrediccionDTO(
-            id=row.cita_id,
-            fecha=inicio_dt.date().isoformat(),
-            hora=inicio_dt.time().strftime("%H:%M"),
-            paciente_id=row.paciente_id,
-            medico_id=row.medico_id,
-            antelacion_dias=antelacion,
-        )
-
-    @staticmethod
-    def _filtrar_por_riesgo(items: list[FilaConfirmacionDTO], riesgo_filtro: str) -> list[FilaConfirmacionDTO]:
-        riesgo = riesgo_filtro.upper().strip()
-        if riesgo == "SOLO_ALTO":
-            return [item for item in items if item.riesgo == "ALTO"]
-        if riesgo == "ALTO_MEDIO":
-            return [item for item in items if item.riesgo in {"ALTO", "MEDIO"}]
-        return items
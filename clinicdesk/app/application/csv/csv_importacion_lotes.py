@@ -0,0 +1,224 @@
+"""
+Importación CSV en streaming y por lotes.
+
+Las filas se leen del fichero según se procesan y se agrupan en lotes. Por lote:
+- Los registros existentes se resuelven con una consulta por clave (id, documento,
+  nombre...), no con una por fila.
+- La escritura va en una sola transacción de la unidad de trabajo; cada fila va en su
+  propio SAVEPOINT, así un error de integridad descarta esa fila y no el lote.
+- Se informa del progreso (filas/s) y de los errores del lote.
+
+Con `dry_run` se convierten, validan y resuelven las filas sin escribir nada.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from clinicdesk.app.application.csv.csv_io import CsvRowError
+from clinicdesk.app.application.ports.unidad_trabajo_port import UnidadDeTrabajo
+from clinicdesk.app.bootstrap_logging import get_logger
+
+LOGGER = get_logger(__name__)
+
+_TAMANO_LOTE_POR_DEFECTO = 500
+_MAX_CLAVES_CONSULTA = 400
+
+FilaCsv = Dict[str, str]
+
+
+@dataclass(slots=True)
+class CsvImportResult:
+    created: int
+    updated: int
+    errors: List[CsvRowError]
+    dry_run: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class ProgresoImportacionCsv:
+    lote: int
+    filas: int
+    creadas: int
+    actualizadas: int
+    errores_lote: int
+    segundos: float
+
+    @property
+    def filas_por_segundo(self) -> float:
+        return self.filas / self.segundos if self.segundos > 0 else 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class OpcionesImportacionCsv:
+    tamano_lote: int = _TAMANO_LOTE_POR_DEFECTO
+    dry_run: bool = False
+    al_progresar: Optional[Callable[[ProgresoImportacionCsv], None]] = None
+
+
+@dataclass(frozen=True, slots=True)
+class ClaveResolucion:
+    """Columnas que identifican un registro existente y cómo obtener sus valores de una fila (None = sin clave)."""
+
+    columnas: tuple[str, ...]
+    extraer: Callable[[FilaCsv], Optional[tuple[object, ...]]]
+
+
+class ResolutorLote:
+    """Ids existentes de un lote, precargados por clave y en orden de prioridad de las claves."""
+
+    def __init__(self, con: sqlite3.Connection, tabla: str, claves: Sequence[ClaveResolucion]) -> None:
+        self._con = con
+        self._tabla = tabla
+        self._claves = tuple(claves)
+        self._ids: list[dict[tuple[object, ...], int]] = [{} for _ in self._claves]
+
+    def precargar(self, filas: Sequence[FilaCsv]) -> None:
+        for indice, clave in enumerate(self._claves):
+            valores = {valor for valor in (_extraer(clave, fila) for fila in filas) if valor is not None}
+            self._ids[indice] = self._consultar(clave.columnas, sorted(valores, key=repr))
+
+    def resolver(self, fila: FilaCsv) -> Optional[int]:
+        for clave, ids in zip(self._claves, self._ids):
+            valor = _extraer(clave, fila)
+            if valor is not None and valor in ids:
+                return ids[valor]
+        return None
+
+    def registrar(self, fila: FilaCsv, entidad_id: int) -> None:
+        """Hace visible un registro recién creado a las filas siguientes del mismo lote."""
+        for clave, ids in zip(self._claves, self._ids):
+            valor = _extraer(clave, fila)
+            if valor is not None:
+                ids.setdefault(valor, entidad_id)
+
+    def _consultar(self, columnas: tuple[str, ...], valores: list[tuple[object, ...]]) -> dict[tuple[object, ...], int]:
+        encontrados: dict[tuple[object, ...], int] = {}
+        seleccion = ", ".join(columnas)
+        for inicio in range(0, len(valores), _MAX_CLAVES_CONSULTA):
+            bloque = valores[inicio : inicio + _MAX_CLAVES_CONSULTA]
+            if len(columnas) == 1:
+                filtro = f"{columnas[0]} IN ({', '.join('?' for _ in bloque)})"
+            else:
+                tupla = "(" + ", ".join("?" for _ in columnas) + ")"
+                filtro = f"({seleccion}) IN (VALUES {', '.join(tupla for _ in bloque)})"
+            sql = f"SELECT id, {seleccion} FROM {self._tabla} WHERE {filtro} ORDER BY id"
+            for row in self._con.execute(sql, [dato for valor in bloque for dato in valor]):
+                encontrados.setdefault(tuple(row)[1:], int(row[0]))
+        return encontrados
+
+
+@dataclass(frozen=True, slots=True)
+class ImportadorCsvPorLotes:
+    con: sqlite3.Connection
+    unidad_trabajo: UnidadDeTrabajo
+    resolutor: ResolutorLote
+    row_to_model: Callable[[FilaCsv], object]
+    updater: Callable[[object], object]
+    creator: Callable[[object], object]
+    format_error: Callable[[Exception], str]
+
+    def importar(self, filas: Iterable[FilaCsv], opciones: OpcionesImportacionCsv) -> CsvImportResult:
+        if opciones.tamano_lote < 1:
+            raise ValueError("tamano_lote debe ser >= 1")
+        resultado = CsvImportResult(created=0, updated=0, errors=[], dry_run=opciones.dry_run)
+        inicio = time.monotonic()
+        procesadas = 0
+        numeradas = enumerate(filas, start=2)
+        for numero_lote, lote in enumerate(iter(lambda: list(islice(numeradas, opciones.tamano_lote)), []), 1):
+            errores_previos = len(resultado.errors)
+            self._procesar_lote(lote, resultado, opciones.dry_run)
+            procesadas += len(lote)
+            progreso = ProgresoImportacionCsv(
+                lote=numero_lote,
+                filas=procesadas,
+                creadas=resultado.created,
+                actualizadas=resultado.updated,
+                errores_lote=len(resultado.errors) - errores_previos,
+                segundos=time.monotonic() - inicio,
+            )
+            _notificar(progreso, opciones.al_progresar)
+        return resultado
+
+    def _procesar_lote(self, lote: list[tuple[int, FilaCsv]], resultado: CsvImportResult, dry_run: bool) -> None:
+        self.resolutor.precargar([fila for _, fila in lote])
+        if dry_run:
+            self._aplicar(lote, resultado, escribir=False)
+            return
+        parcial = CsvImportResult(created=0, updated=0, errors=[])
+        try:
+            with self.unidad_trabajo.transaccion():
+                self._aplicar(lote, parcial, escribir=True)
+        except sqlite3.Error as exc:
+            mensaje = f"Lote no guardado: {self.format_error(exc)}"
+            resultado.errors.extend(CsvRowError(numero, mensaje, fila) for numero, fila in lote)
+            return
+        resultado.created += parcial.created
+        resultado.updated += parcial.updated
+        resultado.errors.extend(parcial.errors)
+
+    def _aplicar(self, lote: list[tuple[int, FilaCsv]], resultado: CsvImportResult, *, escribir: bool) -> None:
+        for numero, fila in lote:
+            try:
+                with _fila_aislada(self.con, escribir):
+                    entidad = self.row_to_model(fila)
+                    existente = self.resolutor.resolver(fila)
+                    if not escribir:
+                        entidad.validar()
+                        self.resolutor.registrar(fila, existente or -numero)
+                    elif existente:
+                        entidad.id = existente
+                        self.updater(entidad)
+                    else:
+                        self.resolutor.registrar(fila, int(self.creator(entidad)))
+            except Exception as exc:  # noqa: BLE001
+                resultado.errors.append(CsvRowError(numero, self.format_error(exc), fila))
+                continue
+            if existente:
+                resultado.updated += 1
+            else:
+                resultado.created += 1
+
+
+def _extraer(clave: ClaveResolucion, fila: FilaCsv) -> Optional[tuple[object, ...]]:
+    try:
+        return clave.extraer(fila)
+    except Exception:  # noqa: BLE001 - la fila fallará igualmente al convertirla al modelo
+        return None
+
+
+@contextmanager
+def _fila_aislada(con: sqlite3.Connection, activo: bool) -> Iterator[None]:
+    if not activo or not con.in_transaction:
+        yield
+        return
+    con.execute("SAVEPOINT csv_fila")
+    try:
+        yield
+    except BaseException:
+        con.execute("ROLLBACK TO csv_fila")
+        con.execute("RELEASE csv_fila")
+        raise
+    con.execute("RELEASE csv_fila")
+
+
+def _notificar(
+    progreso: ProgresoImportacionCsv, al_progresar: Optional[Callable[[ProgresoImportacionCsv], None]]
+) -> None:
+    LOGGER.info(
+        "csv_importacion_lote",
+        extra={
+            "action": "csv_importacion_lote",
+            "lote": progreso.lote,
+            "filas": progreso.filas,
+            "errores_lote": progreso.errores_lote,
+            "filas_por_segundo": round(progreso.filas_por_segundo, 1),
+        },
+    )
+    if al_progresar is not None:
+        al_progresar(progreso)
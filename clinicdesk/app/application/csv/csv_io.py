@@ -4,9 +4,11 @@
 from __future__ import annotations
 
 import csv
+import os
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
 
 
 @dataclass(slots=True)
@@ -66,39 +68,71 @@ def _normalize_row(raw_row: dict[str, str] | None, header_map: dict[str, str]) -
     return normalized
 
 
-def read_csv(
+@dataclass(slots=True)
+class CsvStream:
+    """Cabecera ya validada y filas normalizadas que se leen del fichero según se consumen."""
+
+    headers: List[str]
+    rows: Iterator[Dict[str, str]]
+    errors: List[CsvRowError]
+
+
+@contextmanager
+def stream_csv(
     path: str | Path,
     *,
     required_headers: Optional[Sequence[str]] = None,
     allow_extra_headers: bool = True,
-) -> CsvReadResult:
-    p = Path(path)
-    errors: List[CsvRowError] = []
-    rows: List[Dict[str, str]] = []
-
-    with _open_text(p) as file_handle:
+) -> Iterator[CsvStream]:
+    """Como `read_csv`, pero sin cargar las filas: `rows` solo es válido dentro del bloque `with`."""
+    with _open_text(Path(path)) as file_handle:
         sample = file_handle.read(2048)
         file_handle.seek(0)
 
         reader = csv.DictReader(file_handle, delimiter=_detect_delimiter(sample))
         headers, header_map = _build_headers(reader.fieldnames)
         if not headers:
-            return CsvReadResult(headers=[], rows=[], errors=[CsvRowError(1, "CSV sin cabecera.", {})])
+            yield CsvStream(headers=[], rows=iter(()), errors=[CsvRowError(1, "CSV sin cabecera.", {})])
+            return
 
+        errors: List[CsvRowError] = []
         normalized_required = _normalize_required(required_headers)
         missing = _missing_required(headers, normalized_required)
         if missing:
             errors.append(CsvRowError(row_number=1, message=f"Faltan columnas obligatorias: {missing}", raw={}))
+        if required_headers and not allow_extra_headers:
+            allowed = set(normalized_required)
+            extra = [header for header in headers if header not in allowed]
+            if extra:
+                errors.append(CsvRowError(1, f"Columnas no permitidas: {extra}", {}))
 
-        rows.extend(_normalize_row(raw_row, header_map) for raw_row in reader)
+        yield CsvStream(
+            headers=headers,
+            rows=(_normalize_row(raw_row, header_map) for raw_row in reader),
+            errors=errors,
+        )
 
-    if required_headers and not allow_extra_headers:
-        allowed = set(normalized_required)
-        extra = [header for header in headers if header not in allowed]
-        if extra:
-            errors.append(CsvRowError(1, f"Columnas no permitidas: {extra}", {}))
 
-    return CsvReadResult(headers=headers, rows=rows, errors=errors)
+def read_csv(
+    path: str | Path,
+    *,
+    required_headers: Optional[Sequence[str]] = None,
+    allow_extra_headers: bool = True,
+) -> CsvReadResult:
+    with stream_csv(path, required_headers=required_headers, allow_extra_headers=allow_extra_headers) as stream:
+        return CsvReadResult(headers=stream.headers, rows=list(stream.rows), errors=stream.errors)
+
+
+class ExportacionCsvCancelada(Exception):
+    """La exportación se canceló; el fichero de destino no se ha tocado."""
+
+
+@dataclass(frozen=True, slots=True)
+class OpcionesExportacionCsv:
+    """`al_progresar` recibe las filas escritas hasta el momento; `debe_cancelar` se consulta por lote."""
+
+    al_progresar: Optional[Callable[[int], None]] = None
+    debe_cancelar: Optional[Callable[[], bool]] = None
 
 
 def write_csv(
@@ -107,13 +141,43 @@ def write_csv(
     headers: Sequence[str],
     rows: Iterable[Dict[str, object]],
     delimiter: str = ";",
-) -> None:
+) -> int:
+    return write_csv_por_lotes(path, headers=headers, lotes=(rows,), delimiter=delimiter)
+
+
+def write_csv_por_lotes(
+    path: str | Path,
+    *,
+    headers: Sequence[str],
+    lotes: Iterable[Iterable[Dict[str, object]]],
+    delimiter: str = ";",
+    opciones: Optional[OpcionesExportacionCsv] = None,
+) -> int:
+    """
+    Escribe los lotes según llegan en un temporal junto al destino y lo renombra al terminar.
+
+    Entre lote y lote informa del progreso y comprueba la cancelación; si se cancela o
+    falla, el destino queda como estaba. Devuelve las filas escritas.
+    """
     p = Path(path)
     p.parent.mkdir(parents=True, exist_ok=True)
-
-    with p.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=list(headers), delimiter=delimiter)
-        writer.writeheader()
-        for r in rows:
-            out = {h: ("" if r.get(h) is None else r.get(h)) for h in headers}
-            writer.writerow(out)
+    opciones = opciones or OpcionesExportacionCsv()
+    temporal = p.with_name(f".{p.name}.tmp")
+    escritas = 0
+    try:
+        with temporal.open("w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(headers), delimiter=delimiter)
+            writer.writeheader()
+            for lote in lotes:
+                if opciones.debe_cancelar is not None and opciones.debe_cancelar():
+                    raise ExportacionCsvCancelada(str(p))
+                for r in lote:
+                    writer.writerow({h: ("" if r.get(h) is None else r.get(h)) for h in headers})
+                    escritas += 1
+                if opciones.al_progresar is not None:
+                    opciones.al_progresar(escritas)
+        os.replace(temporal, p)
+    except BaseException:
+        temporal.unlink(missing_ok=True)
+        raise
+    return escritas
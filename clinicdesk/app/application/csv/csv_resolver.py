@@ -2,91 +2,45 @@ from __future__ import annotations
 
 from typing import Dict, Optional
 
+from clinicdesk.app.application.csv.csv_importacion_lotes import ClaveResolucion
 
-class CsvResolverMixin:
-    def _resolve_person_id(self, table: str, row: Dict[str, str]) -> Optional[int]:
-        rid = self._lookup_existing_id(table, self._to_int(row.get("id")))
-        if rid is not None:
-            return rid
-
-        tipo_documento_raw = (row.get("tipo_documento") or "").strip()
-        documento = (row.get("documento") or "").strip()
-        if not tipo_documento_raw or not documento:
-            return None
-
-        tipo_documento = self._parse_tipo_documento(tipo_documento_raw).value
-        query = f"SELECT id FROM {table} WHERE tipo_documento = ? AND documento = ? LIMIT 1"
-        found = self._c.connection.execute(query, (tipo_documento, documento)).fetchone()
-        return int(found["id"]) if found else None
-
-    def _resolve_medico_id(self, row: Dict[str, str]) -> Optional[int]:
-        rid = self._lookup_existing_id("medicos", self._to_int(row.get("id")))
-        if rid is not None:
-            return rid
 
-        num_colegiado = (row.get("num_colegiado") or "").strip()
-        if num_colegiado:
-            found = self._c.connection.execute(
-                "SELECT id FROM medicos WHERE num_colegiado = ? LIMIT 1",
-                (num_colegiado,),
-            ).fetchone()
-            if found:
-                return int(found["id"])
-
-        return self._resolve_person_id("medicos", row)
+class CsvResolverMixin:
+    """Claves, en orden de prioridad, con las que una fila CSV se asocia a un registro existente."""
 
-    def _resolve_medicamento_id(self, row: Dict[str, str]) -> Optional[int]:
-        rid = self._lookup_existing_id("medicamentos", self._to_int(row.get("id")))
-        if rid is not None:
-            return rid
+    def _claves_persona(self) -> tuple[ClaveResolucion, ...]:
+        return (self._clave_id(), ClaveResolucion(("tipo_documento", "documento"), self._valor_documento))
 
-        nc = (row.get("nombre_comercial") or "").strip()
-        ncp = (row.get("nombre_compuesto") or "").strip()
-        if not nc or not ncp:
-            return None
+    def _claves_medico(self) -> tuple[ClaveResolucion, ...]:
+        num_colegiado = ClaveResolucion(("num_colegiado",), lambda row: _texto(row, "num_colegiado"))
+        return (self._clave_id(), num_colegiado, *self._claves_persona()[1:])
 
-        found = self._c.connection.execute(
-            """
-            SELECT id FROM medicamentos
-            WHERE nombre_comercial = ? AND nombre_compuesto = ?
-            LIMIT 1
-            """,
-            (nc, ncp),
-        ).fetchone()
-        return int(found["id"]) if found else None
+    def _claves_medicamento(self) -> tuple[ClaveResolucion, ...]:
+        def _nombres(row: Dict[str, str]) -> Optional[tuple[object, ...]]:
+            comercial = _texto(row, "nombre_comercial")
+            compuesto = _texto(row, "nombre_compuesto")
+            return comercial + compuesto if comercial and compuesto else None
 
-    def _resolve_material_id(self, row: Dict[str, str]) -> Optional[int]:
-        rid = self._lookup_existing_id("materiales", self._to_int(row.get("id")))
-        if rid is not None:
-            return rid
+        return (self._clave_id(), ClaveResolucion(("nombre_comercial", "nombre_compuesto"), _nombres))
 
-        nombre = (row.get("nombre") or "").strip()
-        if not nombre:
-            return None
+    def _claves_por_nombre(self) -> tuple[ClaveResolucion, ...]:
+        return (self._clave_id(), ClaveResolucion(("nombre",), lambda row: _texto(row, "nombre")))
 
-        found = self._c.connection.execute(
-            "SELECT id FROM materiales WHERE nombre = ? LIMIT 1",
-            (nombre,),
-        ).fetchone()
-        return int(found["id"]) if found else None
+    def _clave_id(self) -> ClaveResolucion:
+        def _id(row: Dict[str, str]) -> Optional[tuple[object, ...]]:
+            rid = self._to_int(row.get("id"))
+            return (rid,) if rid else None
 
-    def _resolve_sala_id(self, row: Dict[str, str]) -> Optional[int]:
-        rid = self._lookup_existing_id("salas", self._to_int(row.get("id")))
-        if rid is not None:
-            return rid
+        return ClaveResolucion(("id",), _id)
 
-        nombre = (row.get("nombre") or "").strip()
-        if not nombre:
+    def _valor_documento(self, row: Dict[str, str]) -> Optional[tuple[object, ...]]:
+        tipo_documento_raw = (row.get("tipo_documento") or "").strip()
+        documento = _texto(row, "documento")
+        if not tipo_documento_raw or not documento:
             return None
+        return (self._parse_tipo_documento(tipo_documento_raw).value, *documento)
 
-        found = self._c.connection.execute(
-            "SELECT id FROM salas WHERE nombre = ? LIMIT 1",
-            (nombre,),
-        ).fetchone()
-        return int(found["id"]) if found else None
 
-    def _lookup_existing_id(self, table: str, rid: Optional[int]) -> Optional[int]:
-        if not rid:
-            return None
-        exists = self._c.connection.execute(f"SELECT 1 FROM {table} WHERE id = ? LIMIT 1", (rid,)).fetchone()
-        return rid if exists else None
+def _texto(row: Dict[str, str], columna: str) -> Optional[tuple[object, ...]]:
+    valor = (row.get(columna) or "").strip()
+    return (valor,) if valor else None
@@ -2,29 +2,32 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Callable, Dict, List
+from typing import Callable, Dict, Generator, Iterable, Optional, Sequence
 
 from clinicdesk.app.application.csv.csv_errors import CsvErrorMixin
-from clinicdesk.app.application.csv.csv_io import CsvRowError, read_csv, write_csv
+from clinicdesk.app.application.csv.csv_importacion_lotes import (
+    ClaveResolucion,
+    CsvImportResult,
+    ImportadorCsvPorLotes,
+    OpcionesImportacionCsv,
+    ResolutorLote,
+)
+from clinicdesk.app.application.csv.csv_io import OpcionesExportacionCsv, stream_csv, write_csv_por_lotes
 from clinicdesk.app.application.csv.csv_mapping import CsvMappingMixin
 from clinicdesk.app.application.csv.csv_parsing import CsvParsingMixin
 from clinicdesk.app.application.csv.csv_resolver import CsvResolverMixin
+from clinicdesk.app.application.ports.unidad_trabajo_port import resolver_unidad_de_trabajo
+from clinicdesk.app.composicion.composicion_repositorios_sqlite import RepositoriosSqlite
 from clinicdesk.app.container import AppContainer
 
 
-@dataclass(slots=True)
-class CsvImportResult:
-    created: int
-    updated: int
-    errors: List[CsvRowError]
-
-
 class CsvService(CsvResolverMixin, CsvMappingMixin, CsvParsingMixin, CsvErrorMixin):
-    def __init__(self, container: AppContainer) -> None:
+    """Con `RepositoriosSqlite` (p. ej. sobre una conexión del pool) solo exporta: no hay unidad de trabajo."""
+
+    def __init__(self, container: AppContainer | RepositoriosSqlite) -> None:
         self._c = container
 
-    def export_pacientes(self, path: str) -> None:
+    def export_pacientes(self, path: str, opciones: Optional[OpcionesExportacionCsv] = None) -> int:
         headers = [
             "id",
             "tipo_documento",
@@ -40,9 +43,11 @@ class CsvService(CsvResolverMixin, CsvMappingMixin, CsvParsingMixin, CsvErrorMix
             "alergias",
             "observaciones",
         ]
-        self._export_entities(path, headers, self._c.pacientes_repo.list_all(solo_activos=False), self._paciente_to_row)
+        return self._export_entities(
+            path, headers, self._c.pacientes_repo.iterar_todos(solo_activos=False), self._paciente_to_row, opciones
+        )
 
-    def export_medicos(self, path: str) -> None:
+    def export_medicos(self, path: str, opciones: Optional[OpcionesExportacionCsv] = None) -> int:
         headers = [
             "id",
             "tipo_documento",
@@ -57,9 +62,11 @@ class CsvService(CsvResolverMixin, CsvMappingMixin, CsvParsingMixin, CsvErrorMix
             "num_colegiado",
             "especialidad",
         ]
-        self._export_entities(path, headers, self._c.medicos_repo.list_all(solo_activos=False), self._medico_to_row)
+        return self._export_entities(
+            path, headers, self._c.medicos_repo.iterar_todos(solo_activos=False), self._medico_to_row, opciones
+        )
 
-    def export_personal(self, path: str) -> None:
+    def export_personal(self, path: str, opciones: Optional[OpcionesExportacionCsv] = None) -> int:
         headers = [
             "id",
             "tipo_documento",
@@ -74,88 +81,112 @@ class CsvService(CsvResolverMixin, CsvMappingMixin, CsvParsingMixin, CsvErrorMix
             "puesto",
             "turno",
         ]
-        self._export_entities(path, headers, self._c.personal_repo.list_all(solo_activos=False), self._personal_to_row)
+        return self._export_entities(
+            path, headers, self._c.personal_repo.iterar_todos(solo_activos=False), self._personal_to_row, opciones
+        )
 
-    def export_medicamentos(self, path: str) -> None:
+    def export_medicamentos(self, path: str, opciones: Optional[OpcionesExportacionCsv] = None) -> int:
         headers = ["id", "nombre_compuesto", "nombre_comercial", "cantidad_en_almacen", "activo"]
-        self._export_entities(
-            path, headers, self._c.medicamentos_repo.list_all(solo_activos=False), self._medicamento_to_row
-        )
+        lotes = self._c.medicamentos_repo.iterar_todos(solo_activos=False)
+        return self._export_entities(path, headers, lotes, self._medicamento_to_row, opciones)
 
-    def export_materiales(self, path: str) -> None:
+    def export_materiales(self, path: str, opciones: Optional[OpcionesExportacionCsv] = None) -> int:
         headers = ["id", "nombre", "fungible", "cantidad_en_almacen", "activo"]
-        self._export_entities(
-            path, headers, self._c.materiales_repo.list_all(solo_activos=False), self._material_to_row
+        return self._export_entities(
+            path, headers, self._c.materiales_repo.iterar_todos(solo_activos=False), self._material_to_row, opciones
         )
 
-    def export_salas(self, path: str) -> None:
+    def export_salas(self, path: str, opciones: Optional[OpcionesExportacionCsv] = None) -> int:
         headers = ["id", "nombre", "tipo", "ubicacion", "activa"]
-        self._export_entities(path, headers, self._c.salas_repo.list_all(solo_activas=False), self._sala_to_row)
+        return self._export_entities(
+            path, headers, self._c.salas_repo.iterar_todos(solo_activas=False), self._sala_to_row, opciones
+        )
 
-    def import_pacientes(self, path: str) -> CsvImportResult:
+    def import_pacientes(self, path: str, opciones: Optional[OpcionesImportacionCsv] = None) -> CsvImportResult:
         return self._import_entities(
             path=path,
             required=["tipo_documento", "documento", "nombre", "apellidos"],
             row_to_model=self._row_to_paciente,
-            resolver=lambda row: self._resolve_person_id("pacientes", row),
+            tabla="pacientes",
+            claves=self._claves_persona(),
             updater=self._c.pacientes_repo.update,
             creator=self._c.pacientes_repo.create,
+            opciones=opciones,
         )
 
-    def import_medicos(self, path: str) -> CsvImportResult:
+    def import_medicos(self, path: str, opciones: Optional[OpcionesImportacionCsv] = None) -> CsvImportResult:
         return self._import_entities(
             path=path,
             required=["tipo_documento", "documento", "nombre", "apellidos"],
             row_to_model=self._row_to_medico,
-            resolver=self._resolve_medico_id,
+            tabla="medicos",
+            claves=self._claves_medico(),
             updater=self._c.medicos_repo.update,
             creator=self._c.medicos_repo.create,
+            opciones=opciones,
         )
 
-    def import_personal(self, path: str) -> CsvImportResult:
+    def import_personal(self, path: str, opciones: Optional[OpcionesImportacionCsv] = None) -> CsvImportResult:
         return self._import_entities(
             path=path,
             required=["tipo_documento", "documento", "nombre", "apellidos"],
             row_to_model=self._row_to_personal,
-            resolver=lambda row: self._resolve_person_id("personal", row),
+            tabla="personal",
+            claves=self._claves_persona(),
             updater=self._c.personal_repo.update,
             creator=self._c.personal_repo.create,
+            opciones=opciones,
         )
 
-    def import_medicamentos(self, path: str) -> CsvImportResult:
+    def import_medicamentos(self, path: str, opciones: Optional[OpcionesImportacionCsv] = None) -> CsvImportResult:
         return self._import_entities(
             path=path,
             required=["nombre_compuesto", "nombre_comercial"],
             row_to_model=self._row_to_medicamento,
-            resolver=self._resolve_medicamento_id,
+            tabla="medicamentos",
+            claves=self._claves_medicamento(),
             updater=self._c.medicamentos_repo.update,
             creator=self._c.medicamentos_repo.create,
+            opciones=opciones,
         )
 
-    def import_materiales(self, path: str) -> CsvImportResult:
+    def import_materiales(self, path: str, opciones: Optional[OpcionesImportacionCsv] = None) -> CsvImportResult:
         return self._import_entities(
             path=path,
             required=["nombre", "fungible"],
             row_to_model=self._row_to_material,
-            resolver=self._resolve_material_id,
+            tabla="materiales",
+            claves=self._claves_por_nombre(),
             updater=self._c.materiales_repo.update,
             creator=self._c.materiales_repo.create,
+            opciones=opciones,
         )
 
-    def import_salas(self, path: str) -> CsvImportResult:
+    def import_salas(self, path: str, opciones: Optional[OpcionesImportacionCsv] = None) -> CsvImportResult:
         return self._import_entities(
             path=path,
             required=["nombre", "tipo"],
             row_to_model=self._row_to_sala,
-            resolver=self._resolve_sala_id,
+            tabla="salas",
+            claves=self._claves_por_nombre(),
             updater=self._c.salas_repo.update,
             creator=self._c.salas_repo.create,
+            opciones=opciones,
         )
 
     def _export_entities(
-        self, path: str, headers: list[str], entities, serializer: Callable[[object], Dict[str, object]]
-    ) -> None:
-        write_csv(path, headers=headers, rows=[serializer(entity) for entity in entities])
+        self,
+        path: str,
+        headers: list[str],
+        lotes: Generator[Iterable[object], None, None],
+        serializer: Callable[[object], Dict[str, object]],
+        opciones: Optional[OpcionesExportacionCsv],
+    ) -> int:
+        filas = ([serializer(entity) for entity in lote] for lote in lotes)
+        try:
+            return write_csv_por_lotes(path, headers=headers, lotes=filas, opciones=opciones)
+        finally:
+            lotes.close()
 
     def _import_entities(
         self,
@@ -163,27 +194,22 @@ class CsvService(CsvResolverMixin, CsvMappingMixin, CsvParsingMixin, CsvErrorMix
         path: str,
         required: list[str],
         row_to_model: Callable[[Dict[str, str]], object],
-        resolver: Callable[[Dict[str, str]], int | None],
+        tabla: str,
+        claves: Sequence[ClaveResolucion],
         updater: Callable[[object], object],
         creator: Callable[[object], object],
+        opciones: Optional[OpcionesImportacionCsv],
     ) -> CsvImportResult:
-        data = read_csv(path, required_headers=required)
-        created = 0
-        updated = 0
-        errors = list(data.errors)
-
-        for row_number, row in enumerate(data.rows, start=2):
-            try:
-                entity = row_to_model(row)
-                existing_id = resolver(row)
-                if existing_id:
-                    entity.id = existing_id
-                    updater(entity)
-                    updated += 1
-                else:
-                    creator(entity)
-                    created += 1
-            except Exception as exc:  # noqa: BLE001
-                errors.append(CsvRowError(row_number, self._format_row_error(exc), row))
-
-        return CsvImportResult(created=created, updated=updated, errors=errors)
+        importador = ImportadorCsvPorLotes(
+            con=self._c.connection,
+            unidad_trabajo=resolver_unidad_de_trabajo(self._c),
+            resolutor=ResolutorLote(self._c.connection, tabla, claves),
+            row_to_model=row_to_model,
+            updater=updater,
+            creator=creator,
+            format_error=self._format_row_error,
+        )
+        with stream_csv(path, required_headers=required) as data:
+            resultado = importador.importar(data.rows, opciones or OpcionesImportacionCsv())
+        resultado.errors[:0] = data.errors
+        return resultado
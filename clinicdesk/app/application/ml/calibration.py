@@ -29,6 +29,13 @@ def compute_metrics_at_threshold(scores: list[float], y_true: list[int], thr: fl
 
 
 def calibrate_threshold(scores: list[float], y_true: list[int], policy: ThresholdPolicy) -> float:
+    """
+    Umbral que mejor cumple la política.
+
+    Objetivos: `f1_max`, `min_recall`/`min_precision` (`value` = mínimo exigido),
+    `fbeta_max` (`value` = beta) y `min_cost` (`value` = coste de un falso positivo
+    relativo a un falso negativo).
+    """
     metrics_by_thr = _metrics_grid(scores, y_true)
     objective = policy.objective.strip().lower()
     if objective == "f1_max":
@@ -37,7 +44,11 @@ def calibrate_threshold(scores: list[float], y_true: list[int], policy: Threshol
         return _best_with_min_target(metrics_by_thr, policy.value, key_name="recall")
     if objective == "min_precision":
         return _best_with_min_target(metrics_by_thr, policy.value, key_name="precision")
-    raise ValueError("objective inválido. Use: min_recall|min_precision|f1_max")
+    if objective == "fbeta_max":
+        return _best_by_fbeta(metrics_by_thr, policy.value)
+    if objective == "min_cost":
+        return _best_by_cost(metrics_by_thr, policy.value)
+    raise ValueError("objective inválido. Use: min_recall|min_precision|f1_max|fbeta_max|min_cost")
 
 
 def _validate_inputs(scores: list[float], y_true: list[int]) -> None:
@@ -53,12 +64,27 @@ def _threshold_candidates(scores: list[float], fallback: float) -> list[float]:
 
 
 def _metrics_grid(scores: list[float], y_true: list[int]) -> list[tuple[float, EvalMetrics, float]]:
+    """
+    Métricas en cada umbral candidato con una sola ordenación: se recorren los umbrales de
+    mayor a menor y cada score pasa a positivo una única vez, acumulando tp/fp.
+    """
     _validate_inputs(scores, y_true)
     candidates = _threshold_candidates(scores, fallback=0.5)
+    ordered = sorted(zip(scores, y_true), key=lambda pair: pair[0], reverse=True)
+    positives = sum(1 for target in y_true if target == 1)
+    negatives = len(y_true) - positives
+    tp = fp = index = 0
     by_thr: list[tuple[float, EvalMetrics, float]] = []
-    for thr in candidates:
-        metrics = compute_metrics_at_threshold(scores, y_true, thr)
+    for thr in reversed(candidates):
+        while index < len(ordered) and ordered[index][0] >= thr:
+            if ordered[index][1] == 1:
+                tp += 1
+            else:
+                fp += 1
+            index += 1
+        metrics = _build_metrics(tp, fp, negatives - fp, positives - tp)
         by_thr.append((thr, metrics, _f1(metrics)))
+    by_thr.reverse()
     return by_thr
 
 
@@ -67,6 +93,20 @@ def _best_by_f1(metrics_by_thr: list[tuple[float, EvalMetrics, float]]) -> float
     return float(best[0])
 
 
+def _best_by_fbeta(metrics_by_thr: list[tuple[float, EvalMetrics, float]], beta: float) -> float:
+    if beta <= 0:
+        raise ValueError("fbeta_max requiere value (beta) > 0.")
+    best = max(metrics_by_thr, key=lambda item: (_f_beta(item[1], beta), item[1].precision, -item[0]))
+    return float(best[0])
+
+
+def _best_by_cost(metrics_by_thr: list[tuple[float, EvalMetrics, float]], coste_fp: float) -> float:
+    if coste_fp < 0:
+        raise ValueError("min_cost requiere value (coste relativo de un falso positivo) >= 0.")
+    best = min(metrics_by_thr, key=lambda item: (coste_fp * item[1].fp + item[1].fn, -item[2], item[0]))
+    return float(best[0])
+
+
 def _best_with_min_target(
     metrics_by_thr: list[tuple[float, EvalMetrics, float]], target: float, key_name: str
 ) -> float:
@@ -92,3 +132,9 @@ def _build_metrics(tp: int, fp: int, tn: int, fn: int) -> EvalMetrics:
 def _f1(metrics: EvalMetrics) -> float:
     denom = metrics.precision + metrics.recall
     return (2.0 * metrics.precision * metrics.recall / denom) if denom else 0.0
+
+
+def _f_beta(metrics: EvalMetrics, beta: float) -> float:
+    beta2 = beta * beta
+    denom = beta2 * metrics.precision + metrics.recall
+    return ((1.0 + beta2) * metrics.precision * metrics.recall / denom) if denom else 0.0
@@ -2,11 +2,11 @@ from __future__ import annotations
 
 import math
 from dataclasses import dataclass
-from typing import Callable
+from typing import Any, Callable, Mapping, Sequence
 
 from clinicdesk.app.application.features.citas_features import CitasFeatureRow
 
-_DRIFT_FEATURES = ("duracion_bucket", "notas_len_bucket", "is_weekend", "estado_norm", "is_suspicious")
+DRIFT_FEATURES = ("duracion_bucket", "notas_len_bucket", "is_weekend", "estado_norm", "is_suspicious")
 _PSI_ALERT_THRESHOLD = 0.2
 
 
@@ -49,12 +49,24 @@ def compute_citas_drift(
     from_version: str = "from",
     to_version: str = "to",
 ) -> DriftReport:
+    return compute_citas_drift_from_columns(
+        _columns(features_from), _columns(features_to), from_version=from_version, to_version=to_version
+    )
+
+
+def compute_citas_drift_from_columns(
+    columns_from: Mapping[str, Sequence[Any]],
+    columns_to: Mapping[str, Sequence[Any]],
+    from_version: str = "from",
+    to_version: str = "to",
+) -> DriftReport:
+    """Drift a partir de los valores de `DRIFT_FEATURES`, sin materializar filas completas."""
     feature_shifts: dict[str, dict[str, float]] = {}
     psi_by_feature: dict[str, float] = {}
 
-    for feature_name in _DRIFT_FEATURES:
-        p = compute_categorical_distribution(features_from, lambda row, key=feature_name: _token(row, key))
-        q = compute_categorical_distribution(features_to, lambda row, key=feature_name: _token(row, key))
+    for feature_name in DRIFT_FEATURES:
+        p = _distribution(columns_from[feature_name])
+        q = _distribution(columns_to[feature_name])
         deltas = {token: q.get(token, 0.0) - p.get(token, 0.0) for token in sorted(set(p) | set(q))}
         feature_shifts[feature_name] = deltas
         psi_by_feature[feature_name] = compute_psi(p, q)
@@ -63,16 +75,23 @@ def compute_citas_drift(
     return DriftReport(
         from_version=from_version,
         to_version=to_version,
-        total_from=len(features_from),
-        total_to=len(features_to),
+        total_from=len(columns_from[DRIFT_FEATURES[0]]),
+        total_to=len(columns_to[DRIFT_FEATURES[0]]),
         feature_shifts=feature_shifts,
         psi_by_feature=psi_by_feature,
         overall_flag=overall_flag,
     )
 
 
-def _token(row: CitasFeatureRow, key: str) -> str:
-    value = getattr(row, key)
+def _columns(rows: list[CitasFeatureRow]) -> dict[str, list[Any]]:
+    return {feature_name: [getattr(row, feature_name) for row in rows] for feature_name in DRIFT_FEATURES}
+
+
+def _distribution(values: Sequence[Any]) -> dict[str, float]:
+    return compute_categorical_distribution(list(values), _token)
+
+
+def _token(value: Any) -> str:
     if isinstance(value, bool):
         return str(int(value))
     return str(value)
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Callable
+from typing import Callable, Mapping, Sequence
 
 from clinicdesk.app.application.features.citas_features import CitasFeatureRow
-from clinicdesk.app.application.ml.naive_bayes_citas import TrainedModel, predict_one
+from clinicdesk.app.application.ml.naive_bayes_citas import TrainedModel, score_batch
+
+_UMBRAL_POR_DEFECTO = 0.5
+_BINS_CALIBRACION = 10
 
 
 @dataclass(slots=True)
@@ -18,29 +21,124 @@ class EvalMetrics:
     fn: int
 
 
+@dataclass(frozen=True, slots=True)
+class BinCalibracion:
+    desde: float
+    hasta: float
+    filas: int
+    score_medio: float
+    tasa_positivos: float
+
+
+@dataclass(frozen=True, slots=True)
+class InformeEvaluacion:
+    metrics: EvalMetrics
+    bins_calibracion: tuple[BinCalibracion, ...]
+    por_segmento: dict[str, dict[str, EvalMetrics]]
+
+
+@dataclass(frozen=True, slots=True)
+class ConjuntoEvaluacion:
+    """Conjunto de test por columnas: objetivo y valor de cada segmentación, alineados por posición."""
+
+    targets: tuple[int, ...]
+    segmentos: dict[str, tuple[str, ...]]
+
+    @classmethod
+    def desde_filas(
+        cls,
+        rows: Sequence[CitasFeatureRow],
+        target_fn: Callable[[CitasFeatureRow], int],
+        segmentadores: Mapping[str, Callable[[CitasFeatureRow], str]] | None = None,
+    ) -> ConjuntoEvaluacion:
+        segmentadores = SEGMENTADORES_POR_DEFECTO if segmentadores is None else segmentadores
+        return cls(
+            targets=tuple(int(target_fn(row)) for row in rows),
+            segmentos={nombre: tuple(str(fn(row)) for row in rows) for nombre, fn in segmentadores.items()},
+        )
+
+
+SEGMENTADORES_POR_DEFECTO: Mapping[str, Callable[[CitasFeatureRow], str]] = {
+    "estado_norm": lambda row: row.estado_norm,
+    "duracion_bucket": lambda row: row.duracion_bucket,
+}
+
+
 def evaluate(
     model: TrainedModel,
     rows: list[CitasFeatureRow],
     target_fn: Callable[[CitasFeatureRow], int],
 ) -> EvalMetrics:
-    tp = fp = tn = fn = 0
-    for row in rows:
-        target = int(target_fn(row))
-        predicted = 1 if predict_one(model, row).score >= 0.5 else 0
-        tp, fp, tn, fn = _update_confusion_counts(tp, fp, tn, fn, target, predicted)
-    return _build_metrics(tp, fp, tn, fn)
-
-
-def _update_confusion_counts(
-    tp: int, fp: int, tn: int, fn: int, target: int, predicted: int
-) -> tuple[int, int, int, int]:
-    if predicted == 1 and target == 1:
-        return tp + 1, fp, tn, fn
-    if predicted == 1 and target == 0:
-        return tp, fp + 1, tn, fn
-    if predicted == 0 and target == 0:
-        return tp, fp, tn + 1, fn
-    return tp, fp, tn, fn + 1
+    conjunto = ConjuntoEvaluacion.desde_filas(rows, target_fn, segmentadores={})
+    return evaluar_scores(score_batch(model, rows), conjunto).metrics
+
+
+def evaluar_candidatos(
+    scores_por_candidato: Mapping[str, Sequence[float]],
+    conjunto: ConjuntoEvaluacion,
+    *,
+    umbral: float = _UMBRAL_POR_DEFECTO,
+    bins: int = _BINS_CALIBRACION,
+) -> dict[str, InformeEvaluacion]:
+    """Un informe por candidato (modelo entrenado, baseline...) sobre el mismo conjunto de test."""
+    return {
+        nombre: evaluar_scores(scores, conjunto, umbral=umbral, bins=bins)
+        for nombre, scores in scores_por_candidato.items()
+    }
+
+
+def evaluar_scores(
+    scores: Sequence[float],
+    conjunto: ConjuntoEvaluacion,
+    *,
+    umbral: float = _UMBRAL_POR_DEFECTO,
+    bins: int = _BINS_CALIBRACION,
+) -> InformeEvaluacion:
+    """Matriz de confusión global y por segmento y bins de calibración en una sola pasada."""
+    if len(scores) != len(conjunto.targets):
+        raise ValueError("scores y conjunto de evaluación deben tener el mismo tamaño.")
+    if bins < 1:
+        raise ValueError("bins debe ser >= 1.")
+    global_counts = [0, 0, 0, 0]
+    por_segmento: dict[str, dict[str, list[int]]] = {nombre: {} for nombre in conjunto.segmentos}
+    columnas = tuple(conjunto.segmentos.items())
+    bin_filas = [0] * bins
+    bin_scores = [0.0] * bins
+    bin_positivos = [0] * bins
+    for posicion, (score, target) in enumerate(zip(scores, conjunto.targets)):
+        celda = _celda_confusion(target, 1 if score >= umbral else 0)
+        global_counts[celda] += 1
+        for nombre, valores in columnas:
+            por_segmento[nombre].setdefault(valores[posicion], [0, 0, 0, 0])[celda] += 1
+        indice_bin = min(max(int(score * bins), 0), bins - 1)
+        bin_filas[indice_bin] += 1
+        bin_scores[indice_bin] += score
+        bin_positivos[indice_bin] += target
+    return InformeEvaluacion(
+        metrics=_build_metrics(*global_counts),
+        bins_calibracion=tuple(
+            BinCalibracion(
+                desde=indice / bins,
+                hasta=(indice + 1) / bins,
+                filas=bin_filas[indice],
+                score_medio=bin_scores[indice] / bin_filas[indice],
+                tasa_positivos=bin_positivos[indice] / bin_filas[indice],
+            )
+            for indice in range(bins)
+            if bin_filas[indice]
+        ),
+        por_segmento={
+            nombre: {valor: _build_metrics(*counts) for valor, counts in sorted(segmentos.items())}
+            for nombre, segmentos in por_segmento.items()
+        },
+    )
+
+
+def _celda_confusion(target: int, predicted: int) -> int:
+    """Posición en (tp, fp, tn, fn)."""
+    if predicted == 1:
+        return 0 if target == 1 else 1
+    return 2 if target == 0 else 3
 
 
 def _build_metrics(tp: int, fp: int, tn: int, fn: int) -> EvalMetrics:
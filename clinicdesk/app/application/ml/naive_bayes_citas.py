@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import math
+from collections import Counter
 from dataclasses import dataclass
 from typing import Any
 
@@ -9,6 +10,14 @@ from clinicdesk.app.application.ml.targets import derive_target_from_feature
 from clinicdesk.app.application.ports.predictor_port import PredictionResult
 
 _ALPHA = 1.0
+_FEATURES = (
+    "duracion_bucket",
+    "notas_len_bucket",
+    "is_weekend",
+    "estado_norm",
+    "has_incidencias",
+    "is_suspicious",
+)
 
 
 @dataclass(slots=True)
@@ -24,12 +33,12 @@ def train(rows: list[CitasFeatureRow]) -> TrainedModel:
     class_counts = {"0": 0, "1": 0}
     feature_counts = _empty_feature_counts()
 
-    for row in rows:
-        target = str(derive_target_from_feature(row))
-        class_counts[target] += 1
-        for name, value in _feature_tokens(row).items():
+    combinaciones = Counter((str(derive_target_from_feature(row)), _token_tuple(row)) for row in rows)
+    for (target, tokens), veces in combinaciones.items():
+        class_counts[target] += veces
+        for name, value in zip(_FEATURES, tokens):
             per_class = feature_counts[name].setdefault(target, {})
-            per_class[value] = per_class.get(value, 0) + 1
+            per_class[value] = per_class.get(value, 0) + veces
 
     return TrainedModel(
         model_name="citas_nb_v1",
@@ -40,12 +49,28 @@ def train(rows: list[CitasFeatureRow]) -> TrainedModel:
 
 
 def predict_one(model: TrainedModel, row: CitasFeatureRow) -> PredictionResult:
-    score = _posterior_positive_probability(model, row)
-    return PredictionResult(score=score, label=_to_label(score), reasons=["predictor=naive_bayes"])
+    return predict_batch(model, [row])[0]
 
 
 def predict_batch(model: TrainedModel, rows: list[CitasFeatureRow]) -> list[PredictionResult]:
-    return [predict_one(model, row) for row in rows]
+    return [
+        PredictionResult(score=score, label=_to_label(score), reasons=["predictor=naive_bayes"])
+        for score in score_batch(model, rows)
+    ]
+
+
+def score_batch(model: TrainedModel, rows: list[CitasFeatureRow]) -> list[float]:
+    """Probabilidad de la clase positiva por fila; cada combinación distinta de tokens se puntúa una vez."""
+    compilado = _ModeloCompilado.desde(model)
+    scores: dict[tuple[str, ...], float] = {}
+    resultado: list[float] = []
+    for row in rows:
+        tokens = _token_tuple(row)
+        score = scores.get(tokens)
+        if score is None:
+            score = scores[tokens] = compilado.score(tokens)
+        resultado.append(score)
+    return resultado
 
 
 def model_to_dict(model: TrainedModel) -> dict[str, Any]:
@@ -76,34 +101,61 @@ def model_from_dict(payload: dict[str, Any]) -> TrainedModel:
     )
 
 
-def _posterior_positive_probability(model: TrainedModel, row: CitasFeatureRow) -> float:
-    total = model.class_counts["0"] + model.class_counts["1"]
-    if total == 0:
-        return 0.5
-
-    log_prob_0 = math.log(_smoothed_prior(model.class_counts["0"], total, 2, model.alpha))
-    log_prob_1 = math.log(_smoothed_prior(model.class_counts["1"], total, 2, model.alpha))
-
-    for name, token in _feature_tokens(row).items():
-        log_prob_0 += math.log(_smoothed_likelihood(model, name, token, "0"))
-        log_prob_1 += math.log(_smoothed_likelihood(model, name, token, "1"))
-
-    prob_1 = _sigmoid_from_log_odds(log_prob_1 - log_prob_0)
-    return max(0.0, min(1.0, prob_1))
+@dataclass(frozen=True, slots=True)
+class _ModeloCompilado:
+    """
+    Log-verosimilitudes precalculadas por feature y token, en forma de diferencia
+    log P(token|1) - log P(token|0), con los totales por clase calculados una sola vez.
+    """
+
+    log_odds_prior: float | None
+    log_odds_tokens: tuple[dict[str, float], ...]
+    log_odds_desconocido: tuple[float, ...]
+
+    @classmethod
+    def desde(cls, model: TrainedModel) -> _ModeloCompilado:
+        total = model.class_counts["0"] + model.class_counts["1"]
+        if total == 0:
+            return cls(log_odds_prior=None, log_odds_tokens=(), log_odds_desconocido=())
+        log_prior_0 = math.log(_smoothed_prior(model.class_counts["0"], total, 2, model.alpha))
+        log_prior_1 = math.log(_smoothed_prior(model.class_counts["1"], total, 2, model.alpha))
+        tablas: list[dict[str, float]] = []
+        desconocidos: list[float] = []
+        for feature in _FEATURES:
+            per_class = model.feature_counts.get(feature, {})
+            cuentas = (per_class.get("0", {}), per_class.get("1", {}))
+            cardinality = max(model.feature_value_cardinality.get(feature, 1), 1)
+            denominadores = [sum(c.values()) + model.alpha * cardinality for c in cuentas]
+            tokens = set(cuentas[0]) | set(cuentas[1])
+            tablas.append({token: _log_odds_token(cuentas, token, denominadores, model.alpha) for token in tokens})
+            desconocidos.append(_log_odds_token(cuentas, None, denominadores, model.alpha))
+        return cls(
+            log_odds_prior=log_prior_1 - log_prior_0,
+            log_odds_tokens=tuple(tablas),
+            log_odds_desconocido=tuple(desconocidos),
+        )
+
+    def score(self, tokens: tuple[str, ...]) -> float:
+        if self.log_odds_prior is None:
+            return 0.5
+        log_odds = self.log_odds_prior
+        for tabla, desconocido, token in zip(self.log_odds_tokens, self.log_odds_desconocido, tokens):
+            log_odds += tabla.get(token, desconocido)
+        return max(0.0, min(1.0, _sigmoid_from_log_odds(log_odds)))
+
+
+def _log_odds_token(
+    cuentas: tuple[dict[str, int], dict[str, int]], token: str | None, denominadores: list[float], alpha: float
+) -> float:
+    log_0 = math.log((cuentas[0].get(token, 0) + alpha) / denominadores[0])
+    log_1 = math.log((cuentas[1].get(token, 0) + alpha) / denominadores[1])
+    return log_1 - log_0
 
 
 def _smoothed_prior(class_count: int, total: int, num_classes: int, alpha: float) -> float:
     return (class_count + alpha) / (total + alpha * num_classes)
 
 
-def _smoothed_likelihood(model: TrainedModel, feature: str, token: str, klass: str) -> float:
-    per_class = model.feature_counts.get(feature, {}).get(klass, {})
-    token_count = per_class.get(token, 0)
-    feature_total = sum(per_class.values())
-    cardinality = max(model.feature_value_cardinality.get(feature, 1), 1)
-    return (token_count + model.alpha) / (feature_total + model.alpha * cardinality)
-
-
 def _sigmoid_from_log_odds(log_odds: float) -> float:
     if log_odds >= 0:
         z = math.exp(-log_odds)
@@ -120,19 +172,20 @@ def _to_label(score: float) -> str:
     return "high"
 
 
-def _feature_tokens(row: CitasFeatureRow) -> dict[str, str]:
-    return {
-        "duracion_bucket": row.duracion_bucket,
-        "notas_len_bucket": row.notas_len_bucket,
-        "is_weekend": str(int(row.is_weekend)),
-        "estado_norm": row.estado_norm,
-        "has_incidencias": str(int(row.has_incidencias)),
-        "is_suspicious": str(int(row.is_suspicious)),
-    }
+def _token_tuple(row: CitasFeatureRow) -> tuple[str, ...]:
+    """Tokens de la fila en el orden de `_FEATURES`."""
+    return (
+        row.duracion_bucket,
+        row.notas_len_bucket,
+        str(int(row.is_weekend)),
+        row.estado_norm,
+        str(int(row.has_incidencias)),
+        str(int(row.is_suspicious)),
+    )
 
 
 def _empty_feature_counts() -> dict[str, dict[str, dict[str, int]]]:
-    return {name: {"0": {}, "1": {}} for name in _feature_tokens(_dummy_row()).keys()}
+    return {name: {"0": {}, "1": {}} for name in _FEATURES}
 
 
 def _feature_value_cardinality(feature_counts: dict[str, dict[str, dict[str, int]]]) -> dict[str, int]:
@@ -141,19 +194,3 @@ def _feature_value_cardinality(feature_counts: dict[str, dict[str, dict[str, int
         tokens = set(per_class.get("0", {}).keys()) | set(per_class.get("1", {}).keys())
         cardinality[feature] = max(1, len(tokens))
     return cardinality
-
-
-def _dummy_row() -> CitasFeatureRow:
-    return CitasFeatureRow(
-        cita_id="_",
-        duracion_min=0,
-        duracion_bucket="0-10",
-        hora_inicio=0,
-        dia_semana=0,
-        is_weekend=False,
-        notas_len=0,
-        notas_len_bucket="0",
-        has_incidencias=False,
-        estado_norm="programada",
-        is_suspicious=False,
-    )
@@ -28,6 +28,8 @@ class FeatureArtifactMetadata:
     schema_hash: str
     schema_version: str
     quality: dict[str, Any]
+    content_size: int | None = None
+    content_mtime_ns: int | None = None
 
 
 def canonical_json_bytes(payload: Any) -> bytes:
@@ -64,7 +66,7 @@ def feature_schema_from_dict(payload: dict[str, Any]) -> FeatureSchema:
 
 
 def feature_metadata_to_dict(metadata: FeatureArtifactMetadata) -> dict[str, Any]:
-    return {
+    payload = {
         "dataset_name": metadata.dataset_name,
         "version": metadata.version,
         "created_at": metadata.created_at,
@@ -74,6 +76,10 @@ def feature_metadata_to_dict(metadata: FeatureArtifactMetadata) -> dict[str, Any
         "schema_version": metadata.schema_version,
         "quality": metadata.quality,
     }
+    if metadata.content_size is not None and metadata.content_mtime_ns is not None:
+        payload["content_size"] = metadata.content_size
+        payload["content_mtime_ns"] = metadata.content_mtime_ns
+    return payload
 
 
 def feature_metadata_from_dict(payload: dict[str, Any]) -> FeatureArtifactMetadata:
@@ -86,9 +92,15 @@ def feature_metadata_from_dict(payload: dict[str, Any]) -> FeatureArtifactMetada
         schema_hash=str(payload["schema_hash"]),
         schema_version=str(payload["schema_version"]),
         quality=dict(payload.get("quality", {})),
+        content_size=_optional_int(payload.get("content_size")),
+        content_mtime_ns=_optional_int(payload.get("content_mtime_ns")),
     )
 
 
+def _optional_int(value: Any) -> int | None:
+    return None if value is None else int(value)
+
+
 def _schema_to_payload(schema: FeatureSchema) -> dict[str, Any]:
     return {
         "version": schema.version,
@@ -17,6 +17,8 @@ class CitaReadModel:
     estado: str
     notas: str | None = None
     has_incidencias: bool = False
+    n_incidencias: int = 0
+    ultima_incidencia_tipo: str | None = None
 
 
 class CitasReadPort(Protocol):
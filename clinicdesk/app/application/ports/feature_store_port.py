@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Protocol
+from typing import Any, Protocol, Sequence
 
 from clinicdesk.app.application.ml_artifacts.feature_artifacts import FeatureArtifactMetadata
 
@@ -26,5 +26,11 @@ class FeatureStorePort(Protocol):
     def load_metadata(self, dataset_name: str, version: str) -> FeatureArtifactMetadata:
         """Carga metadata de una versión específica de un dataset."""
 
+    def load_content_hash(self, dataset_name: str, version: str, *, verify: bool = False) -> str:
+        """Hash del contenido guardado; con `verify` se recalcula aunque el fichero no haya cambiado."""
+
+    def load_columns(self, dataset_name: str, version: str, columns: Sequence[str]) -> dict[str, list[Any]]:
+        """Carga solo las columnas pedidas de una versión, alineadas por fila."""
+
     def list_versions(self, dataset_name: str) -> list[str]:
         """Lista versiones disponibles para un dataset."""
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from contextlib import AbstractContextManager, nullcontext
+from typing import Protocol
+
+
+class UnidadDeTrabajo(Protocol):
+    def transaccion(self) -> AbstractContextManager[None]: ...
+
+
+class SinUnidadDeTrabajo:
+    """Cada escritura confirma por su cuenta (contenedores sin unidad de trabajo configurada)."""
+
+    def transaccion(self) -> AbstractContextManager[None]:
+        return nullcontext()
+
+
+def resolver_unidad_de_trabajo(contenedor: object) -> UnidadDeTrabajo:
+    unidad = getattr(contenedor, "unidad_trabajo", None)
+    return unidad if unidad is not None else SinUnidadDeTrabajo()
@@ -22,6 +22,7 @@ from clinicdesk.app.application.prediccion_ausencias.riesgo_agenda import (
     ObtenerRiesgoAusenciaParaCitas,
     RIESGO_NO_DISPONIBLE,
 )
+from clinicdesk.app.application.prediccion_ausencias.scores_riesgo import PuntuarRiesgoAusenciaCitas
 from clinicdesk.app.application.prediccion_ausencias.usecases import (
     ComprobarDatosPrediccionAusencias,
     EntrenamientoPrediccionError,
@@ -66,6 +67,7 @@ __all__ = [
     "PrediccionCitaDTO",
     "ResumenEntrenamientoModeloDTO",
     "PrevisualizarPrediccionAusencias",
+    "PuntuarRiesgoAusenciaCitas",
     "ResultadoCierreCitasDTO",
     "RIESGO_NO_DISPONIBLE",
     "ResultadoComprobacionDatos",
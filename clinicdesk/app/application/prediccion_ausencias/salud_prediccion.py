@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-from typing import Protocol
+import time
+from typing import Callable, Protocol
 
 from clinicdesk.app.application.prediccion_ausencias.dtos import SaludPrediccionDTO
 from clinicdesk.app.bootstrap_logging import get_logger
@@ -18,24 +19,55 @@ class ConteoCitasValidasRecientesPort(Protocol):
     def contar_citas_validas_recientes(self, dias: int = 90) -> int: ...
 
 
+@dataclass(slots=True)
+class _CacheSaludPrediccion:
+    """Último semáforo calculado: (fecha de entrenamiento, instante del cálculo, resultado)."""
+
+    entrada: tuple[str | None, float, SaludPrediccionDTO] | None = None
+
+    def vigente(self, fecha_entrenamiento: str | None, ahora: float, ttl_segundos: float) -> SaludPrediccionDTO | None:
+        if self.entrada is None:
+            return None
+        fecha_cache, calculado_en, salud = self.entrada
+        if fecha_cache == fecha_entrenamiento and ahora - calculado_en < ttl_segundos:
+            return salud
+        return None
+
+
 @dataclass(frozen=True, slots=True)
 class ObtenerSaludPrediccionAusencias:
+    """
+    Semáforo de salud del modelo activo.
+
+    El resultado se reutiliza durante `ttl_segundos` mientras no cambie el modelo, para no
+    recontar citas en cada refresco de los listados que lo muestran.
+    """
+
     lector_metadata: LectorMetadataPrediccionPort
     queries: ConteoCitasValidasRecientesPort
     dias_ventana_citas: int = 90
+    ttl_segundos: float = 300.0
+    reloj: Callable[[], float] = time.monotonic
+    _cache: _CacheSaludPrediccion = field(default_factory=_CacheSaludPrediccion, init=False, repr=False, compare=False)
 
     def ejecutar(self) -> SaludPrediccionDTO:
         metadata = self.lector_metadata.cargar_metadata()
         fecha_entrenamiento = self._extraer_fecha(metadata)
+        ahora = self.reloj()
+        salud_cacheada = self._cache.vigente(fecha_entrenamiento, ahora, self.ttl_segundos)
+        if salud_cacheada is not None:
+            return salud_cacheada
         citas_recientes = self.queries.contar_citas_validas_recientes(self.dias_ventana_citas)
         estado = _resolver_estado(fecha_entrenamiento=fecha_entrenamiento, citas_validas_recientes=citas_recientes)
-        return SaludPrediccionDTO(
+        salud = SaludPrediccionDTO(
             estado=estado,
             mensaje_i18n_key=f"prediccion_ausencias.salud.mensaje.{estado.lower()}",
             acciones_i18n_keys=_resolver_acciones(estado),
             fecha_ultima_actualizacion=fecha_entrenamiento,
             citas_validas_recientes=citas_recientes,
         )
+        self._cache.entrada = (fecha_entrenamiento, ahora, salud)
+        return salud
 
     def _extraer_fecha(self, metadata: object | None) -> str | None:
         if metadata is None:
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Protocol, Sequence
+
+from clinicdesk.app.bootstrap_logging import get_logger
+from clinicdesk.app.domain.prediccion_ausencias import CitaParaPrediccion, PredictorEntrenado
+from clinicdesk.app.queries.prediccion_ausencias_queries import FilaCitaRiesgoAgenda
+
+LOGGER = get_logger(__name__)
+
+
+class MetadataModeloPort(Protocol):
+    fecha_entrenamiento: str
+
+
+class AlmacenamientoModeloPort(Protocol):
+    def cargar_metadata(self) -> MetadataModeloPort | None: ...
+
+    def cargar(self) -> tuple[PredictorEntrenado, MetadataModeloPort]: ...
+
+
+class ScoresRiesgoPort(Protocol):
+    def listar_citas_sin_score_vigente(
+        self,
+        modelo_version: str,
+        *,
+        desde: str | None,
+        hasta: str | None,
+        despues_de_id: int,
+        limite: int,
+    ) -> list[FilaCitaRiesgoAgenda]: ...
+
+    def listar_citas_por_id(self, cita_ids: Sequence[int]) -> list[FilaCitaRiesgoAgenda]: ...
+
+    def guardar_scores(
+        self, modelo_version: str, scored_at_utc: str, items: list[tuple[int, float | None, str]]
+    ) -> int: ...
+
+    def eliminar_scores_de_otros_modelos(self, modelo_version: str) -> int: ...
+
+
+@dataclass(slots=True)
+class PuntuarRiesgoAusenciaCitas:
+    """
+    Mantiene `riesgo_ausencia_citas` al día para el modelo activo.
+
+    Se puntúa al activar un modelo (`recalcular_todo`), al crear citas (`puntuar_citas`) y
+    en segundo plano al arrancar (`ejecutar`, solo las citas sin puntuación vigente); los
+    listados solo leen la tabla con `version_activa`. La versión del modelo es su fecha de
+    entrenamiento, la misma que usa `predicciones_ausencias_log`.
+    """
+
+    almacenamiento: AlmacenamientoModeloPort
+    scores: ScoresRiesgoPort
+    tamano_lote: int = 500
+    _predictor_cache: PredictorEntrenado | None = field(default=None, init=False, repr=False)
+    _version_cache: str | None = field(default=None, init=False, repr=False)
+
+    def version_activa(self) -> str | None:
+        """Versión del modelo activo (None sin modelo), sin cargar el predictor ni puntuar."""
+        metadata = self.almacenamiento.cargar_metadata()
+        return metadata.fecha_entrenamiento if metadata is not None else None
+
+    def ejecutar(self, desde: str | None = None, hasta: str | None = None) -> str | None:
+        """Puntúa las citas pendientes del rango y devuelve la versión activa (None sin modelo)."""
+        cargado = self._cargar_modelo()
+        if cargado is None:
+            return None
+        predictor, version = cargado
+        puntuadas = 0
+        ultimo_id = 0
+        while True:
+            pendientes = self.scores.listar_citas_sin_score_vigente(
+                version, desde=desde, hasta=hasta, despues_de_id=ultimo_id, limite=self.tamano_lote
+            )
+            if not pendientes:
+                break
+            puntuadas += self._puntuar(predictor, version, pendientes)
+            ultimo_id = pendientes[-1].cita_id
+            if len(pendientes) < self.tamano_lote:
+                break
+        if puntuadas:
+            LOGGER.info(
+                "prediccion_scores_actualizados",
+                extra={"action": "prediccion_scores_actualizados", "citas": puntuadas, "modelo_version": version},
+            )
+        return version
+
+    def puntuar_citas(self, cita_ids: Sequence[int]) -> int:
+        """Puntúa las citas indicadas (recién creadas) con el modelo activo."""
+        cargado = self._cargar_modelo()
+        if cargado is None or not cita_ids:
+            return 0
+        predictor, version = cargado
+        filas = self.scores.listar_citas_por_id(cita_ids)
+        return self._puntuar(predictor, version, filas) if filas else 0
+
+    def recalcular_todo(self) -> str | None:
+        """Tras entrenar: descarta puntuaciones de otros modelos y puntúa las citas desde hoy."""
+        self._predictor_cache = None
+        self._version_cache = None
+        cargado = self._cargar_modelo()
+        if cargado is None:
+            return None
+        self.scores.eliminar_scores_de_otros_modelos(cargado[1])
+        return self.ejecutar()
+
+    def _puntuar(self, predictor: PredictorEntrenado, version: str, filas: list[FilaCitaRiesgoAgenda]) -> int:
+        predicciones = predictor.predecir(
+            [
+                CitaParaPrediccion(
+                    cita_id=fila.cita_id, paciente_id=fila.paciente_id, dias_antelacion=fila.dias_antelacion
+                )
+                for fila in filas
+            ]
+        )
+        items = [(item.cita_id, item.score, item.riesgo.value) for item in predicciones]
+        return self.scores.guardar_scores(version, datetime.now(timezone.utc).isoformat(), items)
+
+    def _cargar_modelo(self) -> tuple[PredictorEntrenado, str] | None:
+        metadata = self.almacenamiento.cargar_metadata()
+        if metadata is None:
+            return None
+        if self._predictor_cache is not None and self._version_cache == metadata.fecha_entrenamiento:
+            return self._predictor_cache, self._version_cache
+        try:
+            predictor, metadata = self.almacenamiento.cargar()
+        except Exception as exc:  # noqa: BLE001
+            LOGGER.error(
+                "prediccion_scores_no_disponible",
+                extra={"reason_code": "predictor_load_failed", "error": str(exc)},
+            )
+            return None
+        self._predictor_cache = predictor
+        self._version_cache = metadata.fecha_entrenamiento
+        return predictor, metadata.fecha_entrenamiento
+
+
+def puntuar_citas_nuevas(puntuar_riesgo_uc: PuntuarRiesgoAusenciaCitas | None, cita_ids: Sequence[int]) -> None:
+    """Puntúa las citas recién creadas; un fallo no invalida la reserva (las recoge el arranque)."""
+    if puntuar_riesgo_uc is None or not cita_ids:
+        return
+    try:
+        puntuar_riesgo_uc.puntuar_citas(cita_ids)
+    except Exception as exc:  # noqa: BLE001
+        LOGGER.error(
+            "prediccion_scores_cita_nueva_fallido",
+            extra={"reason_code": "new_cita_hook_failed", "error": str(exc)},
+        )
+
+
+def notificar_modelo_activado(al_activar_modelo: Callable[[], object] | None) -> None:
+    """Lanza el recálculo tras activar un modelo; un fallo no invalida el entrenamiento."""
+    if al_activar_modelo is None:
+        return
+    try:
+        al_activar_modelo()
+    except Exception as exc:  # noqa: BLE001
+        LOGGER.error(
+            "prediccion_scores_recalculo_fallido",
+            extra={"reason_code": "activation_hook_failed", "error": str(exc)},
+        )
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Callable
 
 from clinicdesk.app.application.prediccion_ausencias.dtos import (
     DatosEntrenamientoPrediccion,
@@ -13,6 +14,7 @@ from clinicdesk.app.application.prediccion_ausencias.dtos import (
     ResultadoComprobacionDatos,
     ResultadoPrevisualizacionPrediccion,
 )
+from clinicdesk.app.application.prediccion_ausencias.scores_riesgo import notificar_modelo_activado
 from clinicdesk.app.application.prediccion_ausencias.seleccion_modelo import (
     ResultadoMetricasModelo,
     seleccionar_mejor_modelo,
@@ -87,12 +89,14 @@ class EntrenarPrediccionAusencias:
         predictor_baseline: PredictorAusenciasBaseline | None,
         predictor_v2: PredictorAusenciasV2 | None,
         almacenamiento: AlmacenamientoModeloPrediccion,
+        al_activar_modelo: Callable[[], object] | None = None,
     ) -> None:
         self._comprobar_datos_uc = comprobar_datos_uc
         self._queries = queries
         self._predictor_baseline = predictor_baseline or PredictorAusenciasBaseline()
         self._predictor_v2 = predictor_v2 or PredictorAusenciasV2()
         self._almacenamiento = almacenamiento
+        self._al_activar_modelo = al_activar_modelo
 
     def ejecutar(self) -> ResultadoEntrenamientoPrediccion:
         chequeo = self._comprobar_datos_uc.ejecutar()
@@ -183,6 +187,7 @@ class EntrenarPrediccionAusencias:
 
         if not metadata.fecha_entrenamiento:
             raise EntrenamientoPrediccionError("metadata_invalid")
+        notificar_modelo_activado(self._al_activar_modelo)
         return ResultadoEntrenamientoPrediccion(
             citas_usadas=metadata.citas_usadas,
             fecha_entrenamiento=metadata.fecha_entrenamiento,
@@ -2,14 +2,12 @@ from __future__ import annotations
 
 from dataclasses import asdict, is_dataclass
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Sequence
 
 from clinicdesk.app.application.features.citas_features import CitasFeatureQualityReport, CitasFeatureRow
 from clinicdesk.app.application.ml_artifacts.feature_artifacts import (
     FeatureArtifactMetadata,
     build_schema_from_dataclass,
-    canonical_json_bytes,
-    compute_content_hash,
     compute_schema_hash,
 )
 from clinicdesk.app.application.ports.feature_store_port import FeatureStorePort
@@ -39,13 +37,12 @@ class FeatureStoreService:
         resolved_version = version or self._build_version()
         serialized_rows = [_to_serializable(row) for row in rows]
         schema = build_schema_from_dataclass(CitasFeatureRow, version=self.CITAS_SCHEMA_VERSION)
-        rows_bytes = canonical_json_bytes(serialized_rows)
         metadata = FeatureArtifactMetadata(
             dataset_name=self.CITAS_DATASET_NAME,
             version=resolved_version,
             created_at=self._build_created_at(),
             row_count=len(serialized_rows),
-            content_hash=compute_content_hash(rows_bytes),
+            content_hash="",  # lo calcula el store sobre los bytes que escribe
             schema_hash=compute_schema_hash(schema),
             schema_version=schema.version,
             quality=_to_serializable(quality_report),
@@ -61,9 +58,16 @@ class FeatureStoreService:
     def load_citas_features(self, version: str) -> list[Any]:
         return self._feature_store.load(self.CITAS_DATASET_NAME, version)
 
+    def load_citas_feature_columns(self, version: str, columns: Sequence[str]) -> dict[str, list[Any]]:
+        return self._feature_store.load_columns(self.CITAS_DATASET_NAME, version, columns)
+
     def load_citas_features_metadata(self, version: str) -> FeatureArtifactMetadata:
         return self._feature_store.load_metadata(self.CITAS_DATASET_NAME, version)
 
+    def load_citas_features_content_hash(self, version: str, *, verify: bool = False) -> str:
+        """Hash del dataset tal como está en disco, sin volver a serializarlo."""
+        return self._feature_store.load_content_hash(self.CITAS_DATASET_NAME, version, verify=verify)
+
     def list_citas_versions(self) -> list[str]:
         return self._feature_store.list_versions(self.CITAS_DATASET_NAME)
 
@@ -19,6 +19,7 @@ from clinicdesk.app.application.prediccion_ausencias.usecases import (
     ObtenerResumenUltimoEntrenamientoPrediccion,
     PrevisualizarPrediccionAusencias,
 )
+from clinicdesk.app.application.prediccion_ausencias.scores_riesgo import PuntuarRiesgoAusenciaCitas
 from clinicdesk.app.application.prediccion_ausencias.salud_prediccion import ObtenerSaludPrediccionAusencias
 from clinicdesk.app.application.prediccion_ausencias.resultados_recientes import (
     ObtenerResultadosRecientesPrediccionAusencias,
@@ -41,3 +42,4 @@ class PrediccionAusenciasFacade:
     obtener_resultados_recientes_uc: ObtenerResultadosRecientesPrediccionAusencias
     listar_citas_pendientes_cierre_uc: ListarCitasPendientesCierre
     cerrar_citas_pendientes_uc: CerrarCitasPendientes
+    puntuar_riesgo_uc: PuntuarRiesgoAusenciaCitas | None = None
@@ -26,14 +26,21 @@ Guardado consciente:
 Notas:
 - cantidad siempre es magnitud positiva
 - el tipo indica la dirección del movimiento
+
+Transacción:
+- Lectura del stock, movimiento, stock e incidencia van en una única unidad de trabajo.
+- El stock se actualiza con un UPDATE condicional sobre el valor leído bajo bloqueo.
+- `execute_lote` aplica varios ajustes (p. ej. una reposición de planta) en la misma
+  transacción: o se aplican todos o ninguno.
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import List, Optional, Sequence, Tuple
 
+from clinicdesk.app.application.ports.unidad_trabajo_port import resolver_unidad_de_trabajo
 from clinicdesk.app.container import AppContainer
 from clinicdesk.app.domain.exceptions import ValidationError
 
@@ -124,7 +131,17 @@ class AjustarStockMaterialUseCase:
         self._c = container
 
     def execute(self, req: AjustarStockMaterialRequest) -> AjustarStockMaterialResult:
-        self._validate_request(req)
+        return self.execute_lote([req])[0]
+
+    def execute_lote(self, reqs: Sequence[AjustarStockMaterialRequest]) -> List[AjustarStockMaterialResult]:
+        if not reqs:
+            raise ValidationError("No hay ajustes de stock que aplicar.")
+        for req in reqs:
+            self._validate_request(req)
+        with resolver_unidad_de_trabajo(self._c).transaccion():
+            return [self._ajustar(req) for req in reqs]
+
+    def _ajustar(self, req: AjustarStockMaterialRequest) -> AjustarStockMaterialResult:
         fecha_hora, stock_anterior = self._load_state(req)
         stock_nuevo, warnings, mov_tipo, mov_cantidad = self._compute_changes(req, stock_anterior)
         incidencia_id, movimiento_id = self._persist(
@@ -192,8 +209,9 @@ class AjustarStockMaterialUseCase:
             motivo=req.motivo,
             referencia=req.referencia,
         )
+        if self._c.materiales_repo.aplicar_delta_stock(req.material_id, stock_nuevo - stock_anterior) is None:
+            raise ValidationError("La operación dejaría el stock en negativo o el material ya no está activo.")
         movimiento_id = self._c.mov_materiales_repo.create(mov)
-        self._c.materiales_repo.update_stock(req.material_id, stock_nuevo)
         incidencia_id = self._create_incidencia_if_needed(
             req=req,
             warnings=warnings,
@@ -19,6 +19,13 @@ Reglas principales:
 
 - Ausencias (baja/vacaciones):
   - Bloqueo por defecto. Solo se permite override explícito con incidencia ALTA.
+
+- Transacción:
+  - Comprobaciones, cita e incidencia van en una única unidad de trabajo (un solo commit).
+  - La auditoría se registra después, con el resultado ya confirmado o deshecho.
+
+- Riesgo de ausencia:
+  - Tras confirmar, la cita se puntúa con el modelo activo (si falla, la recoge el arranque).
 """
 
 from __future__ import annotations
@@ -33,6 +40,8 @@ from clinicdesk.app.domain.exceptions import ValidationError
 
 from clinicdesk.app.container import AppContainer
 from clinicdesk.app.application.auditoria.audit_service import AuditService
+from clinicdesk.app.application.prediccion_ausencias.scores_riesgo import puntuar_citas_nuevas
+from clinicdesk.app.application.ports.unidad_trabajo_port import resolver_unidad_de_trabajo
 from clinicdesk.app.application.security import Action
 
 
@@ -96,16 +105,17 @@ class CrearCitaUseCase:
             _exigir_permiso_crear_cita(self._c)
             _validate_request(req)
             inicio_dt, fin_dt, estado, notas = _normalize_inputs(req)
-            _load_dependencies(self._c, req)
-            warnings = _apply_rules(self._c, req)
-            cita_id, incidencia_id = self._persist(
-                req,
-                inicio_dt=inicio_dt,
-                fin_dt=fin_dt,
-                estado=estado,
-                notas=notas,
-                warnings=warnings,
-            )
+            with resolver_unidad_de_trabajo(self._c).transaccion():
+                warnings = _verificar_disponibilidad(self._c, req)
+                cita_id, incidencia_id = self._persist(
+                    req,
+                    inicio_dt=inicio_dt,
+                    fin_dt=fin_dt,
+                    estado=estado,
+                    notas=notas,
+                    warnings=warnings,
+                )
+            puntuar_citas_nuevas(_resolve_puntuar_riesgo_uc(self._c), [cita_id])
             if audit_service is not None:
                 audit_service.registrar(
                     action="CITA_CREAR",
@@ -188,6 +198,11 @@ class CrearCitaUseCase:
         return CrearCitaResult(cita_id=cita_id, warnings=warnings, incidencia_id=incidencia_id)
 
 
+def _resolve_puntuar_riesgo_uc(container: AppContainer) -> object | None:
+    facade = getattr(container, "prediccion_ausencias_facade", None)
+    return getattr(facade, "puntuar_riesgo_uc", None)
+
+
 def _resolve_audit_service(container: AppContainer) -> AuditService | None:
     service = getattr(container, "audit_service", None)
     return service if isinstance(service, AuditService) else None
@@ -234,25 +249,54 @@ def _normalize_inputs(req: CrearCitaRequest) -> Tuple[datetime, datetime, Estado
     return inicio_dt, fin_dt, EstadoCita(req.estado), req.observaciones
 
 
-def _load_dependencies(container: AppContainer, req: CrearCitaRequest) -> None:
-    medico = container.medicos_repo.get_by_id(req.medico_id)
-    if not medico or not medico.activo:
-        raise ValidationError("El médico no existe o está inactivo.")
-
-    sala = container.salas_repo.get_by_id(req.sala_id)
-    if not sala or not sala.activa:
-        raise ValidationError("La sala no existe o está inactiva.")
+# Todas las comprobaciones de disponibilidad en una sola lectura, dentro de la transacción
+# de escritura: nadie puede insertar una cita solapada entre esta consulta y el INSERT.
+# Solape: (inicio < fin_existente) AND (fin > inicio_existente)
+_SQL_DISPONIBILIDAD = """
+SELECT
+    (SELECT activo FROM medicos WHERE id = :medico_id) AS medico_activo,
+    (SELECT activa FROM salas WHERE id = :sala_id) AS sala_activa,
+    EXISTS (
+        SELECT 1 FROM citas
+        WHERE medico_id = :medico_id AND estado != 'CANCELADA' AND inicio < :fin AND fin > :inicio
+    ) AS solape_medico,
+    EXISTS (
+        SELECT 1 FROM citas
+        WHERE sala_id = :sala_id AND estado != 'CANCELADA' AND inicio < :fin AND fin > :inicio
+    ) AS solape_sala,
+    EXISTS (
+        SELECT 1 FROM calendario_medico
+        WHERE medico_id = :medico_id AND fecha = :fecha AND activo = 1
+    ) AS hay_calendario,
+    EXISTS (
+        SELECT 1 FROM ausencias_medico
+        WHERE medico_id = :medico_id AND inicio <= :fin AND fin >= :inicio AND activo = 1
+    ) AS hay_ausencia
+"""
 
-    _assert_no_solape_medico(container, req.medico_id, req.inicio, req.fin)
-    _assert_no_solape_sala(container, req.sala_id, req.inicio, req.fin)
 
+def _verificar_disponibilidad(container: AppContainer, req: CrearCitaRequest) -> List[WarningItem]:
+    fila = container.connection.execute(
+        _SQL_DISPONIBILIDAD,
+        {
+            "medico_id": req.medico_id,
+            "sala_id": req.sala_id,
+            "inicio": req.inicio,
+            "fin": req.fin,
+            "fecha": req.inicio[:10],
+        },
+    ).fetchone()
+    if not fila["medico_activo"]:
+        raise ValidationError("El médico no existe o está inactivo.")
+    if not fila["sala_activa"]:
+        raise ValidationError("La sala no existe o está inactiva.")
+    if fila["solape_medico"]:
+        raise ValidationError("Existe un solape con otra cita del médico (no permitido).")
+    if fila["solape_sala"]:
+        raise ValidationError("Existe un solape con otra cita en la sala (no permitido).")
 
-def _apply_rules(container: AppContainer, req: CrearCitaRequest) -> List[WarningItem]:
     warnings: List[WarningItem] = []
-    fecha = req.inicio[:10]
-
-    hay_calendario = container.calendario_medico_repo.exists_for_medico_fecha(req.medico_id, fecha, solo_activos=True)
-    if not hay_calendario:
+    if not fila["hay_calendario"]:
         warnings.append(
             WarningItem(
                 codigo="MEDICO_SIN_CUADRANTE",
@@ -260,8 +304,7 @@ def _apply_rules(container: AppContainer, req: CrearCitaRequest) -> List[Warning
                 severidad="MEDIA",
             )
         )
-
-    if container.ausencias_medico_repo.exists_overlap(req.medico_id, req.inicio, req.fin):
+    if fila["hay_ausencia"]:
         warnings.append(
             WarningItem(
                 codigo="MEDICO_CON_AUSENCIA",
@@ -298,41 +341,6 @@ def _parse_inicio_fin(inicio: str, fin: str) -> Tuple[datetime, datetime]:
     return inicio_dt, fin_dt
 
 
-def _assert_no_solape_medico(container: AppContainer, medico_id: int, inicio: str, fin: str) -> None:
-    # Solape: (inicio < fin_existente) AND (fin > inicio_existente)
-    row = container.connection.execute(
-        """
-        SELECT 1
-        FROM citas
-        WHERE medico_id = ?
-          AND estado != 'CANCELADA'
-          AND inicio < ?
-          AND fin > ?
-        LIMIT 1
-        """,
-        (medico_id, fin, inicio),
-    ).fetchone()
-    if row:
-        raise ValidationError("Existe un solape con otra cita del médico (no permitido).")
-
-
-def _assert_no_solape_sala(container: AppContainer, sala_id: int, inicio: str, fin: str) -> None:
-    row = container.connection.execute(
-        """
-        SELECT 1
-        FROM citas
-        WHERE sala_id = ?
-          AND estado != 'CANCELADA'
-          AND inicio < ?
-          AND fin > ?
-        LIMIT 1
-        """,
-        (sala_id, fin, inicio),
-    ).fetchone()
-    if row:
-        raise ValidationError("Existe un solape con otra cita en la sala (no permitido).")
-
-
 def _max_severidad(warnings: List[WarningItem]) -> str:
     order = {"BAJA": 1, "MEDIA": 2, "ALTA": 3}
     return max((w.severidad for w in warnings), key=lambda s: order.get(s, 0))
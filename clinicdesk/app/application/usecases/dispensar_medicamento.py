@@ -26,14 +26,22 @@ Efectos:
 - Inserta dispensación
 - Actualiza stock de medicamento
 - Inserta movimiento en movimientos_medicamentos (tipo=SALIDA)
+
+Transacción:
+- Lecturas, stock, dispensación, movimiento e incidencia van en una única unidad de trabajo.
+- El stock se descuenta con un UPDATE condicional (nunca queda negativo aunque haya
+  otra dispensación concurrente del mismo medicamento).
+- `execute_lote` dispensa varias líneas (p. ej. una receta completa) en la misma
+  transacción: o se guardan todas o ninguna.
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import List, Optional, Sequence, Tuple
 
+from clinicdesk.app.application.ports.unidad_trabajo_port import resolver_unidad_de_trabajo
 from clinicdesk.app.domain.exceptions import ValidationError
 from clinicdesk.app.container import AppContainer
 
@@ -128,16 +136,37 @@ def _build_incidencia_descripcion(
     )
 
 
+def _now_iso() -> str:
+    return datetime.now().replace(microsecond=0).isoformat(sep=" ")
+
+
+def _descontar_stock(container: AppContainer, medicamento_id: int, cantidad: int) -> int:
+    stock_nuevo = container.medicamentos_repo.aplicar_delta_stock(medicamento_id, -cantidad)
+    if stock_nuevo is None:
+        raise ValidationError(f"Stock insuficiente para dispensar {cantidad} unidad(es).")
+    return stock_nuevo
+
+
 class DispensarMedicamentoUseCase:
     def __init__(self, container: AppContainer) -> None:
         self._c = container
 
     def execute(self, req: DispensarMedicamentoRequest) -> DispensarMedicamentoResult:
+        return self.execute_lote([req])[0]
+
+    def execute_lote(self, reqs: Sequence[DispensarMedicamentoRequest]) -> List[DispensarMedicamentoResult]:
         self._c.user_context.require_write("farmacia.dispensar")
-        self._validate_request(req)
+        if not reqs:
+            raise ValidationError("No hay líneas que dispensar.")
+        for req in reqs:
+            self._validate_request(req)
+        with resolver_unidad_de_trabajo(self._c).transaccion():
+            return [self._dispensar(req) for req in reqs]
+
+    def _dispensar(self, req: DispensarMedicamentoRequest) -> DispensarMedicamentoResult:
         state = self._load_state(req)
         warnings, incidencia_flag, notas_incidencia = self._compute_changes(req, state)
-        dispensacion_id, movimiento_id, incidencia_id = self._persist(
+        dispensacion_id, movimiento_id, incidencia_id, stock_nuevo = self._persist(
             req=req,
             state=state,
             warnings=warnings,
@@ -147,7 +176,7 @@ class DispensarMedicamentoUseCase:
         return self._build_response(
             dispensacion_id=dispensacion_id,
             movimiento_id=movimiento_id,
-            stock_nuevo=state.stock_nuevo,
+            stock_nuevo=stock_nuevo,
             warnings=warnings,
             incidencia_id=incidencia_id,
         )
@@ -163,7 +192,7 @@ class DispensarMedicamentoUseCase:
             raise ValidationError("cantidad debe ser mayor que 0.")
 
     def _load_state(self, req: DispensarMedicamentoRequest) -> _DispenseState:
-        fecha_hora = req.fecha_hora or self._now_iso()
+        fecha_hora = req.fecha_hora or _now_iso()
         fecha = fecha_hora[:10]
         receta = self._c.recetas_repo.get_receta_by_id(req.receta_id)
         if not receta:
@@ -195,9 +224,11 @@ class DispensarMedicamentoUseCase:
         warnings: List[WarningItem],
         incidencia_flag: bool,
         notas_incidencia: Optional[str],
-    ) -> Tuple[int, int, Optional[int]]:
+    ) -> Tuple[int, int, Optional[int], int]:
         from clinicdesk.app.infrastructure.sqlite.repos_dispensaciones import Dispensacion
 
+        stock_nuevo = _descontar_stock(self._c, state.medicamento_id, req.cantidad)
+
         disp = Dispensacion(
             receta_id=req.receta_id,
             receta_linea_id=req.receta_linea_id,
@@ -209,10 +240,9 @@ class DispensarMedicamentoUseCase:
             notas_incidencia=notas_incidencia,
         )
         dispensacion_id = self._c.dispensaciones_repo.create(disp)
-        self._c.medicamentos_repo.update_stock(state.medicamento_id, state.stock_nuevo)
         movimiento_id = self._create_movement(req, state, dispensacion_id)
         incidencia_id = self._create_incidencia_if_needed(req, state, warnings, dispensacion_id)
-        return dispensacion_id, movimiento_id, incidencia_id
+        return dispensacion_id, movimiento_id, incidencia_id, stock_nuevo
 
     def _build_response(
         self,
@@ -340,6 +370,3 @@ class DispensarMedicamentoUseCase:
             "SELECT * FROM receta_lineas WHERE id = ?",
             (receta_linea_id,),
         ).fetchone()
-
-    def _now_iso(self) -> str:
-        return datetime.now().replace(microsecond=0).isoformat(sep=" ")
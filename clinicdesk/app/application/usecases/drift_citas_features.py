@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Any
 
-from clinicdesk.app.application.features.citas_features import CitasFeatureRow
-from clinicdesk.app.application.ml.drift import DriftReport, compute_citas_drift
+from clinicdesk.app.application.ml.drift import DRIFT_FEATURES, DriftReport, compute_citas_drift_from_columns
 from clinicdesk.app.application.services.feature_store_service import FeatureStoreService
 
 
@@ -23,9 +23,9 @@ class DriftCitasFeatures:
 
     def execute(self, request: DriftCitasFeaturesRequest) -> DriftReport:
         self._validate_request(request)
-        rows_from = self._load_rows(request.from_version)
-        rows_to = self._load_rows(request.to_version)
-        return compute_citas_drift(rows_from, rows_to, request.from_version, request.to_version)
+        columns_from = self._load_columns(request.from_version)
+        columns_to = self._load_columns(request.to_version)
+        return compute_citas_drift_from_columns(columns_from, columns_to, request.from_version, request.to_version)
 
     def _validate_request(self, request: DriftCitasFeaturesRequest) -> None:
         if not request.from_version.strip() or not request.to_version.strip():
@@ -33,19 +33,12 @@ class DriftCitasFeatures:
         if request.from_version == request.to_version:
             raise DriftCitasFeaturesValidationError("from_version y to_version deben ser diferentes para drift.")
 
-    def _load_rows(self, version: str) -> list[CitasFeatureRow]:
-        loaded = self._feature_store_service.load_citas_features(version)
-        if not loaded:
+    def _load_columns(self, version: str) -> dict[str, list[Any]]:
+        """Solo las columnas que entran en el drift; el resto del dataset no se lee."""
+        try:
+            loaded = self._feature_store_service.load_citas_feature_columns(version, DRIFT_FEATURES)
+        except (KeyError, TypeError) as exc:
+            raise DriftCitasFeaturesValidationError("Fila inválida para drift de CitasFeatureRow.") from exc
+        if not loaded[DRIFT_FEATURES[0]]:
             raise DriftCitasFeaturesValidationError(f"Dataset de drift vacío para versión '{version}'.")
-        return [_to_feature_row(item) for item in loaded]
-
-
-def _to_feature_row(raw: object) -> CitasFeatureRow:
-    if isinstance(raw, CitasFeatureRow):
-        return raw
-    if not isinstance(raw, dict):
-        raise DriftCitasFeaturesValidationError("Fila inválida en drift: se esperaba dict o CitasFeatureRow.")
-    try:
-        return CitasFeatureRow(**raw)
-    except TypeError as exc:
-        raise DriftCitasFeaturesValidationError("Fila inválida para drift de CitasFeatureRow.") from exc
+        return loaded
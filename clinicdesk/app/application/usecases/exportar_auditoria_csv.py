@@ -7,7 +7,8 @@ import os
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from io import StringIO
-from typing import Any, Mapping, Protocol
+from pathlib import Path
+from typing import Any, Callable, Iterator, Mapping, Protocol
 
 from clinicdesk.app.application.auditoria.audit_service import AuditService
 from clinicdesk.app.application.security import Action, AutorizadorAcciones, Role, UserContext
@@ -49,6 +50,19 @@ class ExportacionAuditoriaDemasiadasFilasError(ExportacionAuditoriaError):
         super().__init__("demasiadas_filas")
 
 
+class ExportacionAuditoriaCanceladaError(ExportacionAuditoriaError):
+    def __init__(self) -> None:
+        super().__init__("cancelled")
+
+
+@dataclass(frozen=True, slots=True)
+class OpcionesExportacionAuditoria:
+    """`al_progresar(filas_escritas, total)` tras cada lote; `debe_cancelar` se consulta antes de cada lote."""
+
+    al_progresar: Callable[[int, int], None] | None = None
+    debe_cancelar: Callable[[], bool] | None = None
+
+
 @dataclass(frozen=True, slots=True)
 class ExportacionCSVDTO:
     nombre_archivo_sugerido: str
@@ -70,6 +84,12 @@ class ExportarAuditoriaCSVGateway(Protocol):
         max_filas: int | None = None,
     ) -> list[AuditoriaAccesoItemQuery]: ...
 
+    def iterar_auditoria_accesos(
+        self,
+        filtros: FiltrosAuditoriaAccesos,
+        max_filas: int | None = None,
+    ) -> Iterator[list[AuditoriaAccesoItemQuery]]: ...
+
 
 class ExportarAuditoriaCSV:
     _MAX_FILAS_DEFENSIVO = 10_000
@@ -98,17 +118,7 @@ class ExportarAuditoriaCSV:
         confirmacion: str | None = None,
     ) -> ExportacionCSVDTO:
         try:
-            self._exigir_permiso_exportacion()
-            exigir_integridad_auditoria(self._verificador_integridad)
-            self._exigir_guardrail_pii(incluir_pii, confirmacion)
-            filtros_finales = aplicar_preset_rango_auditoria(filtros, preset_rango)
-            _, total = self._gateway.buscar_auditoria_accesos(filtros_finales, limit=1, offset=0)
-            if total > self._MAX_FILAS_DEFENSIVO:
-                LOGGER.warning(
-                    "auditoria_exportacion_denegada_limite",
-                    extra=_payload_log_exportacion_auditoria(filtros_finales, "auditoria_exportacion_denegada_limite"),
-                )
-                raise ExportacionAuditoriaDemasiadasFilasError()
+            filtros_finales, _ = self._preparar(filtros, preset_rango, incluir_pii, confirmacion)
             filas = self._gateway.exportar_auditoria_accesos(filtros_finales, max_filas=self._MAX_FILAS_DEFENSIVO)
             LOGGER.info(
                 "auditoria_exportacion_generada",
@@ -125,6 +135,51 @@ class ExportarAuditoriaCSV:
             self._registrar_auditoria("fail", getattr(exc, "reason_code", "unexpected_error"), 0)
             raise
 
+    def exportar_a_archivo(
+        self,
+        filtros: FiltrosAuditoriaAccesos,
+        ruta: str | Path,
+        preset_rango: str | None = None,
+        *,
+        incluir_pii: bool = False,
+        confirmacion: str | None = None,
+        opciones: OpcionesExportacionAuditoria | None = None,
+    ) -> int:
+        """Como `execute`, pero escribe en `ruta` lote a lote sin generar el CSV en memoria. Devuelve las filas."""
+        try:
+            filtros_finales, total = self._preparar(filtros, preset_rango, incluir_pii, confirmacion)
+            lotes = self._gateway.iterar_auditoria_accesos(filtros_finales, max_filas=self._MAX_FILAS_DEFENSIVO)
+            filas = _escribir_csv_por_lotes(Path(ruta), lotes, total, opciones or OpcionesExportacionAuditoria())
+            LOGGER.info(
+                "auditoria_exportacion_generada",
+                extra=_payload_log_exportacion_auditoria(filtros_finales, "auditoria_exportacion_generada"),
+            )
+            self._registrar_auditoria("ok", "ok", filas)
+            return filas
+        except Exception as exc:
+            self._registrar_auditoria("fail", getattr(exc, "reason_code", "unexpected_error"), 0)
+            raise
+
+    def _preparar(
+        self,
+        filtros: FiltrosAuditoriaAccesos,
+        preset_rango: str | None,
+        incluir_pii: bool,
+        confirmacion: str | None,
+    ) -> tuple[FiltrosAuditoriaAccesos, int]:
+        self._exigir_permiso_exportacion()
+        exigir_integridad_auditoria(self._verificador_integridad)
+        self._exigir_guardrail_pii(incluir_pii, confirmacion)
+        filtros_finales = aplicar_preset_rango_auditoria(filtros, preset_rango)
+        _, total = self._gateway.buscar_auditoria_accesos(filtros_finales, limit=1, offset=0)
+        if total > self._MAX_FILAS_DEFENSIVO:
+            LOGGER.warning(
+                "auditoria_exportacion_denegada_limite",
+                extra=_payload_log_exportacion_auditoria(filtros_finales, "auditoria_exportacion_denegada_limite"),
+            )
+            raise ExportacionAuditoriaDemasiadasFilasError()
+        return filtros_finales, total
+
     def _exigir_permiso_exportacion(self) -> None:
         if self._user_context is None or self._autorizador_acciones is None:
             return
@@ -170,6 +225,39 @@ def _render_csv(filas: list[AuditoriaAccesoItemQuery | Mapping[str, Any]]) -> st
     return output.getvalue()
 
 
+def _escribir_csv_por_lotes(
+    ruta: Path,
+    lotes: Iterator[list[AuditoriaAccesoItemQuery]],
+    total: int,
+    opciones: OpcionesExportacionAuditoria,
+) -> int:
+    temporal = ruta.with_name(f".{ruta.name}.tmp")
+    escritas = 0
+    try:
+        with temporal.open("w", encoding="utf-8", newline="") as destino:
+            writer = csv.writer(destino)
+            writer.writerow(list(COLUMNAS_EXPORTACION_AUDITORIA))
+            for lote in lotes:
+                if opciones.debe_cancelar is not None and opciones.debe_cancelar():
+                    raise ExportacionAuditoriaCanceladaError()
+                writer.writerows(
+                    [_obtener_columna_permitida(item, columna) for columna in COLUMNAS_EXPORTACION_AUDITORIA]
+                    for item in lote
+                )
+                escritas += len(lote)
+                if opciones.al_progresar is not None:
+                    opciones.al_progresar(escritas, total)
+        os.replace(temporal, ruta)
+    except BaseException:
+        temporal.unlink(missing_ok=True)
+        raise
+    finally:
+        close = getattr(lotes, "close", None)
+        if close is not None:
+            close()
+    return escritas
+
+
 def _obtener_columna_permitida(item: AuditoriaAccesoItemQuery | Mapping[str, Any], columna: str) -> str:
     if isinstance(item, Mapping):
         valor = item.get(columna)
@@ -1,5 +1,32 @@
 from __future__ import annotations
 
+import base64
+import binascii
+from dataclasses import dataclass
+
+DIRECCION_SIGUIENTE = "SIGUIENTE"
+DIRECCION_ANTERIOR = "ANTERIOR"
+
+_VERSION_CURSOR = "k1"
+
+
+class CursorPaginacionInvalidoError(ValueError):
+    """El cursor recibido no es uno emitido por `codificar_cursor` con la aridad esperada."""
+
+
+@dataclass(frozen=True, slots=True)
+class CursoresPagina:
+    siguiente: str | None
+    anterior: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class RecortePaginaKeyset:
+    """Filas ya recortadas al límite y cursores para seguir navegando desde ellas."""
+
+    filas: list[dict[str, object]]
+    cursores: CursoresPagina
+
 
 def calcular_siguiente_offset(offset: int, limit: int, total: int) -> int:
     if total <= 0:
@@ -7,3 +34,52 @@ def calcular_siguiente_offset(offset: int, limit: int, total: int) -> int:
     offset_actual = max(0, int(offset))
     limite = max(1, int(limit))
     return min(offset_actual + limite, total)
+
+
+def codificar_cursor(*clave: int) -> str:
+    """Cursor opaco (base64 url-safe) para una clave de orden compuesta por enteros."""
+    texto = ":".join((_VERSION_CURSOR, *(str(int(valor)) for valor in clave)))
+    return base64.urlsafe_b64encode(texto.encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(cursor: str, *, aridad: int) -> tuple[int, ...]:
+    relleno = "=" * (-len(cursor) % 4)
+    try:
+        texto = base64.urlsafe_b64decode(cursor + relleno).decode("ascii")
+        version, *valores = texto.split(":")
+        clave = tuple(int(valor) for valor in valores)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise CursorPaginacionInvalidoError("cursor_paginacion_invalido") from exc
+    if version != _VERSION_CURSOR or len(clave) != aridad:
+        raise CursorPaginacionInvalidoError("cursor_paginacion_invalido")
+    return clave
+
+
+def recortar_pagina_keyset(
+    filas: list[dict[str, object]],
+    *,
+    limit: int,
+    direccion: str,
+    con_cursor: bool,
+    claves_orden: tuple[str, ...],
+) -> RecortePaginaKeyset:
+    """
+    Recorta una página pedida con `limit + 1` filas (en orden de presentación).
+
+    La fila sobrante solo indica que hay más datos en la dirección pedida; al ir hacia atrás
+    sobra la primera, hacia delante la última.
+    """
+    limite = max(1, int(limit))
+    hay_mas = len(filas) > limite
+    hacia_atras = direccion == DIRECCION_ANTERIOR
+    if hay_mas:
+        filas = filas[-limite:] if hacia_atras else filas[:limite]
+    if not filas:
+        return RecortePaginaKeyset(filas=[], cursores=CursoresPagina(siguiente=None, anterior=None))
+    primera = codificar_cursor(*(int(filas[0][clave]) for clave in claves_orden))
+    ultima = codificar_cursor(*(int(filas[-1][clave]) for clave in claves_orden))
+    if hacia_atras:
+        cursores = CursoresPagina(siguiente=ultima, anterior=primera if hay_mas else None)
+    else:
+        cursores = CursoresPagina(siguiente=ultima if hay_mas else None, anterior=primera if con_cursor else None)
+    return RecortePaginaKeyset(filas=filas, cursores=cursores)
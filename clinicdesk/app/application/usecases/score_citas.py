@@ -5,7 +5,6 @@ from typing import Any
 
 from clinicdesk.app.application.features.citas_features import CitasFeatureRow
 from clinicdesk.app.application.ml.naive_bayes_citas import model_from_dict, predict_batch as predict_batch_trained
-from clinicdesk.app.application.ml_artifacts.feature_artifacts import canonical_json_bytes, compute_content_hash
 from clinicdesk.app.application.ports.model_store_port import ModelStorePort
 from clinicdesk.app.application.ports.predictor_port import PredictionResult, PredictorPort
 from clinicdesk.app.application.services.feature_store_service import FeatureStoreService
@@ -109,7 +108,7 @@ class ScoreCitas:
             raise ScoringValidationError(
                 f"Metadata inválida para versión '{dataset_version}': row_count={metadata.row_count} no coincide con {len(rows)} filas."
             )
-        actual_hash = compute_content_hash(canonical_json_bytes(rows))
+        actual_hash = self._feature_store_service.load_citas_features_content_hash(dataset_version)
         if metadata.content_hash != actual_hash:
             raise ScoringValidationError(
                 f"Metadata inválida para versión '{dataset_version}': content_hash no coincide."
@@ -9,8 +9,15 @@ from clinicdesk.app.application.ml.calibration import (
     calibrate_threshold,
     compute_metrics_at_threshold,
 )
-from clinicdesk.app.application.ml.evaluation import EvalMetrics, evaluate
-from clinicdesk.app.application.ml.naive_bayes_citas import model_to_dict, predict_batch, train
+from clinicdesk.app.application.ml.baseline_citas_predictor import BaselineCitasPredictor
+from clinicdesk.app.application.ml.evaluation import (
+    ConjuntoEvaluacion,
+    EvalMetrics,
+    InformeEvaluacion,
+    evaluar_candidatos,
+    evaluar_scores,
+)
+from clinicdesk.app.application.ml.naive_bayes_citas import TrainedModel, model_to_dict, score_batch, train
 from clinicdesk.app.application.ml.splitting import (
     TemporalSplitConfig,
     TemporalSplitNotEnoughDataError,
@@ -70,7 +77,9 @@ class TrainCitasModel:
         metadata = self._feature_store_service.load_citas_features_metadata(request.dataset_version)
         if metadata.row_count != len(rows):
             raise ModelTrainingValidationError("Metadata de features inválida: row_count no coincide.")
-        if metadata.content_hash != compute_content_hash(canonical_json_bytes(loaded_rows)):
+        if metadata.content_hash != self._feature_store_service.load_citas_features_content_hash(
+            request.dataset_version
+        ):
             raise ModelTrainingValidationError("Metadata de features inválida: content_hash no coincide.")
         expected_schema_hash = compute_schema_hash(
             build_schema_from_dataclass(CitasFeatureRow, version=FeatureStoreService.CITAS_SCHEMA_VERSION)
@@ -85,10 +94,8 @@ class TrainCitasModel:
             raise TrainCitasModelNotEnoughDataError(str(exc)) from exc
 
         model = train(train_rows)
-        train_metrics = evaluate(model, train_rows, derive_target_from_feature)
-        test_metrics = evaluate(model, test_rows, derive_target_from_feature)
-        test_scores = [pred.score for pred in predict_batch(model, test_rows)]
-        y_true = [int(derive_target_from_feature(row)) for row in test_rows]
+        train_metrics, test_scores, y_true, informes = _evaluar(model, train_rows, test_rows)
+        test_metrics = informes["trained"].metrics
         calibrated_threshold = calibrate_threshold(test_scores, y_true, self.DEFAULT_CALIBRATION_POLICY)
         calibrated_metrics = compute_metrics_at_threshold(test_scores, y_true, calibrated_threshold)
         model_version = request.model_version or self._build_version()
@@ -103,6 +110,7 @@ class TrainCitasModel:
             calibrated_threshold,
             calibrated_metrics,
             len(test_rows),
+            informes,
         )
         self._model_store.save_model(self.MODEL_NAME, model_version, payload, metadata_payload)
         return TrainCitasModelResponse(
@@ -129,6 +137,7 @@ class TrainCitasModel:
         calibrated_threshold: float,
         calibrated_metrics: EvalMetrics,
         test_row_count: int,
+        informes: dict[str, InformeEvaluacion],
     ) -> dict:
         return {
             "trained_on_dataset_version": dataset_version,
@@ -144,6 +153,7 @@ class TrainCitasModel:
             "calibration_policy": asdict(self.DEFAULT_CALIBRATION_POLICY),
             "test_metrics_at_calibrated_threshold": asdict(calibrated_metrics),
             "test_row_count": test_row_count,
+            "test_evaluation": {nombre: asdict(informe) for nombre, informe in informes.items()},
             "traceability": {
                 "dataset_version": dataset_version,
                 "schema_hash": schema_hash,
@@ -153,6 +163,24 @@ class TrainCitasModel:
         }
 
 
+def _evaluar(
+    model: TrainedModel, train_rows: list[CitasFeatureRow], test_rows: list[CitasFeatureRow]
+) -> tuple[EvalMetrics, list[float], list[int], dict[str, InformeEvaluacion]]:
+    """Puntúa cada conjunto una sola vez y evalúa modelo y baseline sobre el mismo test."""
+    train_set = ConjuntoEvaluacion.desde_filas(train_rows, derive_target_from_feature, segmentadores={})
+    train_metrics = evaluar_scores(score_batch(model, train_rows), train_set).metrics
+    test_set = ConjuntoEvaluacion.desde_filas(test_rows, derive_target_from_feature)
+    test_scores = score_batch(model, test_rows)
+    informes = evaluar_candidatos(
+        {
+            "trained": test_scores,
+            "baseline": [pred.score for pred in BaselineCitasPredictor().predict_batch(test_rows)],
+        },
+        test_set,
+    )
+    return train_metrics, test_scores, list(test_set.targets), informes
+
+
 def _to_feature_row(raw: object) -> CitasFeatureRow:
     if isinstance(raw, CitasFeatureRow):
         return raw
@@ -23,14 +23,9 @@ from clinicdesk.app.common.field_crypto_flags import validate_field_crypto_confi
 from clinicdesk.app.infrastructure.sqlite.sqlite_datetime_codecs import (
     register_sqlite_datetime_codecs,
 )
-from clinicdesk.app.infrastructure.sqlite.field_crypto_migrations import (
-    ensure_medicos_field_crypto_columns,
-    ensure_pacientes_field_crypto_columns,
-)
-from clinicdesk.app.infrastructure.sqlite.pii_crypto import (
-    configure_connection_pii,
-    migrate_existing_pii_data,
-)
+from clinicdesk.app.infrastructure.sqlite.migraciones_sqlite import aplicar_migraciones
+from clinicdesk.app.infrastructure.sqlite.pii_crypto import configure_connection_pii
+from clinicdesk.app.infrastructure.sqlite.sqlite_connection_config import configurar_conexion
 
 
 LOGGER = get_logger(__name__)
@@ -94,52 +89,20 @@ def schema_path() -> Path:
 # ---------------------------------------------------------------------
 
 
-def _apply_pragmas(con: sqlite3.Connection) -> None:
+def _apply_pragmas(con: sqlite3.Connection, target_path: Path) -> None:
     """
     PRAGMAs recomendados para SQLite en apps de escritorio.
-    """
-    con.execute("PRAGMA foreign_keys = ON;")
-    con.execute("PRAGMA journal_mode = WAL;")
-    con.execute("PRAGMA synchronous = NORMAL;")
-    con.execute("PRAGMA temp_store = MEMORY;")
-    con.execute("PRAGMA busy_timeout = 5000;")
-
 
-def _apply_schema(con: sqlite3.Connection) -> None:
-    """
-    Aplica el schema SQL (idempotente).
+    Para ficheros reales incluye el tuning de producción (mmap/cache/checkpoint).
     """
-    path = schema_path()
-    if not path.exists():
-        raise FileNotFoundError(f"No se encuentra schema.sql en {path}")
-
-    sql = path.read_text(encoding="utf-8")
-    con.executescript(sql)
-    _migrate_stock_columns(con)
-    asegurar_columnas_citas_extendido(con)
-    ensure_pacientes_field_crypto_columns(con)
-    ensure_medicos_field_crypto_columns(con)
-    migrate_existing_pii_data(con)
-    con.commit()
+    configurar_conexion(con, None if _is_special_sqlite_path(str(target_path)) else target_path)
 
 
-def _migrate_stock_columns(con: sqlite3.Connection) -> None:
+def _apply_schema(con: sqlite3.Connection) -> None:
     """
-    Migra columnas legacy de stock si existen en la base de datos.
+    Aplica el schema SQL y las migraciones versionadas pendientes (idempotente).
     """
-    _ensure_stock_column(con, table="medicamentos")
-    _ensure_stock_column(con, table="materiales")
-
-
-def _ensure_stock_column(con: sqlite3.Connection, *, table: str) -> None:
-    columns = {row["name"] for row in con.execute(f"PRAGMA table_info({table})").fetchall()}
-    if "cantidad_en_almacen" in columns:
-        return
-    if "cantidad_almacen" not in columns:
-        return
-
-    con.execute(f"ALTER TABLE {table} ADD COLUMN cantidad_en_almacen INTEGER NOT NULL DEFAULT 0")
-    con.execute(f"UPDATE {table} SET cantidad_en_almacen = cantidad_almacen")
+    aplicar_migraciones(con, schema_path())
 
 
 # ---------------------------------------------------------------------
@@ -169,29 +132,9 @@ def bootstrap_database(apply_schema: bool = True, sqlite_path: str | None = None
     con.row_factory = sqlite3.Row
     configure_connection_pii(con)
 
-    _apply_pragmas(con)
+    _apply_pragmas(con, target_path)
 
     if apply_schema:
         _apply_schema(con)
 
     return con
-
-
-def asegurar_columnas_citas_extendido(con: sqlite3.Connection) -> None:
-    columnas = {row["name"] for row in con.execute("PRAGMA table_info(citas)").fetchall()}
-    for columna in (
-        "check_in_at",
-        "llamado_a_consulta_at",
-        "consulta_inicio_at",
-        "consulta_fin_at",
-        "check_out_at",
-        "tipo_cita",
-        "canal_reserva",
-    ):
-        if columna in columnas:
-            continue
-        con.execute(f"ALTER TABLE citas ADD COLUMN {columna} TEXT NULL")
-        LOGGER.info(
-            "sqlite_migracion_add_col",
-            extra={"action": "sqlite_migracion_add_col", "tabla": "citas", "columna": columna},
-        )
@@ -12,8 +12,13 @@ from __future__ import annotations
 from clinicdesk.app.controllers.csv_controller import CsvController
 from clinicdesk.app.application.csv.csv_service import CsvService
 from clinicdesk.app.container import AppContainer
+from clinicdesk.app.infrastructure.sqlite.db_path import resolver_db_path_desde_conexion
 
 
 def build_csv_controller(container: AppContainer, parent) -> CsvController:
     svc = CsvService(container)
-    return CsvController(parent=parent, csv_service=svc)
+    return CsvController(
+        parent=parent,
+        csv_service=svc,
+        db_path=resolver_db_path_desde_conexion(container.connection),
+    )
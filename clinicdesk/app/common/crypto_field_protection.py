@@ -1,55 +1,151 @@
+"""
+Cifrado AES-GCM de campos protegidos.
+
+Formato de token:
+- `cfp:v2:<key_id>:<base64(nonce + ciphertext)>`: el id de clave (hash truncado del
+  material) permite elegir la clave directamente, sin descifrado de prueba.
+- `cfp:v1:<base64(...)>`: tokens antiguos sin id; se leen probando la clave activa y
+  la previa. La rotación (`security_cli rotate-key`) los reescribe en v2.
+
+Los cifradores se derivan una vez por clave en un `AnilloClavesCampos` cacheado por
+el material de las variables de entorno, así que cambiar la clave no requiere reiniciar.
+"""
+
 from __future__ import annotations
 
 import base64
 import hashlib
 import hmac
 import os
+from functools import lru_cache
+from typing import Any, Iterable
 
 from clinicdesk.app.common.sensitive_field_canonicalization import canonicalize_for_lookup
 
 _ENV_KEY = "CLINICDESK_CRYPTO_KEY"
 _ENV_KEY_PREVIOUS = "CLINICDESK_CRYPTO_KEY_PREVIOUS"
-_VERSION = "cfp:v1:"
+_VERSION_LEGACY = "cfp:v1:"
+_VERSION = "cfp:v2:"
+_KEY_ID_LEN = 8
+_NONCE_LEN = 12
 
 
 class CryptoFieldProtectionError(RuntimeError):
     """Error controlado para cifrado/descifrado de campos protegidos."""
 
 
+class AnilloClavesCampos:
+    """Cifradores AES-GCM por id de clave (activa + previas), derivados una sola vez."""
+
+    __slots__ = ("_key_id_activa", "_cifradores", "_clave_lookup")
+
+    def __init__(self, activa: str, previas: Iterable[str] = ()) -> None:
+        self._cifradores: dict[str, Any] = {}
+        for material in (activa, *previas):
+            self._cifradores.setdefault(_key_id(material), _aesgcm(material))
+        self._key_id_activa = _key_id(activa)
+        self._clave_lookup = hashlib.sha256(f"lookup:{activa}".encode("utf-8")).digest()
+
+    @property
+    def key_id_activa(self) -> str:
+        return self._key_id_activa
+
+    @property
+    def clave_lookup(self) -> bytes:
+        return self._clave_lookup
+
+    def encrypt(self, value: str) -> str:
+        if is_encrypted(value):
+            return value
+        nonce = os.urandom(_NONCE_LEN)
+        ciphertext = self._cifradores[self._key_id_activa].encrypt(nonce, value.encode("utf-8"), None)
+        payload = base64.urlsafe_b64encode(nonce + ciphertext).decode("ascii")
+        return f"{_VERSION}{self._key_id_activa}:{payload}"
+
+    def decrypt(self, value: str) -> str:
+        if value.startswith(_VERSION):
+            key_id, _, payload = value[len(_VERSION) :].partition(":")
+            cifrador = self._cifradores.get(key_id)
+            if cifrador is None:
+                raise CryptoFieldProtectionError("No se pudo descifrar campo protegido: clave no configurada.")
+            return _decrypt_with(cifrador, _decode_payload(payload))
+        if value.startswith(_VERSION_LEGACY):
+            return self._decrypt_legacy(_decode_payload(value[len(_VERSION_LEGACY) :]))
+        return value
+
+    def encrypt_many(self, values: Iterable[str | None]) -> list[str | None]:
+        return [self.encrypt(value) if value is not None else None for value in values]
+
+    def decrypt_many(self, values: Iterable[str | None]) -> list[str | None]:
+        return [self.decrypt(value) if value else value for value in values]
+
+    def requiere_recifrado(self, value: str | None) -> bool:
+        """True si el token no está en el formato actual con la clave activa."""
+        return bool(value) and not str(value).startswith(f"{_VERSION}{self._key_id_activa}:")
+
+    def _decrypt_legacy(self, raw: bytes) -> str:
+        last_error: Exception | None = None
+        for key_id in (self._key_id_activa, *(k for k in self._cifradores if k != self._key_id_activa)):
+            try:
+                return _decrypt_with(self._cifradores[key_id], raw)
+            except CryptoFieldProtectionError as exc:
+                last_error = exc
+        raise CryptoFieldProtectionError("No se pudo descifrar campo protegido.") from last_error
+
+
+def anillo_claves() -> AnilloClavesCampos:
+    return _anillo_para(_active_key_material(), tuple(_previous_key_materials()))
+
+
+def is_encrypted(value: str) -> bool:
+    return value.startswith(_VERSION) or value.startswith(_VERSION_LEGACY)
+
+
 def encrypt(value: str) -> str:
-    if value.startswith(_VERSION):
+    if is_encrypted(value):
         return value
-    aesgcm = _aesgcm(_active_key_material())
-    nonce = os.urandom(12)
-    ciphertext = aesgcm.encrypt(nonce, value.encode("utf-8"), None)
-    payload = base64.urlsafe_b64encode(nonce + ciphertext).decode("ascii")
-    return f"{_VERSION}{payload}"
+    return anillo_claves().encrypt(value)
 
 
 def decrypt(value: str) -> str:
-    if not value.startswith(_VERSION):
+    if not is_encrypted(value):
         return value
-    raw = _decode_payload(value)
-    nonce, ciphertext = raw[:12], raw[12:]
-    materials = [_active_key_material(), *_previous_key_materials()]
-    last_error: Exception | None = None
-    for material in materials:
-        try:
-            aesgcm = _aesgcm(material)
-            return aesgcm.decrypt(nonce, ciphertext, None).decode("utf-8")
-        except Exception as exc:
-            if not _is_invalid_tag_error(exc):
-                raise CryptoFieldProtectionError("No se pudo descifrar campo protegido.") from exc
-            last_error = exc
-    raise CryptoFieldProtectionError("No se pudo descifrar campo protegido.") from last_error
+    return anillo_claves().decrypt(value)
+
+
+def encrypt_many(values: Iterable[str | None]) -> list[str | None]:
+    return anillo_claves().encrypt_many(values)
+
+
+def decrypt_many(values: Iterable[str | None]) -> list[str | None]:
+    pendientes = list(values)
+    if not any(value and is_encrypted(value) for value in pendientes):
+        return pendientes
+    return anillo_claves().decrypt_many(pendientes)
 
 
 def hash_lookup(value: str, *, field: str | None = None) -> str:
     normalized = _normalize_lookup(value, field=field)
-    digest = hmac.new(_lookup_key(), normalized.encode("utf-8"), hashlib.sha256).digest()
+    digest = hmac.new(anillo_claves().clave_lookup, normalized.encode("utf-8"), hashlib.sha256).digest()
     return base64.urlsafe_b64encode(digest).decode("ascii")
 
 
+@lru_cache(maxsize=4)
+def _anillo_para(activa: str, previas: tuple[str, ...]) -> AnilloClavesCampos:
+    return AnilloClavesCampos(activa, previas)
+
+
+def _key_id(material: str) -> str:
+    return hashlib.sha256(f"key-id:{material}".encode("utf-8")).hexdigest()[:_KEY_ID_LEN]
+
+
+def _decrypt_with(cifrador: Any, raw: bytes) -> str:
+    try:
+        return cifrador.decrypt(raw[:_NONCE_LEN], raw[_NONCE_LEN:], None).decode("utf-8")
+    except Exception as exc:
+        raise CryptoFieldProtectionError("No se pudo descifrar campo protegido.") from exc
+
+
 def _aesgcm(material: str):
     try:
         from cryptography.hazmat.primitives.ciphers.aead import AESGCM
@@ -64,11 +160,6 @@ def _encryption_key(material: str) -> bytes:
     return hashlib.sha256(material.encode("utf-8")).digest()
 
 
-def _lookup_key() -> bytes:
-    material = f"lookup:{_active_key_material()}".encode("utf-8")
-    return hashlib.sha256(material).digest()
-
-
 def _active_key_material() -> str:
     key = os.getenv(_ENV_KEY, "").strip()
     if not key:
@@ -83,24 +174,16 @@ def _previous_key_materials() -> list[str]:
     return [key]
 
 
-def _decode_payload(value: str) -> bytes:
+def _decode_payload(payload: str) -> bytes:
     try:
-        raw = base64.urlsafe_b64decode(value[len(_VERSION) :].encode("ascii"))
+        raw = base64.urlsafe_b64decode(payload.encode("ascii"))
     except Exception as exc:
         raise CryptoFieldProtectionError("Token cifrado inválido.") from exc
-    if len(raw) < 13:
+    if len(raw) < _NONCE_LEN + 1:
         raise CryptoFieldProtectionError("Token cifrado inválido.")
     return raw
 
 
-def _is_invalid_tag_error(exc: Exception) -> bool:
-    try:
-        from cryptography.exceptions import InvalidTag
-    except ModuleNotFoundError:
-        return False
-    return isinstance(exc, InvalidTag)
-
-
 def _normalize_lookup(value: str, *, field: str | None) -> str:
     if field is not None:
         normalized = canonicalize_for_lookup(field, value)
@@ -4,7 +4,7 @@ import sqlite3
 from dataclasses import dataclass
 from typing import Iterable
 
-from clinicdesk.app.common.crypto_field_protection import decrypt, encrypt, hash_lookup
+from clinicdesk.app.common.crypto_field_protection import decrypt, decrypt_many, encrypt, hash_lookup
 from clinicdesk.app.common.sensitive_field_canonicalization import canonicalize_sensitive_value
 
 
@@ -54,6 +54,14 @@ class FieldProtectionBase:
             return decrypt(encrypted)
         return legacy
 
+    def decode_many(self, field: str, values: Iterable[tuple[str | None, str | None]]) -> list[str | None]:
+        """Como `decode` para pares (legacy, encrypted) de un lote de filas, con un solo acceso al anillo de claves."""
+        pares = list(values)
+        if field not in self._fields:
+            return [legacy for legacy, _ in pares]
+        descifrados = decrypt_many([encrypted or None for _, encrypted in pares])
+        return [claro if encrypted else legacy for (legacy, encrypted), claro in zip(pares, descifrados)]
+
     def hash_for_lookup(self, field: str, value: str | None) -> str | None:
         canonical = canonicalize_sensitive_value(field, value)
         if not self.enabled or field not in self._fields or canonical is None:
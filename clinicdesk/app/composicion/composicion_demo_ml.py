@@ -15,7 +15,7 @@ from clinicdesk.app.application.usecases.score_citas import ScoreCitas
 from clinicdesk.app.application.usecases.seed_demo_data import SeedDemoData
 from clinicdesk.app.application.usecases.train_citas_model import TrainCitasModel
 from clinicdesk.app.bootstrap import data_dir
-from clinicdesk.app.infrastructure.feature_store.local_json_feature_store import LocalJsonFeatureStore
+from clinicdesk.app.infrastructure.feature_store.local_columnar_feature_store import LocalColumnarFeatureStore
 from clinicdesk.app.infrastructure.model_store.local_json_model_store import LocalJsonModelStore
 from clinicdesk.app.infrastructure.sqlite.citas_read_adapter import SqliteCitasReadAdapter
 from clinicdesk.app.infrastructure.sqlite.demo_data_seeder import DemoDataSeeder
@@ -37,7 +37,7 @@ def build_analitica_ml_facade(
     stores_base = data_dir()
     feature_store_path = Path(stores_base) / "feature_store"
     model_store_path = Path(stores_base) / "model_store"
-    feature_service = FeatureStoreService(LocalJsonFeatureStore(feature_store_path))
+    feature_service = FeatureStoreService(LocalColumnarFeatureStore(feature_store_path))
     model_store = LocalJsonModelStore(model_store_path)
     dataset_uc = BuildCitasDataset(SqliteCitasReadAdapter(citas_repo, incidencias_repo))
     seguimiento_operativo = SeguimientoOperativoMLService(RepositorioSeguimientoOperativoMLSqlite(connection))
@@ -9,6 +9,7 @@ from clinicdesk.app.application.prediccion_ausencias.resultados_recientes import
     RegistrarPrediccionesAusenciasAgenda,
 )
 from clinicdesk.app.application.prediccion_ausencias.riesgo_agenda import ObtenerRiesgoAusenciaParaCitas
+from clinicdesk.app.application.prediccion_ausencias.scores_riesgo import PuntuarRiesgoAusenciaCitas
 from clinicdesk.app.application.prediccion_ausencias.salud_prediccion import ObtenerSaludPrediccionAusencias
 from clinicdesk.app.application.prediccion_ausencias.usecases import (
     ComprobarDatosPrediccionAusencias,
@@ -27,6 +28,7 @@ from clinicdesk.app.infrastructure.prediccion_ausencias import (
 from clinicdesk.app.infrastructure.sqlite.proveedor_conexion_sqlite import ProveedorConexionSqlitePorHilo
 from clinicdesk.app.queries.prediccion_ausencias_queries import PrediccionAusenciasQueries
 from clinicdesk.app.queries.prediccion_ausencias_resultados_queries import PrediccionAusenciasResultadosQueries
+from clinicdesk.app.queries.riesgo_ausencia_scores_queries import RiesgoAusenciaScoresQueries
 
 
 def build_prediccion_ausencias_facade(
@@ -36,12 +38,14 @@ def build_prediccion_ausencias_facade(
     resultados_queries = PrediccionAusenciasResultadosQueries(proveedor_conexion)
     almacenamiento = AlmacenamientoModeloPrediccion()
     comprobar_uc = ComprobarDatosPrediccionAusencias(queries, minimo_requerido=50)
+    puntuar_riesgo_uc = PuntuarRiesgoAusenciaCitas(almacenamiento, RiesgoAusenciaScoresQueries(proveedor_conexion))
     entrenar_uc = EntrenarPrediccionAusencias(
         comprobar_datos_uc=comprobar_uc,
         queries=queries,
         predictor_baseline=PredictorAusenciasBaseline(),
         predictor_v2=PredictorAusenciasV2(),
         almacenamiento=almacenamiento,
+        al_activar_modelo=puntuar_riesgo_uc.recalcular_todo,
     )
     return PrediccionAusenciasFacade(
         proveedor_conexion=proveedor_conexion,
@@ -57,4 +61,5 @@ def build_prediccion_ausencias_facade(
         obtener_resultados_recientes_uc=ObtenerResultadosRecientesPrediccionAusencias(resultados_queries),
         listar_citas_pendientes_cierre_uc=ListarCitasPendientesCierre(queries),
         cerrar_citas_pendientes_uc=CerrarCitasPendientes(queries),
+        puntuar_riesgo_uc=puntuar_riesgo_uc,
     )
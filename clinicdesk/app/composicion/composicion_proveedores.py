@@ -4,10 +4,16 @@ import sqlite3
 
 from clinicdesk.app.infrastructure.sqlite.db_path import resolver_db_path_desde_conexion
 from clinicdesk.app.infrastructure.sqlite.proveedor_conexion_sqlite import ProveedorConexionSqlitePorHilo
+from clinicdesk.app.infrastructure.sqlite.sqlite_connection_config import (
+    PERFIL_INTERACTIVO,
+    PerfilConexionSqlite,
+)
 
 
 def build_proveedor_conexion_sqlite_por_hilo(
     connection: sqlite3.Connection,
+    *,
+    perfil: PerfilConexionSqlite = PERFIL_INTERACTIVO,
 ) -> ProveedorConexionSqlitePorHilo:
     db_path = resolver_db_path_desde_conexion(connection)
-    return ProveedorConexionSqlitePorHilo(db_path)
+    return ProveedorConexionSqlitePorHilo(db_path, perfil=perfil)
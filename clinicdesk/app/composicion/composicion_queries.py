@@ -2,8 +2,13 @@ from __future__ import annotations
 
 import sqlite3
 
+from clinicdesk.app.queries.agenda_disponibilidad_queries import AgendaDisponibilidadQueries
 from clinicdesk.app.queries.farmacia_queries import FarmaciaQueries
 
 
 def build_farmacia_queries(connection: sqlite3.Connection) -> FarmaciaQueries:
     return FarmaciaQueries(connection)
+
+
+def build_agenda_disponibilidad_queries(connection: sqlite3.Connection) -> AgendaDisponibilidadQueries:
+    return AgendaDisponibilidadQueries(connection)
@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 import sqlite3
 
+from clinicdesk.app.infrastructure.sqlite.escritor_eventos_sqlite import EscritorEventosSqliteEnLote
 from clinicdesk.app.infrastructure.sqlite.repos_auditoria_accesos import RepositorioAuditoriaAccesoSqlite
 from clinicdesk.app.infrastructure.sqlite.repos_auditoria_eventos import RepositorioAuditoriaEventosSqlite
 from clinicdesk.app.infrastructure.sqlite.repos_ausencias_medico import AusenciasMedicoRepository
@@ -49,7 +50,11 @@ class RepositoriosSqlite:
     auditoria_eventos_repo: RepositorioAuditoriaEventosSqlite
 
 
-def build_repositorios_sqlite(connection: sqlite3.Connection) -> RepositoriosSqlite:
+def build_repositorios_sqlite(
+    connection: sqlite3.Connection,
+    *,
+    escritor_eventos: EscritorEventosSqliteEnLote | None = None,
+) -> RepositoriosSqlite:
     return RepositoriosSqlite(
         pacientes_repo=PacientesRepository(connection),
         medicos_repo=MedicosRepository(connection),
@@ -68,7 +73,7 @@ def build_repositorios_sqlite(connection: sqlite3.Connection) -> RepositoriosSql
         dispensaciones_repo=DispensacionesRepository(connection),
         citas_repo=CitasRepository(connection),
         incidencias_repo=IncidenciasRepository(connection),
-        auditoria_accesos_repo=RepositorioAuditoriaAccesoSqlite(connection),
-        telemetria_eventos_repo=RepositorioTelemetriaEventosSqlite(connection),
-        auditoria_eventos_repo=RepositorioAuditoriaEventosSqlite(connection),
+        auditoria_accesos_repo=RepositorioAuditoriaAccesoSqlite(connection, escritor_eventos),
+        telemetria_eventos_repo=RepositorioTelemetriaEventosSqlite(connection, escritor_eventos),
+        auditoria_eventos_repo=RepositorioAuditoriaEventosSqlite(connection, escritor_eventos),
     )
@@ -2,30 +2,47 @@ from __future__ import annotations
 
 import os
 import sqlite3
+import threading
 from dataclasses import dataclass
 from typing import Any
 
 from clinicdesk.app.application.auditoria.audit_service import AuditService
+from clinicdesk.app.application.ports.unidad_trabajo_port import UnidadDeTrabajo
 from clinicdesk.app.application.preferencias.preferencias_usuario import PreferenciasService
 from clinicdesk.app.application.security import AutorizadorAcciones, Role, UserContext
 from clinicdesk.app.application.services.demo_ml_facade import DemoMLFacade
 from clinicdesk.app.application.services.prediccion_ausencias_facade import PrediccionAusenciasFacade
 from clinicdesk.app.application.services.prediccion_operativa_facade import PrediccionOperativaFacade
 from clinicdesk.app.application.services.recordatorios_citas_facade import RecordatoriosCitasFacade
+from clinicdesk.app.bootstrap_logging import get_logger
 from clinicdesk.app.composicion.composicion_demo_ml import build_analitica_ml_facade
 from clinicdesk.app.composicion.composicion_prediccion_ausencias import build_prediccion_ausencias_facade
 from clinicdesk.app.composicion.composicion_prediccion_operativa import build_prediccion_operativa_facade
 from clinicdesk.app.composicion.composicion_proveedores import build_proveedor_conexion_sqlite_por_hilo
-from clinicdesk.app.composicion.composicion_queries import build_farmacia_queries
+from clinicdesk.app.composicion.composicion_queries import (
+    build_agenda_disponibilidad_queries,
+    build_farmacia_queries,
+)
 from clinicdesk.app.composicion.composicion_recordatorios import build_recordatorios_citas_facade
 from clinicdesk.app.composicion.composicion_repositorios_sqlite import build_repositorios_sqlite
 from clinicdesk.app.infrastructure.preferencias.repositorio_preferencias_json import RepositorioPreferenciasJson
+from clinicdesk.app.infrastructure.sqlite.db_path import resolver_db_path_desde_conexion
+from clinicdesk.app.infrastructure.sqlite.escritor_eventos_sqlite import EscritorEventosSqliteEnLote
+from clinicdesk.app.infrastructure.sqlite.migraciones_sqlite import planificar_migraciones
+from clinicdesk.app.infrastructure.sqlite.pii_migracion_lotes import MigracionPiiEnSegundoPlano
+from clinicdesk.app.infrastructure.sqlite.pool_conexiones_sqlite import cerrar_pools_compartidos
+from clinicdesk.app.infrastructure.sqlite.sqlite_connection_config import PERFIL_ANALITICA
+from clinicdesk.app.infrastructure.sqlite.unidad_trabajo_sqlite import UnidadTrabajoSqlite
+from clinicdesk.app.queries.agenda_disponibilidad_queries import AgendaDisponibilidadQueries
 from clinicdesk.app.queries.farmacia_queries import FarmaciaQueries
 
+LOGGER = get_logger(__name__)
+
 
 @dataclass(slots=True)
 class QueriesHub:
     farmacia: FarmaciaQueries
+    agenda_disponibilidad: AgendaDisponibilidadQueries
 
 
 @dataclass(slots=True)
@@ -66,18 +83,50 @@ class AppContainer:
     autorizador_acciones: AutorizadorAcciones
     preferencias_service: PreferenciasService
     proveedores_sqlite_por_hilo: tuple[Any, ...]
+    escritor_eventos: EscritorEventosSqliteEnLote | None = None
+    unidad_trabajo: UnidadDeTrabajo | None = None
+    migracion_pii: MigracionPiiEnSegundoPlano | None = None
 
     @property
     def demo_ml_facade(self) -> DemoMLFacade:
         """Compatibilidad temporal con naming histórico de analítica ML."""
         return self.analitica_ml_facade
 
+    def iniciar_migracion_pii_pendiente(self) -> None:
+        """Cifra en segundo plano la PII existente si el arranque la dejó pendiente."""
+        if self.migracion_pii is not None or not planificar_migraciones(self.connection).cifrado_pii_pendiente:
+            return
+        db_path = resolver_db_path_desde_conexion(self.connection)
+        if db_path == ":memory:":
+            return
+        self.migracion_pii = MigracionPiiEnSegundoPlano.para_db(db_path)
+        self.migracion_pii.iniciar()
+
+    def iniciar_puntuacion_riesgo_pendiente(self) -> None:
+        """Puntúa en segundo plano las citas sin puntuación vigente (p. ej. modificadas o importadas)."""
+        facade = self.prediccion_ausencias_facade
+        if facade.puntuar_riesgo_uc is None or resolver_db_path_desde_conexion(self.connection) == ":memory:":
+            return
+        hilo = threading.Thread(
+            target=_puntuar_riesgo_pendiente, args=(facade,), name="clinicdesk-scores-riesgo", daemon=True
+        )
+        hilo.start()
+
     def close(self) -> None:
         try:
+            if self.migracion_pii is not None:
+                self.migracion_pii.detener()
+                try:
+                    self.migracion_pii.esperar()
+                except Exception:
+                    pass  # el hilo ya lo registró; se reanuda desde la marca de agua al volver a arrancar
+            if self.escritor_eventos is not None:
+                self.escritor_eventos.cerrar()
             for proveedor in self.proveedores_sqlite_por_hilo:
                 cerrar = getattr(proveedor, "cerrar_conexion_del_hilo_actual", None)
                 if callable(cerrar):
                     cerrar()
+            cerrar_pools_compartidos()
         finally:
             try:
                 self.connection.close()
@@ -85,17 +134,27 @@ class AppContainer:
                 pass
 
 
-def build_container(connection: sqlite3.Connection) -> AppContainer:
+def build_container(connection: sqlite3.Connection, *, escritura_eventos_en_lote: bool = False) -> AppContainer:
+    """
+    Compone la aplicación sobre `connection`.
+
+    Con `escritura_eventos_en_lote` la auditoría y la telemetría se escriben desde un hilo
+    con su propia conexión, agrupadas por transacción; `close()` vacía la cola.
+    """
     connection.row_factory = sqlite3.Row
-    repos = build_repositorios_sqlite(connection)
-    proveedor_prediccion = build_proveedor_conexion_sqlite_por_hilo(connection)
+    escritor_eventos = _build_escritor_eventos(connection) if escritura_eventos_en_lote else None
+    repos = build_repositorios_sqlite(connection, escritor_eventos=escritor_eventos)
+    proveedor_prediccion = build_proveedor_conexion_sqlite_por_hilo(connection, perfil=PERFIL_ANALITICA)
     proveedor_recordatorios = build_proveedor_conexion_sqlite_por_hilo(connection)
     proveedores_sqlite_por_hilo = (proveedor_prediccion, proveedor_recordatorios)
     user_context = build_user_context()
     autorizador_acciones = AutorizadorAcciones()
     return AppContainer(
         connection=connection,
-        queries=QueriesHub(farmacia=build_farmacia_queries(connection)),
+        queries=QueriesHub(
+            farmacia=build_farmacia_queries(connection),
+            agenda_disponibilidad=build_agenda_disponibilidad_queries(connection),
+        ),
         analitica_ml_facade=build_analitica_ml_facade(
             connection,
             repos.citas_repo,
@@ -131,9 +190,32 @@ def build_container(connection: sqlite3.Connection) -> AppContainer:
         autorizador_acciones=autorizador_acciones,
         preferencias_service=PreferenciasService(RepositorioPreferenciasJson()),
         proveedores_sqlite_por_hilo=proveedores_sqlite_por_hilo,
+        escritor_eventos=escritor_eventos,
+        unidad_trabajo=UnidadTrabajoSqlite(connection),
     )
 
 
+def _puntuar_riesgo_pendiente(facade: PrediccionAusenciasFacade) -> None:
+    try:
+        facade.puntuar_riesgo_uc.ejecutar()
+    except Exception as exc:  # noqa: BLE001 - se reintenta en el próximo arranque
+        LOGGER.error(
+            "prediccion_scores_arranque_fallido",
+            extra={"action": "prediccion_scores_arranque_fallido", "error": str(exc)},
+        )
+    finally:
+        facade.proveedor_conexion.cerrar_conexion_del_hilo_actual()
+
+
+def _build_escritor_eventos(connection: sqlite3.Connection) -> EscritorEventosSqliteEnLote | None:
+    db_path = resolver_db_path_desde_conexion(connection)
+    if db_path == ":memory:":
+        return None
+    escritor = EscritorEventosSqliteEnLote.para_db(db_path)
+    escritor.iniciar()
+    return escritor
+
+
 def build_user_context() -> UserContext:
     role_value = os.getenv("CLINICDESK_ROLE", Role.ADMIN.value).upper()
     role = Role(role_value) if role_value in {valor.value for valor in Role} else Role.ADMIN
@@ -4,7 +4,15 @@ from typing import List
 
 from PySide6.QtWidgets import QMessageBox, QWidget, QDialog
 
+from clinicdesk.app.application.citas import (
+    BuscarHuecosLibres,
+    BuscarHuecosRequest,
+    ReservarSerieCitas,
+    SerieCitasRequest,
+)
+from clinicdesk.app.application.ports.unidad_trabajo_port import resolver_unidad_de_trabajo
 from clinicdesk.app.container import AppContainer
+from clinicdesk.app.domain.agenda_disponibilidad import HuecoLibre
 from clinicdesk.app.queries.citas_queries import CitaRow, CitasQueries
 from clinicdesk.app.application.usecases.crear_cita import CrearCitaRequest, CrearCitaUseCase, PendingWarningsError
 from clinicdesk.app.application.usecases.eliminar_cita import EliminarCitaUseCase
@@ -23,6 +31,16 @@ class CitasController:
         self._q = CitasQueries(container)
         self._uc_crear = CrearCitaUseCase(container)
         self._uc_eliminar = EliminarCitaUseCase(container.citas_repo, container.user_context)
+        self._uc_buscar_huecos = BuscarHuecosLibres(container.queries.agenda_disponibilidad)
+        self._uc_reservar_serie = ReservarSerieCitas(
+            agenda=container.queries.agenda_disponibilidad,
+            citas_repo=container.citas_repo,
+            unidad_trabajo=resolver_unidad_de_trabajo(container),
+            user_context=container.user_context,
+            autorizador_acciones=container.autorizador_acciones,
+            audit_service=container.audit_service,
+            puntuar_riesgo_uc=container.prediccion_ausencias_facade.puntuar_riesgo_uc,
+        )
 
     def load_citas_for_date(self, yyyy_mm_dd: str) -> List[CitaRow]:
         return self._q.list_by_date(yyyy_mm_dd)
@@ -79,6 +97,21 @@ class CitasController:
             present_error(self._parent, ex)
             return False
 
+    def buscar_huecos(self, request: BuscarHuecosRequest) -> List[HuecoLibre]:
+        try:
+            return self._uc_buscar_huecos.ejecutar(request)
+        except Exception as ex:
+            present_error(self._parent, ex)
+            return []
+
+    def reservar_serie(self, request: SerieCitasRequest) -> bool:
+        try:
+            self._uc_reservar_serie.ejecutar(request)
+            return True
+        except Exception as ex:
+            present_error(self._parent, ex)
+            return False
+
     def delete_cita(self, cita_id: int) -> bool:
         if cita_id <= 0:
             return False
@@ -19,6 +19,7 @@ from typing import Callable, Dict, Optional
 from PySide6.QtWidgets import QFileDialog, QMessageBox, QWidget
 
 from clinicdesk.app.application.csv.csv_service import CsvService, CsvImportResult
+from clinicdesk.app.controllers.workers_csv import ExportadorCsv, crear_worker_exportacion_csv
 from clinicdesk.app.pages.dialog_csv import CsvDialog
 from clinicdesk.app.ui.error_presenter import present_error
 
@@ -30,19 +31,22 @@ class CsvController:
         csv_service: CsvService,
         *,
         on_import_complete: Optional[Callable[[str], None]] = None,
+        db_path: Optional[str] = None,
     ) -> None:
         self._parent = parent
         self._svc = csv_service
         self._on_import_complete = on_import_complete
-
-        # Mapeo de entidades -> funciones service
-        self._exporters: Dict[str, Callable[[str], None]] = {
-            "Pacientes": self._svc.export_pacientes,
-            "Médicos": self._svc.export_medicos,
-            "Personal": self._svc.export_personal,
-            "Medicamentos": self._svc.export_medicamentos,
-            "Materiales": self._svc.export_materiales,
-            "Salas": self._svc.export_salas,
+        # Con una BD en disco la exportación corre como job sobre una conexión del pool.
+        self._db_path = db_path if db_path and db_path != ":memory:" else None
+
+        # Mapeo de entidades -> métodos del service (se invocan sobre el service del hilo que exporta)
+        self._exporters: Dict[str, ExportadorCsv] = {
+            "Pacientes": CsvService.export_pacientes,
+            "Médicos": CsvService.export_medicos,
+            "Personal": CsvService.export_personal,
+            "Medicamentos": CsvService.export_medicamentos,
+            "Materiales": CsvService.export_materiales,
+            "Salas": CsvService.export_salas,
         }
 
         self._importers: Dict[str, Callable[[str], CsvImportResult]] = {
@@ -80,12 +84,31 @@ class CsvController:
         if not path:
             return
 
+        runner = self._parent
+        if self._db_path is None or not hasattr(runner, "run_premium_job"):
+            self._export_sync(exporter, path)
+            return
+        db_path = self._db_path
+        runner.run_premium_job(
+            job_id="export_csv",
+            title_key="job.export_csv.title",
+            worker_factory=lambda: crear_worker_exportacion_csv(db_path=db_path, exportar=exporter, ruta_guardado=path),
+            cancellable=True,
+            toast_success_key="job.done",
+            toast_failed_key="job.failed",
+            toast_cancelled_key="job.cancelled",
+            on_success=lambda filas: self._informar_exportacion(filas, path),
+        )
+
+    def _export_sync(self, exporter: ExportadorCsv, path: str) -> None:
         try:
-            exporter(path)
-            QMessageBox.information(self._parent, "CSV", f"Exportación completada:\n{path}")
+            self._informar_exportacion(exporter(self._svc, path, None), path)
         except Exception as e:
             present_error(self._parent, e)
 
+    def _informar_exportacion(self, filas: object, path: str) -> None:
+        QMessageBox.information(self._parent, "CSV", f"Exportación completada ({filas} filas):\n{path}")
+
     def _import(self, entity: str, dlg: CsvDialog) -> None:
         importer = self._importers.get(entity)
         if not importer:
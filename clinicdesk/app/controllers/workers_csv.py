@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from typing import Callable, Optional
+
+from clinicdesk.app.application.csv.csv_io import ExportacionCsvCancelada, OpcionesExportacionCsv
+from clinicdesk.app.application.csv.csv_service import CsvService
+from clinicdesk.app.composicion.composicion_repositorios_sqlite import build_repositorios_sqlite
+from clinicdesk.app.infrastructure.sqlite.pool_conexiones_sqlite import obtener_pool_compartido
+from clinicdesk.app.infrastructure.sqlite.sqlite_connection_config import PERFIL_ANALITICA
+from clinicdesk.app.ui.jobs.job_manager import JobCancelledError
+
+ExportadorCsv = Callable[[CsvService, str, Optional[OpcionesExportacionCsv]], int]
+
+_PROGRESO_INICIO_ESCRITURA = 10
+_PROGRESO_FIN_ESCRITURA = 95
+# Sin un total previo el avance es una estimación: a estas filas se llega a la mitad del tramo.
+_FILAS_MITAD_TRAMO = 5_000
+
+
+def crear_worker_exportacion_csv(*, db_path: str, exportar: ExportadorCsv, ruta_guardado: str):
+    def _worker(cancel_token, report_progress):
+        def _al_progresar(escritas: int) -> None:
+            tramo = _PROGRESO_FIN_ESCRITURA - _PROGRESO_INICIO_ESCRITURA
+            avance = _PROGRESO_INICIO_ESCRITURA + tramo * escritas // (escritas + _FILAS_MITAD_TRAMO)
+            report_progress(avance, "job.export_csv.progress.write")
+
+        opciones = OpcionesExportacionCsv(
+            al_progresar=_al_progresar,
+            debe_cancelar=lambda: cancel_token.is_cancelled,
+        )
+        report_progress(_PROGRESO_INICIO_ESCRITURA, "job.export_csv.progress.export")
+        try:
+            # La conexión de la UI no puede usarse desde el hilo del job: se pide una al pool.
+            with obtener_pool_compartido(db_path, perfil=PERFIL_ANALITICA).conexion() as connection:
+                filas = exportar(CsvService(build_repositorios_sqlite(connection)), ruta_guardado, opciones)
+        except ExportacionCsvCancelada as exc:
+            raise JobCancelledError() from exc
+        report_progress(100, "job.export_csv.progress.done")
+        return filas
+
+    return _worker
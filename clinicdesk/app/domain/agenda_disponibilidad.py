@@ -0,0 +1,223 @@
+"""
+Disponibilidad de agenda en memoria.
+
+Se carga una vez la ocupación de un rango (citas no canceladas por médico y por sala,
+turnos del cuadrante y ausencias) y se resuelven en memoria tanto la búsqueda de huecos
+libres como la comprobación de una serie de citas antes de reservarla.
+
+Las reglas son las de `CrearCitaUseCase`:
+- Solape de citas: (inicio < fin_existente) AND (fin > inicio_existente).
+- Ausencia: (inicio_ausencia <= fin) AND (fin_ausencia >= inicio), extremos incluidos.
+- Cuadrante: basta con que el médico tenga algún turno ese día; la búsqueda de huecos,
+  además, solo propone horas dentro de los turnos.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from typing import Iterable
+
+CONFLICTO_SOLAPE_MEDICO = "SOLAPE_MEDICO"
+CONFLICTO_SOLAPE_SALA = "SOLAPE_SALA"
+CONFLICTO_AUSENCIA = "MEDICO_CON_AUSENCIA"
+CONFLICTO_SIN_CUADRANTE = "MEDICO_SIN_CUADRANTE"
+
+_INSTANTE = timedelta(seconds=1)
+
+
+@dataclass(frozen=True, slots=True, order=True)
+class Intervalo:
+    inicio: datetime
+    fin: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class HuecoLibre:
+    medico_id: int
+    sala_id: int
+    inicio: datetime
+    fin: datetime
+
+
+class _Ocupacion:
+    """
+    Intervalos de un recurso ordenados por inicio, con el máximo acumulado de `fin`.
+
+    `libre_desde` responde con una bisección: los candidatos a solapar son los que empiezan
+    antes del fin pedido, y basta el mayor `fin` entre ellos para saber si alguno solapa.
+    """
+
+    __slots__ = ("_intervalos", "_inicios", "_fin_maximo", "_extremos_incluidos")
+
+    def __init__(self, intervalos: Iterable[Intervalo] = (), *, extremos_incluidos: bool = False) -> None:
+        self._intervalos = sorted(intervalos)
+        self._extremos_incluidos = extremos_incluidos
+        self._reindexar()
+
+    def agregar(self, intervalo: Intervalo) -> None:
+        insort(self._intervalos, intervalo)
+        self._reindexar()
+
+    def libre_desde(self, inicio: datetime, fin: datetime) -> datetime | None:
+        """None si [inicio, fin) está libre; si no, el primer instante en que deja de haber solape."""
+        if self._extremos_incluidos:
+            candidatos = bisect_right(self._inicios, fin)
+        else:
+            candidatos = bisect_left(self._inicios, fin)
+        if candidatos == 0:
+            return None
+        fin_maximo = self._fin_maximo[candidatos - 1]
+        if self._extremos_incluidos:
+            return fin_maximo + _INSTANTE if fin_maximo >= inicio else None
+        return fin_maximo if fin_maximo > inicio else None
+
+    def _reindexar(self) -> None:
+        self._inicios = [intervalo.inicio for intervalo in self._intervalos]
+        self._fin_maximo = list(accumulate((intervalo.fin for intervalo in self._intervalos), max))
+
+
+@dataclass(slots=True)
+class AgendaDisponibilidad:
+    citas_medico: dict[int, _Ocupacion] = field(default_factory=dict)
+    citas_sala: dict[int, _Ocupacion] = field(default_factory=dict)
+    ausencias_medico: dict[int, _Ocupacion] = field(default_factory=dict)
+    turnos_medico: dict[tuple[int, date], list[Intervalo]] = field(default_factory=dict)
+
+    @classmethod
+    def construir(
+        cls,
+        *,
+        citas_medico: Iterable[tuple[int, Intervalo]],
+        citas_sala: Iterable[tuple[int, Intervalo]],
+        turnos: Iterable[tuple[int, Intervalo]],
+        ausencias: Iterable[tuple[int, Intervalo]],
+    ) -> AgendaDisponibilidad:
+        """Cada iterable da pares (id de médico o sala, intervalo)."""
+        por_turno: dict[tuple[int, date], list[Intervalo]] = {}
+        for medico_id, intervalo in turnos:
+            por_turno.setdefault((medico_id, intervalo.inicio.date()), []).append(intervalo)
+        return cls(
+            citas_medico=_agrupar(citas_medico),
+            citas_sala=_agrupar(citas_sala),
+            ausencias_medico=_agrupar(ausencias, extremos_incluidos=True),
+            turnos_medico={clave: sorted(valores) for clave, valores in por_turno.items()},
+        )
+
+    def conflictos(self, medico_id: int, sala_id: int, inicio: datetime, fin: datetime) -> tuple[str, ...]:
+        encontrados: list[str] = []
+        if _libre_desde(self.citas_medico, medico_id, inicio, fin) is not None:
+            encontrados.append(CONFLICTO_SOLAPE_MEDICO)
+        if _libre_desde(self.citas_sala, sala_id, inicio, fin) is not None:
+            encontrados.append(CONFLICTO_SOLAPE_SALA)
+        if (medico_id, inicio.date()) not in self.turnos_medico:
+            encontrados.append(CONFLICTO_SIN_CUADRANTE)
+        if _libre_desde(self.ausencias_medico, medico_id, inicio, fin) is not None:
+            encontrados.append(CONFLICTO_AUSENCIA)
+        return tuple(encontrados)
+
+    def reservar(self, medico_id: int, sala_id: int, inicio: datetime, fin: datetime) -> None:
+        intervalo = Intervalo(inicio, fin)
+        self.citas_medico.setdefault(medico_id, _Ocupacion()).agregar(intervalo)
+        self.citas_sala.setdefault(sala_id, _Ocupacion()).agregar(intervalo)
+
+    def huecos_libres(
+        self,
+        *,
+        medico_ids: Iterable[int],
+        sala_ids: Iterable[int],
+        desde: datetime,
+        hasta: datetime,
+        duracion: timedelta,
+        paso: timedelta,
+        limite: int,
+    ) -> list[HuecoLibre]:
+        """Primeros `limite` huecos de `duracion` en orden cronológico (y por médico a igual hora)."""
+        medicos = sorted(set(medico_ids))
+        salas = sorted(set(sala_ids))
+        if limite <= 0 or not medicos or not salas or duracion <= timedelta(0) or paso <= timedelta(0):
+            return []
+        resultado: list[HuecoLibre] = []
+        dia = desde.date()
+        while dia <= hasta.date() and len(resultado) < limite:
+            del_dia: list[HuecoLibre] = []
+            for medico_id in medicos:
+                for turno in self.turnos_medico.get((medico_id, dia), ()):
+                    ventana = Intervalo(max(turno.inicio, desde), min(turno.fin, hasta))
+                    del_dia.extend(
+                        self._huecos_en_turno(medico_id, salas, turno.inicio, ventana, duracion, paso, limite)
+                    )
+            del_dia.sort(key=lambda hueco: (hueco.inicio, hueco.medico_id, hueco.sala_id))
+            resultado.extend(del_dia[: limite - len(resultado)])
+            dia += timedelta(days=1)
+        return resultado
+
+    def _huecos_en_turno(
+        self,
+        medico_id: int,
+        salas: list[int],
+        origen: datetime,
+        ventana: Intervalo,
+        duracion: timedelta,
+        paso: timedelta,
+        limite: int,
+    ) -> list[HuecoLibre]:
+        huecos: list[HuecoLibre] = []
+        inicio = _alinear(ventana.inicio, origen, paso)
+        while inicio + duracion <= ventana.fin and len(huecos) < limite:
+            fin = inicio + duracion
+            bloqueo = _libre_tras_bloqueos(
+                _libre_desde(self.ausencias_medico, medico_id, inicio, fin),
+                _libre_desde(self.citas_medico, medico_id, inicio, fin),
+            )
+            if bloqueo is None:
+                sala_libre, bloqueo = self._primera_sala_libre(salas, inicio, fin)
+                if sala_libre is not None:
+                    huecos.append(HuecoLibre(medico_id=medico_id, sala_id=sala_libre, inicio=inicio, fin=fin))
+                    inicio += paso
+                    continue
+            inicio = _alinear(bloqueo, origen, paso)
+        return huecos
+
+    def _primera_sala_libre(
+        self, salas: list[int], inicio: datetime, fin: datetime
+    ) -> tuple[int | None, datetime | None]:
+        bloqueos: list[datetime] = []
+        for sala_id in salas:
+            libre_desde = _libre_desde(self.citas_sala, sala_id, inicio, fin)
+            if libre_desde is None:
+                return sala_id, None
+            bloqueos.append(libre_desde)
+        return None, min(bloqueos)
+
+
+def _agrupar(intervalos: Iterable[tuple[int, Intervalo]], *, extremos_incluidos: bool = False) -> dict[int, _Ocupacion]:
+    por_recurso: dict[int, list[Intervalo]] = {}
+    for recurso_id, intervalo in intervalos:
+        por_recurso.setdefault(recurso_id, []).append(intervalo)
+    return {
+        recurso_id: _Ocupacion(valores, extremos_incluidos=extremos_incluidos)
+        for recurso_id, valores in por_recurso.items()
+    }
+
+
+def _libre_desde(
+    ocupaciones: dict[int, _Ocupacion], recurso_id: int, inicio: datetime, fin: datetime
+) -> datetime | None:
+    ocupacion = ocupaciones.get(recurso_id)
+    return ocupacion.libre_desde(inicio, fin) if ocupacion is not None else None
+
+
+def _libre_tras_bloqueos(*bloqueos: datetime | None) -> datetime | None:
+    presentes = [bloqueo for bloqueo in bloqueos if bloqueo is not None]
+    return max(presentes) if presentes else None
+
+
+def _alinear(instante: datetime, origen: datetime, paso: timedelta) -> datetime:
+    """Primer `origen + k * paso` (k >= 0) que no es anterior a `instante`."""
+    if instante <= origen:
+        return origen
+    pasos = -((origen - instante) // paso)
+    return origen + pasos * paso
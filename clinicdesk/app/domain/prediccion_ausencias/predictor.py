@@ -30,6 +30,7 @@ class PrediccionAusencia:
     cita_id: int
     riesgo: NivelRiesgo
     explicacion_corta: str
+    score: float | None = None
 
 
 class PredictorEntrenado(Protocol):
@@ -17,6 +17,10 @@ I18N_CATALOGO_UX = {
         "job.export_auditoria.progress.export": "Generando CSV",
         "job.export_auditoria.progress.write": "Guardando archivo",
         "job.export_auditoria.progress.done": "Exportación finalizada",
+        "job.export_csv.title": "Exportar CSV",
+        "job.export_csv.progress.export": "Leyendo registros",
+        "job.export_csv.progress.write": "Guardando archivo",
+        "job.export_csv.progress.done": "Exportación finalizada",
         "job.prediccion_ausencias_entrenar.title": "Entrenar predicción de ausencias",
         "job.prediccion_ausencias_entrenar.progress.preflight": "Validando datos de entrenamiento",
         "job.prediccion_ausencias_entrenar.progress.entrenando": "Entrenando modelo",
@@ -116,6 +120,10 @@ I18N_CATALOGO_UX = {
         "job.export_auditoria.progress.export": "Generating CSV",
         "job.export_auditoria.progress.write": "Writing file",
         "job.export_auditoria.progress.done": "Export finished",
+        "job.export_csv.title": "Export CSV",
+        "job.export_csv.progress.export": "Reading records",
+        "job.export_csv.progress.write": "Writing file",
+        "job.export_csv.progress.done": "Export finished",
         "job.prediccion_ausencias_entrenar.title": "Train absence prediction",
         "job.prediccion_ausencias_entrenar.progress.preflight": "Checking training data",
         "job.prediccion_ausencias_entrenar.progress.entrenando": "Training model",
@@ -0,0 +1,195 @@
+"""
+Formato columnar binario para versiones de datasets de features.
+
+Un fichero por versión:
+
+    MAGIC | bloques... | pie JSON | longitud del pie (8 bytes LE) | MAGIC
+
+Las filas se agrupan en tramos; cada columna de cada tramo es un bloque
+independiente (lista JSON canónica comprimida con zlib). El pie guarda el orden
+de columnas, el total de filas y, por tramo, offset y longitud de cada bloque.
+Así se puede leer solo algunas columnas, recorrer el fichero tramo a tramo y
+añadir tramos nuevos sin recomprimir los existentes. Toda escritura se hace sobre
+un fichero temporal que sustituye al original al terminar: un corte a mitad deja
+la versión anterior intacta.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import struct
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, Sequence
+
+from clinicdesk.app.application.ml_artifacts.feature_artifacts import canonical_json_bytes
+
+MAGIC = b"CDFCOL1\n"
+FILAS_POR_TRAMO = 10_000
+_LONGITUD_PIE = struct.Struct("<Q")
+_NIVEL_ZLIB = 6
+
+
+class FormatoColumnarError(ValueError):
+    """El fichero no es un dataset columnar válido."""
+
+
+@dataclass(frozen=True, slots=True)
+class Tramo:
+    filas: int
+    bloques: dict[str, tuple[int, int]]
+
+
+@dataclass(frozen=True, slots=True)
+class PieColumnar:
+    columnas: tuple[str, ...]
+    filas: int
+    tramos: tuple[Tramo, ...]
+
+
+def columnas_uniformes(rows: Sequence[Any]) -> tuple[str, ...] | None:
+    """Columnas comunes si todas las filas son dicts con las mismas claves; si no, None."""
+    if not rows:
+        return ()
+    primera = rows[0]
+    if not isinstance(primera, dict):
+        return None
+    columnas = tuple(primera)
+    claves = set(columnas)
+    if any(not isinstance(row, dict) or row.keys() != claves for row in rows):
+        return None
+    return columnas
+
+
+def escribir_columnar(
+    path: Path, rows: Sequence[dict[str, Any]], columnas: Sequence[str], *, filas_por_tramo: int = FILAS_POR_TRAMO
+) -> None:
+    temporal = _ruta_temporal(path)
+    try:
+        with temporal.open("wb") as handle:
+            handle.write(MAGIC)
+            tramos = _escribir_tramos(handle, rows, tuple(columnas), filas_por_tramo)
+            _escribir_pie(handle, PieColumnar(columnas=tuple(columnas), filas=len(rows), tramos=tramos))
+    except BaseException:
+        temporal.unlink(missing_ok=True)
+        raise
+    temporal.replace(path)
+
+
+def anadir_columnar(path: Path, rows: Sequence[dict[str, Any]], *, filas_por_tramo: int = FILAS_POR_TRAMO) -> None:
+    """Añade tramos al final sin recomprimir los existentes; las filas deben tener las mismas columnas."""
+    if not rows:
+        return
+    pie = leer_pie(path)
+    nuevas = columnas_uniformes(rows)
+    columnas = pie.columnas if pie.filas else nuevas
+    if nuevas is None or columnas is None or set(nuevas) != set(columnas):
+        raise FormatoColumnarError("Las filas añadidas no tienen las columnas del dataset.")
+    temporal = _ruta_temporal(path)
+    try:
+        shutil.copyfile(path, temporal)
+        with temporal.open("r+b") as handle:
+            pie, inicio_pie = _leer_pie(handle)
+            handle.seek(inicio_pie)
+            handle.truncate()
+            nuevos = _escribir_tramos(handle, rows, columnas, filas_por_tramo)
+            _escribir_pie(
+                handle,
+                PieColumnar(columnas=columnas, filas=pie.filas + len(rows), tramos=pie.tramos + nuevos),
+            )
+    except BaseException:
+        temporal.unlink(missing_ok=True)
+        raise
+    temporal.replace(path)
+
+
+def leer_pie(path: Path) -> PieColumnar:
+    with path.open("rb") as handle:
+        return _leer_pie(handle)[0]
+
+
+def iterar_tramos(path: Path, columnas: Sequence[str] | None = None) -> Iterator[dict[str, list[Any]]]:
+    """Por tramo, los valores de las columnas pedidas (todas si `columnas` es None)."""
+    with path.open("rb") as handle:
+        pie, _ = _leer_pie(handle)
+        seleccion = pie.columnas if columnas is None else tuple(columnas)
+        desconocidas = [nombre for nombre in seleccion if nombre not in pie.columnas]
+        if desconocidas:
+            raise KeyError(f"Columnas inexistentes en el dataset: {desconocidas}")
+        for tramo in pie.tramos:
+            yield {nombre: _leer_bloque(handle, *tramo.bloques[nombre]) for nombre in seleccion}
+
+
+def leer_filas(path: Path) -> list[dict[str, Any]]:
+    filas: list[dict[str, Any]] = []
+    for valores in iterar_tramos(path):
+        nombres = tuple(valores)
+        filas.extend(dict(zip(nombres, fila)) for fila in zip(*valores.values()))
+    return filas
+
+
+def _ruta_temporal(path: Path) -> Path:
+    return path.with_name(f".{path.name}.tmp")
+
+
+def _escribir_tramos(
+    handle: BinaryIO, rows: Sequence[dict[str, Any]], columnas: tuple[str, ...], filas_por_tramo: int
+) -> tuple[Tramo, ...]:
+    tramos: list[Tramo] = []
+    for inicio in range(0, len(rows), filas_por_tramo):
+        lote = rows[inicio : inicio + filas_por_tramo]
+        bloques: dict[str, tuple[int, int]] = {}
+        for nombre in columnas:
+            datos = zlib.compress(canonical_json_bytes([row[nombre] for row in lote]), _NIVEL_ZLIB)
+            bloques[nombre] = (handle.tell(), len(datos))
+            handle.write(datos)
+        tramos.append(Tramo(filas=len(lote), bloques=bloques))
+    return tuple(tramos)
+
+
+def _escribir_pie(handle: BinaryIO, pie: PieColumnar) -> None:
+    datos = canonical_json_bytes(
+        {
+            "columnas": list(pie.columnas),
+            "filas": pie.filas,
+            "tramos": [{"filas": tramo.filas, "bloques": tramo.bloques} for tramo in pie.tramos],
+        }
+    )
+    handle.write(datos)
+    handle.write(_LONGITUD_PIE.pack(len(datos)))
+    handle.write(MAGIC)
+
+
+def _leer_pie(handle: BinaryIO) -> tuple[PieColumnar, int]:
+    cola = len(MAGIC) + _LONGITUD_PIE.size
+    handle.seek(0, 2)
+    tamano = handle.tell()
+    handle.seek(0)
+    if tamano < len(MAGIC) + cola or handle.read(len(MAGIC)) != MAGIC:
+        raise FormatoColumnarError("Cabecera de dataset columnar inválida.")
+    handle.seek(tamano - cola)
+    (longitud,) = _LONGITUD_PIE.unpack(handle.read(_LONGITUD_PIE.size))
+    if handle.read(len(MAGIC)) != MAGIC or longitud > tamano - len(MAGIC) - cola:
+        raise FormatoColumnarError("Pie de dataset columnar inválido.")
+    inicio_pie = tamano - cola - longitud
+    handle.seek(inicio_pie)
+    payload = json.loads(handle.read(longitud).decode("utf-8"))
+    pie = PieColumnar(
+        columnas=tuple(payload["columnas"]),
+        filas=int(payload["filas"]),
+        tramos=tuple(
+            Tramo(
+                filas=int(tramo["filas"]),
+                bloques={nombre: (int(offset), int(largo)) for nombre, (offset, largo) in tramo["bloques"].items()},
+            )
+            for tramo in payload["tramos"]
+        ),
+    )
+    return pie, inicio_pie
+
+
+def _leer_bloque(handle: BinaryIO, offset: int, longitud: int) -> list[Any]:
+    handle.seek(offset)
+    return json.loads(zlib.decompress(handle.read(longitud)).decode("utf-8"))
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Iterator, Sequence
+
+from clinicdesk.app.application.ml_artifacts.feature_artifacts import (
+    canonical_json_bytes,
+    compute_content_hash,
+    feature_metadata_to_dict,
+)
+from clinicdesk.app.bootstrap_logging import get_logger
+from clinicdesk.app.infrastructure.feature_store.formato_columnar import (
+    FormatoColumnarError,
+    anadir_columnar,
+    columnas_uniformes,
+    escribir_columnar,
+    iterar_tramos,
+    leer_filas,
+)
+from clinicdesk.app.infrastructure.feature_store.local_json_feature_store import (
+    FeatureStoreDatasetNotFoundError,
+    FeatureStoreMetadataNotFoundError,
+    LocalJsonFeatureStore,
+)
+
+LOGGER = get_logger(__name__)
+
+_EXTENSION_COLUMNAR = ".cols"
+
+
+class FeatureStoreMigracionError(ValueError):
+    """La versión en JSON no coincide con el `content_hash` de su sidecar; no se migra."""
+
+
+class LocalColumnarFeatureStore(LocalJsonFeatureStore):
+    """
+    Feature store local con versiones en formato columnar comprimido.
+
+    Metadata y schema siguen en sus sidecars JSON y el `content_hash` sigue siendo el de
+    las filas en JSON canónico, así que ambos backends son intercambiables. Las versiones
+    que ya estén en JSON se leen tal cual (leer nunca escribe); se guardan en columnar al
+    volver a escribirlas o con `migrar_version_a_columnar`. Las filas que no son dicts
+    homogéneos se guardan en JSON.
+    """
+
+    def save(self, dataset_name: str, version: str, rows: list[Any]) -> None:
+        self._dataset_path(dataset_name).mkdir(parents=True, exist_ok=True)
+        payload = self._build_payload(rows)
+        self._write_version(dataset_name, version, payload, canonical_json_bytes(payload))
+
+    def load(self, dataset_name: str, version: str) -> list[Any]:
+        columnar_file = self._columnar_file_path(dataset_name, version)
+        if columnar_file.exists():
+            return leer_filas(columnar_file)
+        return super().load(dataset_name, version)
+
+    def load_columns(self, dataset_name: str, version: str, columns: Sequence[str]) -> dict[str, list[Any]]:
+        columnas: dict[str, list[Any]] = {column: [] for column in columns}
+        for tramo in self.iter_chunks(dataset_name, version, columns):
+            for column, valores in tramo.items():
+                columnas[column].extend(valores)
+        return columnas
+
+    def iter_chunks(
+        self, dataset_name: str, version: str, columns: Sequence[str] | None = None
+    ) -> Iterator[dict[str, list[Any]]]:
+        """Valores por columna, tramo a tramo; una versión aún en JSON sale en un único tramo."""
+        columnar_file = self._columnar_file_path(dataset_name, version)
+        if columnar_file.exists():
+            yield from iterar_tramos(columnar_file, columns)
+            return
+        rows = super().load(dataset_name, version)
+        seleccion = columnas_uniformes(rows) if columns is None else tuple(columns)
+        if seleccion is None:
+            raise FormatoColumnarError(f"Versión '{version}' de '{dataset_name}' no se puede leer por columnas.")
+        yield {column: [row[column] for row in rows] for column in seleccion}
+
+    def append(self, dataset_name: str, version: str, rows: list[Any]) -> None:
+        """
+        Añade filas a una versión y actualiza `row_count`, `content_hash` y la huella del
+        sidecar, si lo hay. La calidad guardada sigue describiendo las filas originales.
+        """
+        payload = self._build_payload(rows)
+        columnar_file = self._columnar_file_path(dataset_name, version)
+        if columnar_file.exists():
+            anadir_columnar(columnar_file, payload)
+        else:
+            combinadas = super().load(dataset_name, version) + payload
+            columnar_file = self._write_version(dataset_name, version, combinadas, canonical_json_bytes(combinadas))
+        self._actualizar_metadata(dataset_name, version, columnar_file)
+
+    def migrar_version_a_columnar(self, dataset_name: str, version: str) -> bool:
+        """
+        Pasa a columnar una versión guardada en JSON, solo si sus filas siguen cuadrando con
+        el `content_hash` del sidecar, que se conserva. Devuelve False si no hay nada que migrar.
+        """
+        if self._columnar_file_path(dataset_name, version).exists():
+            return False
+        rows = super().load(dataset_name, version)
+        if columnas_uniformes(rows) is None:
+            return False
+        rows_bytes = canonical_json_bytes(rows)
+        try:
+            metadata = self.load_metadata(dataset_name, version)
+        except FeatureStoreMetadataNotFoundError:
+            metadata = None
+        if metadata is not None and metadata.content_hash != compute_content_hash(rows_bytes):
+            raise FeatureStoreMigracionError(
+                f"Versión '{version}' de '{dataset_name}' no coincide con su content_hash; no se migra."
+            )
+        columnar_file = self._write_version(dataset_name, version, rows, rows_bytes)
+        if metadata is not None:
+            stat = columnar_file.stat()
+            migrada = replace(metadata, content_size=stat.st_size, content_mtime_ns=stat.st_mtime_ns)
+            self._write_json_file(self._metadata_file_path(dataset_name, version), feature_metadata_to_dict(migrada))
+        LOGGER.info(
+            "feature_store_migrada_a_columnar",
+            extra={"action": "feature_store_migrada_a_columnar", "dataset": dataset_name, "version": version},
+        )
+        return True
+
+    def list_versions(self, dataset_name: str) -> list[str]:
+        dataset_path = self._dataset_path(dataset_name)
+        if not dataset_path.exists():
+            raise FeatureStoreDatasetNotFoundError(f"Dataset no existe: '{dataset_name}'.")
+        columnares = {path.stem for path in dataset_path.glob(f"*{_EXTENSION_COLUMNAR}") if path.is_file()}
+        return sorted(columnares | set(super().list_versions(dataset_name)))
+
+    def _columnar_file_path(self, dataset_name: str, version: str) -> Path:
+        return self._dataset_path(dataset_name) / f"{version}{_EXTENSION_COLUMNAR}"
+
+    def _write_version(self, dataset_name: str, version: str, payload: list[Any], rows_bytes: bytes) -> Path:
+        columnas = columnas_uniformes(payload)
+        if columnas is None:
+            self._columnar_file_path(dataset_name, version).unlink(missing_ok=True)
+            return super()._write_version(dataset_name, version, payload, rows_bytes)
+        columnar_file = self._columnar_file_path(dataset_name, version)
+        escribir_columnar(columnar_file, payload, columnas)
+        self._version_file_path(dataset_name, version).unlink(missing_ok=True)
+        return columnar_file
+
+    def _stored_version_file(self, dataset_name: str, version: str) -> Path:
+        columnar_file = self._columnar_file_path(dataset_name, version)
+        if columnar_file.exists():
+            return columnar_file
+        return super()._stored_version_file(dataset_name, version)
+
+    def _hash_stored_version(self, version_file: Path) -> str:
+        if version_file.suffix != _EXTENSION_COLUMNAR:
+            return super()._hash_stored_version(version_file)
+        return compute_content_hash(canonical_json_bytes(leer_filas(version_file)))
+
+    def _actualizar_metadata(self, dataset_name: str, version: str, version_file: Path) -> None:
+        try:
+            metadata = self.load_metadata(dataset_name, version)
+        except FeatureStoreMetadataNotFoundError:
+            return
+        rows = self.load(dataset_name, version)
+        stat = version_file.stat()
+        actualizada = replace(
+            metadata,
+            row_count=len(rows),
+            content_hash=compute_content_hash(canonical_json_bytes(rows)),
+            content_size=stat.st_size,
+            content_mtime_ns=stat.st_mtime_ns,
+        )
+        self._write_json_file(self._metadata_file_path(dataset_name, version), feature_metadata_to_dict(actualizada))
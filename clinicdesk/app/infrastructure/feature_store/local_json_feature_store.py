@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 from pathlib import Path
-from typing import Any
+from typing import Any, Sequence
 
 from clinicdesk.app.application.ml_artifacts.feature_artifacts import (
     FeatureArtifactMetadata,
@@ -18,6 +20,8 @@ from clinicdesk.app.application.ml_artifacts.feature_artifacts import (
 )
 from clinicdesk.app.application.ports.feature_store_port import FeatureStorePort
 
+_HASH_CHUNK_BYTES = 1 << 20
+
 
 class FeatureStoreDatasetNotFoundError(FileNotFoundError):
     """Error cuando el dataset solicitado no existe."""
@@ -78,14 +82,13 @@ class LocalJsonFeatureStore(FeatureStorePort):
         payload = self._build_payload(rows)
         rows_bytes = canonical_json_bytes(payload)
         schema = self._build_schema(payload, metadata.schema_version)
-        resolved_metadata = self._build_resolved_metadata(metadata, rows_bytes, schema)
 
-        version_file = self._version_file_path(dataset_name, version)
         schema_file = self._schema_file_path(dataset_name, version)
         metadata_file = self._metadata_file_path(dataset_name, version)
-        version_file.parent.mkdir(parents=True, exist_ok=True)
+        schema_file.parent.mkdir(parents=True, exist_ok=True)
 
-        version_file.write_bytes(rows_bytes)
+        version_file = self._write_version(dataset_name, version, payload, rows_bytes)
+        resolved_metadata = self._build_resolved_metadata(metadata, rows_bytes, schema, version_file.stat())
         self._write_json_file(schema_file, feature_schema_to_dict(schema))
         self._write_json_file(metadata_file, feature_metadata_to_dict(resolved_metadata))
 
@@ -99,6 +102,24 @@ class LocalJsonFeatureStore(FeatureStorePort):
             payload = json.load(handle)
         return feature_metadata_from_dict(payload)
 
+    def load_content_hash(self, dataset_name: str, version: str, *, verify: bool = False) -> str:
+        """
+        Hash canónico del dataset. Si el tamaño y mtime del fichero de versión coinciden
+        con los del sidecar se devuelve el hash guardado; si no (o con `verify`) se
+        recalcula. En JSON el fichero son los bytes canónicos: se lee por bloques, sin parsearlo.
+        """
+        metadata = self.load_metadata(dataset_name, version)
+        version_file = self._stored_version_file(dataset_name, version)
+        stat = version_file.stat()
+        sin_cambios = (metadata.content_size, metadata.content_mtime_ns) == (stat.st_size, stat.st_mtime_ns)
+        if sin_cambios and not verify:
+            return metadata.content_hash
+        return self._hash_stored_version(version_file)
+
+    def load_columns(self, dataset_name: str, version: str, columns: Sequence[str]) -> dict[str, list[Any]]:
+        rows = self.load(dataset_name, version)
+        return {column: [row[column] for row in rows] for column in columns}
+
     def load_schema(self, dataset_name: str, version: str) -> FeatureSchema:
         schema_file = self._schema_file_path(dataset_name, version)
         if not schema_file.exists():
@@ -121,6 +142,20 @@ class LocalJsonFeatureStore(FeatureStorePort):
     def _schema_file_path(self, dataset_name: str, version: str) -> Path:
         return self._dataset_path(dataset_name) / f"{version}.schema.json"
 
+    def _write_version(self, dataset_name: str, version: str, payload: list[Any], rows_bytes: bytes) -> Path:
+        version_file = self._version_file_path(dataset_name, version)
+        version_file.write_bytes(rows_bytes)
+        return version_file
+
+    def _stored_version_file(self, dataset_name: str, version: str) -> Path:
+        version_file = self._version_file_path(dataset_name, version)
+        if not version_file.exists():
+            raise FeatureStoreVersionNotFoundError(f"Versión '{version}' no existe para dataset '{dataset_name}'.")
+        return version_file
+
+    def _hash_stored_version(self, version_file: Path) -> str:
+        return _sha256_file(version_file)
+
     def _build_payload(self, rows: list[Any]) -> list[Any]:
         return rows
 
@@ -140,6 +175,7 @@ class LocalJsonFeatureStore(FeatureStorePort):
         metadata: FeatureArtifactMetadata,
         rows_bytes: bytes,
         schema: FeatureSchema,
+        written: os.stat_result,
     ) -> FeatureArtifactMetadata:
         return FeatureArtifactMetadata(
             dataset_name=metadata.dataset_name,
@@ -150,6 +186,8 @@ class LocalJsonFeatureStore(FeatureStorePort):
             schema_hash=compute_schema_hash(schema),
             schema_version=metadata.schema_version,
             quality=metadata.quality,
+            content_size=written.st_size,
+            content_mtime_ns=written.st_mtime_ns,
         )
 
     def _validate_loaded_payload(self, data: Any, dataset_name: str, version: str) -> list[Any]:
@@ -160,3 +198,11 @@ class LocalJsonFeatureStore(FeatureStorePort):
     def _write_json_file(self, path: Path, payload: Any) -> None:
         with path.open("w", encoding="utf-8") as handle:
             json.dump(payload, handle, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
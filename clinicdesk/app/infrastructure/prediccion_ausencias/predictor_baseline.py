@@ -27,6 +27,7 @@ class PredictorAusenciasEntrenadoBaseline(PredictorEntrenado):
             cita_id=cita.cita_id,
             riesgo=_a_nivel(score),
             explicacion_corta="Basado en historial de asistencia y antelación.",
+            score=score,
         )
 
 
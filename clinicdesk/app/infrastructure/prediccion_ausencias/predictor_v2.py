@@ -50,6 +50,7 @@ class PredictorAusenciasEntrenadoV2(PredictorEntrenado):
             cita_id=cita.cita_id,
             riesgo=_a_nivel(probabilidad),
             explicacion_corta="Modelo jerárquico: historial global, paciente y antelación.",
+            score=probabilidad,
         )
 
 
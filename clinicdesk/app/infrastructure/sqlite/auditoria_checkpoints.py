@@ -0,0 +1,128 @@
+"""
+Checkpoints firmados de verificación de las cadenas de hashes.
+
+Tras una verificación correcta se guarda, por tabla, el último id verificado y su
+`entry_hash`, firmados con HMAC-SHA256 derivado de `CLINICDESK_CRYPTO_KEY`. La siguiente
+verificación parte de ahí y solo recorre las filas nuevas.
+
+- Un checkpoint solo se usa si la firma es válida y la fila sigue existiendo con el mismo
+  hash; si no, se verifica desde GENESIS.
+- Sin clave configurada no se firman ni se usan checkpoints (verificación completa siempre).
+- Reescribir la cadena (backfill) invalida el checkpoint de la tabla.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import os
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from clinicdesk.app.bootstrap_logging import get_logger
+
+LOGGER = get_logger(__name__)
+
+TABLA_CHECKPOINTS = "auditoria_cadena_checkpoints"
+_ENV_CLAVE = "CLINICDESK_CRYPTO_KEY"
+
+_SQL_CREAR_TABLA = f"""
+CREATE TABLE IF NOT EXISTS {TABLA_CHECKPOINTS} (
+    tabla TEXT PRIMARY KEY,
+    ultimo_id INTEGER NOT NULL,
+    ultimo_hash TEXT NOT NULL,
+    firma TEXT NOT NULL,
+    actualizado_en_utc TEXT NOT NULL
+)
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class CheckpointCadena:
+    tabla: str
+    ultimo_id: int
+    ultimo_hash: str
+
+
+def asegurar_tabla_checkpoints(con: sqlite3.Connection) -> None:
+    con.execute(_SQL_CREAR_TABLA)
+
+
+def leer_checkpoint_vigente(con: sqlite3.Connection, tabla: str) -> CheckpointCadena | None:
+    clave = _clave_firma()
+    if clave is None:
+        return None
+    try:
+        fila = con.execute(
+            f"SELECT ultimo_id, ultimo_hash, firma FROM {TABLA_CHECKPOINTS} WHERE tabla = ?", (tabla,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    if fila is None:
+        return None
+    checkpoint = CheckpointCadena(tabla=tabla, ultimo_id=int(fila[0]), ultimo_hash=str(fila[1]))
+    if not hmac.compare_digest(str(fila[2]), _firmar(clave, checkpoint)):
+        LOGGER.warning(
+            "auditoria_checkpoint_firma_invalida",
+            extra={"action": "auditoria_checkpoint_firma_invalida", "tabla": tabla},
+        )
+        return None
+    ancla = con.execute(f"SELECT entry_hash FROM {tabla} WHERE id = ?", (checkpoint.ultimo_id,)).fetchone()
+    if ancla is None or ancla[0] != checkpoint.ultimo_hash:
+        LOGGER.warning(
+            "auditoria_checkpoint_ancla_alterada",
+            extra={"action": "auditoria_checkpoint_ancla_alterada", "tabla": tabla, "id": checkpoint.ultimo_id},
+        )
+        return None
+    return checkpoint
+
+
+def guardar_checkpoint(con: sqlite3.Connection, checkpoint: CheckpointCadena) -> None:
+    """Persiste el checkpoint si hay clave y la conexión no tiene una transacción del llamador abierta."""
+    clave = _clave_firma()
+    if clave is None or con.in_transaction:
+        return
+    try:
+        with con:
+            asegurar_tabla_checkpoints(con)
+            con.execute(
+                f"""
+                INSERT INTO {TABLA_CHECKPOINTS} (tabla, ultimo_id, ultimo_hash, firma, actualizado_en_utc)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(tabla) DO UPDATE SET
+                    ultimo_id = excluded.ultimo_id,
+                    ultimo_hash = excluded.ultimo_hash,
+                    firma = excluded.firma,
+                    actualizado_en_utc = excluded.actualizado_en_utc
+                """,
+                (
+                    checkpoint.tabla,
+                    checkpoint.ultimo_id,
+                    checkpoint.ultimo_hash,
+                    _firmar(clave, checkpoint),
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+    except sqlite3.Error as exc:
+        LOGGER.warning(
+            "auditoria_checkpoint_no_guardado",
+            extra={"action": "auditoria_checkpoint_no_guardado", "tabla": checkpoint.tabla, "error": str(exc)},
+        )
+
+
+def invalidar_checkpoint(con: sqlite3.Connection, tabla: str) -> None:
+    asegurar_tabla_checkpoints(con)
+    con.execute(f"DELETE FROM {TABLA_CHECKPOINTS} WHERE tabla = ?", (tabla,))
+
+
+def _clave_firma() -> bytes | None:
+    material = os.getenv(_ENV_CLAVE, "").strip()
+    if not material:
+        return None
+    return hashlib.sha256(f"auditoria-checkpoint:{material}".encode("utf-8")).digest()
+
+
+def _firmar(clave: bytes, checkpoint: CheckpointCadena) -> str:
+    mensaje = f"{checkpoint.tabla}|{checkpoint.ultimo_id}|{checkpoint.ultimo_hash}".encode("utf-8")
+    return hmac.new(clave, mensaje, hashlib.sha256).hexdigest()
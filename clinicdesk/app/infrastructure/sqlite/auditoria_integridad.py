@@ -4,9 +4,18 @@ import hashlib
 import json
 import sqlite3
 from dataclasses import dataclass
-from typing import Any, Callable
+from typing import Any, Callable, Iterator, Sequence
+
+from clinicdesk.app.infrastructure.sqlite.auditoria_checkpoints import (
+    CheckpointCadena,
+    asegurar_tabla_checkpoints,
+    guardar_checkpoint,
+    invalidar_checkpoint,
+    leer_checkpoint_vigente,
+)
 
 GENESIS_HASH = "GENESIS"
+_TAMANO_BLOQUE_LECTURA = 1000
 
 
 @dataclass(frozen=True, slots=True)
@@ -47,20 +56,69 @@ def siguiente_hash_acceso(con: sqlite3.Connection, payload: dict[str, Any]) -> t
     return _siguiente_hash_para_tabla(con, "auditoria_accesos", payload)
 
 
-def verificar_cadena(con: sqlite3.Connection) -> ResultadoVerificacionCadena:
-    resultado_eventos = _verificar_tabla(con, "auditoria_eventos", _payload_desde_fila_evento)
+def verificar_cadena(con: sqlite3.Connection, *, completa: bool = False) -> ResultadoVerificacionCadena:
+    """Verifica auditoría desde el último checkpoint firmado, o desde GENESIS con `completa=True`."""
+    resultado_eventos = _verificar_tabla(con, "auditoria_eventos", _payload_desde_fila_evento, completa=completa)
     if not resultado_eventos.ok:
         return resultado_eventos
-    return _verificar_tabla(con, "auditoria_accesos", _payload_desde_fila_acceso)
+    return _verificar_tabla(con, "auditoria_accesos", _payload_desde_fila_acceso, completa=completa)
 
 
 def siguiente_hash_telemetria(con: sqlite3.Connection, payload: dict[str, Any]) -> tuple[str, str]:
     return _siguiente_hash_para_tabla(con, "telemetria_eventos", payload)
 
 
-def verificar_cadena_telemetria(con: sqlite3.Connection) -> ResultadoVerificacionCadena:
+def verificar_cadena_telemetria(con: sqlite3.Connection, *, completa: bool = False) -> ResultadoVerificacionCadena:
     ensure_telemetria_integridad_schema(con)
-    return _verificar_tabla(con, "telemetria_eventos", _payload_desde_fila_telemetria)
+    return _verificar_tabla(con, "telemetria_eventos", _payload_desde_fila_telemetria, completa=completa)
+
+
+def insertar_encadenados(
+    con: sqlite3.Connection,
+    tabla: str,
+    sql_insert: str,
+    registros: Sequence[tuple[dict[str, Any], tuple[Any, ...]]],
+) -> None:
+    """
+    Inserta `registros` (payload, valores) en orden, añadiendo `prev_hash` y `entry_hash` al final de los valores.
+
+    Lee el último hash una sola vez; el llamador debe tener abierta una transacción de escritura
+    (ver `escribir_encadenados`) para que nadie intercale filas entre la lectura y el insert.
+    """
+    if not registros:
+        return
+    fila = con.execute(f"SELECT entry_hash FROM {tabla} ORDER BY id DESC LIMIT 1").fetchone()
+    prev_hash = fila[0] if fila and fila[0] else GENESIS_HASH
+    params: list[tuple[Any, ...]] = []
+    for payload, valores in registros:
+        entry_hash = calcular_entry_hash(prev_hash, payload)
+        params.append((*valores, prev_hash, entry_hash))
+        prev_hash = entry_hash
+    con.executemany(sql_insert, params)
+
+
+def escribir_encadenados(
+    con: sqlite3.Connection,
+    lotes: Sequence[tuple[str, str, Sequence[tuple[dict[str, Any], tuple[Any, ...]]]]],
+) -> None:
+    """
+    Escribe varios lotes (tabla, sql_insert, registros) en una única transacción `BEGIN IMMEDIATE`.
+
+    Si la conexión ya está en una transacción (una unidad de trabajo o del llamador) se
+    escribe dentro de ella y la confirma quien la abrió.
+    """
+    abrir_transaccion = not con.in_transaction
+    if abrir_transaccion:
+        con.execute("BEGIN IMMEDIATE")
+    try:
+        for tabla, sql_insert, registros in lotes:
+            insertar_encadenados(con, tabla, sql_insert, registros)
+        if abrir_transaccion:
+            con.commit()
+    except Exception:
+        if abrir_transaccion:
+            con.rollback()
+        raise
 
 
 def _ensure_tabla_cadena(
@@ -76,6 +134,7 @@ def _ensure_tabla_cadena(
     if "entry_hash" not in columnas:
         con.execute(f"ALTER TABLE {tabla} ADD COLUMN entry_hash TEXT NOT NULL DEFAULT ''")
     con.execute(f"CREATE INDEX IF NOT EXISTS idx_{tabla}_entry_hash ON {tabla}(entry_hash)")
+    asegurar_tabla_checkpoints(con)
 
     if not _tabla_requiere_backfill(con, tabla):
         return
@@ -88,16 +147,19 @@ def _ensure_tabla_cadena(
 
 
 def _tabla_requiere_backfill(con: sqlite3.Connection, tabla: str) -> bool:
+    checkpoint = leer_checkpoint_vigente(con, tabla)
     fila = con.execute(
         f"""
         SELECT id
         FROM {tabla}
-        WHERE prev_hash IS NULL
+        WHERE id > ?
+          AND (prev_hash IS NULL
            OR entry_hash IS NULL
-           OR entry_hash = ''
+           OR entry_hash = '')
         ORDER BY id ASC
         LIMIT 1
-        """
+        """,
+        (checkpoint.ultimo_id if checkpoint else 0,),
     ).fetchone()
     return fila is not None
 
@@ -139,9 +201,9 @@ def _rehash_tabla(
     tabla: str,
     construir_payload: Callable[[sqlite3.Row], dict[str, Any]],
 ) -> None:
-    filas = con.execute(f"SELECT * FROM {tabla} ORDER BY id ASC").fetchall()
+    invalidar_checkpoint(con, tabla)
     prev_hash = GENESIS_HASH
-    for fila in filas:
+    for fila in _iterar_filas(con, tabla, desde_id=0):
         entry_hash = calcular_entry_hash(prev_hash, construir_payload(fila))
         con.execute(
             f"UPDATE {tabla} SET prev_hash = ?, entry_hash = ? WHERE id = ?",
@@ -164,17 +226,38 @@ def _verificar_tabla(
     con: sqlite3.Connection,
     tabla: str,
     construir_payload: Callable[[sqlite3.Row], dict[str, Any]],
+    *,
+    completa: bool = False,
 ) -> ResultadoVerificacionCadena:
-    filas = con.execute(f"SELECT * FROM {tabla} ORDER BY id ASC").fetchall()
-    prev_hash_esperado = GENESIS_HASH
-    for fila in filas:
+    checkpoint = None if completa else leer_checkpoint_vigente(con, tabla)
+    desde_id = checkpoint.ultimo_id if checkpoint else 0
+    prev_hash_esperado = checkpoint.ultimo_hash if checkpoint else GENESIS_HASH
+    ultimo_id = desde_id
+    for fila in _iterar_filas(con, tabla, desde_id=desde_id):
         entry_hash_esperado = calcular_entry_hash(prev_hash_esperado, construir_payload(fila))
         if fila["prev_hash"] != prev_hash_esperado or fila["entry_hash"] != entry_hash_esperado:
             return ResultadoVerificacionCadena(ok=False, tabla=tabla, primer_fallo_id=fila["id"])
         prev_hash_esperado = entry_hash_esperado
+        ultimo_id = fila["id"]
+    if ultimo_id and (checkpoint is None or ultimo_id != checkpoint.ultimo_id):
+        guardar_checkpoint(con, CheckpointCadena(tabla=tabla, ultimo_id=ultimo_id, ultimo_hash=prev_hash_esperado))
     return ResultadoVerificacionCadena(ok=True)
 
 
+def _iterar_filas(con: sqlite3.Connection, tabla: str, *, desde_id: int) -> Iterator[sqlite3.Row]:
+    """Recorre la tabla por id en bloques acotados, sin cargarla entera en memoria."""
+    ultimo_id = desde_id
+    while True:
+        filas = con.execute(
+            f"SELECT * FROM {tabla} WHERE id > ? ORDER BY id ASC LIMIT ?",
+            (ultimo_id, _TAMANO_BLOQUE_LECTURA),
+        ).fetchall()
+        if not filas:
+            return
+        yield from filas
+        ultimo_id = filas[-1]["id"]
+
+
 def _payload_desde_fila_evento(fila: sqlite3.Row) -> dict[str, Any]:
     return {
         "timestamp_utc": fila["timestamp_utc"],
@@ -0,0 +1,75 @@
+"""
+Clave temporal normalizada de citas para filtros por rango.
+
+`inicio`/`fin` se guardan como texto ISO con separador variable (' ' o 'T'), por lo que las
+consultas los envolvían en `datetime()`/`date()` y SQLite no podía usar ningún índice.
+`inicio_ts`/`fin_ts` son columnas generadas (VIRTUAL) con el epoch en segundos del valor
+normalizado; los índices sobre ellas permiten filtrar rangos comparando contra una
+constante calculada una sola vez por consulta.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+from clinicdesk.app.bootstrap_logging import get_logger
+
+LOGGER = get_logger(__name__)
+
+COLUMNAS_EPOCH_CITAS: tuple[tuple[str, str], ...] = (("inicio_ts", "inicio"), ("fin_ts", "fin"))
+
+INDICES_EPOCH_CITAS: tuple[tuple[str, str], ...] = (
+    ("idx_citas_inicio_ts", "inicio_ts"),
+    ("idx_citas_activo_inicio_ts", "activo, inicio_ts"),
+    ("idx_citas_medico_inicio_ts", "medico_id, inicio_ts"),
+    ("idx_citas_sala_inicio_ts", "sala_id, inicio_ts"),
+    ("idx_citas_paciente_inicio_ts", "paciente_id, inicio_ts"),
+)
+
+
+def sql_epoch(*argumentos: str) -> str:
+    """Expresión SQL con el epoch de `strftime('%s', ...)`; constante si los argumentos lo son."""
+    return f"CAST(strftime('%s', {', '.join(argumentos)}) AS INTEGER)"
+
+
+SQL_EPOCH_PARAM = sql_epoch("?")
+SQL_EPOCH_INICIO_DIA_PARAM = sql_epoch("date(?)")
+SQL_EPOCH_FIN_DIA_PARAM = sql_epoch("date(?)", "'+1 day'")
+
+
+def sql_inicio_entre_dias(alias: str = "c") -> str:
+    """Equivalente sargable de `date(inicio) BETWEEN date(?) AND date(?)` (dos parámetros)."""
+    return f"{alias}.inicio_ts >= {SQL_EPOCH_INICIO_DIA_PARAM} AND {alias}.inicio_ts < {SQL_EPOCH_FIN_DIA_PARAM}"
+
+
+def sql_inicio_entre_instantes(alias: str = "c") -> str:
+    """Equivalente sargable de `datetime(inicio) BETWEEN datetime(?) AND datetime(?)`."""
+    return f"{alias}.inicio_ts >= {SQL_EPOCH_PARAM} AND {alias}.inicio_ts <= {SQL_EPOCH_PARAM}"
+
+
+def asegurar_epoch_citas(con: sqlite3.Connection) -> None:
+    columnas = {row[1] for row in con.execute("PRAGMA table_xinfo(citas)").fetchall()}
+    for columna, origen in COLUMNAS_EPOCH_CITAS:
+        if columna in columnas:
+            continue
+        # SQLite solo permite añadir columnas generadas VIRTUAL con ALTER TABLE.
+        con.execute(f"ALTER TABLE citas ADD COLUMN {columna} INTEGER GENERATED ALWAYS AS ({sql_epoch(origen)}) VIRTUAL")
+        LOGGER.info(
+            "sqlite_migracion_add_col",
+            extra={"action": "sqlite_migracion_add_col", "tabla": "citas", "columna": columna},
+        )
+    for nombre, columnas_indice in INDICES_EPOCH_CITAS:
+        con.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON citas({columnas_indice})")
+
+
+__all__ = [
+    "COLUMNAS_EPOCH_CITAS",
+    "INDICES_EPOCH_CITAS",
+    "SQL_EPOCH_FIN_DIA_PARAM",
+    "SQL_EPOCH_INICIO_DIA_PARAM",
+    "SQL_EPOCH_PARAM",
+    "asegurar_epoch_citas",
+    "sql_epoch",
+    "sql_inicio_entre_dias",
+    "sql_inicio_entre_instantes",
+]
@@ -4,7 +4,7 @@ from datetime import datetime
 
 from clinicdesk.app.application.ports.citas_read_port import CitaReadModel, CitasReadPort
 from clinicdesk.app.infrastructure.sqlite.repos_citas import CitasRepository
-from clinicdesk.app.infrastructure.sqlite.repos_incidencias import IncidenciasRepository
+from clinicdesk.app.infrastructure.sqlite.repos_incidencias import IncidenciasRepository, ResumenIncidenciasCita
 
 
 class SqliteCitasReadAdapter(CitasReadPort):
@@ -20,9 +20,15 @@ class SqliteCitasReadAdapter(CitasReadPort):
 
     def list_in_range(self, desde: datetime, hasta: datetime) -> list[CitaReadModel]:
         citas = self._citas_repo.list_in_range(desde=desde, hasta=hasta)
-        return [self._to_read_model(cita) for cita in citas]
+        return self.to_read_models(citas)
 
-    def _to_read_model(self, cita) -> CitaReadModel:
+    def to_read_models(self, citas: list) -> list[CitaReadModel]:
+        """Mapea un lote de citas resolviendo sus incidencias con una sola consulta."""
+        cita_ids = [cita.id for cita in citas if cita.id is not None]
+        resumen = self._incidencias_repo.resumen_por_citas(cita_ids) if cita_ids else {}
+        return [self._to_read_model(cita, resumen.get(cita.id)) for cita in citas]
+
+    def _to_read_model(self, cita, incidencias: ResumenIncidenciasCita | None) -> CitaReadModel:
         return CitaReadModel(
             cita_id=str(cita.id),
             paciente_id=cita.paciente_id,
@@ -31,10 +37,7 @@ class SqliteCitasReadAdapter(CitasReadPort):
             fin=cita.fin,
             estado=cita.estado.value,
             notas=cita.notas,
-            has_incidencias=self._has_incidencias(cita.id),
+            has_incidencias=incidencias is not None,
+            n_incidencias=incidencias.total if incidencias is not None else 0,
+            ultima_incidencia_tipo=incidencias.ultimo_tipo if incidencias is not None else None,
         )
-
-    def _has_incidencias(self, cita_id: int | None) -> bool:
-        if cita_id is None:
-            return False
-        return bool(self._incidencias_repo.search(cita_id=cita_id))
@@ -4,7 +4,7 @@ Conexión y bootstrap de SQLite.
 
 Responsabilidades:
 - Abrir conexión con SQLite con PRAGMAs recomendados.
-- Aplicar el schema desde un archivo .sql (idempotente: CREATE IF NOT EXISTS).
+- Aplicar el schema y las migraciones versionadas (ver migraciones_sqlite).
 - Centralizar el acceso para que el resto de capas no repitan lógica.
 
 Notas:
@@ -20,25 +20,26 @@ from pathlib import Path
 from clinicdesk.app.infrastructure.sqlite.sqlite_datetime_codecs import (
     register_sqlite_datetime_codecs,
 )
-from clinicdesk.app.infrastructure.sqlite.field_crypto_migrations import (
-    ensure_medicos_field_crypto_columns,
-    ensure_pacientes_field_crypto_columns,
-    ensure_personal_field_crypto_columns,
-)
-from clinicdesk.app.infrastructure.sqlite.pii_crypto import (
-    configure_connection_pii,
-    migrate_existing_pii_data,
+from clinicdesk.app.infrastructure.sqlite.migraciones_sqlite import (
+    PlanMigracionSqlite,
+    aplicar_migraciones,
+    asegurar_columnas_citas_extendido,
 )
+from clinicdesk.app.infrastructure.sqlite.pii_crypto import configure_connection_pii
 from clinicdesk.app.infrastructure.sqlite.sqlite_connection_config import (
+    PERFIL_INTERACTIVO,
+    PerfilConexionSqlite,
     configurar_conexion,
 )
-from clinicdesk.app.infrastructure.sqlite.auditoria_integridad import (
-    ensure_auditoria_integridad_schema,
-)
-from clinicdesk.app.bootstrap_logging import get_logger
 
-
-LOGGER = get_logger(__name__)
+__all__ = [
+    "SqliteConfig",
+    "apply_schema",
+    "asegurar_columnas_citas_extendido",
+    "bootstrap",
+    "connect",
+    "get_connection",
+]
 
 
 @dataclass(frozen=True)
@@ -63,108 +64,40 @@ def connect(config: SqliteConfig) -> sqlite3.Connection:
     return get_connection(config.db_path)
 
 
-def get_connection(db_path: str | Path) -> sqlite3.Connection:
-    """Abre una conexión SQLite y aplica configuración base de conexión."""
+def get_connection(
+    db_path: str | Path,
+    *,
+    perfil: PerfilConexionSqlite = PERFIL_INTERACTIVO,
+    check_same_thread: bool = True,
+) -> sqlite3.Connection:
+    """
+    Abre una conexión SQLite y aplica configuración base de conexión.
+
+    - perfil: PRAGMAs según el rol de la conexión (UI, analítica, escritura masiva).
+    - check_same_thread=False solo para conexiones gestionadas por un pool
+      que garantiza uso exclusivo por checkout.
+    """
     db_file = Path(db_path)
     db_file.parent.mkdir(parents=True, exist_ok=True)
     register_sqlite_datetime_codecs()
 
-    con = sqlite3.connect(db_file.as_posix())
+    if check_same_thread:
+        con = sqlite3.connect(db_file.as_posix())
+    else:
+        con = sqlite3.connect(db_file.as_posix(), check_same_thread=False)
     con.row_factory = sqlite3.Row  # devuelve filas tipo dict-like
     configure_connection_pii(con)
-    configurar_conexion(con, db_file)
+    configurar_conexion(con, db_file, perfil=perfil)
     return con
 
 
-def apply_schema(con: sqlite3.Connection, schema_path: Path) -> None:
+def apply_schema(con: sqlite3.Connection, schema_path: Path) -> PlanMigracionSqlite:
     """
-    Aplica el schema desde un archivo .sql.
+    Aplica el schema y las migraciones versionadas pendientes.
 
-    Requisitos:
-    - El schema debe ser idempotente (CREATE TABLE IF NOT EXISTS...).
-    """
-    if not schema_path.exists():
-        raise FileNotFoundError(f"No existe schema.sql en: {schema_path}")
-
-    sql = schema_path.read_text(encoding="utf-8")
-
-    # executescript permite ejecutar múltiples sentencias SQL separadas por ';'
-    con.executescript(sql)
-    _migrate_stock_columns(con)
-    _migrate_active_columns(con)
-    _migrate_demo_columns(con)
-    asegurar_columnas_citas_extendido(con)
-    ensure_pacientes_field_crypto_columns(con)
-    ensure_medicos_field_crypto_columns(con)
-    ensure_personal_field_crypto_columns(con)
-    ensure_auditoria_integridad_schema(con)
-    migrate_existing_pii_data(con)
-    con.commit()
-
-
-def _migrate_stock_columns(con: sqlite3.Connection) -> None:
+    Si `PRAGMA user_version` ya está en la versión actual no se ejecuta nada más.
     """
-    Migra columnas legacy de stock si existen en la base de datos.
-    """
-    _ensure_stock_column(con, table="medicamentos")
-    _ensure_stock_column(con, table="materiales")
-
-
-def _migrate_active_columns(con: sqlite3.Connection) -> None:
-    _ensure_flag_column(con, table="citas", column="activo")
-    _ensure_flag_column(con, table="ausencias_medico", column="activo")
-    _ensure_flag_column(con, table="ausencias_personal", column="activo")
-    _ensure_flag_column(con, table="recetas", column="activo")
-    _ensure_flag_column(con, table="receta_lineas", column="activo")
-    _ensure_flag_column(con, table="dispensaciones", column="activo")
-    _ensure_flag_column(con, table="movimientos_medicamentos", column="activo")
-    _ensure_flag_column(con, table="movimientos_materiales", column="activo")
-    _ensure_flag_column(con, table="incidencias", column="activo")
-    _ensure_flag_column(con, table="salas", column="activa")
-    _ensure_flag_column(con, table="turnos", column="activo")
-
-
-def _ensure_stock_column(con: sqlite3.Connection, *, table: str) -> None:
-    columns = {row["name"] for row in con.execute(f"PRAGMA table_info({table})").fetchall()}
-    if "cantidad_en_almacen" in columns:
-        return
-    if "cantidad_almacen" not in columns:
-        return
-
-    con.execute(f"ALTER TABLE {table} ADD COLUMN cantidad_en_almacen INTEGER NOT NULL DEFAULT 0")
-    con.execute(f"UPDATE {table} SET cantidad_en_almacen = cantidad_almacen")
-
-
-def _ensure_flag_column(con: sqlite3.Connection, *, table: str, column: str) -> None:
-    columns = {row["name"] for row in con.execute(f"PRAGMA table_info({table})").fetchall()}
-    if column in columns:
-        return
-    con.execute(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER NOT NULL DEFAULT 1")
-    con.execute(f"UPDATE {table} SET {column} = 1")
-
-
-def _migrate_demo_columns(con: sqlite3.Connection) -> None:
-    _ensure_text_column(con, table="recetas", column="estado", default="ACTIVA")
-    _ensure_int_column(con, table="receta_lineas", column="cantidad", default=1)
-    _ensure_int_column(con, table="receta_lineas", column="pendiente", default=1)
-    _ensure_text_column(con, table="receta_lineas", column="estado", default="PENDIENTE")
-    _ensure_text_column(con, table="movimientos_medicamentos", column="referencia", default="")
-    _ensure_text_column(con, table="movimientos_materiales", column="referencia", default="")
-
-
-def _ensure_text_column(con: sqlite3.Connection, *, table: str, column: str, default: str) -> None:
-    columns = {row["name"] for row in con.execute(f"PRAGMA table_info({table})").fetchall()}
-    if column in columns:
-        return
-    escaped = default.replace("'", "''")
-    con.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT NOT NULL DEFAULT '{escaped}'")
-
-
-def _ensure_int_column(con: sqlite3.Connection, *, table: str, column: str, default: int) -> None:
-    columns = {row["name"] for row in con.execute(f"PRAGMA table_info({table})").fetchall()}
-    if column in columns:
-        return
-    con.execute(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER NOT NULL DEFAULT {int(default)}")
+    return aplicar_migraciones(con, schema_path)
 
 
 def bootstrap(
@@ -183,24 +116,3 @@ def bootstrap(
     if apply:
         apply_schema(con, cfg.schema_path)
     return con
-
-
-def asegurar_columnas_citas_extendido(con: sqlite3.Connection) -> None:
-    columnas = {row["name"] for row in con.execute("PRAGMA table_info(citas)").fetchall()}
-    nuevas = (
-        ("check_in_at", "TEXT NULL"),
-        ("llamado_a_consulta_at", "TEXT NULL"),
-        ("consulta_inicio_at", "TEXT NULL"),
-        ("consulta_fin_at", "TEXT NULL"),
-        ("check_out_at", "TEXT NULL"),
-        ("tipo_cita", "TEXT NULL"),
-        ("canal_reserva", "TEXT NULL"),
-    )
-    for columna, tipo in nuevas:
-        if columna in columnas:
-            continue
-        con.execute(f"ALTER TABLE citas ADD COLUMN {columna} {tipo}")
-        LOGGER.info(
-            "sqlite_migracion_add_col",
-            extra={"action": "sqlite_migracion_add_col", "tabla": "citas", "columna": columna},
-        )
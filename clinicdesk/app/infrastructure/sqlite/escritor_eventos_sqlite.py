@@ -0,0 +1,393 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from clinicdesk.app.bootstrap_logging import get_logger
+from clinicdesk.app.infrastructure.sqlite.auditoria_integridad import escribir_encadenados
+from clinicdesk.app.infrastructure.sqlite.db import get_connection
+from clinicdesk.app.infrastructure.sqlite.sqlite_connection_config import PERFIL_ESCRITURA_MASIVA
+
+LOGGER = get_logger(__name__)
+
+_CAPACIDAD_COLA_POR_DEFECTO = 10_000
+_TAMANO_LOTE_POR_DEFECTO = 500
+_REINTENTOS_LOTE = 3
+_ESPERA_REINTENTO_SEGUNDOS = 0.05
+_ESPERA_COLA_LLENA_SEGUNDOS = 0.1
+_ESPERA_REINTENTO_PENDIENTES_SEGUNDOS = 1.0
+_TIMEOUT_FLUSH_SEGUNDOS = 5.0
+_TIMEOUT_CIERRE_SEGUNDOS = 10.0
+_SUFIJO_VOLCADO = ".eventos_pendientes.jsonl"
+
+
+@dataclass(frozen=True, slots=True)
+class DestinoEventosEncadenados:
+    """Tabla con cadena de hashes y su INSERT; `prev_hash` y `entry_hash` son las dos últimas columnas."""
+
+    tabla: str
+    sql_insert: str
+
+
+@dataclass(frozen=True, slots=True)
+class MetricasEscritorEventos:
+    encolados: int
+    escritos: int
+    lotes: int
+    reintentos: int
+    descartados: int
+    pendientes: int
+    esperas_cola_llena: int
+    segundos_espera_cola_llena: float
+    profundidad_cola: int
+    profundidad_maxima: int
+    capacidad_cola: int
+
+
+@dataclass(frozen=True, slots=True)
+class _Registro:
+    destino: DestinoEventosEncadenados
+    payload: dict[str, Any]
+    valores: tuple[Any, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class _MarcaFlush:
+    hecho: threading.Event
+
+
+_FIN = object()
+
+
+class EscritorEventosSqliteEnLote:
+    """
+    Escritor en segundo plano de auditoría y telemetría encadenadas.
+
+    - Los repositorios encolan filas ya saneadas; el hilo escritor las agrupa y escribe cada
+      lote en una sola transacción `BEGIN IMMEDIATE`, calculando la cadena de hashes en orden
+      de encolado a partir del último hash persistido.
+    - La cola es acotada: si se llena, `encolar` espera (back-pressure) y lo refleja en las métricas.
+    - Un lote se confirma entero o no se confirma. Agotados los reintentos, sus eventos quedan
+      pendientes delante del siguiente lote; si llenan la capacidad o se cierra con pendientes,
+      se vuelcan a `ruta_volcado` (JSONL), que se escribe tras el siguiente lote correcto.
+    - `flush` espera como mucho `timeout`; `cerrar` (registrado en `atexit`) vacía la cola.
+      Si el escritor no está activo, `encolar` devuelve False y se escribe de forma síncrona.
+    """
+
+    def __init__(
+        self,
+        abrir_conexion: Callable[[], sqlite3.Connection],
+        *,
+        capacidad_cola: int = _CAPACIDAD_COLA_POR_DEFECTO,
+        tamano_lote: int = _TAMANO_LOTE_POR_DEFECTO,
+        reintentos_lote: int = _REINTENTOS_LOTE,
+        ruta_volcado: str | Path | None = None,
+    ) -> None:
+        if capacidad_cola < 1 or tamano_lote < 1:
+            raise ValueError("capacidad_cola y tamano_lote deben ser >= 1")
+        self._abrir_conexion = abrir_conexion
+        self._capacidad = capacidad_cola
+        self._tamano_lote = tamano_lote
+        self._reintentos_lote = reintentos_lote
+        self._volcado = _VolcadoPendientes(Path(ruta_volcado)) if ruta_volcado is not None else None
+        self._pendientes: list[_Registro] = []
+        self._cola: queue.Queue[object] = queue.Queue(maxsize=capacidad_cola)
+        self._lock = threading.Lock()
+        self._hilo: threading.Thread | None = None
+        self._activo = False
+        self._encolados = 0
+        self._escritos = 0
+        self._lotes = 0
+        self._reintentos = 0
+        self._descartados = 0
+        self._esperas_cola_llena = 0
+        self._segundos_espera = 0.0
+        self._profundidad_maxima = 0
+
+    @classmethod
+    def para_db(cls, db_path: str | Path, **kwargs: Any) -> EscritorEventosSqliteEnLote:
+        kwargs.setdefault("ruta_volcado", Path(db_path).with_name(f"{Path(db_path).name}{_SUFIJO_VOLCADO}"))
+        return cls(lambda: get_connection(db_path, perfil=PERFIL_ESCRITURA_MASIVA), **kwargs)
+
+    @property
+    def activo(self) -> bool:
+        return self._activo
+
+    def iniciar(self) -> None:
+        with self._lock:
+            if self._activo:
+                return
+            self._hilo = threading.Thread(target=self._bucle, name="clinicdesk-escritor-eventos", daemon=True)
+            self._activo = True
+            self._hilo.start()
+        atexit.register(self.cerrar)
+
+    def encolar(self, destino: DestinoEventosEncadenados, payload: dict[str, Any], valores: tuple[Any, ...]) -> bool:
+        registro = _Registro(destino=destino, payload=payload, valores=valores)
+        inicio_espera: float | None = None
+        while self._activo:
+            try:
+                self._cola.put(registro, timeout=_ESPERA_COLA_LLENA_SEGUNDOS)
+            except queue.Full:
+                if inicio_espera is None:
+                    inicio_espera = time.monotonic()
+                continue
+            self._registrar_encolado(inicio_espera)
+            return True
+        return False
+
+    def flush(self, timeout: float = _TIMEOUT_FLUSH_SEGUNDOS) -> bool:
+        """Espera (como mucho `timeout`) a lo encolado antes; False si vence o quedan pendientes."""
+        if not self._activo:
+            return True
+        marca = _MarcaFlush(threading.Event())
+        limite = time.monotonic() + timeout
+        try:
+            self._cola.put(marca, timeout=timeout)
+        except queue.Full:
+            return False
+        if not marca.hecho.wait(max(0.0, limite - time.monotonic())):
+            return False
+        with self._lock:
+            return not self._pendientes
+
+    def cerrar(self, timeout: float = _TIMEOUT_CIERRE_SEGUNDOS) -> None:
+        with self._lock:
+            if not self._activo or self._hilo is None:
+                return
+            self._activo = False
+            hilo = self._hilo
+        self._cola.put(_FIN)
+        hilo.join(timeout)
+        atexit.unregister(self.cerrar)
+        metricas = self.metricas()
+        LOGGER.info(
+            "escritor_eventos_cerrado",
+            extra={
+                "action": "escritor_eventos_cerrado",
+                "escritos": metricas.escritos,
+                "lotes": metricas.lotes,
+                "descartados": metricas.descartados,
+                "pendientes": metricas.pendientes,
+                "en_cola": metricas.profundidad_cola,
+            },
+        )
+
+    def metricas(self) -> MetricasEscritorEventos:
+        with self._lock:
+            return MetricasEscritorEventos(
+                encolados=self._encolados,
+                escritos=self._escritos,
+                lotes=self._lotes,
+                reintentos=self._reintentos,
+                descartados=self._descartados,
+                pendientes=len(self._pendientes),
+                esperas_cola_llena=self._esperas_cola_llena,
+                segundos_espera_cola_llena=self._segundos_espera,
+                profundidad_cola=self._cola.qsize(),
+                profundidad_maxima=self._profundidad_maxima,
+                capacidad_cola=self._capacidad,
+            )
+
+    def _registrar_encolado(self, inicio_espera: float | None) -> None:
+        with self._lock:
+            self._encolados += 1
+            self._profundidad_maxima = max(self._profundidad_maxima, self._cola.qsize())
+            if inicio_espera is not None:
+                self._esperas_cola_llena += 1
+                self._segundos_espera += time.monotonic() - inicio_espera
+
+    def _bucle(self) -> None:
+        try:
+            con = self._abrir_conexion()
+        except sqlite3.Error as exc:
+            self._activo = False
+            LOGGER.error(
+                "escritor_eventos_sin_conexion",
+                extra={"action": "escritor_eventos_sin_conexion", "error": str(exc)},
+            )
+            return
+        try:
+            self._pendientes = _recuperar_volcado(self._volcado)
+            terminar = False
+            while not terminar:
+                elementos = self._tomar_elementos()
+                registros = [item for item in elementos if isinstance(item, _Registro)]
+                if registros or self._pendientes:
+                    self._escribir_con_reintentos(con, registros)
+                for item in elementos:
+                    if isinstance(item, _MarcaFlush):
+                        item.hecho.set()
+                terminar = any(item is _FIN for item in elementos)
+            if self._pendientes:
+                self._volcar_pendientes()
+        finally:
+            con.close()
+
+    def _tomar_elementos(self) -> list[object]:
+        try:
+            primero = self._cola.get(timeout=_ESPERA_REINTENTO_PENDIENTES_SEGUNDOS if self._pendientes else None)
+        except queue.Empty:
+            return []
+        elementos = [primero]
+        registros = 1
+        while registros < self._tamano_lote and elementos[-1] is not _FIN:
+            try:
+                elemento = self._cola.get_nowait()
+            except queue.Empty:
+                break
+            elementos.append(elemento)
+            registros += isinstance(elemento, _Registro)
+        return elementos
+
+    def _escribir_con_reintentos(self, con: sqlite3.Connection, registros: list[_Registro]) -> None:
+        lote = self._pendientes + registros
+        for intento in range(self._reintentos_lote + 1):
+            try:
+                escribir_encadenados(con, _agrupar_por_destino(lote))
+            except Exception as exc:  # noqa: BLE001
+                if intento < self._reintentos_lote:
+                    with self._lock:
+                        self._reintentos += 1
+                    time.sleep(_ESPERA_REINTENTO_SEGUNDOS * (intento + 1))
+                    continue
+                with self._lock:
+                    self._pendientes = lote
+                LOGGER.warning(
+                    "escritor_eventos_lote_pendiente",
+                    extra={"action": "escritor_eventos_lote_pendiente", "eventos": len(lote), "error": str(exc)},
+                )
+                if len(lote) >= self._capacidad:
+                    self._volcar_pendientes()
+                return
+            with self._lock:
+                self._escritos += len(lote)
+                self._lotes += 1
+            self._pendientes = _recuperar_volcado(self._volcado)
+            return
+
+    def _volcar_pendientes(self) -> None:
+        """Saca los pendientes de memoria: al fichero de volcado o, si no se puede, al log como descartados."""
+        pendientes = self._pendientes
+        volcados = _volcar(self._volcado, pendientes)
+        with self._lock:
+            self._descartados += 0 if volcados else len(pendientes)
+            self._pendientes = []
+
+
+class _VolcadoPendientes:
+    """
+    Eventos que no se pudieron escribir, en JSONL junto a la base de datos.
+
+    El fichero se reescribe entero (temporal + `replace`). Mientras su contenido está
+    cargado en los pendientes del escritor no se toca; se borra cuando esos eventos quedan
+    escritos, así un corte en cualquier punto no pierde ni duplica eventos.
+    """
+
+    def __init__(self, ruta: Path) -> None:
+        self._ruta = ruta
+        self._cargado = False
+        self._sin_cargar = True
+
+    def tras_escribir(self) -> list[_Registro]:
+        """Borra el volcado ya escrito y devuelve el que quede en disco por escribir."""
+        if self._cargado:
+            self._ruta.unlink(missing_ok=True)
+            self._cargado = False
+        if not self._sin_cargar:
+            return []
+        registros = self._leer()
+        self._sin_cargar = False
+        self._cargado = bool(registros)
+        return registros
+
+    def guardar(self, pendientes: list[_Registro]) -> None:
+        registros = (self._leer() if self._sin_cargar else []) + pendientes
+        temporal = self._ruta.with_name(f".{self._ruta.name}.tmp")
+        with temporal.open("w", encoding="utf-8") as handle:
+            for registro in registros:
+                dato = {
+                    "tabla": registro.destino.tabla,
+                    "sql_insert": registro.destino.sql_insert,
+                    "payload": registro.payload,
+                    "valores": list(registro.valores),
+                }
+                handle.write(json.dumps(dato, ensure_ascii=False, sort_keys=True) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+        temporal.replace(self._ruta)
+        self._cargado = False
+        self._sin_cargar = True
+
+    def _leer(self) -> list[_Registro]:
+        if not self._ruta.exists():
+            return []
+        registros: list[_Registro] = []
+        with self._ruta.open("r", encoding="utf-8") as handle:
+            for linea in handle:
+                if linea.strip():
+                    dato = json.loads(linea)
+                    destino = DestinoEventosEncadenados(tabla=dato["tabla"], sql_insert=dato["sql_insert"])
+                    registros.append(_Registro(destino, dato["payload"], tuple(dato["valores"])))
+        return registros
+
+
+def _recuperar_volcado(volcado: _VolcadoPendientes | None) -> list[_Registro]:
+    if volcado is None:
+        return []
+    try:
+        return volcado.tras_escribir()
+    except (OSError, ValueError, KeyError) as exc:
+        LOGGER.error(
+            "escritor_eventos_volcado_ilegible",
+            extra={"action": "escritor_eventos_volcado_ilegible", "error": str(exc)},
+        )
+        return []
+
+
+def _volcar(volcado: _VolcadoPendientes | None, pendientes: list[_Registro]) -> bool:
+    try:
+        if volcado is None:
+            raise OSError("sin ruta de volcado")
+        volcado.guardar(pendientes)
+    except (OSError, TypeError, ValueError) as exc:
+        LOGGER.error(
+            "escritor_eventos_lote_descartado",
+            extra={"action": "escritor_eventos_lote_descartado", "eventos": len(pendientes), "error": str(exc)},
+        )
+        return False
+    LOGGER.warning(
+        "escritor_eventos_lote_volcado",
+        extra={"action": "escritor_eventos_lote_volcado", "eventos": len(pendientes)},
+    )
+    return True
+
+
+def registrar_encadenado(
+    con: sqlite3.Connection,
+    escritor: EscritorEventosSqliteEnLote | None,
+    destino: DestinoEventosEncadenados,
+    payload: dict[str, Any],
+    valores: tuple[Any, ...],
+) -> None:
+    """Encola en el escritor si está activo; si no, escribe en el momento en su propia transacción."""
+    if escritor is not None and escritor.encolar(destino, payload, valores):
+        return
+    escribir_encadenados(con, [(destino.tabla, destino.sql_insert, [(payload, valores)])])
+
+
+def _agrupar_por_destino(
+    registros: list[_Registro],
+) -> list[tuple[str, str, list[tuple[dict[str, Any], tuple[Any, ...]]]]]:
+    por_destino: dict[DestinoEventosEncadenados, list[tuple[dict[str, Any], tuple[Any, ...]]]] = {}
+    for registro in registros:
+        por_destino.setdefault(registro.destino, []).append((registro.payload, registro.valores))
+    return [(destino.tabla, destino.sql_insert, filas) for destino, filas in por_destino.items()]
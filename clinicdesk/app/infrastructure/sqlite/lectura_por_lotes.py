@@ -0,0 +1,29 @@
+"""Lectura de consultas grandes en lotes de `fetchmany`, sin materializar el resultado completo."""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Iterator, Sequence
+
+TAMANO_LOTE_LECTURA = 500
+
+
+def iterar_filas(
+    con: sqlite3.Connection,
+    sql: str,
+    params: Sequence[object] = (),
+    *,
+    tamano_lote: int = TAMANO_LOTE_LECTURA,
+) -> Iterator[list[sqlite3.Row]]:
+    """Lotes de filas de un cursor propio, que se cierra al agotarlo o al abandonar el iterador."""
+    if tamano_lote < 1:
+        raise ValueError("tamano_lote debe ser >= 1")
+    cursor = con.execute(sql, params)
+    try:
+        while True:
+            filas = cursor.fetchmany(tamano_lote)
+            if not filas:
+                return
+            yield filas
+    finally:
+        cursor.close()
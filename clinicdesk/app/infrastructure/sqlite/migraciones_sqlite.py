@@ -0,0 +1,281 @@
+"""
+Motor de migraciones versionadas de SQLite.
+
+- La versión del esquema vive en `PRAGMA user_version`.
+- Cada paso es idempotente y se sella (user_version + historial) en su propio commit,
+  de modo que un arranque interrumpido continúa desde el último paso completado.
+- Si la base ya está al día, el arranque solo lee `PRAGMA user_version`
+  (más una consulta indexada al historial cuando el cifrado PII está activo).
+- El cifrado de la PII ya existente no se hace en el arranque: queda pendiente (sin fila
+  `TAREA_CIFRADO_PII` en el historial) hasta que `MigracionPiiEnSegundoPlano` termina y
+  llama a `registrar_cifrado_pii_completado`. Mientras tanto se leen v1/claro y se escribe v2.
+
+Cualquier cambio en schema.sql que deba llegar a bases existentes necesita un paso nuevo
+al final de `MIGRACIONES`.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+from clinicdesk.app.bootstrap_logging import get_logger
+from clinicdesk.app.infrastructure.sqlite.auditoria_integridad import ensure_auditoria_integridad_schema
+from clinicdesk.app.infrastructure.sqlite.citas_rango_sql import asegurar_epoch_citas
+from clinicdesk.app.infrastructure.sqlite.field_crypto_migrations import (
+    ensure_medicos_field_crypto_columns,
+    ensure_pacientes_field_crypto_columns,
+    ensure_personal_field_crypto_columns,
+)
+from clinicdesk.app.infrastructure.sqlite.pacientes.busqueda_fts import crear_indice_busqueda_pacientes
+from clinicdesk.app.infrastructure.sqlite.pii_crypto import get_connection_pii_cipher
+from clinicdesk.app.infrastructure.sqlite.recordatorios_resumen import reconstruir_resumen_recordatorios
+from clinicdesk.app.infrastructure.sqlite.riesgo_ausencia_scores import asegurar_scores_riesgo
+
+LOGGER = get_logger(__name__)
+
+TAREA_CIFRADO_PII = "pii_cifrado_existente"
+
+
+@dataclass(frozen=True, slots=True)
+class MigracionSqlite:
+    version: int
+    nombre: str
+    aplicar: Callable[[sqlite3.Connection, Path], None]
+
+
+@dataclass(frozen=True, slots=True)
+class PlanMigracionSqlite:
+    version_actual: int
+    version_objetivo: int
+    pendientes: tuple[str, ...]
+    cifrado_pii_pendiente: bool
+
+    @property
+    def al_dia(self) -> bool:
+        return not self.pendientes and not self.cifrado_pii_pendiente
+
+
+def _aplicar_schema_base(con: sqlite3.Connection, schema_path: Path) -> None:
+    if not schema_path.exists():
+        raise FileNotFoundError(f"No existe schema.sql en: {schema_path}")
+    # executescript permite ejecutar múltiples sentencias SQL separadas por ';'
+    con.executescript(schema_path.read_text(encoding="utf-8"))
+
+
+def _migrar_columnas_legacy(con: sqlite3.Connection, _schema_path: Path) -> None:
+    _ensure_stock_column(con, table="medicamentos")
+    _ensure_stock_column(con, table="materiales")
+    for table, column in (
+        ("citas", "activo"),
+        ("ausencias_medico", "activo"),
+        ("ausencias_personal", "activo"),
+        ("recetas", "activo"),
+        ("receta_lineas", "activo"),
+        ("dispensaciones", "activo"),
+        ("movimientos_medicamentos", "activo"),
+        ("movimientos_materiales", "activo"),
+        ("incidencias", "activo"),
+        ("salas", "activa"),
+        ("turnos", "activo"),
+    ):
+        _ensure_flag_column(con, table=table, column=column)
+    _ensure_text_column(con, table="recetas", column="estado", default="ACTIVA")
+    _ensure_int_column(con, table="receta_lineas", column="cantidad", default=1)
+    _ensure_int_column(con, table="receta_lineas", column="pendiente", default=1)
+    _ensure_text_column(con, table="receta_lineas", column="estado", default="PENDIENTE")
+    _ensure_text_column(con, table="movimientos_medicamentos", column="referencia", default="")
+    _ensure_text_column(con, table="movimientos_materiales", column="referencia", default="")
+
+
+def _migrar_citas_extendido(con: sqlite3.Connection, _schema_path: Path) -> None:
+    asegurar_columnas_citas_extendido(con)
+
+
+def _migrar_columnas_cifrado_campos(con: sqlite3.Connection, _schema_path: Path) -> None:
+    ensure_pacientes_field_crypto_columns(con)
+    ensure_medicos_field_crypto_columns(con)
+    ensure_personal_field_crypto_columns(con)
+
+
+def _migrar_cadena_integridad_auditoria(con: sqlite3.Connection, _schema_path: Path) -> None:
+    ensure_auditoria_integridad_schema(con)
+
+
+def _migrar_indice_busqueda_pacientes(con: sqlite3.Connection, _schema_path: Path) -> None:
+    crear_indice_busqueda_pacientes(con)
+
+
+def _migrar_citas_epoch(con: sqlite3.Connection, _schema_path: Path) -> None:
+    asegurar_epoch_citas(con)
+
+
+def _migrar_resumen_recordatorios(con: sqlite3.Connection, _schema_path: Path) -> None:
+    reconstruir_resumen_recordatorios(con)
+
+
+def _migrar_scores_riesgo(con: sqlite3.Connection, _schema_path: Path) -> None:
+    asegurar_scores_riesgo(con)
+
+
+def _migrar_indice_incidencias_cita(con: sqlite3.Connection, _schema_path: Path) -> None:
+    con.execute("CREATE INDEX IF NOT EXISTS idx_incidencias_cita_fecha ON incidencias(cita_id, fecha_hora)")
+
+
+MIGRACIONES: tuple[MigracionSqlite, ...] = (
+    MigracionSqlite(1, "schema_base", _aplicar_schema_base),
+    MigracionSqlite(2, "columnas_legacy", _migrar_columnas_legacy),
+    MigracionSqlite(3, "citas_extendido", _migrar_citas_extendido),
+    MigracionSqlite(4, "columnas_cifrado_campos", _migrar_columnas_cifrado_campos),
+    MigracionSqlite(5, "cadena_integridad_auditoria", _migrar_cadena_integridad_auditoria),
+    MigracionSqlite(6, "indice_busqueda_pacientes", _migrar_indice_busqueda_pacientes),
+    MigracionSqlite(7, "citas_epoch", _migrar_citas_epoch),
+    MigracionSqlite(8, "resumen_recordatorios", _migrar_resumen_recordatorios),
+    MigracionSqlite(9, "scores_riesgo_ausencia", _migrar_scores_riesgo),
+    MigracionSqlite(10, "indice_incidencias_cita", _migrar_indice_incidencias_cita),
+)
+
+VERSION_ESQUEMA = MIGRACIONES[-1].version
+
+
+def leer_version_esquema(con: sqlite3.Connection) -> int:
+    return int(con.execute("PRAGMA user_version").fetchone()[0])
+
+
+def planificar_migraciones(con: sqlite3.Connection) -> PlanMigracionSqlite:
+    version_actual = leer_version_esquema(con)
+    pendientes = tuple(paso.nombre for paso in MIGRACIONES if paso.version > version_actual)
+    return PlanMigracionSqlite(
+        version_actual=version_actual,
+        version_objetivo=VERSION_ESQUEMA,
+        pendientes=pendientes,
+        cifrado_pii_pendiente=_cifrado_pii_pendiente(con, version_actual),
+    )
+
+
+def aplicar_migraciones(
+    con: sqlite3.Connection,
+    schema_path: Path,
+    *,
+    dry_run: bool = False,
+) -> PlanMigracionSqlite:
+    """Aplica los pasos pendientes en orden; con dry_run solo devuelve el plan."""
+    plan = planificar_migraciones(con)
+    if plan.version_actual > VERSION_ESQUEMA:
+        raise RuntimeError(
+            f"La base de datos usa un esquema más nuevo ({plan.version_actual}) que esta versión "
+            f"de la aplicación ({VERSION_ESQUEMA})."
+        )
+    if dry_run or plan.al_dia:
+        return plan
+    for paso in MIGRACIONES:
+        if paso.version <= plan.version_actual:
+            continue
+        paso.aplicar(con, schema_path)
+        _sellar_paso(con, version=paso.version, nombre=paso.nombre)
+        LOGGER.info(
+            "sqlite_migracion_aplicada",
+            extra={"action": "sqlite_migracion_aplicada", "version": paso.version, "nombre": paso.nombre},
+        )
+    if plan.cifrado_pii_pendiente:
+        LOGGER.info("sqlite_cifrado_pii_pendiente", extra={"action": "sqlite_cifrado_pii_pendiente"})
+    return plan
+
+
+def registrar_cifrado_pii_completado(con: sqlite3.Connection) -> None:
+    """Sella en el historial que la PII existente ya está cifrada (lo llama la migración en segundo plano)."""
+    with con:
+        _registrar_historial(con, version=VERSION_ESQUEMA, nombre=TAREA_CIFRADO_PII)
+
+
+def _cifrado_pii_pendiente(con: sqlite3.Connection, version_actual: int) -> bool:
+    if get_connection_pii_cipher(con) is None:
+        return False
+    if version_actual == 0:
+        return True
+    try:
+        fila = con.execute("SELECT 1 FROM schema_migraciones WHERE nombre = ?", (TAREA_CIFRADO_PII,)).fetchone()
+    except sqlite3.OperationalError:
+        return True
+    return fila is None
+
+
+def _sellar_paso(con: sqlite3.Connection, *, version: int, nombre: str) -> None:
+    _registrar_historial(con, version=version, nombre=nombre)
+    con.execute(f"PRAGMA user_version = {int(version)}")
+    con.commit()
+
+
+def _registrar_historial(con: sqlite3.Connection, *, version: int, nombre: str) -> None:
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migraciones (
+            nombre TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            aplicada_en_utc TEXT NOT NULL
+        )
+        """
+    )
+    con.execute(
+        "INSERT OR REPLACE INTO schema_migraciones(nombre, version, aplicada_en_utc) VALUES (?, ?, ?)",
+        (nombre, version, datetime.now(timezone.utc).isoformat()),
+    )
+
+
+def _ensure_stock_column(con: sqlite3.Connection, *, table: str) -> None:
+    columns = _table_columns(con, table)
+    if "cantidad_en_almacen" in columns:
+        return
+    if "cantidad_almacen" not in columns:
+        return
+
+    con.execute(f"ALTER TABLE {table} ADD COLUMN cantidad_en_almacen INTEGER NOT NULL DEFAULT 0")
+    con.execute(f"UPDATE {table} SET cantidad_en_almacen = cantidad_almacen")
+
+
+def _ensure_flag_column(con: sqlite3.Connection, *, table: str, column: str) -> None:
+    if column in _table_columns(con, table):
+        return
+    con.execute(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER NOT NULL DEFAULT 1")
+    con.execute(f"UPDATE {table} SET {column} = 1")
+
+
+def _ensure_text_column(con: sqlite3.Connection, *, table: str, column: str, default: str) -> None:
+    if column in _table_columns(con, table):
+        return
+    escaped = default.replace("'", "''")
+    con.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT NOT NULL DEFAULT '{escaped}'")
+
+
+def _ensure_int_column(con: sqlite3.Connection, *, table: str, column: str, default: int) -> None:
+    if column in _table_columns(con, table):
+        return
+    con.execute(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER NOT NULL DEFAULT {int(default)}")
+
+
+def _table_columns(con: sqlite3.Connection, table: str) -> set[str]:
+    return {row[1] for row in con.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def asegurar_columnas_citas_extendido(con: sqlite3.Connection) -> None:
+    columnas = _table_columns(con, "citas")
+    nuevas = (
+        ("check_in_at", "TEXT NULL"),
+        ("llamado_a_consulta_at", "TEXT NULL"),
+        ("consulta_inicio_at", "TEXT NULL"),
+        ("consulta_fin_at", "TEXT NULL"),
+        ("check_out_at", "TEXT NULL"),
+        ("tipo_cita", "TEXT NULL"),
+        ("canal_reserva", "TEXT NULL"),
+    )
+    for columna, tipo in nuevas:
+        if columna in columnas:
+            continue
+        con.execute(f"ALTER TABLE citas ADD COLUMN {columna} {tipo}")
+        LOGGER.info(
+            "sqlite_migracion_add_col",
+            extra={"action": "sqlite_migracion_add_col", "tabla": "citas", "columna": columna},
+        )
@@ -0,0 +1,144 @@
+"""
+Índice FTS5 para la búsqueda de pacientes.
+
+- `nombre_completo`: nombre + apellidos, tokenizado con `unicode61 remove_diacritics 2`
+  (insensible a mayúsculas y tildes) y con índices de prefijo para type-ahead.
+- `identificadores`: hash de lookup de documento/teléfono cuando el cifrado por campo está
+  activo; en modo legacy, documento y teléfono compactado en claro.
+
+El índice se mantiene con triggers sobre `pacientes` (rowid = pacientes.id), de modo que
+cualquier escritura (repositorio, importación CSV, rotación de claves) lo deja al día.
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+
+from clinicdesk.app.bootstrap_logging import get_logger
+from clinicdesk.app.infrastructure.sqlite.pacientes_field_protection import PacientesFieldProtection
+
+LOGGER = get_logger(__name__)
+
+TABLA_FTS_PACIENTES = "pacientes_fts"
+
+_TOKENS_TEXTO = re.compile(r"\w+")
+_SEPARADORES_IDENTIFICADOR = re.compile(r"[\s().-]+")
+_COLUMNAS_DISPARADORAS = "nombre, apellidos, documento, documento_hash, telefono, telefono_hash"
+
+
+def _expr_nombre_completo(alias: str) -> str:
+    return f"COALESCE({alias}nombre, '') || ' ' || COALESCE({alias}apellidos, '')"
+
+
+def _expr_identificadores(alias: str) -> str:
+    return (
+        f"COALESCE({alias}documento_hash, {alias}documento, '') || ' ' || "
+        f"COALESCE({alias}telefono_hash, REPLACE(REPLACE({alias}telefono, ' ', ''), '-', ''), '')"
+    )
+
+
+def _sql_insertar_desde(alias: str) -> str:
+    return (
+        f"INSERT INTO {TABLA_FTS_PACIENTES}(rowid, nombre_completo, identificadores) "
+        f"VALUES ({alias}id, {_expr_nombre_completo(alias)}, {_expr_identificadores(alias)});"
+    )
+
+
+def crear_indice_busqueda_pacientes(con: sqlite3.Connection) -> bool:
+    """Crea tabla FTS5 y triggers y lo puebla si está vacío; False si SQLite no trae FTS5."""
+    try:
+        con.execute(
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA_FTS_PACIENTES} USING fts5(
+                nombre_completo,
+                identificadores,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+            """
+        )
+    except sqlite3.OperationalError as exc:
+        LOGGER.warning(
+            "pacientes_fts_no_disponible",
+            extra={"action": "pacientes_fts_no_disponible", "error": str(exc)},
+        )
+        return False
+    con.executescript(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_pacientes_fts_ai AFTER INSERT ON pacientes BEGIN
+            {_sql_insertar_desde("NEW.")}
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_pacientes_fts_ad AFTER DELETE ON pacientes BEGIN
+            DELETE FROM {TABLA_FTS_PACIENTES} WHERE rowid = OLD.id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_pacientes_fts_au AFTER UPDATE OF {_COLUMNAS_DISPARADORAS} ON pacientes BEGIN
+            DELETE FROM {TABLA_FTS_PACIENTES} WHERE rowid = OLD.id;
+            {_sql_insertar_desde("NEW.")}
+        END;
+        """
+    )
+    if con.execute(f"SELECT 1 FROM {TABLA_FTS_PACIENTES} LIMIT 1").fetchone() is None:
+        reconstruir_indice_busqueda_pacientes(con)
+    return True
+
+
+def reconstruir_indice_busqueda_pacientes(con: sqlite3.Connection) -> int:
+    """Regenera el índice completo desde `pacientes`; devuelve las filas indexadas."""
+    con.execute(f"DELETE FROM {TABLA_FTS_PACIENTES}")
+    cur = con.execute(
+        f"INSERT INTO {TABLA_FTS_PACIENTES}(rowid, nombre_completo, identificadores) "
+        f"SELECT id, {_expr_nombre_completo('')}, {_expr_identificadores('')} FROM pacientes"
+    )
+    con.commit()
+    return int(cur.rowcount)
+
+
+def indice_busqueda_disponible(con: sqlite3.Connection) -> bool:
+    row = con.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (TABLA_FTS_PACIENTES,),
+    ).fetchone()
+    return row is not None
+
+
+def expresion_busqueda_fts(texto: str, field_protection: PacientesFieldProtection) -> str | None:
+    """
+    Traduce el texto libre a una expresión MATCH.
+
+    Cada palabra es un prefijo obligatorio sobre el nombre completo; alternativamente el texto
+    puede identificar al paciente por documento/teléfono (hash exacto en modo protegido,
+    prefijo en modo legacy). Devuelve None si el texto no tiene términos indexables.
+    """
+    alternativas: list[str] = []
+    tokens = _TOKENS_TEXTO.findall(texto)
+    if tokens:
+        prefijos = " AND ".join(f'"{token}"*' for token in tokens)
+        alternativas.append(f"nombre_completo : ({prefijos})")
+    alternativas.extend(_alternativas_identificador(texto, field_protection))
+    if not alternativas:
+        return None
+    return " OR ".join(f"({alternativa})" for alternativa in alternativas)
+
+
+def _alternativas_identificador(texto: str, field_protection: PacientesFieldProtection) -> list[str]:
+    if field_protection.enabled:
+        hashes = {field_protection.hash_for_lookup("documento", texto)}
+        if any(caracter.isdigit() for caracter in texto):
+            hashes.add(field_protection.hash_for_lookup("telefono", texto))
+        # Los hashes son base64 urlsafe: el tokenizador los parte en '-', '_' y '=',
+        # así que se buscan como frase exacta.
+        return [f'identificadores : "{valor}"' for valor in sorted(h for h in hashes if h)]
+    compacto = _SEPARADORES_IDENTIFICADOR.sub("", texto)
+    if not compacto or not _TOKENS_TEXTO.fullmatch(compacto):
+        return []
+    return [f'identificadores : "{compacto}"*']
+
+
+__all__ = [
+    "TABLA_FTS_PACIENTES",
+    "crear_indice_busqueda_pacientes",
+    "expresion_busqueda_fts",
+    "indice_busqueda_disponible",
+    "reconstruir_indice_busqueda_pacientes",
+]
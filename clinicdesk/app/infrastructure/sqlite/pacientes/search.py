@@ -5,6 +5,7 @@ import sqlite3
 from typing import List
 
 from clinicdesk.app.common.search_utils import like_value
+from clinicdesk.app.infrastructure.sqlite.pacientes.busqueda_fts import TABLA_FTS_PACIENTES, expresion_busqueda_fts
 from clinicdesk.app.infrastructure.sqlite.pacientes_field_protection import PacientesFieldProtection
 
 logger = logging.getLogger(__name__)
@@ -17,11 +18,16 @@ def search_filters(
     tipo_documento: str | None,
     documento: str | None,
     activo: bool | None,
+    usar_fts: bool = False,
 ) -> tuple[list[str], list[object]]:
     clauses: list[str] = []
     params: list[object] = []
 
-    if texto:
+    expresion_fts = expresion_busqueda_fts(texto, field_protection) if texto and usar_fts else None
+    if expresion_fts:
+        clauses.append(f"id IN (SELECT rowid FROM {TABLA_FTS_PACIENTES} WHERE {TABLA_FTS_PACIENTES} MATCH ?)")
+        params.append(expresion_fts)
+    elif texto:
         _append_text_filter(clauses, params, texto, field_protection.enabled)
 
     if tipo_documento:
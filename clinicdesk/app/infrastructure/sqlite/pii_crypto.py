@@ -1,3 +1,12 @@
+"""
+Cifrado de columnas PII en reposo (CLINICDESK_PII_ENCRYPTION_*).
+
+Formatos:
+- `enc:v2:` AES-GCM (nonce de 12 bytes, AAD = prefijo). Es el formato de escritura.
+- `enc:v1:` keystream SHA256 + HMAC truncado. Solo se lee, para datos ya cifrados;
+  `pii_migracion_lotes.migrar_pii_en_lotes` los reescribe en v2 con la aplicación en marcha.
+"""
+
 from __future__ import annotations
 
 import base64
@@ -6,12 +15,20 @@ import hmac
 import os
 import sqlite3
 from dataclasses import dataclass
-from typing import Iterable
 
 
 _ENV_ENABLED = "CLINICDESK_PII_ENCRYPTION_ENABLED"
 _ENV_KEY = "CLINICDESK_PII_ENCRYPTION_KEY"
-_PREFIX = "enc:v1:"
+_PREFIX_LEGACY = "enc:v1:"
+_PREFIX = "enc:v2:"
+_AAD = _PREFIX.encode("ascii")
+_NONCE_LEN = 12
+
+COLUMNAS_PII: dict[str, tuple[str, ...]] = {
+    "pacientes": ("telefono", "email", "direccion", "alergias", "observaciones"),
+    "medicos": ("telefono", "email", "direccion"),
+    "personal": ("telefono", "email", "direccion"),
+}
 
 _CONNECTION_CIPHERS: dict[int, "PiiCipher"] = {}
 
@@ -24,6 +41,7 @@ class PiiEncryptionSettings:
 
 class PiiCipher:
     def __init__(self, key_material: str) -> None:
+        self._aead = _aesgcm(_derive_key(key_material, purpose="aead"))
         self._enc_key = _derive_key(key_material, purpose="enc")
         self._mac_key = _derive_key(key_material, purpose="mac")
 
@@ -38,19 +56,34 @@ class PiiCipher:
         return self.decrypt(value)
 
     def encrypt(self, value: str) -> str:
-        if value.startswith(_PREFIX):
+        if value.startswith(_PREFIX) or value.startswith(_PREFIX_LEGACY):
             return value
-        nonce = os.urandom(16)
-        plaintext = value.encode("utf-8")
-        ciphertext = _xor_keystream(plaintext, self._enc_key, nonce)
-        tag = hmac.new(self._mac_key, nonce + ciphertext, hashlib.sha256).digest()[:16]
-        blob = base64.urlsafe_b64encode(nonce + ciphertext + tag).decode("ascii")
+        nonce = os.urandom(_NONCE_LEN)
+        ciphertext = self._aead.encrypt(nonce, value.encode("utf-8"), _AAD)
+        blob = base64.urlsafe_b64encode(nonce + ciphertext).decode("ascii")
         return f"{_PREFIX}{blob}"
 
     def decrypt(self, value: str) -> str:
-        if not value.startswith(_PREFIX):
-            return value
-        payload = value[len(_PREFIX) :]
+        if value.startswith(_PREFIX):
+            raw = base64.urlsafe_b64decode(value[len(_PREFIX) :].encode("ascii"))
+            if len(raw) < _NONCE_LEN + 16:
+                raise ValueError("Encrypted payload is malformed.")
+            try:
+                return self._aead.decrypt(raw[:_NONCE_LEN], raw[_NONCE_LEN:], _AAD).decode("utf-8")
+            except Exception as exc:
+                raise ValueError("Encrypted payload authentication failed.") from exc
+        if value.startswith(_PREFIX_LEGACY):
+            return self._decrypt_legacy(value)
+        return value
+
+    def recifrar(self, value: str) -> str:
+        """Devuelve el valor en el formato actual; los tokens v1 se descifran y se vuelven a cifrar."""
+        if value.startswith(_PREFIX_LEGACY):
+            return self.encrypt(self._decrypt_legacy(value))
+        return self.encrypt(value)
+
+    def _decrypt_legacy(self, value: str) -> str:
+        payload = value[len(_PREFIX_LEGACY) :]
         raw = base64.urlsafe_b64decode(payload.encode("ascii"))
         if len(raw) < 32:
             raise ValueError("Encrypted payload is malformed.")
@@ -91,60 +124,27 @@ def cleanup_connection_pii(connection: sqlite3.Connection) -> None:
     _CONNECTION_CIPHERS.pop(id(connection), None)
 
 
-def migrate_existing_pii_data(connection: sqlite3.Connection) -> None:
-    cipher = get_connection_pii_cipher(connection)
-    if cipher is None:
-        return
-    plans = {
-        "pacientes": ("telefono", "email", "direccion", "alergias", "observaciones"),
-        "medicos": ("telefono", "email", "direccion"),
-        "personal": ("telefono", "email", "direccion"),
-    }
-    for table, columns in plans.items():
-        _migrate_table_columns(connection, table=table, columns=columns, cipher=cipher)
-
-
-def _migrate_table_columns(
-    connection: sqlite3.Connection,
-    *,
-    table: str,
-    columns: Iterable[str],
-    cipher: PiiCipher,
-) -> None:
-    select_columns = ", ".join(["id", *columns])
-    rows = connection.execute(f"SELECT {select_columns} FROM {table}").fetchall()
-    for row in rows:
-        updates: list[str] = []
-        values: list[str] = []
-        for column in columns:
-            raw_value = row[column]
-            if raw_value is None:
-                continue
-            encrypted = cipher.encrypt(str(raw_value))
-            if encrypted == raw_value:
-                continue
-            updates.append(f"{column} = ?")
-            values.append(encrypted)
-        if not updates:
-            continue
-        values.append(row["id"])
-        sql = f"UPDATE {table} SET {', '.join(updates)} WHERE id = ?"
-        connection.execute(sql, values)
-
-
 def _derive_key(key_material: str, *, purpose: str) -> bytes:
     return hashlib.sha256(f"{purpose}:{key_material}".encode("utf-8")).digest()
 
 
+def _aesgcm(key: bytes):
+    try:
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    except ModuleNotFoundError as exc:
+        raise RuntimeError(
+            "Missing dependency: cryptography. Install requirements.txt (pip install -r requirements.txt)."
+        ) from exc
+    return AESGCM(key)
+
+
 def _xor_keystream(data: bytes, key: bytes, nonce: bytes) -> bytes:
-    output = bytearray(len(data))
-    counter = 0
-    offset = 0
-    while offset < len(data):
-        block = hashlib.sha256(key + nonce + counter.to_bytes(4, "big")).digest()
-        chunk = data[offset : offset + len(block)]
-        for index, value in enumerate(chunk):
-            output[offset + index] = value ^ block[index]
-        offset += len(block)
-        counter += 1
-    return bytes(output)
+    """Keystream del formato legacy v1 (solo lectura); XOR de todo el bloque como enteros."""
+    if not data:
+        return b""
+    bloques = -(-len(data) // hashlib.sha256().digest_size)
+    keystream = b"".join(
+        hashlib.sha256(key + nonce + counter.to_bytes(4, "big")).digest() for counter in range(bloques)
+    )[: len(data)]
+    mezclado = int.from_bytes(data, "big") ^ int.from_bytes(keystream, "big")
+    return mezclado.to_bytes(len(data), "big")
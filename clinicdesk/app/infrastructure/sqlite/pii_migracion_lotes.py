@@ -0,0 +1,346 @@
+"""
+Migración de la PII en reposo por lotes, reanudable y con el cifrado repartido en procesos.
+
+- Cada tabla se recorre por id (keyset) en lotes; el cifrado de cada lote (CPU) puede
+  repartirse en un `ProcessPoolExecutor` y la escritura es un `executemany` por lote.
+- Cada lote se confirma junto con su marca de agua (`pii_migracion_progreso`), así que
+  una interrupción se reanuda desde el último lote escrito.
+- El UPDATE solo se aplica si la fila sigue con los valores leídos: si la aplicación la
+  modifica mientras tanto (y ya la guarda cifrada), el lote no la pisa.
+- Los valores en claro y los `enc:v1:` se escriben como `enc:v2:`; los ya migrados no se tocan.
+- El arranque solo deja la tarea pendiente; la aplicación (o el script) lanza
+  `MigracionPiiEnSegundoPlano` sobre una conexión del pool y, al completarse, la sella.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import sqlite3
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable, Sequence
+
+from clinicdesk.app.bootstrap_logging import get_logger
+from clinicdesk.app.infrastructure.sqlite.pii_crypto import COLUMNAS_PII, PiiCipher, encryption_settings_from_env
+from clinicdesk.app.infrastructure.sqlite.sqlite_connection_config import PERFIL_ESCRITURA_MASIVA
+
+LOGGER = get_logger(__name__)
+
+TABLA_PROGRESO = "pii_migracion_progreso"
+TAREA_POR_DEFECTO = "cifrado_pii"
+_TAMANO_LOTE_POR_DEFECTO = 500
+
+_SQL_CREAR_PROGRESO = f"""
+CREATE TABLE IF NOT EXISTS {TABLA_PROGRESO} (
+    tarea TEXT NOT NULL,
+    tabla TEXT NOT NULL,
+    ultimo_id INTEGER NOT NULL,
+    filas_actualizadas INTEGER NOT NULL,
+    actualizado_en_utc TEXT NOT NULL,
+    PRIMARY KEY (tarea, tabla)
+)
+"""
+
+# Cifrador del proceso worker (se crea una vez en el initializer del pool).
+_CIFRADOR_WORKER: PiiCipher | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ProgresoMigracionPii:
+    tabla: str
+    ultimo_id: int
+    filas_leidas: int
+    filas_actualizadas: int
+    segundos: float
+
+    @property
+    def filas_por_segundo(self) -> float:
+        return self.filas_leidas / self.segundos if self.segundos > 0 else 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class ResumenMigracionPii:
+    filas_leidas: int
+    filas_actualizadas: int
+    segundos: float
+    completada: bool
+
+
+def migrar_pii_en_lotes(
+    con: sqlite3.Connection,
+    cipher: PiiCipher,
+    *,
+    key_material: str | None = None,
+    tarea: str = TAREA_POR_DEFECTO,
+    tamano_lote: int = _TAMANO_LOTE_POR_DEFECTO,
+    workers: int = 0,
+    al_progresar: Callable[[ProgresoMigracionPii], None] | None = None,
+    detener: threading.Event | None = None,
+    desde_cero: bool = False,
+) -> ResumenMigracionPii:
+    """
+    Migra todas las tablas con PII. Con `workers > 1` (y `key_material`) el cifrado se
+    reparte en procesos; si no, se hace en el propio hilo. `desde_cero` descarta las
+    marcas de agua de la tarea y vuelve a recorrer las tablas completas.
+    """
+    if tamano_lote < 1:
+        raise ValueError("tamano_lote debe ser >= 1")
+    with con:
+        con.execute(_SQL_CREAR_PROGRESO)
+        if desde_cero:
+            con.execute(f"DELETE FROM {TABLA_PROGRESO} WHERE tarea = ?", (tarea,))
+    inicio = time.monotonic()
+    pool = _crear_pool(workers, key_material)
+    leidas = actualizadas = 0
+    completada = True
+    try:
+        for tabla, columnas in COLUMNAS_PII.items():
+            migracion = _MigracionTabla(con, tarea=tarea, tabla=tabla, columnas=columnas, tamano_lote=tamano_lote)
+            for lotes, resultados in migracion.lotes_transformados(pool, cipher, max(1, workers)):
+                for filas, updates in zip(lotes, resultados):
+                    leidas += len(filas)
+                    actualizadas += migracion.escribir(filas, updates)
+                    progreso = ProgresoMigracionPii(
+                        tabla=tabla,
+                        ultimo_id=int(filas[-1][0]),
+                        filas_leidas=leidas,
+                        filas_actualizadas=actualizadas,
+                        segundos=time.monotonic() - inicio,
+                    )
+                    _notificar(progreso, al_progresar)
+                if detener is not None and detener.is_set():
+                    completada = False
+                    break
+            if not completada:
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True)
+    return _resumir(
+        tarea,
+        ResumenMigracionPii(
+            filas_leidas=leidas,
+            filas_actualizadas=actualizadas,
+            segundos=time.monotonic() - inicio,
+            completada=completada,
+        ),
+    )
+
+
+class MigracionPiiEnSegundoPlano:
+    """
+    Ejecuta `migrar_pii_en_lotes` en un hilo sobre la conexión que presta `conexion`;
+    `detener` para entre lotes y `al_completar` se llama solo si se recorrió todo.
+    """
+
+    def __init__(
+        self,
+        conexion: Callable[[], AbstractContextManager[sqlite3.Connection]],
+        *,
+        key_material: str,
+        al_completar: Callable[[sqlite3.Connection], None] | None = None,
+        **opciones: Any,
+    ) -> None:
+        self._conexion = conexion
+        self._key_material = key_material
+        self._al_completar = al_completar
+        self._opciones = opciones
+        self._detener = threading.Event()
+        self._hilo: threading.Thread | None = None
+        self._resumen: ResumenMigracionPii | None = None
+        self._error: BaseException | None = None
+
+    @classmethod
+    def para_db(cls, db_path: str | Path, **opciones: Any) -> MigracionPiiEnSegundoPlano:
+        # Imports diferidos: el pool importa db, que importa migraciones_sqlite.
+        from clinicdesk.app.infrastructure.sqlite.migraciones_sqlite import registrar_cifrado_pii_completado
+        from clinicdesk.app.infrastructure.sqlite.pool_conexiones_sqlite import obtener_pool_compartido
+
+        settings = encryption_settings_from_env()
+        if not settings.enabled or not settings.key_material:
+            raise RuntimeError("El cifrado PII no está activado (CLINICDESK_PII_ENCRYPTION_ENABLED).")
+        return cls(
+            obtener_pool_compartido(db_path, perfil=PERFIL_ESCRITURA_MASIVA).conexion,
+            key_material=settings.key_material,
+            al_completar=registrar_cifrado_pii_completado,
+            **opciones,
+        )
+
+    def iniciar(self) -> None:
+        if self._hilo is not None:
+            return
+        self._hilo = threading.Thread(target=self._ejecutar, name="clinicdesk-migracion-pii", daemon=True)
+        self._hilo.start()
+
+    def detener(self) -> None:
+        self._detener.set()
+
+    def esperar(self, timeout: float | None = None) -> ResumenMigracionPii | None:
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+        if self._error is not None:
+            raise self._error
+        return self._resumen
+
+    def _ejecutar(self) -> None:
+        try:
+            with self._conexion() as con:
+                self._resumen = migrar_pii_en_lotes(
+                    con,
+                    PiiCipher(self._key_material),
+                    key_material=self._key_material,
+                    detener=self._detener,
+                    **self._opciones,
+                )
+                if self._resumen.completada and self._al_completar is not None:
+                    self._al_completar(con)
+        except BaseException as exc:  # el hilo no debe morir en silencio: se relanza en esperar()
+            LOGGER.error("pii_migracion_lotes_error", extra={"action": "pii_migracion_lotes_error", "error": str(exc)})
+            self._error = exc
+
+
+class _MigracionTabla:
+    def __init__(
+        self,
+        con: sqlite3.Connection,
+        *,
+        tarea: str,
+        tabla: str,
+        columnas: tuple[str, ...],
+        tamano_lote: int,
+    ) -> None:
+        self._con = con
+        self._tarea = tarea
+        self._tabla = tabla
+        self._columnas = columnas
+        self._tamano_lote = tamano_lote
+        self._sql_leer = f"SELECT id, {', '.join(columnas)} FROM {tabla} WHERE id > ? ORDER BY id LIMIT ?"
+        asignaciones = ", ".join(f"{columna} = ?" for columna in columnas)
+        sin_cambios = " AND ".join(f"{columna} IS ?" for columna in columnas)
+        self._sql_actualizar = f"UPDATE {tabla} SET {asignaciones} WHERE id = ? AND {sin_cambios}"
+        self._ultimo_id, self._actualizadas = self._leer_marca()
+
+    def lotes_transformados(
+        self, pool: Executor | None, cipher: PiiCipher, lotes_por_ronda: int
+    ) -> Iterable[tuple[list[tuple[Any, ...]], list[tuple[Any, ...]]]]:
+        """Lee `lotes_por_ronda` lotes seguidos y los cifra a la vez (en paralelo si hay pool)."""
+        while True:
+            lotes: list[list[tuple[Any, ...]]] = []
+            siguiente = self._ultimo_id
+            for _ in range(lotes_por_ronda):
+                filas = [tuple(fila) for fila in self._con.execute(self._sql_leer, (siguiente, self._tamano_lote))]
+                if not filas:
+                    break
+                lotes.append(filas)
+                siguiente = int(filas[-1][0])
+            if not lotes:
+                return
+            if pool is None:
+                resultados = [_transformar_lote(lote, cipher) for lote in lotes]
+            else:
+                resultados = list(pool.map(_transformar_lote_en_worker, lotes))
+            yield lotes, resultados
+
+    def escribir(self, filas: Sequence[tuple[Any, ...]], updates: Sequence[tuple[Any, ...]]) -> int:
+        """Escribe el lote y su marca de agua; devuelve las filas realmente actualizadas."""
+        ultimo_id = int(filas[-1][0])
+        escritas = 0
+        with self._con:
+            if updates:
+                escritas = self._con.executemany(self._sql_actualizar, updates).rowcount
+            self._con.execute(
+                f"""
+                INSERT INTO {TABLA_PROGRESO} (tarea, tabla, ultimo_id, filas_actualizadas, actualizado_en_utc)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(tarea, tabla) DO UPDATE SET
+                    ultimo_id = excluded.ultimo_id,
+                    filas_actualizadas = excluded.filas_actualizadas,
+                    actualizado_en_utc = excluded.actualizado_en_utc
+                """,
+                (
+                    self._tarea,
+                    self._tabla,
+                    ultimo_id,
+                    self._actualizadas + escritas,
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+        self._ultimo_id = ultimo_id
+        self._actualizadas += escritas
+        return escritas
+
+    def _leer_marca(self) -> tuple[int, int]:
+        fila = self._con.execute(
+            f"SELECT ultimo_id, filas_actualizadas FROM {TABLA_PROGRESO} WHERE tarea = ? AND tabla = ?",
+            (self._tarea, self._tabla),
+        ).fetchone()
+        return (int(fila[0]), int(fila[1])) if fila is not None else (0, 0)
+
+
+def _transformar_lote(filas: Sequence[tuple[Any, ...]], cipher: PiiCipher) -> list[tuple[Any, ...]]:
+    """Parámetros del UPDATE (nuevos valores, id, valores leídos) de las filas que cambian."""
+    updates: list[tuple[Any, ...]] = []
+    for fila in filas:
+        originales = fila[1:]
+        nuevos = tuple(cipher.recifrar(str(valor)) if valor is not None else None for valor in originales)
+        if nuevos != originales:
+            updates.append((*nuevos, fila[0], *originales))
+    return updates
+
+
+def _transformar_lote_en_worker(filas: Sequence[tuple[Any, ...]]) -> list[tuple[Any, ...]]:
+    if _CIFRADOR_WORKER is None:
+        raise RuntimeError("Worker de migración PII sin inicializar.")
+    return _transformar_lote(filas, _CIFRADOR_WORKER)
+
+
+def _inicializar_worker(key_material: str) -> None:
+    global _CIFRADOR_WORKER
+    _CIFRADOR_WORKER = PiiCipher(key_material)
+
+
+def _crear_pool(workers: int, key_material: str | None) -> ProcessPoolExecutor | None:
+    if workers <= 1 or not key_material:
+        return None
+    # spawn: se lanza desde un hilo de un proceso Qt, donde hacer fork no es seguro.
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_inicializar_worker,
+        initargs=(key_material,),
+    )
+
+
+def _notificar(progreso: ProgresoMigracionPii, al_progresar: Callable[[ProgresoMigracionPii], None] | None) -> None:
+    LOGGER.info(
+        "pii_migracion_lotes_progreso",
+        extra={
+            "action": "pii_migracion_lotes_progreso",
+            "tabla": progreso.tabla,
+            "ultimo_id": progreso.ultimo_id,
+            "filas_leidas": progreso.filas_leidas,
+            "filas_actualizadas": progreso.filas_actualizadas,
+            "filas_por_segundo": round(progreso.filas_por_segundo, 1),
+        },
+    )
+    if al_progresar is not None:
+        al_progresar(progreso)
+
+
+def _resumir(tarea: str, resumen: ResumenMigracionPii) -> ResumenMigracionPii:
+    LOGGER.info(
+        "pii_migracion_lotes_fin",
+        extra={
+            "action": "pii_migracion_lotes_fin",
+            "tarea": tarea,
+            "filas_leidas": resumen.filas_leidas,
+            "filas_actualizadas": resumen.filas_actualizadas,
+            "completada": resumen.completada,
+        },
+    )
+    return resumen
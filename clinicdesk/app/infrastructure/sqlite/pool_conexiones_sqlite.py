@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator
+
+from clinicdesk.app.bootstrap_logging import get_logger
+from clinicdesk.app.infrastructure.sqlite.db import get_connection
+from clinicdesk.app.infrastructure.sqlite.pii_crypto import cleanup_connection_pii
+from clinicdesk.app.infrastructure.sqlite.sqlite_connection_config import (
+    PERFIL_INTERACTIVO,
+    PerfilConexionSqlite,
+)
+
+LOGGER = get_logger(__name__)
+
+_MAX_CONEXIONES_POR_DEFECTO = 4
+_TIMEOUT_CHECKOUT_SEGUNDOS = 10.0
+_MAX_INACTIVIDAD_SEGUNDOS = 300.0
+
+
+class PoolConexionesAgotadoError(TimeoutError):
+    """No se liberó ninguna conexión del pool dentro del timeout de checkout."""
+
+
+class PoolConexionesCerradoError(RuntimeError):
+    """El pool ya se cerró y no entrega más conexiones."""
+
+
+@dataclass(frozen=True, slots=True)
+class EstadisticasPoolSqlite:
+    perfil: str
+    max_conexiones: int
+    abiertas: int
+    en_uso: int
+    inactivas: int
+    creadas: int
+    reutilizadas: int
+    descartadas_por_salud: int
+    expulsadas_por_inactividad: int
+
+
+@dataclass(slots=True)
+class _ConexionInactiva:
+    conexion: sqlite3.Connection
+    liberada_en: float
+
+
+class PoolConexionesSqlite:
+    """
+    Pool acotado de conexiones SQLite configuradas.
+
+    - Cada conexión se abre con `get_connection` y su perfil de PRAGMAs una sola vez.
+    - El checkout bloquea hasta `timeout_checkout_segundos` si se alcanzó `max_conexiones`.
+    - En cada checkout se verifica la salud de la conexión reutilizada.
+    - Las conexiones inactivas más de `max_inactividad_segundos` se cierran.
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        *,
+        perfil: PerfilConexionSqlite = PERFIL_INTERACTIVO,
+        max_conexiones: int = _MAX_CONEXIONES_POR_DEFECTO,
+        timeout_checkout_segundos: float = _TIMEOUT_CHECKOUT_SEGUNDOS,
+        max_inactividad_segundos: float = _MAX_INACTIVIDAD_SEGUNDOS,
+        reloj: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_conexiones < 1:
+            raise ValueError("max_conexiones debe ser >= 1")
+        self._db_path = Path(db_path)
+        self._perfil = perfil
+        self._max_conexiones = max_conexiones
+        self._timeout_checkout = timeout_checkout_segundos
+        self._max_inactividad = max_inactividad_segundos
+        self._reloj = reloj
+        self._condicion = threading.Condition()
+        self._inactivas: list[_ConexionInactiva] = []
+        self._en_uso: set[int] = set()
+        self._abiertas = 0
+        self._cerrado = False
+        self._creadas = 0
+        self._reutilizadas = 0
+        self._descartadas_por_salud = 0
+        self._expulsadas_por_inactividad = 0
+
+    @property
+    def perfil(self) -> PerfilConexionSqlite:
+        return self._perfil
+
+    def adquirir(self) -> sqlite3.Connection:
+        limite = self._reloj() + self._timeout_checkout
+        while True:
+            expulsadas: list[sqlite3.Connection] = []
+            try:
+                with self._condicion:
+                    candidata = self._reservar_locked(limite, expulsadas)
+            finally:
+                _cerrar_conexiones(expulsadas)
+            if candidata is None:
+                return self._marcar_en_uso(self._abrir_conexion())
+            # El health check es I/O: se hace fuera del lock con el hueco ya reservado.
+            if _conexion_sana(candidata):
+                with self._condicion:
+                    self._reutilizadas += 1
+                return self._marcar_en_uso(candidata)
+            with self._condicion:
+                self._abiertas -= 1
+                self._descartadas_por_salud += 1
+                self._condicion.notify()
+            _cerrar_conexion(candidata)
+
+    def liberar(self, conexion: sqlite3.Connection) -> None:
+        with self._condicion:
+            if id(conexion) not in self._en_uso:
+                raise ValueError("La conexión no pertenece a este pool o ya fue liberada.")
+            self._en_uso.discard(id(conexion))
+            cerrado = self._cerrado
+        reutilizable = not cerrado and _restablecer_conexion(conexion)
+        with self._condicion:
+            reutilizable = reutilizable and not self._cerrado
+            if reutilizable:
+                self._inactivas.append(_ConexionInactiva(conexion, self._reloj()))
+            else:
+                self._abiertas -= 1
+            self._condicion.notify()
+        if not reutilizable:
+            _cerrar_conexion(conexion)
+
+    @contextmanager
+    def conexion(self) -> Iterator[sqlite3.Connection]:
+        conexion = self.adquirir()
+        try:
+            yield conexion
+        finally:
+            self.liberar(conexion)
+
+    def purgar_inactivas(self) -> int:
+        with self._condicion:
+            expulsadas = self._expulsar_inactivas_locked()
+        _cerrar_conexiones(expulsadas)
+        return len(expulsadas)
+
+    def estadisticas(self) -> EstadisticasPoolSqlite:
+        with self._condicion:
+            return EstadisticasPoolSqlite(
+                perfil=self._perfil.nombre,
+                max_conexiones=self._max_conexiones,
+                abiertas=self._abiertas,
+                en_uso=len(self._en_uso),
+                inactivas=len(self._inactivas),
+                creadas=self._creadas,
+                reutilizadas=self._reutilizadas,
+                descartadas_por_salud=self._descartadas_por_salud,
+                expulsadas_por_inactividad=self._expulsadas_por_inactividad,
+            )
+
+    def cerrar(self) -> None:
+        """Cierra las conexiones inactivas; las que estén en uso se cierran al liberarse."""
+        with self._condicion:
+            self._cerrado = True
+            inactivas = [item.conexion for item in self._inactivas]
+            self._inactivas.clear()
+            self._abiertas -= len(inactivas)
+            self._condicion.notify_all()
+        _cerrar_conexiones(inactivas)
+
+    def _abrir_conexion(self) -> sqlite3.Connection:
+        try:
+            conexion = get_connection(self._db_path, perfil=self._perfil, check_same_thread=False)
+        except Exception:
+            with self._condicion:
+                self._abiertas -= 1
+                self._condicion.notify()
+            raise
+        with self._condicion:
+            self._creadas += 1
+        LOGGER.debug(
+            "sqlite_pool_conexion_creada",
+            extra={
+                "action": "sqlite_pool_conexion_creada",
+                "db_path": self._db_path.as_posix(),
+                "perfil": self._perfil.nombre,
+                "thread_name": threading.current_thread().name,
+            },
+        )
+        return conexion
+
+    def _reservar_locked(self, limite: float, expulsadas: list[sqlite3.Connection]) -> sqlite3.Connection | None:
+        """Reserva un hueco: devuelve una inactiva por verificar o None si toca abrir una nueva."""
+        while True:
+            if self._cerrado:
+                raise PoolConexionesCerradoError(self._db_path.as_posix())
+            expulsadas.extend(self._expulsar_inactivas_locked())
+            if self._inactivas:
+                return self._inactivas.pop().conexion
+            if self._abiertas < self._max_conexiones:
+                self._abiertas += 1
+                return None
+            restante = limite - self._reloj()
+            if restante <= 0:
+                raise PoolConexionesAgotadoError(f"Pool SQLite agotado ({self._max_conexiones} conexiones en uso)")
+            self._condicion.wait(restante)
+
+    def _marcar_en_uso(self, conexion: sqlite3.Connection) -> sqlite3.Connection:
+        with self._condicion:
+            self._en_uso.add(id(conexion))
+        return conexion
+
+    def _expulsar_inactivas_locked(self) -> list[sqlite3.Connection]:
+        """Saca del pool las inactivas caducadas; quien llama las cierra fuera del lock."""
+        if not self._inactivas:
+            return []
+        umbral = self._reloj() - self._max_inactividad
+        expulsadas = [item.conexion for item in self._inactivas if item.liberada_en < umbral]
+        self._inactivas = [item for item in self._inactivas if item.liberada_en >= umbral]
+        self._abiertas -= len(expulsadas)
+        self._expulsadas_por_inactividad += len(expulsadas)
+        return expulsadas
+
+
+_POOLS_COMPARTIDOS: dict[tuple[str, str], PoolConexionesSqlite] = {}
+_POOLS_COMPARTIDOS_LOCK = threading.Lock()
+
+
+def obtener_pool_compartido(
+    db_path: str | Path,
+    *,
+    perfil: PerfilConexionSqlite = PERFIL_INTERACTIVO,
+) -> PoolConexionesSqlite:
+    """Devuelve el pool de proceso para (db_path, perfil), creándolo la primera vez."""
+    clave = (Path(db_path).expanduser().resolve().as_posix(), perfil.nombre)
+    with _POOLS_COMPARTIDOS_LOCK:
+        pool = _POOLS_COMPARTIDOS.get(clave)
+        if pool is None:
+            pool = PoolConexionesSqlite(db_path, perfil=perfil)
+            _POOLS_COMPARTIDOS[clave] = pool
+        return pool
+
+
+def cerrar_pools_compartidos() -> None:
+    with _POOLS_COMPARTIDOS_LOCK:
+        pools = list(_POOLS_COMPARTIDOS.values())
+        _POOLS_COMPARTIDOS.clear()
+    for pool in pools:
+        pool.cerrar()
+
+
+def _conexion_sana(conexion: sqlite3.Connection) -> bool:
+    try:
+        conexion.execute("SELECT 1").fetchone()
+    except sqlite3.Error:
+        return False
+    return True
+
+
+def _restablecer_conexion(conexion: sqlite3.Connection) -> bool:
+    try:
+        if conexion.in_transaction:
+            conexion.rollback()
+    except sqlite3.Error:
+        return False
+    return True
+
+
+def _cerrar_conexiones(conexiones: list[sqlite3.Connection]) -> None:
+    for conexion in conexiones:
+        _cerrar_conexion(conexion)
+
+
+def _cerrar_conexion(conexion: sqlite3.Connection) -> None:
+    cleanup_connection_pii(conexion)
+    try:
+        conexion.close()
+    except sqlite3.Error:
+        LOGGER.debug("sqlite_pool_cierre_fallido", extra={"action": "sqlite_pool_cierre_fallido"})
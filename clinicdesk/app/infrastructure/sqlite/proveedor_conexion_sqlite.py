@@ -6,6 +6,10 @@ import threading
 
 from clinicdesk.app.bootstrap_logging import get_logger
 from clinicdesk.app.infrastructure.sqlite.db import get_connection
+from clinicdesk.app.infrastructure.sqlite.sqlite_connection_config import (
+    PERFIL_INTERACTIVO,
+    PerfilConexionSqlite,
+)
 
 
 LOGGER = get_logger(__name__)
@@ -14,20 +18,22 @@ LOGGER = get_logger(__name__)
 class ProveedorConexionSqlitePorHilo:
     """Entrega una conexión SQLite por hilo para evitar uso cruzado entre threads."""
 
-    def __init__(self, db_path: str | Path) -> None:
+    def __init__(self, db_path: str | Path, *, perfil: PerfilConexionSqlite = PERFIL_INTERACTIVO) -> None:
         self._db_path = Path(db_path)
+        self._perfil = perfil
         self._local = threading.local()
 
     def obtener(self) -> sqlite3.Connection:
         conexion = getattr(self._local, "conexion", None)
         if conexion is None:
-            conexion = get_connection(self._db_path)
+            conexion = get_connection(self._db_path, perfil=self._perfil)
             self._local.conexion = conexion
             LOGGER.debug(
                 "sqlite_conexion_hilo_creada",
                 extra={
                     "action": "sqlite_conexion_hilo_creada",
                     "db_path": self._db_path.as_posix(),
+                    "perfil": self._perfil.nombre,
                     "thread_name": threading.current_thread().name,
                     "thread_id": threading.get_ident(),
                 },
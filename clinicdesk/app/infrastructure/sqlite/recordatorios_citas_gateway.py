@@ -97,10 +97,13 @@ class RecordatoriosCitasSqliteGateway:
             """
 
     def upsert_recordatorio_cita(self, cita_id: int, canal: str, estado: str, now_utc: str) -> None:
-        self._obtener_conexion().execute(
-            _SQL_UPSERT_RECORDATORIO,
-            (cita_id, canal, estado, now_utc, now_utc),
-        )
+        # Los triggers de recordatorios_citas actualizan el resumen por cita en esta misma transacción.
+        con = self._obtener_conexion()
+        with con:
+            con.execute(
+                _SQL_UPSERT_RECORDATORIO,
+                (cita_id, canal, estado, now_utc, now_utc),
+            )
 
     def obtener_estado_recordatorio(self, cita_id: int) -> tuple[EstadoRecordatorioDTO, ...]:
         rows = (
@@ -177,7 +180,9 @@ class RecordatoriosCitasSqliteGateway:
         if not items:
             return 0
         params = [(cita_id, canal, estado, now_utc, now_utc) for cita_id, canal, estado, now_utc in items]
-        cursor = self._obtener_conexion().executemany(_SQL_UPSERT_RECORDATORIO, params)
+        con = self._obtener_conexion()
+        with con:
+            cursor = con.executemany(_SQL_UPSERT_RECORDATORIO, params)
         return cursor.rowcount if cursor.rowcount != -1 else len(items)
 
     def _obtener_conexion(self) -> sqlite3.Connection:
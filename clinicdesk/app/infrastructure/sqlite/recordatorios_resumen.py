@@ -0,0 +1,107 @@
+"""
+Resumen materializado de recordatorios por cita.
+
+Confirmaciones y el listado de citas agregaban `recordatorios_citas` completa en cada
+consulta (una vez para las filas y otra para el total). `recordatorios_citas_resumen`
+guarda una fila por cita con el estado global, el último canal/estado, los conteos por
+estado y el último envío, de modo que las consultas solo hacen un lookup por clave primaria.
+
+El resumen se mantiene con triggers sobre `recordatorios_citas`: cualquier escritura
+(gateway, lotes, seed demo) lo actualiza dentro de la misma transacción. Solo se recalcula
+la cita afectada, que tiene como mucho una fila por canal.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+from clinicdesk.app.bootstrap_logging import get_logger
+
+LOGGER = get_logger(__name__)
+
+TABLA_RESUMEN_RECORDATORIOS = "recordatorios_citas_resumen"
+
+_SQL_CREAR_TABLA = f"""
+CREATE TABLE IF NOT EXISTS {TABLA_RESUMEN_RECORDATORIOS} (
+    cita_id INTEGER PRIMARY KEY,
+    estado_global TEXT NOT NULL,
+    ultimo_canal TEXT NULL,
+    ultimo_estado TEXT NULL,
+    total_preparados INTEGER NOT NULL DEFAULT 0,
+    total_enviados INTEGER NOT NULL DEFAULT 0,
+    ultimo_envio_utc TEXT NULL,
+    actualizado_en_utc TEXT NOT NULL,
+    FOREIGN KEY (cita_id) REFERENCES citas(id) ON DELETE CASCADE
+)
+"""
+
+_COLUMNAS_RESUMEN = (
+    "cita_id, estado_global, ultimo_canal, ultimo_estado, total_preparados, total_enviados, "
+    "ultimo_envio_utc, actualizado_en_utc"
+)
+
+
+def _sql_select_resumen(filtro: str) -> str:
+    # Sin CTE: SQLite no admite WITH dentro del cuerpo de un trigger.
+    ultimo = (
+        "(SELECT u.{col} FROM recordatorios_citas u WHERE u.cita_id = rc.cita_id "
+        "ORDER BY u.updated_at_utc DESC, u.id DESC LIMIT 1)"
+    )
+    return (
+        "SELECT rc.cita_id, "
+        "CASE WHEN sum(rc.estado = 'ENVIADO') > 0 THEN 'ENVIADO' "
+        "WHEN sum(rc.estado = 'PREPARADO') > 0 THEN 'PREPARADO' "
+        "ELSE 'SIN_PREPARAR' END, "
+        f"{ultimo.format(col='canal')}, {ultimo.format(col='estado')}, "
+        "sum(rc.estado = 'PREPARADO'), sum(rc.estado = 'ENVIADO'), "
+        "max(CASE WHEN rc.estado = 'ENVIADO' THEN rc.updated_at_utc END), "
+        "max(rc.updated_at_utc) "
+        f"FROM recordatorios_citas rc WHERE {filtro} GROUP BY rc.cita_id"
+    )
+
+
+def _sql_refrescar_cita(referencia: str) -> str:
+    return (
+        f"DELETE FROM {TABLA_RESUMEN_RECORDATORIOS} WHERE cita_id = {referencia}; "
+        f"INSERT INTO {TABLA_RESUMEN_RECORDATORIOS} ({_COLUMNAS_RESUMEN}) "
+        f"{_sql_select_resumen(f'rc.cita_id = {referencia}')};"
+    )
+
+
+_TRIGGERS_RESUMEN: tuple[tuple[str, str], ...] = (
+    ("trg_recordatorios_resumen_ai", f"AFTER INSERT ON recordatorios_citas BEGIN {_sql_refrescar_cita('NEW.cita_id')}"),
+    ("trg_recordatorios_resumen_ad", f"AFTER DELETE ON recordatorios_citas BEGIN {_sql_refrescar_cita('OLD.cita_id')}"),
+    (
+        "trg_recordatorios_resumen_au",
+        "AFTER UPDATE OF cita_id, canal, estado, updated_at_utc ON recordatorios_citas BEGIN "
+        f"{_sql_refrescar_cita('OLD.cita_id')} {_sql_refrescar_cita('NEW.cita_id')}",
+    ),
+)
+
+
+def asegurar_resumen_recordatorios(con: sqlite3.Connection) -> None:
+    """Crea tabla y triggers si faltan (idempotente); no recalcula filas existentes."""
+    con.execute(_SQL_CREAR_TABLA)
+    for nombre, cuerpo in _TRIGGERS_RESUMEN:
+        con.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} {cuerpo} END")
+
+
+def reconstruir_resumen_recordatorios(con: sqlite3.Connection) -> int:
+    """Recalcula el resumen completo desde `recordatorios_citas` en una transacción."""
+    asegurar_resumen_recordatorios(con)
+    with con:
+        con.execute(f"DELETE FROM {TABLA_RESUMEN_RECORDATORIOS}")
+        con.execute(f"INSERT INTO {TABLA_RESUMEN_RECORDATORIOS} ({_COLUMNAS_RESUMEN}) {_sql_select_resumen('1 = 1')}")
+    total = int(con.execute(f"SELECT count(1) FROM {TABLA_RESUMEN_RECORDATORIOS}").fetchone()[0])
+    LOGGER.info(
+        "recordatorios_resumen_reconstruido",
+        extra={"action": "recordatorios_resumen_reconstruido", "citas": total},
+    )
+    return total
+
+
+__all__ = [
+    "TABLA_RESUMEN_RECORDATORIOS",
+    "asegurar_resumen_recordatorios",
+    "reconstruir_resumen_recordatorios",
+]
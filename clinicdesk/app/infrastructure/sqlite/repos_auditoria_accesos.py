@@ -5,18 +5,41 @@ import sqlite3
 from dataclasses import dataclass
 
 from clinicdesk.app.application.auditoria_acceso import EventoAuditoriaAcceso
-from clinicdesk.app.infrastructure.sqlite.auditoria_integridad import (
-    ensure_auditoria_integridad_schema,
-    siguiente_hash_acceso,
+from clinicdesk.app.infrastructure.sqlite.auditoria_integridad import ensure_auditoria_integridad_schema
+from clinicdesk.app.infrastructure.sqlite.escritor_eventos_sqlite import (
+    DestinoEventosEncadenados,
+    EscritorEventosSqliteEnLote,
+    registrar_encadenado,
 )
 from clinicdesk.app.infrastructure.sqlite.persistencia_segura_auditoria_telemetria import (
     sanear_evento_auditoria_para_persistencia,
 )
 
 
+_DESTINO_AUDITORIA_ACCESOS = DestinoEventosEncadenados(
+    tabla="auditoria_accesos",
+    sql_insert="""
+    INSERT INTO auditoria_accesos(
+        timestamp_utc,
+        usuario,
+        modo_demo,
+        accion,
+        entidad_tipo,
+        entidad_id,
+        metadata_json,
+        created_at_utc,
+        prev_hash,
+        entry_hash
+    )
+    VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+)
+
+
 @dataclass(slots=True)
 class RepositorioAuditoriaAccesoSqlite:
     connection: sqlite3.Connection
+    escritor: EscritorEventosSqliteEnLote | None = None
 
     def __post_init__(self) -> None:
         ensure_auditoria_integridad_schema(self.connection)
@@ -38,34 +61,14 @@ class RepositorioAuditoriaAccesoSqlite:
             "metadata_json": metadata_json,
             "created_at_utc": evento.timestamp_utc,
         }
-        prev_hash, entry_hash = siguiente_hash_acceso(self.connection, payload)
-        self.connection.execute(
-            """
-            INSERT INTO auditoria_accesos(
-                timestamp_utc,
-                usuario,
-                modo_demo,
-                accion,
-                entidad_tipo,
-                entidad_id,
-                metadata_json,
-                created_at_utc,
-                prev_hash,
-                entry_hash
-            )
-            VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                evento.timestamp_utc,
-                usuario_saneado,
-                1 if evento.modo_demo else 0,
-                evento.accion.value,
-                evento.entidad_tipo.value,
-                entidad_id_saneado,
-                metadata_json,
-                evento.timestamp_utc,
-                prev_hash,
-                entry_hash,
-            ),
+        valores = (
+            evento.timestamp_utc,
+            usuario_saneado,
+            1 if evento.modo_demo else 0,
+            evento.accion.value,
+            evento.entidad_tipo.value,
+            entidad_id_saneado,
+            metadata_json,
+            evento.timestamp_utc,
         )
-        self.connection.commit()
+        registrar_encadenado(self.connection, self.escritor, _DESTINO_AUDITORIA_ACCESOS, payload, valores)
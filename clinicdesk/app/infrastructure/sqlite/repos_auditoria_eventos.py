@@ -5,15 +5,37 @@ import sqlite3
 from dataclasses import dataclass
 
 from clinicdesk.app.application.auditoria.audit_service import AuditEvent
-from clinicdesk.app.infrastructure.sqlite.auditoria_integridad import (
-    ensure_auditoria_integridad_schema,
-    siguiente_hash_evento,
+from clinicdesk.app.infrastructure.sqlite.auditoria_integridad import ensure_auditoria_integridad_schema
+from clinicdesk.app.infrastructure.sqlite.escritor_eventos_sqlite import (
+    DestinoEventosEncadenados,
+    EscritorEventosSqliteEnLote,
+    registrar_encadenado,
+)
+
+
+_DESTINO_AUDITORIA_EVENTOS = DestinoEventosEncadenados(
+    tabla="auditoria_eventos",
+    sql_insert="""
+    INSERT INTO auditoria_eventos(
+        timestamp_utc,
+        action,
+        outcome,
+        actor_username,
+        actor_role,
+        correlation_id,
+        metadata_json,
+        prev_hash,
+        entry_hash
+    )
+    VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
 )
 
 
 @dataclass(slots=True)
 class RepositorioAuditoriaEventosSqlite:
     connection: sqlite3.Connection
+    escritor: EscritorEventosSqliteEnLote | None = None
 
     def __post_init__(self) -> None:
         ensure_auditoria_integridad_schema(self.connection)
@@ -29,32 +51,13 @@ class RepositorioAuditoriaEventosSqlite:
             "correlation_id": event.correlation_id,
             "metadata_json": metadata_json,
         }
-        prev_hash, entry_hash = siguiente_hash_evento(self.connection, payload)
-        self.connection.execute(
-            """
-            INSERT INTO auditoria_eventos(
-                timestamp_utc,
-                action,
-                outcome,
-                actor_username,
-                actor_role,
-                correlation_id,
-                metadata_json,
-                prev_hash,
-                entry_hash
-            )
-            VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                event.timestamp_utc,
-                event.action,
-                event.outcome,
-                event.actor_username,
-                event.actor_role,
-                event.correlation_id,
-                metadata_json,
-                prev_hash,
-                entry_hash,
-            ),
+        valores = (
+            event.timestamp_utc,
+            event.action,
+            event.outcome,
+            event.actor_username,
+            event.actor_role,
+            event.correlation_id,
+            metadata_json,
         )
-        self.connection.commit()
+        registrar_encadenado(self.connection, self.escritor, _DESTINO_AUDITORIA_EVENTOS, payload, valores)
@@ -25,6 +25,7 @@ from clinicdesk.app.domain.enums import EstadoCita
 from clinicdesk.app.domain.modelos import Cita
 from clinicdesk.app.domain.exceptions import ValidationError
 from clinicdesk.app.infrastructure.sqlite.id_utils import require_lastrowid, require_row_id
+from clinicdesk.app.infrastructure.sqlite.unidad_trabajo_sqlite import confirmar_si_autonoma
 from clinicdesk.app.infrastructure.sqlite.sqlite_datetime_codecs import (
     deserialize_datetime,
     serialize_datetime,
@@ -86,7 +87,7 @@ class CitasRepository:
                 cita.estado.value,
             ),
         )
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
         return require_lastrowid(cur, context="CitasRepository.create")
 
     def update(self, cita: Cita) -> None:
@@ -123,14 +124,14 @@ class CitasRepository:
                 cita.id,
             ),
         )
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
 
     def delete(self, cita_id: int) -> None:
         """
         Borrado lógico: marca la cita como inactiva.
         """
         self._con.execute("UPDATE citas SET activo = 0 WHERE id = ?", (cita_id,))
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
 
     def get_by_id(self, cita_id: int) -> Optional[Cita]:
         """
@@ -23,6 +23,7 @@ from typing import List, Optional
 
 from clinicdesk.app.domain.exceptions import ValidationError
 from clinicdesk.app.infrastructure.sqlite.id_utils import require_lastrowid, require_row_id
+from clinicdesk.app.infrastructure.sqlite.unidad_trabajo_sqlite import confirmar_si_autonoma
 
 
 logger = logging.getLogger(__name__)
@@ -118,7 +119,7 @@ class DispensacionesRepository:
                 dispensacion.notas_incidencia,
             ),
         )
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
         return require_lastrowid(cur, context="DispensacionesRepository.create")
 
     def get_by_id(self, dispensacion_id: int) -> Optional[Dispensacion]:
@@ -137,7 +138,7 @@ class DispensacionesRepository:
         Borrado lógico: marca la dispensación como inactiva.
         """
         self._con.execute("UPDATE dispensaciones SET activo = 0 WHERE id = ?", (dispensacion_id,))
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
 
     # --------------------------------------------------------------
     # Consultas de auditoría
@@ -17,15 +17,33 @@ from __future__ import annotations
 import logging
 import sqlite3
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 
 from clinicdesk.app.common.search_utils import like_value, normalize_search_text
 from clinicdesk.app.domain.exceptions import ValidationError
 from clinicdesk.app.infrastructure.sqlite.id_utils import require_lastrowid, require_row_id
+from clinicdesk.app.infrastructure.sqlite.unidad_trabajo_sqlite import confirmar_si_autonoma
 
 
 logger = logging.getLogger(__name__)
 
+# Ids por sentencia en consultas por lote (por debajo del límite clásico de 999 variables).
+_TAMANO_LOTE_IDS = 900
+
+_SQL_RESUMEN_POR_CITAS = """
+SELECT cita_id, total, tipo
+FROM (
+    SELECT
+        cita_id,
+        tipo,
+        COUNT(*) OVER (PARTITION BY cita_id) AS total,
+        ROW_NUMBER() OVER (PARTITION BY cita_id ORDER BY fecha_hora DESC, id DESC) AS orden
+    FROM incidencias
+    WHERE cita_id IN ({marcadores}) AND activo = 1
+)
+WHERE orden = 1
+"""
+
 
 # ---------------------------------------------------------------------
 # Modelo ligero de incidencia
@@ -77,6 +95,14 @@ class Incidencia:
             raise ValidationError("nota_override obligatoria.")
 
 
+@dataclass(frozen=True, slots=True)
+class ResumenIncidenciasCita:
+    """Incidencias activas de una cita: cuántas hay y el tipo de la más reciente."""
+
+    total: int
+    ultimo_tipo: str
+
+
 # ---------------------------------------------------------------------
 # Repositorio
 # ---------------------------------------------------------------------
@@ -126,7 +152,7 @@ class IncidenciasRepository:
                 incidencia.nota_override,
             ),
         )
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
         return require_lastrowid(cur, context="IncidenciasRepository.create")
 
     def update(self, incidencia: Incidencia) -> None:
@@ -171,7 +197,7 @@ class IncidenciasRepository:
                 incidencia.id,
             ),
         )
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
 
     def update_state(self, incidencia_id: int, estado: str) -> None:
         """
@@ -186,14 +212,14 @@ class IncidenciasRepository:
             "UPDATE incidencias SET estado = ? WHERE id = ?",
             (estado, incidencia_id),
         )
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
 
     def delete(self, incidencia_id: int) -> None:
         """
         Borrado lógico: marca la incidencia como inactiva.
         """
         self._con.execute("UPDATE incidencias SET activo = 0 WHERE id = ?", (incidencia_id,))
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
 
     def get_by_id(self, incidencia_id: int) -> Optional[Incidencia]:
         """
@@ -269,6 +295,24 @@ class IncidenciasRepository:
             return []
         return [self._row_to_model(r) for r in rows]
 
+    def resumen_por_citas(self, cita_ids: Sequence[int]) -> Dict[int, ResumenIncidenciasCita]:
+        """
+        Resume en una consulta por lote las incidencias activas de varias citas.
+
+        Las citas sin incidencias no aparecen en el resultado.
+        """
+        resumen: Dict[int, ResumenIncidenciasCita] = {}
+        for lote in _lotes_ids(cita_ids):
+            sql = _SQL_RESUMEN_POR_CITAS.format(marcadores=", ".join("?" for _ in lote))
+            try:
+                rows = self._con.execute(sql, lote).fetchall()
+            except sqlite3.Error as exc:
+                logger.error("Error SQL en IncidenciasRepository.resumen_por_citas: %s", exc)
+                return {}
+            for row in rows:
+                resumen[int(row["cita_id"])] = ResumenIncidenciasCita(total=int(row["total"]), ultimo_tipo=row["tipo"])
+        return resumen
+
     # --------------------------------------------------------------
     # Interno
     # --------------------------------------------------------------
@@ -294,6 +338,11 @@ class IncidenciasRepository:
         )
 
 
+def _lotes_ids(ids: Sequence[int]) -> List[List[int]]:
+    unicos = sorted(set(ids))
+    return [unicos[inicio : inicio + _TAMANO_LOTE_IDS] for inicio in range(0, len(unicos), _TAMANO_LOTE_IDS)]
+
+
 def _build_search_query(
     *,
     tipo: Optional[str],
@@ -17,9 +17,11 @@ from __future__ import annotations
 
 import logging
 import sqlite3
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from clinicdesk.app.infrastructure.sqlite.id_utils import require_lastrowid
+from clinicdesk.app.infrastructure.sqlite.lectura_por_lotes import TAMANO_LOTE_LECTURA, iterar_filas
+from clinicdesk.app.infrastructure.sqlite.unidad_trabajo_sqlite import confirmar_si_autonoma
 
 from clinicdesk.app.domain.modelos import Material
 from clinicdesk.app.common.search_utils import like_value, normalize_search_text
@@ -69,7 +71,7 @@ class MaterialesRepository:
                 int(material.activo),
             ),
         )
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
         return require_lastrowid(cur, context="MaterialesRepository.create")
 
     def update(self, material: Material) -> None:
@@ -98,7 +100,7 @@ class MaterialesRepository:
                 material.id,
             ),
         )
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
 
     def delete(self, material_id: int) -> None:
         """
@@ -108,7 +110,7 @@ class MaterialesRepository:
             "UPDATE materiales SET activo = 0 WHERE id = ?",
             (material_id,),
         )
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
 
     def get_by_id(self, material_id: int) -> Optional[Material]:
         """
@@ -144,6 +146,14 @@ class MaterialesRepository:
             return []
         return [self._row_to_model(r) for r in rows]
 
+    def iterar_todos(
+        self, *, solo_activos: bool = True, tamano_lote: int = TAMANO_LOTE_LECTURA
+    ) -> Iterator[List[Material]]:
+        """Como `list_all`, pero en lotes de `fetchmany` (exportaciones sin cargar la tabla entera)."""
+        sql = "SELECT * FROM materiales" + (" WHERE activo = 1" if solo_activos else "") + " ORDER BY nombre"
+        for filas in iterar_filas(self._con, sql, tamano_lote=tamano_lote):
+            yield [self._row_to_model(row) for row in filas]
+
     def search(
         self,
         *,
@@ -212,7 +222,26 @@ class MaterialesRepository:
             """,
             (nueva_cantidad, material_id),
         )
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
+
+    def aplicar_delta_stock(self, material_id: int, delta: int) -> Optional[int]:
+        """
+        Suma `delta` al stock en una única sentencia condicional.
+
+        Devuelve el stock resultante, o None si el registro no existe, está inactivo
+        o el stock quedaría negativo (no se modifica nada).
+        """
+        row = self._con.execute(
+            """
+            UPDATE materiales
+            SET cantidad_en_almacen = cantidad_en_almacen + ?
+            WHERE id = ? AND activo = 1 AND cantidad_en_almacen + ? >= 0
+            RETURNING cantidad_en_almacen
+            """,
+            (delta, material_id, delta),
+        ).fetchone()
+        confirmar_si_autonoma(self._con)
+        return int(row[0]) if row is not None else None
 
     # --------------------------------------------------------------
     # Interno
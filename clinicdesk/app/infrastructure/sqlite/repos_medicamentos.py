@@ -17,9 +17,11 @@ from __future__ import annotations
 
 import logging
 import sqlite3
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from clinicdesk.app.infrastructure.sqlite.id_utils import require_lastrowid, require_row_id
+from clinicdesk.app.infrastructure.sqlite.lectura_por_lotes import TAMANO_LOTE_LECTURA, iterar_filas
+from clinicdesk.app.infrastructure.sqlite.unidad_trabajo_sqlite import confirmar_si_autonoma
 
 from clinicdesk.app.domain.modelos import Medicamento
 from clinicdesk.app.common.search_utils import like_value, normalize_search_text
@@ -69,7 +71,7 @@ class MedicamentosRepository:
                 int(medicamento.activo),
             ),
         )
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
         return require_lastrowid(cur, context="MedicamentosRepository.create")
 
     def update(self, medicamento: Medicamento) -> None:
@@ -98,7 +100,7 @@ class MedicamentosRepository:
                 medicamento.id,
             ),
         )
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
 
     def delete(self, medicamento_id: int) -> None:
         """
@@ -108,7 +110,7 @@ class MedicamentosRepository:
             "UPDATE medicamentos SET activo = 0 WHERE id = ?",
             (medicamento_id,),
         )
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
 
     def get_by_id(self, medicamento_id: int) -> Optional[Medicamento]:
         """
@@ -164,6 +166,15 @@ class MedicamentosRepository:
             return []
         return [self._row_to_model(r) for r in rows]
 
+    def iterar_todos(
+        self, *, solo_activos: bool = True, tamano_lote: int = TAMANO_LOTE_LECTURA
+    ) -> Iterator[List[Medicamento]]:
+        """Como `list_all`, pero en lotes de `fetchmany` (exportaciones sin cargar la tabla entera)."""
+        sql = "SELECT * FROM medicamentos" + (" WHERE activo = 1" if solo_activos else "")
+        sql += " ORDER BY nombre_comercial"
+        for filas in iterar_filas(self._con, sql, tamano_lote=tamano_lote):
+            yield [self._row_to_model(row) for row in filas]
+
     def search(
         self,
         *,
@@ -227,7 +238,26 @@ class MedicamentosRepository:
             """,
             (nueva_cantidad, medicamento_id),
         )
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
+
+    def aplicar_delta_stock(self, medicamento_id: int, delta: int) -> Optional[int]:
+        """
+        Suma `delta` al stock en una única sentencia condicional.
+
+        Devuelve el stock resultante, o None si el registro no existe, está inactivo
+        o el stock quedaría negativo (no se modifica nada).
+        """
+        row = self._con.execute(
+            """
+            UPDATE medicamentos
+            SET cantidad_en_almacen = cantidad_en_almacen + ?
+            WHERE id = ? AND activo = 1 AND cantidad_en_almacen + ? >= 0
+            RETURNING cantidad_en_almacen
+            """,
+            (delta, medicamento_id, delta),
+        ).fetchone()
+        confirmar_si_autonoma(self._con)
+        return int(row[0]) if row is not None else None
 
     # --------------------------------------------------------------
     # Interno
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import logging
 import sqlite3
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from clinicdesk.app.common.search_utils import like_value, normalize_search_text
 from clinicdesk.app.domain.enums import TipoDocumento
@@ -13,6 +13,8 @@ from clinicdesk.app.infrastructure.sqlite.date_utils import format_iso_date, par
 from clinicdesk.app.infrastructure.sqlite.id_utils import require_lastrowid, require_row_id
 from clinicdesk.app.infrastructure.sqlite.medicos_field_protection import MedicosFieldProtection
 from clinicdesk.app.infrastructure.sqlite.pii_crypto import get_connection_pii_cipher
+from clinicdesk.app.infrastructure.sqlite.lectura_por_lotes import TAMANO_LOTE_LECTURA, iterar_filas
+from clinicdesk.app.infrastructure.sqlite.unidad_trabajo_sqlite import confirmar_si_autonoma
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +29,7 @@ class MedicosRepository:
         medico.validar()
         payload = _payload_for_write(medico, self._field_protection, self._encrypt)
         cur = self._con.execute(_insert_sql(self._field_protection.enabled), payload)
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
         return require_lastrowid(cur, context="MedicosRepository.create")
 
     def update(self, medico: Medico) -> None:
@@ -36,11 +38,11 @@ class MedicosRepository:
         medico.validar()
         payload = _payload_for_write(medico, self._field_protection, self._encrypt)
         self._con.execute(_update_sql(self._field_protection.enabled), (*payload, medico.id))
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
 
     def delete(self, medico_id: int) -> None:
         self._con.execute("UPDATE medicos SET activo = 0 WHERE id = ?", (medico_id,))
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
 
     def get_by_id(self, medico_id: int) -> Optional[Medico]:
         row = self._con.execute("SELECT * FROM medicos WHERE id = ? AND activo = 1", (medico_id,)).fetchone()
@@ -58,6 +60,14 @@ class MedicosRepository:
         sql += " ORDER BY apellidos, nombre"
         return _query_models(self._con, sql, [], self._row_to_model, "MedicosRepository.list_all")
 
+    def iterar_todos(
+        self, *, solo_activos: bool = True, tamano_lote: int = TAMANO_LOTE_LECTURA
+    ) -> Iterator[List[Medico]]:
+        """Como `list_all`, pero en lotes de `fetchmany` (exportaciones sin cargar la tabla entera)."""
+        sql = "SELECT * FROM medicos" + (" WHERE activo = 1" if solo_activos else "") + " ORDER BY apellidos, nombre"
+        for filas in iterar_filas(self._con, sql, tamano_lote=tamano_lote):
+            yield [self._row_to_model(row) for row in filas]
+
     def search(
         self,
         *,
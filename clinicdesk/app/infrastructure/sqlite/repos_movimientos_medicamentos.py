@@ -22,6 +22,7 @@ from typing import List, Optional
 
 from clinicdesk.app.domain.exceptions import ValidationError
 from clinicdesk.app.infrastructure.sqlite.id_utils import require_lastrowid, require_row_id
+from clinicdesk.app.infrastructure.sqlite.unidad_trabajo_sqlite import confirmar_si_autonoma
 
 
 logger = logging.getLogger(__name__)
@@ -107,7 +108,7 @@ class MovimientosMedicamentosRepository:
                 movimiento.referencia,
             ),
         )
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
         return require_lastrowid(cur, context="MovimientosMedicamentosRepository.create")
 
     def get_by_id(self, movimiento_id: int) -> Optional[MovimientoMedicamento]:
@@ -126,7 +127,7 @@ class MovimientosMedicamentosRepository:
         Borrado lógico: marca el movimiento como inactivo.
         """
         self._con.execute("UPDATE movimientos_medicamentos SET activo = 0 WHERE id = ?", (movimiento_id,))
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
 
     # --------------------------------------------------------------
     # Consultas de auditoría
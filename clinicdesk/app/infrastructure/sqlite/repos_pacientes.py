@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import sqlite3
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Iterable, Iterator, List, Optional
 
 from clinicdesk.app.common.search_utils import normalize_search_text
 from clinicdesk.app.common.sensitive_field_canonicalization import canonicalize_for_lookup
@@ -10,6 +10,7 @@ from clinicdesk.app.domain.enums import TipoDocumento
 from clinicdesk.app.domain.exceptions import ValidationError
 from clinicdesk.app.domain.modelos import Paciente
 from clinicdesk.app.infrastructure.sqlite.id_utils import require_lastrowid, require_row_id
+from clinicdesk.app.infrastructure.sqlite.pacientes.busqueda_fts import indice_busqueda_disponible
 from clinicdesk.app.infrastructure.sqlite.pacientes.crud import (
     fetch_by_documento,
     insert_sql,
@@ -26,6 +27,8 @@ from clinicdesk.app.infrastructure.sqlite.pacientes.pii import decrypt_optional,
 from clinicdesk.app.infrastructure.sqlite.pacientes.search import query_models, search_filters
 from clinicdesk.app.infrastructure.sqlite.pacientes_field_protection import PacientesFieldProtection
 from clinicdesk.app.infrastructure.sqlite.pii_crypto import get_connection_pii_cipher
+from clinicdesk.app.infrastructure.sqlite.lectura_por_lotes import TAMANO_LOTE_LECTURA, iterar_filas
+from clinicdesk.app.infrastructure.sqlite.unidad_trabajo_sqlite import confirmar_si_autonoma
 
 
 class PacientesRepository:
@@ -33,6 +36,7 @@ class PacientesRepository:
         self._con = connection
         self._pii_cipher = get_connection_pii_cipher(connection)
         self._field_protection = PacientesFieldProtection(connection)
+        self._usar_fts = indice_busqueda_disponible(connection)
 
     def create(self, paciente: Paciente) -> int:
         paciente.validar()
@@ -43,7 +47,7 @@ class PacientesRepository:
             "UPDATE pacientes SET num_historia = ? WHERE id = ?",
             (format_num_historia(paciente_id), paciente_id),
         )
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
         return paciente_id
 
     def update(self, paciente: Paciente) -> None:
@@ -52,11 +56,11 @@ class PacientesRepository:
         paciente.validar()
         payload = update_payload(paciente, self._field_protection, self._encrypt)
         self._con.execute(update_sql(self._field_protection.enabled), (*payload, paciente.id))
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
 
     def delete(self, paciente_id: int) -> None:
         self._con.execute("UPDATE pacientes SET activo = 0 WHERE id = ?", (paciente_id,))
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
 
     def get_by_id(self, paciente_id: int) -> Optional[Paciente]:
         row = self._con.execute("SELECT * FROM pacientes WHERE id = ? AND activo = 1", (paciente_id,)).fetchone()
@@ -80,6 +84,14 @@ class PacientesRepository:
         sql += " ORDER BY apellidos, nombre"
         return query_models(self._con, sql, [], self._row_to_model, "PacientesRepository.list_all")
 
+    def iterar_todos(
+        self, *, solo_activos: bool = True, tamano_lote: int = TAMANO_LOTE_LECTURA
+    ) -> Iterator[List[Paciente]]:
+        """Como `list_all`, pero en lotes de `fetchmany` (exportaciones sin cargar la tabla entera)."""
+        sql = "SELECT * FROM pacientes" + (" WHERE activo = 1" if solo_activos else "") + " ORDER BY apellidos, nombre"
+        for filas in iterar_filas(self._con, sql, tamano_lote=tamano_lote):
+            yield [self._row_to_model(row) for row in filas]
+
     def search(
         self,
         *,
@@ -94,6 +106,7 @@ class PacientesRepository:
             tipo_documento=normalize_search_text(tipo_documento.value if tipo_documento else None),
             documento=normalize_search_text(documento),
             activo=activo,
+            usar_fts=self._usar_fts,
         )
         sql = "SELECT * FROM pacientes"
         if clauses:
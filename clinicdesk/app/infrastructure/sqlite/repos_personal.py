@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import sqlite3
-from typing import Optional
+from typing import Iterator, Optional
 
 from clinicdesk.app.common.search_utils import like_value, normalize_search_text
 from clinicdesk.app.domain.enums import TipoDocumento
@@ -19,6 +19,8 @@ from clinicdesk.app.infrastructure.sqlite.personal.mapping import row_to_model
 from clinicdesk.app.infrastructure.sqlite.personal.search import query_models, search_filters
 from clinicdesk.app.infrastructure.sqlite.personal_field_protection import PersonalFieldProtection
 from clinicdesk.app.infrastructure.sqlite.pii_crypto import get_connection_pii_cipher
+from clinicdesk.app.infrastructure.sqlite.lectura_por_lotes import TAMANO_LOTE_LECTURA, iterar_filas
+from clinicdesk.app.infrastructure.sqlite.unidad_trabajo_sqlite import confirmar_si_autonoma
 
 
 class PersonalRepository:
@@ -31,7 +33,7 @@ class PersonalRepository:
         personal.validar()
         payload = create_payload(personal, self._field_protection, self._encrypt)
         cur = self._con.execute(insert_sql(self._field_protection.enabled), payload)
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
         return require_lastrowid(cur, context="PersonalRepository.create")
 
     def update(self, personal: Personal) -> None:
@@ -40,11 +42,11 @@ class PersonalRepository:
         personal.validar()
         payload = create_payload(personal, self._field_protection, self._encrypt)
         self._con.execute(update_sql(self._field_protection.enabled), (*payload, personal.id))
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
 
     def delete(self, personal_id: int) -> None:
         self._con.execute("UPDATE personal SET activo = 0 WHERE id = ?", (personal_id,))
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
 
     def get_by_id(self, personal_id: int) -> Optional[Personal]:
         row = self._con.execute(
@@ -79,6 +81,14 @@ class PersonalRepository:
         sql += " ORDER BY apellidos, nombre"
         return query_models(self._con, sql, [], self._row_to_model, "PersonalRepository.list_all")
 
+    def iterar_todos(
+        self, *, solo_activos: bool = True, tamano_lote: int = TAMANO_LOTE_LECTURA
+    ) -> Iterator[list[Personal]]:
+        """Como `list_all`, pero en lotes de `fetchmany` (exportaciones sin cargar la tabla entera)."""
+        sql = "SELECT * FROM personal" + (" WHERE activo = 1" if solo_activos else "") + " ORDER BY apellidos, nombre"
+        for filas in iterar_filas(self._con, sql, tamano_lote=tamano_lote):
+            yield [self._row_to_model(row) for row in filas]
+
     def search(
         self,
         *,
@@ -17,9 +17,11 @@ from __future__ import annotations
 
 import logging
 import sqlite3
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from clinicdesk.app.infrastructure.sqlite.id_utils import require_lastrowid
+from clinicdesk.app.infrastructure.sqlite.lectura_por_lotes import TAMANO_LOTE_LECTURA, iterar_filas
+from clinicdesk.app.infrastructure.sqlite.unidad_trabajo_sqlite import confirmar_si_autonoma
 
 from clinicdesk.app.domain.modelos import Sala
 from clinicdesk.app.domain.enums import TipoSala
@@ -67,7 +69,7 @@ class SalasRepository:
                 int(sala.activa),
             ),
         )
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
         return require_lastrowid(cur, context="SalasRepository.create")
 
     def update(self, sala: Sala) -> None:
@@ -96,7 +98,7 @@ class SalasRepository:
                 sala.id,
             ),
         )
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
 
     def delete(self, sala_id: int) -> None:
         """
@@ -106,7 +108,7 @@ class SalasRepository:
             "UPDATE salas SET activa = 0 WHERE id = ?",
             (sala_id,),
         )
-        self._con.commit()
+        confirmar_si_autonoma(self._con)
 
     def get_by_id(self, sala_id: int) -> Optional[Sala]:
         """
@@ -142,6 +144,14 @@ class SalasRepository:
             return []
         return [self._row_to_model(r) for r in rows]
 
+    def iterar_todos(
+        self, *, solo_activas: bool = True, tamano_lote: int = TAMANO_LOTE_LECTURA
+    ) -> Iterator[List[Sala]]:
+        """Como `list_all`, pero en lotes de `fetchmany` (exportaciones sin cargar la tabla entera)."""
+        sql = "SELECT * FROM salas" + (" WHERE activa = 1" if solo_activas else "") + " ORDER BY nombre"
+        for filas in iterar_filas(self._con, sql, tamano_lote=tamano_lote):
+            yield [self._row_to_model(row) for row in filas]
+
     def search(
         self,
         *,
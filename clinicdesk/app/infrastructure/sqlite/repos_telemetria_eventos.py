@@ -4,9 +4,11 @@ import sqlite3
 from dataclasses import dataclass
 
 from clinicdesk.app.application.telemetria import EventoTelemetriaDTO
-from clinicdesk.app.infrastructure.sqlite.auditoria_integridad import (
-    ensure_telemetria_integridad_schema,
-    siguiente_hash_telemetria,
+from clinicdesk.app.infrastructure.sqlite.auditoria_integridad import ensure_telemetria_integridad_schema
+from clinicdesk.app.infrastructure.sqlite.escritor_eventos_sqlite import (
+    DestinoEventosEncadenados,
+    EscritorEventosSqliteEnLote,
+    registrar_encadenado,
 )
 from clinicdesk.app.infrastructure.sqlite.persistencia_segura_auditoria_telemetria import (
     sanear_contexto_telemetria_para_persistencia,
@@ -14,9 +16,29 @@ from clinicdesk.app.infrastructure.sqlite.persistencia_segura_auditoria_telemetr
 )
 
 
+_DESTINO_TELEMETRIA = DestinoEventosEncadenados(
+    tabla="telemetria_eventos",
+    sql_insert="""
+    INSERT INTO telemetria_eventos(
+        timestamp_utc,
+        usuario,
+        modo_demo,
+        evento,
+        contexto,
+        entidad_tipo,
+        entidad_id,
+        prev_hash,
+        entry_hash
+    )
+    VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+)
+
+
 @dataclass(slots=True)
 class RepositorioTelemetriaEventosSqlite:
     connection: sqlite3.Connection
+    escritor: EscritorEventosSqliteEnLote | None = None
 
     def __post_init__(self) -> None:
         ensure_telemetria_integridad_schema(self.connection)
@@ -42,33 +64,13 @@ class RepositorioTelemetriaEventosSqlite:
             "entidad_tipo": evento.entidad_tipo,
             "entidad_id": entidad_id_para_guardar,
         }
-        prev_hash, entry_hash = siguiente_hash_telemetria(self.connection, payload)
-
-        self.connection.execute(
-            """
-            INSERT INTO telemetria_eventos(
-                timestamp_utc,
-                usuario,
-                modo_demo,
-                evento,
-                contexto,
-                entidad_tipo,
-                entidad_id,
-                prev_hash,
-                entry_hash
-            )
-            VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                evento.timestamp_utc,
-                usuario_saneado,
-                1 if evento.modo_demo else 0,
-                evento.evento,
-                contexto_saneado,
-                evento.entidad_tipo,
-                entidad_id_para_guardar,
-                prev_hash,
-                entry_hash,
-            ),
+        valores = (
+            evento.timestamp_utc,
+            usuario_saneado,
+            1 if evento.modo_demo else 0,
+            evento.evento,
+            contexto_saneado,
+            evento.entidad_tipo,
+            entidad_id_para_guardar,
         )
-        self.connection.commit()
+        registrar_encadenado(self.connection, self.escritor, _DESTINO_TELEMETRIA, payload, valores)
@@ -0,0 +1,51 @@
+"""
+Puntuaciones persistidas de riesgo de ausencia por cita.
+
+Confirmaciones calculaba el riesgo con el modelo después de paginar y filtraba en memoria,
+así que las páginas filtradas por riesgo salían cortas o vacías. `riesgo_ausencia_citas`
+guarda una puntuación por cita y versión de modelo para poder filtrar y ordenar en SQL.
+
+- Se rellena en lote al entrenar un modelo, al crear citas y, en segundo plano al arrancar,
+  para las citas sin puntuación vigente (sin fila o de otro modelo).
+- El trigger de `citas` invalida la fila cuando cambian los datos que usa el modelo.
+- La tabla, su índice y el trigger solo se definen aquí (no en schema.sql); los crea la
+  migración `scores_riesgo_ausencia`.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+TABLA_SCORES_RIESGO = "riesgo_ausencia_citas"
+
+_SQL_CREAR_TABLA = f"""
+CREATE TABLE IF NOT EXISTS {TABLA_SCORES_RIESGO} (
+    cita_id INTEGER PRIMARY KEY,
+    modelo_version TEXT NOT NULL,
+    score REAL NULL,
+    bucket TEXT NOT NULL CHECK(bucket IN ('BAJO', 'MEDIO', 'ALTO')),
+    scored_at_utc TEXT NOT NULL,
+    FOREIGN KEY (cita_id) REFERENCES citas(id) ON DELETE CASCADE
+)
+"""
+
+_SQL_INDICES = (
+    f"CREATE INDEX IF NOT EXISTS idx_riesgo_ausencia_citas_modelo_bucket_score "
+    f"ON {TABLA_SCORES_RIESGO}(modelo_version, bucket, score DESC)",
+)
+
+_SQL_TRIGGER_INVALIDAR = (
+    "CREATE TRIGGER IF NOT EXISTS trg_riesgo_ausencia_citas_invalidar "
+    "AFTER UPDATE OF paciente_id, inicio ON citas BEGIN "
+    f"DELETE FROM {TABLA_SCORES_RIESGO} WHERE cita_id = NEW.id; END"
+)
+
+
+def asegurar_scores_riesgo(con: sqlite3.Connection) -> None:
+    con.execute(_SQL_CREAR_TABLA)
+    for sql in _SQL_INDICES:
+        con.execute(sql)
+    con.execute(_SQL_TRIGGER_INVALIDAR)
+
+
+__all__ = ["TABLA_SCORES_RIESGO", "asegurar_scores_riesgo"]
@@ -211,6 +211,9 @@ CREATE TABLE IF NOT EXISTS citas (
 
     inicio TEXT NOT NULL, -- ISO datetime
     fin TEXT NOT NULL,    -- ISO datetime
+    -- epoch normalizado para filtros por rango (índices en la migración citas_epoch)
+    inicio_ts INTEGER GENERATED ALWAYS AS (CAST(strftime('%s', inicio) AS INTEGER)) VIRTUAL,
+    fin_ts INTEGER GENERATED ALWAYS AS (CAST(strftime('%s', fin) AS INTEGER)) VIRTUAL,
     estado TEXT NOT NULL,
     motivo TEXT,
     notas TEXT,
@@ -261,6 +264,9 @@ CREATE TABLE IF NOT EXISTS recordatorios_citas (
 CREATE INDEX IF NOT EXISTS idx_recordatorios_citas_cita_id ON recordatorios_citas(cita_id);
 CREATE INDEX IF NOT EXISTS idx_recordatorios_citas_updated_at_utc ON recordatorios_citas(updated_at_utc);
 
+-- La tabla recordatorios_citas_resumen y sus triggers los crea la migración
+-- resumen_recordatorios (ver sqlite/recordatorios_resumen.py).
+
 CREATE TABLE IF NOT EXISTS predicciones_ausencias_log (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     timestamp_utc TEXT NOT NULL,
@@ -274,6 +280,9 @@ CREATE TABLE IF NOT EXISTS predicciones_ausencias_log (
 );
 
 CREATE INDEX IF NOT EXISTS idx_predicciones_ausencias_log_modelo_fecha ON predicciones_ausencias_log(modelo_fecha_utc);
+
+-- La tabla riesgo_ausencia_citas, su índice y su trigger los crea la migración
+-- scores_riesgo_ausencia (ver sqlite/riesgo_ausencia_scores.py).
 CREATE INDEX IF NOT EXISTS idx_predicciones_ausencias_log_cita_id ON predicciones_ausencias_log(cita_id);
 
 CREATE TABLE IF NOT EXISTS ml_acciones_operativas (
@@ -487,6 +496,7 @@ CREATE INDEX IF NOT EXISTS idx_incidencias_fecha ON incidencias(fecha_hora);
 CREATE INDEX IF NOT EXISTS idx_incidencias_tipo_estado ON incidencias(tipo, estado);
 CREATE INDEX IF NOT EXISTS idx_incidencias_medico_fecha ON incidencias(medico_id, fecha_hora);
 CREATE INDEX IF NOT EXISTS idx_incidencias_personal_fecha ON incidencias(personal_id, fecha_hora);
+CREATE INDEX IF NOT EXISTS idx_incidencias_cita_fecha ON incidencias(cita_id, fecha_hora);
 CREATE INDEX IF NOT EXISTS idx_incidencias_activo ON incidencias(activo);
 CREATE INDEX IF NOT EXISTS idx_incidencias_activo_estado_fecha ON incidencias(activo, estado, fecha_hora);
 
@@ -585,3 +595,13 @@ BEFORE DELETE ON telemetria_eventos
 BEGIN
     SELECT RAISE(ABORT, 'telemetria_eventos_append_only');
 END;
+
+-- ============================================================
+-- MIGRACIONES (historial; la versión vive en PRAGMA user_version)
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS schema_migraciones (
+    nombre TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    aplicada_en_utc TEXT NOT NULL
+);
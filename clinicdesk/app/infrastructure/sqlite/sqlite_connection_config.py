@@ -3,8 +3,11 @@ from __future__ import annotations
 import sqlite3
 import threading
 import time
+from dataclasses import dataclass
 from pathlib import Path
 
+from clinicdesk.app.infrastructure.sqlite.sqlite_tuning_produccion import aplicar_tuning_produccion
+
 
 _WAL_CONFIGURED_PATHS: set[str] = set()
 _WAL_LOCKS_BY_PATH: dict[str, threading.Lock] = {}
@@ -13,6 +16,33 @@ _WAL_MAX_ATTEMPTS = 3
 _WAL_RETRY_DELAYS_SECONDS = (0.01, 0.03, 0.05)
 
 
+@dataclass(frozen=True, slots=True)
+class PerfilConexionSqlite:
+    """PRAGMAs por rol de conexión; se aplican una sola vez al abrirla."""
+
+    nombre: str
+    busy_timeout_ms: int
+    synchronous: str = "NORMAL"
+    temp_store: str = "MEMORY"
+    cache_size: int | None = None
+
+
+PERFIL_INTERACTIVO = PerfilConexionSqlite(nombre="interactivo", busy_timeout_ms=5000)
+PERFIL_ANALITICA = PerfilConexionSqlite(nombre="analitica", busy_timeout_ms=15000, cache_size=-16000)
+PERFIL_ESCRITURA_MASIVA = PerfilConexionSqlite(nombre="escritura_masiva", busy_timeout_ms=30000, cache_size=-20000)
+
+PERFILES_CONEXION: dict[str, PerfilConexionSqlite] = {
+    perfil.nombre: perfil for perfil in (PERFIL_INTERACTIVO, PERFIL_ANALITICA, PERFIL_ESCRITURA_MASIVA)
+}
+
+
+def obtener_perfil_conexion(nombre: str) -> PerfilConexionSqlite:
+    perfil = PERFILES_CONEXION.get(nombre.strip().lower())
+    if perfil is None:
+        raise ValueError(f"Perfil de conexión SQLite desconocido: {nombre}")
+    return perfil
+
+
 def _normalizar_db_path(db_path: str | Path) -> str:
     return Path(db_path).expanduser().resolve().as_posix()
 
@@ -50,8 +80,10 @@ def _aplicar_wal_con_reintentos(connection: sqlite3.Connection) -> None:
 def configurar_conexion(
     connection: sqlite3.Connection,
     db_path: str | Path | None = None,
+    *,
+    perfil: PerfilConexionSqlite = PERFIL_INTERACTIVO,
 ) -> None:
-    """Aplica PRAGMAs recomendados para cada conexión SQLite."""
+    """Aplica PRAGMAs recomendados para cada conexión SQLite según el perfil de uso."""
     if db_path is not None:
         path_normalizado = _normalizar_db_path(db_path)
         lock = _obtener_lock_por_path(path_normalizado)
@@ -63,6 +95,17 @@ def configurar_conexion(
         _aplicar_wal_con_reintentos(connection)
 
     connection.execute("PRAGMA foreign_keys = ON;")
-    connection.execute("PRAGMA busy_timeout = 5000;")
-    connection.execute("PRAGMA synchronous = NORMAL;")
-    connection.execute("PRAGMA temp_store = MEMORY;")
+    connection.execute(f"PRAGMA busy_timeout = {int(perfil.busy_timeout_ms)};")
+    connection.execute(f"PRAGMA synchronous = {perfil.synchronous};")
+    connection.execute(f"PRAGMA temp_store = {perfil.temp_store};")
+    tuning = None
+    if db_path is not None:
+        tuning = aplicar_tuning_produccion(connection, db_path, cache_minimo_kib=_cache_minimo_kib(perfil))
+    if tuning is None and perfil.cache_size is not None:
+        connection.execute(f"PRAGMA cache_size = {int(perfil.cache_size)};")
+
+
+def _cache_minimo_kib(perfil: PerfilConexionSqlite) -> int:
+    if perfil.cache_size is None or perfil.cache_size >= 0:
+        return 0
+    return -perfil.cache_size
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import ctypes
+import os
+import sqlite3
+import sys
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from clinicdesk.app.bootstrap_logging import get_logger
+
+LOGGER = get_logger(__name__)
+
+_ENV_MODO = "CLINICDESK_SQLITE_TUNING"
+_ENV_MMAP_MAX_MB = "CLINICDESK_SQLITE_MMAP_MAX_MB"
+_ENV_CACHE_MAX_MB = "CLINICDESK_SQLITE_CACHE_MAX_MB"
+_ENV_WAL_AUTOCHECKPOINT = "CLINICDESK_SQLITE_WAL_AUTOCHECKPOINT"
+_ENV_JOURNAL_SIZE_LIMIT_MB = "CLINICDESK_SQLITE_JOURNAL_SIZE_LIMIT_MB"
+
+_MB = 1024 * 1024
+_PAGE_SIZE_POR_DEFECTO = 4096
+_MMAP_MAX_MB_POR_DEFECTO = 1024
+_CACHE_MAX_MB_POR_DEFECTO = 256
+_CACHE_MIN_KIB = 2000
+_WAL_AUTOCHECKPOINT_MIN = 1000
+_WAL_AUTOCHECKPOINT_MAX = 10000
+_JOURNAL_SIZE_LIMIT_MIN_BYTES = 32 * _MB
+_FRACCION_RAM_MMAP = 0.25
+_FRACCION_RAM_CACHE = 0.05
+_FRACCION_DB_CACHE = 0.10
+_MARGEN_CRECIMIENTO_DB = 1.25
+
+_PATHS_REPORTADOS: set[str] = set()
+_PATHS_REPORTADOS_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True, slots=True)
+class ConfigTuningSqlite:
+    """Límites por despliegue; `None` en un override significa cálculo automático."""
+
+    habilitado: bool = True
+    mmap_max_bytes: int = _MMAP_MAX_MB_POR_DEFECTO * _MB
+    cache_max_bytes: int = _CACHE_MAX_MB_POR_DEFECTO * _MB
+    wal_autocheckpoint: int | None = None
+    journal_size_limit_bytes: int | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ParametrosTuningSqlite:
+    mmap_size: int
+    cache_size_kib: int
+    wal_autocheckpoint: int
+    journal_size_limit: int
+
+
+@dataclass(frozen=True, slots=True)
+class TuningSqliteEfectivo:
+    """Valores leídos de la conexión tras aplicar el tuning (cache_size en convención SQLite)."""
+
+    mmap_size: int
+    cache_size: int
+    wal_autocheckpoint: int
+    journal_size_limit: int
+    page_size: int
+
+
+def config_tuning_desde_env() -> ConfigTuningSqlite:
+    modo = os.getenv(_ENV_MODO, "auto").strip().lower()
+    return ConfigTuningSqlite(
+        habilitado=modo not in {"0", "off", "false", "no"},
+        mmap_max_bytes=_leer_entero_env(_ENV_MMAP_MAX_MB, _MMAP_MAX_MB_POR_DEFECTO) * _MB,
+        cache_max_bytes=_leer_entero_env(_ENV_CACHE_MAX_MB, _CACHE_MAX_MB_POR_DEFECTO) * _MB,
+        wal_autocheckpoint=_leer_entero_opcional_env(_ENV_WAL_AUTOCHECKPOINT),
+        journal_size_limit_bytes=_multiplicar_opcional(_leer_entero_opcional_env(_ENV_JOURNAL_SIZE_LIMIT_MB), _MB),
+    )
+
+
+def calcular_tuning_sqlite(
+    *,
+    tamano_db_bytes: int,
+    memoria_disponible_bytes: int | None,
+    config: ConfigTuningSqlite,
+    page_size: int = _PAGE_SIZE_POR_DEFECTO,
+) -> ParametrosTuningSqlite:
+    """Dimensiona mmap/cache/checkpoint a partir del tamaño de la DB y la RAM disponible."""
+    tamano = max(0, tamano_db_bytes)
+    mmap_max = config.mmap_max_bytes
+    cache_max = config.cache_max_bytes
+    if memoria_disponible_bytes is not None and memoria_disponible_bytes > 0:
+        mmap_max = min(mmap_max, int(memoria_disponible_bytes * _FRACCION_RAM_MMAP))
+        cache_max = min(cache_max, int(memoria_disponible_bytes * _FRACCION_RAM_CACHE))
+
+    mmap_size = min(mmap_max, _redondear_a_mb(int(tamano * _MARGEN_CRECIMIENTO_DB)))
+    cache_kib = max(_CACHE_MIN_KIB, min(cache_max // 1024, int(tamano * _FRACCION_DB_CACHE) // 1024))
+    wal_autocheckpoint = config.wal_autocheckpoint or _calcular_wal_autocheckpoint(tamano, page_size)
+    journal_size_limit = config.journal_size_limit_bytes or max(
+        _JOURNAL_SIZE_LIMIT_MIN_BYTES,
+        4 * wal_autocheckpoint * page_size,
+    )
+    return ParametrosTuningSqlite(
+        mmap_size=max(0, mmap_size),
+        cache_size_kib=cache_kib,
+        wal_autocheckpoint=wal_autocheckpoint,
+        journal_size_limit=journal_size_limit,
+    )
+
+
+def aplicar_tuning_produccion(
+    connection: sqlite3.Connection,
+    db_path: str | Path,
+    *,
+    config: ConfigTuningSqlite | None = None,
+    cache_minimo_kib: int = 0,
+) -> ParametrosTuningSqlite | None:
+    """Aplica el tuning de producción a la conexión; devuelve None si está deshabilitado."""
+    config_efectiva = config or config_tuning_desde_env()
+    if not config_efectiva.habilitado:
+        return None
+    parametros = calcular_tuning_sqlite(
+        tamano_db_bytes=_tamano_db(db_path),
+        memoria_disponible_bytes=memoria_disponible_bytes(),
+        config=config_efectiva,
+        page_size=_leer_pragma_int(connection, "page_size"),
+    )
+    connection.execute(f"PRAGMA mmap_size = {int(parametros.mmap_size)};")
+    connection.execute(f"PRAGMA cache_size = {-max(parametros.cache_size_kib, cache_minimo_kib)};")
+    connection.execute(f"PRAGMA wal_autocheckpoint = {int(parametros.wal_autocheckpoint)};")
+    connection.execute(f"PRAGMA journal_size_limit = {int(parametros.journal_size_limit)};")
+    _reportar_una_vez(connection, db_path)
+    return parametros
+
+
+def leer_tuning_efectivo(connection: sqlite3.Connection) -> TuningSqliteEfectivo:
+    return TuningSqliteEfectivo(
+        mmap_size=_leer_pragma_int(connection, "mmap_size", por_defecto=0),
+        cache_size=_leer_pragma_int(connection, "cache_size"),
+        wal_autocheckpoint=_leer_pragma_int(connection, "wal_autocheckpoint"),
+        journal_size_limit=_leer_pragma_int(connection, "journal_size_limit"),
+        page_size=_leer_pragma_int(connection, "page_size"),
+    )
+
+
+@lru_cache(maxsize=1)
+def memoria_disponible_bytes() -> int | None:
+    """RAM física disponible al arrancar; None si la plataforma no la expone."""
+    if sys.platform == "win32":
+        return _memoria_disponible_windows()
+    try:
+        return int(os.sysconf("SC_AVPHYS_PAGES")) * int(os.sysconf("SC_PAGE_SIZE"))
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _memoria_disponible_windows() -> int | None:
+    class _MemoryStatusEx(ctypes.Structure):
+        _fields_ = [
+            ("dwLength", ctypes.c_ulong),
+            ("dwMemoryLoad", ctypes.c_ulong),
+            ("ullTotalPhys", ctypes.c_ulonglong),
+            ("ullAvailPhys", ctypes.c_ulonglong),
+            ("ullTotalPageFile", ctypes.c_ulonglong),
+            ("ullAvailPageFile", ctypes.c_ulonglong),
+            ("ullTotalVirtual", ctypes.c_ulonglong),
+            ("ullAvailVirtual", ctypes.c_ulonglong),
+            ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+        ]
+
+    estado = _MemoryStatusEx()
+    estado.dwLength = ctypes.sizeof(_MemoryStatusEx)
+    try:
+        if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(estado)):  # type: ignore[attr-defined]
+            return None
+    except (AttributeError, OSError):
+        return None
+    return int(estado.ullAvailPhys)
+
+
+def _calcular_wal_autocheckpoint(tamano_db_bytes: int, page_size: int) -> int:
+    paginas = tamano_db_bytes // max(1, page_size)
+    return max(_WAL_AUTOCHECKPOINT_MIN, min(_WAL_AUTOCHECKPOINT_MAX, paginas // 64))
+
+
+def _redondear_a_mb(valor: int) -> int:
+    return ((valor + _MB - 1) // _MB) * _MB
+
+
+def _tamano_db(db_path: str | Path) -> int:
+    try:
+        return Path(db_path).stat().st_size
+    except OSError:
+        return 0
+
+
+def _reportar_una_vez(connection: sqlite3.Connection, db_path: str | Path) -> None:
+    path = Path(db_path).as_posix()
+    with _PATHS_REPORTADOS_LOCK:
+        if path in _PATHS_REPORTADOS:
+            return
+        _PATHS_REPORTADOS.add(path)
+    efectivo = leer_tuning_efectivo(connection)
+    LOGGER.info(
+        "sqlite_tuning_produccion_aplicado",
+        extra={
+            "action": "sqlite_tuning_produccion_aplicado",
+            "mmap_size": efectivo.mmap_size,
+            "cache_size": efectivo.cache_size,
+            "wal_autocheckpoint": efectivo.wal_autocheckpoint,
+            "journal_size_limit": efectivo.journal_size_limit,
+            "page_size": efectivo.page_size,
+        },
+    )
+
+
+def _leer_entero_env(nombre: str, por_defecto: int) -> int:
+    valor = _leer_entero_opcional_env(nombre)
+    return por_defecto if valor is None else valor
+
+
+def _leer_entero_opcional_env(nombre: str) -> int | None:
+    raw = os.getenv(nombre, "").strip()
+    if not raw:
+        return None
+    try:
+        valor = int(raw)
+    except ValueError:
+        LOGGER.warning("sqlite_tuning_env_invalido", extra={"action": "sqlite_tuning_env_invalido", "env": nombre})
+        return None
+    return valor if valor >= 0 else None
+
+
+def _multiplicar_opcional(valor: int | None, factor: int) -> int | None:
+    return None if valor is None else valor * factor
+
+
+def _leer_pragma_int(connection: sqlite3.Connection, pragma: str, *, por_defecto: int | None = None) -> int:
+    row = connection.execute(f"PRAGMA {pragma};").fetchone()
+    if row is None:
+        # SQLite no devuelve fila para mmap_size en bases en memoria o sin soporte de mmap.
+        if por_defecto is not None:
+            return por_defecto
+        raise ValueError(f"No se pudo leer PRAGMA {pragma}")
+    return int(row[0])
@@ -0,0 +1,56 @@
+"""
+Unidad de trabajo sobre una conexión SQLite.
+
+`transaccion()` abre `BEGIN IMMEDIATE` (reserva el bloqueo de escritura antes de leer, así
+las comprobaciones y el insert no pueden intercalarse con otro escritor) y confirma una sola
+vez al salir, o deshace todo si hay excepción. Mientras está abierta, los repositorios que
+confirman con `confirmar_si_autonoma` no hacen commit propio.
+
+Si la conexión ya está dentro de otra unidad de trabajo (o de una transacción del llamador),
+se participa en ella sin abrir ni confirmar nada.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+# ids de conexión; cada entrada vive solo mientras dura su bloque `transaccion()`.
+_conexiones_en_unidad: set[int] = set()
+_lock = threading.Lock()
+
+
+class UnidadTrabajoSqlite:
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self._con = connection
+
+    @contextmanager
+    def transaccion(self) -> Iterator[None]:
+        if self._con.in_transaction or en_unidad_de_trabajo(self._con):
+            yield
+            return
+        self._con.execute("BEGIN IMMEDIATE")
+        with _lock:
+            _conexiones_en_unidad.add(id(self._con))
+        try:
+            yield
+            self._con.commit()
+        except BaseException:
+            self._con.rollback()
+            raise
+        finally:
+            with _lock:
+                _conexiones_en_unidad.discard(id(self._con))
+
+
+def en_unidad_de_trabajo(con: sqlite3.Connection) -> bool:
+    with _lock:
+        return id(con) in _conexiones_en_unidad
+
+
+def confirmar_si_autonoma(con: sqlite3.Connection) -> None:
+    """Commit del repositorio, salvo que la escritura forme parte de una unidad de trabajo abierta."""
+    if not en_unidad_de_trabajo(con):
+        con.commit()
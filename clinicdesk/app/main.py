@@ -224,7 +224,9 @@ def main(control: ControlEntrypointDesktop | None = None) -> int:
     app, run_id = _inicializar_app()
 
     con = bootstrap_database(apply_schema=True)
-    container = build_container(con)
+    container = build_container(con, escritura_eventos_en_lote=True)
+    container.iniciar_migracion_pii_pendiente()
+    container.iniciar_puntuacion_riesgo_pendiente()
     i18n = I18nManager("es")
     auth = AuthService(con)
 
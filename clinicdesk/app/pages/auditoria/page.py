@@ -27,7 +27,6 @@ from clinicdesk.app.pages.auditoria.render_auditoria import apply_selection, ren
 from clinicdesk.app.pages.auditoria.ui_builder import build_auditoria_ui
 from clinicdesk.app.pages.auditoria.workers_auditoria import crear_worker_exportacion
 from clinicdesk.app.queries.auditoria_accesos_queries import AuditoriaAccesosQueries, FiltrosAuditoriaAccesos
-from clinicdesk.app.infrastructure.sqlite.repos_telemetria_eventos import RepositorioTelemetriaEventosSqlite
 from clinicdesk.app.ui.viewmodels.auditoria_viewmodel import AuditoriaViewModel
 
 LOGGER = get_logger(__name__)
@@ -40,7 +39,8 @@ class PageAuditoria(QWidget):
         self._settings = QSettings("clinicdesk", "ui")
         self._preferencias_service = container.preferencias_service
         self._queries = AuditoriaAccesosQueries(container.connection)
-        self._uc_telemetria = RegistrarTelemetria(RepositorioTelemetriaEventosSqlite(container.connection))
+        self._uc_telemetria = RegistrarTelemetria(container.telemetria_eventos_repo)
+        self._escritor_eventos = container.escritor_eventos
         self._contexto_telemetria = UserContext()
         self._uc_buscar = BuscarAuditoriaAccesos(self._queries, verificador_integridad=self._queries)
         self._uc_resumen = ObtenerResumenAuditoria(self._queries)
@@ -130,6 +130,8 @@ class PageAuditoria(QWidget):
         if filtros is None:
             return
         self._set_estado("loading_more" if incremental else "loading")
+        if self._escritor_eventos is not None:
+            self._escritor_eventos.flush(timeout=2.0)
         try:
             result = self._uc_buscar.execute(
                 filtros,
@@ -219,7 +221,7 @@ class PageAuditoria(QWidget):
                 job_id="export_auditoria_csv",
                 title_key="job.export_auditoria.title",
                 worker_factory=lambda: crear_worker_exportacion(
-                    ejecutar_exportacion=self._uc_exportar.execute,
+                    exportar_a_archivo=self._uc_exportar.exportar_a_archivo,
                     filtros=filtros,
                     preset_rango=self._ui.combo_rango.currentData(),
                     ruta_guardado=ruta_guardado,
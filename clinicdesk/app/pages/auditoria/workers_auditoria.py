@@ -1,21 +1,35 @@
 from __future__ import annotations
 
-from pathlib import Path
-
+from clinicdesk.app.application.usecases.exportar_auditoria_csv import (
+    ExportacionAuditoriaCanceladaError,
+    OpcionesExportacionAuditoria,
+)
 from clinicdesk.app.ui.jobs.job_manager import JobCancelledError
 
+_PROGRESO_INICIO_ESCRITURA = 20
+_PROGRESO_FIN_ESCRITURA = 95
+
 
-def crear_worker_exportacion(*, ejecutar_exportacion, filtros, preset_rango: str | None, ruta_guardado: str):
+def crear_worker_exportacion(*, exportar_a_archivo, filtros, preset_rango: str | None, ruta_guardado: str):
     def _worker(cancel_token, report_progress):
         report_progress(15, "job.export_auditoria.progress.preflight")
         if cancel_token.is_cancelled:
             raise JobCancelledError()
-        report_progress(55, "job.export_auditoria.progress.export")
-        exp = ejecutar_exportacion(filtros, preset_rango=preset_rango)
-        if cancel_token.is_cancelled:
-            raise JobCancelledError()
-        report_progress(85, "job.export_auditoria.progress.write")
-        Path(ruta_guardado).write_text(exp.csv_texto, encoding="utf-8")
+
+        def _al_progresar(escritas: int, total: int) -> None:
+            tramo = _PROGRESO_FIN_ESCRITURA - _PROGRESO_INICIO_ESCRITURA
+            avance = _PROGRESO_INICIO_ESCRITURA + (tramo * escritas // total if total else tramo)
+            report_progress(min(avance, _PROGRESO_FIN_ESCRITURA), "job.export_auditoria.progress.write")
+
+        opciones = OpcionesExportacionAuditoria(
+            al_progresar=_al_progresar,
+            debe_cancelar=lambda: cancel_token.is_cancelled,
+        )
+        report_progress(_PROGRESO_INICIO_ESCRITURA, "job.export_auditoria.progress.export")
+        try:
+            exportar_a_archivo(filtros, ruta_guardado, preset_rango=preset_rango, opciones=opciones)
+        except ExportacionAuditoriaCanceladaError as exc:
+            raise JobCancelledError() from exc
         report_progress(100, "job.export_auditoria.progress.done")
         return ruta_guardado
 
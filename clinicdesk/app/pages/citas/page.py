@@ -29,7 +29,7 @@ from clinicdesk.app.application.citas import (
     ErrorValidacionDTO,
     HitoAtencion,
     RegistrarHitoAtencionCita,
-    PaginacionCitasDTO,
+    PaginacionCitasKeysetDTO,
     formatear_valor_atributo_cita,
     normalizar_y_validar_filtros_citas,
     redactar_texto_busqueda,
@@ -88,6 +88,8 @@ from clinicdesk.app.infrastructure.sqlite.db_path import resolver_db_path_desde_
 
 LOGGER = get_logger(__name__)
 
+_LIMITE_PAGINA_LISTA = 200
+
 
 class _RelojSistema:
     def ahora(self) -> datetime:
@@ -144,6 +146,8 @@ class PageCitas(QWidget):
         self._filtros_aplicados = FiltrosCitasDTO()
         self._columnas_lista: tuple[str, ...] = tuple()
         self._citas_lista_ids: list[int] = []
+        self._filtros_lista_cargados: FiltrosCitasDTO | None = None
+        self._cursor_lista_siguiente: str | None = None
         self._citas_calendario_ids: list[int] = []
         self._coordinador_intents = CoordinadorIntentsCitas()
         self._coordinador_banners = CoordinadorBannersCitas()
@@ -309,6 +313,7 @@ class PageCitas(QWidget):
         self.table_lista.itemDoubleClicked.connect(self._on_lista_item_double_clicked)
         self.table_lista.customContextMenuRequested.connect(self._on_lista_context_menu)
         self.table_lista.itemChanged.connect(self._on_lista_item_changed)
+        self.table_lista.verticalScrollBar().valueChanged.connect(self._on_lista_scroll)
         self.chk_seleccionar_todo.stateChanged.connect(self._on_toggle_seleccionar_todo_visible)
         self.tabs.currentChanged.connect(self._on_tab_changed)
 
@@ -594,6 +599,7 @@ class PageCitas(QWidget):
     def _refresh_lista(self, token_refresh: int, origen: str = "refresh_lista") -> None:
         if not self._es_refresh_vigente(token_refresh, origen):
             return
+        self._cursor_lista_siguiente = None
         if self._coordinador_banners.hay_filtro_calidad_activo():
             self._citas_seleccionadas.clear()
         validacion = normalizar_y_validar_filtros_citas(self._filtros_aplicados, datetime.now(), "LISTA")
@@ -603,8 +609,10 @@ class PageCitas(QWidget):
             self._set_estado_lista(None)
             return
         try:
-            resultado = self._buscar_lista_uc.ejecutar(
-                validacion.filtros_normalizados, self._columnas_lista, PaginacionCitasDTO(limit=500, offset=0)
+            resultado = self._buscar_lista_uc.ejecutar_keyset(
+                validacion.filtros_normalizados,
+                self._columnas_lista,
+                PaginacionCitasKeysetDTO(limit=_LIMITE_PAGINA_LISTA),
             )
         except Exception as exc:  # noqa: BLE001
             LOGGER.warning(
@@ -614,6 +622,8 @@ class PageCitas(QWidget):
             self._set_estado_lista("citas.ux.error", error=True)
             return
         self._ocultar_banner_validacion()
+        self._filtros_lista_cargados = validacion.filtros_normalizados
+        self._cursor_lista_siguiente = resultado.cursor_siguiente
         self._render_lista(self._inyectar_estimaciones(resultado.items))
         self._actualizar_aviso_salud_prediccion("lista")
         if not resultado.items:
@@ -633,7 +643,18 @@ class PageCitas(QWidget):
         headers_visibles.extend(headers[c] for c in visibles)
         self.table_lista.setColumnCount(len(headers_visibles))
         self.table_lista.setHorizontalHeaderLabels(headers_visibles)
-        self._citas_lista_ids = [int(row["cita_id"]) for row in rows]
+        self._citas_lista_ids = []
+        self._anexar_filas_lista(rows)
+        self.table_lista.resizeColumnsToContents()
+        self._actualizando_checks_lote = False
+        self._actualizar_ui_lote_hitos()
+        restaurar_contexto_tabla(self.table_lista, self._contexto_lista_pendiente, columna_id=0)
+
+    def _anexar_filas_lista(self, rows: list[dict[str, object]]) -> None:
+        columnas, _ = sanear_columnas_citas(self._columnas_lista)
+        visibles = [c for c in columnas if c != "cita_id"]
+        mostrar_lote = self._coordinador_banners.hay_filtro_calidad_activo()
+        self._citas_lista_ids.extend(int(row["cita_id"]) for row in rows)
         for row in rows:
             idx = self.table_lista.rowCount()
             self.table_lista.insertRow(idx)
@@ -650,10 +671,37 @@ class PageCitas(QWidget):
                 if col == 0:
                     item_col.setData(Qt.UserRole, cita_id)
                 self.table_lista.setItem(idx, col + offset, item_col)
-        self.table_lista.resizeColumnsToContents()
+
+    def _on_lista_scroll(self, valor: int) -> None:
+        barra = self.table_lista.verticalScrollBar()
+        if self._cursor_lista_siguiente is None or self._filtros_lista_cargados is None:
+            return
+        if valor < barra.maximum():
+            return
+        self._cargar_mas_lista()
+
+    def _cargar_mas_lista(self) -> None:
+        """Añade la página siguiente por cursor; el coste no depende de cuántas filas hay ya cargadas."""
+        cursor = self._cursor_lista_siguiente
+        self._cursor_lista_siguiente = None
+        try:
+            resultado = self._buscar_lista_uc.ejecutar_keyset(
+                self._filtros_lista_cargados,
+                self._columnas_lista,
+                PaginacionCitasKeysetDTO(limit=_LIMITE_PAGINA_LISTA, cursor=cursor),
+            )
+        except Exception as exc:  # noqa: BLE001
+            LOGGER.warning(
+                "citas_lista_error",
+                extra={"action": "citas_lista_error", "error": exc.__class__.__name__, "contexto": "LISTA_MAS"},
+            )
+            self._cursor_lista_siguiente = cursor
+            return
+        self._actualizando_checks_lote = True
+        self._anexar_filas_lista(self._inyectar_estimaciones(resultado.items))
         self._actualizando_checks_lote = False
         self._actualizar_ui_lote_hitos()
-        restaurar_contexto_tabla(self.table_lista, self._contexto_lista_pendiente, columna_id=0)
+        self._cursor_lista_siguiente = resultado.cursor_siguiente
 
     def _resolver_intent_navegacion(self, vista: str, token_refresh: int) -> None:
         if not self._es_refresh_vigente(token_refresh, f"resolver_intent:{vista}"):
@@ -235,7 +235,7 @@ class PageConfirmaciones(QWidget):
                 db_path=self._db_path,
                 filtros=self._build_filtros(texto),
                 page_size=_PAGE_SIZE,
-                riesgo_uc=self._container.prediccion_ausencias_facade.obtener_riesgo_agenda_uc,
+                riesgo_uc=self._container.prediccion_ausencias_facade.puntuar_riesgo_uc,
                 salud_uc=self._container.prediccion_ausencias_facade.obtener_salud_uc,
                 token=token,
                 on_payload=self._on_busqueda_rapida_ok,
@@ -270,7 +270,7 @@ class PageConfirmaciones(QWidget):
             filtros=self._build_filtros(),
             page_size=_PAGE_SIZE,
             offset=self._offset,
-            riesgo_uc=self._container.prediccion_ausencias_facade.obtener_riesgo_agenda_uc,
+            riesgo_uc=self._container.prediccion_ausencias_facade.puntuar_riesgo_uc,
             salud_uc=self._container.prediccion_ausencias_facade.obtener_salud_uc,
             token=token,
             on_ok=self._on_carga_ok,
@@ -449,7 +449,7 @@ class PageConfirmaciones(QWidget):
     def _listar_confirmaciones_sync(self, **kwargs) -> list[object]:
         use_case = ObtenerConfirmacionesCitas(
             queries=ConfirmacionesQueries(self._container.connection),
-            obtener_riesgo_uc=self._container.prediccion_ausencias_facade.obtener_riesgo_agenda_uc,
+            puntuar_riesgo_uc=self._container.prediccion_ausencias_facade.puntuar_riesgo_uc,
             obtener_salud_uc=self._container.prediccion_ausencias_facade.obtener_salud_uc,
         )
         filtros = self._build_filtros(kwargs.get("filtro_texto"))
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import date, datetime, time, timedelta
+from typing import Sequence
+
+from clinicdesk.app.domain.agenda_disponibilidad import AgendaDisponibilidad, Intervalo
+from clinicdesk.app.infrastructure.sqlite.citas_rango_sql import SQL_EPOCH_PARAM
+
+# Margen hacia atrás al buscar citas que solapan el inicio del rango: ninguna cita dura
+# más de un día, así que el filtro sobre `inicio_ts` sigue siendo un rango del índice.
+_MARGEN_CITAS = timedelta(days=1)
+
+
+class AgendaDisponibilidadQueries:
+    """Carga en una pasada la ocupación de médicos y salas de un rango para resolverla en memoria."""
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self._con = connection
+
+    def cargar_agenda(
+        self,
+        desde: datetime,
+        hasta: datetime,
+        *,
+        medico_ids: Sequence[int],
+        sala_ids: Sequence[int],
+    ) -> AgendaDisponibilidad:
+        return AgendaDisponibilidad.construir(
+            citas_medico=self._citas("medico_id", medico_ids, desde, hasta),
+            citas_sala=self._citas("sala_id", sala_ids, desde, hasta),
+            turnos=self._turnos(medico_ids, desde.date(), hasta.date()),
+            ausencias=self._ausencias(medico_ids, desde, hasta),
+        )
+
+    def listar_salas_activas(self) -> list[int]:
+        rows = self._con.execute("SELECT id FROM salas WHERE activa = 1 ORDER BY id").fetchall()
+        return [int(row[0]) for row in rows]
+
+    def _citas(self, columna: str, ids: Sequence[int], desde: datetime, hasta: datetime) -> list[tuple[int, Intervalo]]:
+        if not ids:
+            return []
+        rows = self._con.execute(
+            f"""
+            SELECT {columna} AS recurso_id, inicio, fin
+            FROM citas
+            WHERE {columna} IN ({_marcadores(ids)})
+              AND estado != 'CANCELADA'
+              AND inicio_ts >= {SQL_EPOCH_PARAM}
+              AND inicio_ts < {SQL_EPOCH_PARAM}
+              AND fin_ts > {SQL_EPOCH_PARAM}
+            """,
+            (*ids, _texto(desde - _MARGEN_CITAS), _texto(hasta), _texto(desde)),
+        ).fetchall()
+        return [(int(row["recurso_id"]), Intervalo(_parse(row["inicio"]), _parse(row["fin"]))) for row in rows]
+
+    def _turnos(self, medico_ids: Sequence[int], desde: date, hasta: date) -> list[tuple[int, Intervalo]]:
+        if not medico_ids:
+            return []
+        rows = self._con.execute(
+            f"""
+            SELECT
+                c.medico_id,
+                c.fecha,
+                COALESCE(c.hora_inicio_override, t.hora_inicio) AS hora_inicio,
+                COALESCE(c.hora_fin_override, t.hora_fin) AS hora_fin
+            FROM calendario_medico c
+            JOIN turnos t ON t.id = c.turno_id
+            JOIN medicos m ON m.id = c.medico_id AND m.activo = 1
+            WHERE c.medico_id IN ({_marcadores(medico_ids)})
+              AND c.fecha BETWEEN ? AND ?
+              AND c.activo = 1
+            """,
+            (*medico_ids, desde.isoformat(), hasta.isoformat()),
+        ).fetchall()
+        turnos: list[tuple[int, Intervalo]] = []
+        for row in rows:
+            fecha = date.fromisoformat(row["fecha"])
+            inicio = datetime.combine(fecha, time.fromisoformat(row["hora_inicio"]))
+            fin = datetime.combine(fecha, time.fromisoformat(row["hora_fin"]))
+            if fin <= inicio:
+                fin += timedelta(days=1)
+            turnos.append((int(row["medico_id"]), Intervalo(inicio, fin)))
+        return turnos
+
+    def _ausencias(self, medico_ids: Sequence[int], desde: datetime, hasta: datetime) -> list[tuple[int, Intervalo]]:
+        if not medico_ids:
+            return []
+        rows = self._con.execute(
+            f"""
+            SELECT medico_id, inicio, fin
+            FROM ausencias_medico
+            WHERE medico_id IN ({_marcadores(medico_ids)})
+              AND inicio <= ?
+              AND fin >= ?
+              AND activo = 1
+            """,
+            (*medico_ids, _texto(hasta), _texto(desde)),
+        ).fetchall()
+        return [(int(row["medico_id"]), Intervalo(_parse(row["inicio"]), _parse(row["fin"]))) for row in rows]
+
+
+def _marcadores(ids: Sequence[int]) -> str:
+    return ", ".join("?" for _ in ids)
+
+
+def _texto(instante: datetime) -> str:
+    return instante.isoformat(sep=" ", timespec="seconds")
+
+
+def _parse(valor: datetime | str) -> datetime:
+    return valor if isinstance(valor, datetime) else datetime.fromisoformat(str(valor))
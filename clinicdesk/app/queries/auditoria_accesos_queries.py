@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any
+from typing import Any, Iterator
 
 import sqlite3
 
@@ -11,9 +11,18 @@ from clinicdesk.app.application.usecases.preflight_integridad_auditoria import E
 from clinicdesk.app.common.redaccion_pii import sanear_valor_pii
 from clinicdesk.app.common.search_utils import normalize_search_text
 from clinicdesk.app.infrastructure.sqlite.auditoria_integridad import verificar_cadena
+from clinicdesk.app.infrastructure.sqlite.lectura_por_lotes import TAMANO_LOTE_LECTURA, iterar_filas
 
 LOGGER = get_logger(__name__)
 
+_SQL_ITEMS = (
+    "SELECT timestamp_utc, usuario, modo_demo, accion, entidad_tipo, entidad_id "
+    "FROM auditoria_accesos "
+    "{where_sql} "
+    "ORDER BY timestamp_utc DESC "
+    "LIMIT ? OFFSET ?"
+)
+
 
 @dataclass(frozen=True, slots=True)
 class FiltrosAuditoriaAccesos:
@@ -112,6 +121,20 @@ class AuditoriaAccesosQueries:
         limite = _resolve_export_limit(max_filas, self._EXPORT_LIMIT_DEFENSIVO)
         return self._buscar_items(where_sql, where_params, limit=limite, offset=0)
 
+    def iterar_auditoria_accesos(
+        self,
+        filtros: FiltrosAuditoriaAccesos,
+        max_filas: int | None = None,
+        *,
+        tamano_lote: int = TAMANO_LOTE_LECTURA,
+    ) -> Iterator[list[AuditoriaAccesoItemQuery]]:
+        """Mismas filas que `exportar_auditoria_accesos`, en lotes de `fetchmany`."""
+        where_sql, where_params = _build_where_sql(filtros)
+        limite = _resolve_export_limit(max_filas, self._EXPORT_LIMIT_DEFENSIVO)
+        sql = _SQL_ITEMS.format(where_sql=where_sql)
+        for filas in iterar_filas(self._connection, sql, (*where_params, limite, 0), tamano_lote=tamano_lote):
+            yield [_map_row(row) for row in filas]
+
     def _buscar_items(
         self,
         where_sql: str,
@@ -119,16 +142,9 @@ class AuditoriaAccesosQueries:
         limit: int,
         offset: int,
     ) -> list[AuditoriaAccesoItemQuery]:
-        sql = (
-            "SELECT timestamp_utc, usuario, modo_demo, accion, entidad_tipo, entidad_id "
-            "FROM auditoria_accesos "
-            f"{where_sql} "
-            "ORDER BY timestamp_utc DESC "
-            "LIMIT ? OFFSET ?"
-        )
         params = (*where_params, limit, offset)
         try:
-            rows = self._connection.execute(sql, params).fetchall()
+            rows = self._connection.execute(_SQL_ITEMS.format(where_sql=where_sql), params).fetchall()
         except sqlite3.Error:
             LOGGER.exception("auditoria_accesos_query_items_error")
             return []
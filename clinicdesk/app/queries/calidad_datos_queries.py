@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from datetime import date
 import sqlite3
 
+from clinicdesk.app.infrastructure.sqlite.citas_rango_sql import sql_inicio_entre_dias
 from clinicdesk.app.infrastructure.sqlite.proveedor_conexion_sqlite import ProveedorConexionSqlitePorHilo
 
 _ESTADOS_CERRADOS = ("REALIZADA", "NO_PRESENTADO", "CANCELADA")
@@ -26,23 +27,23 @@ class CalidadDatosQueries:
         return self._proveedor if isinstance(self._proveedor, sqlite3.Connection) else self._proveedor.obtener()
 
     def contar_citas_cerradas(self, desde: date, hasta: date) -> int:
-        query = """
+        query = f"""
             SELECT COUNT(1) AS total
             FROM citas c
             WHERE c.activo = 1
               AND c.estado IN (?, ?, ?)
-              AND date(c.inicio) BETWEEN date(?) AND date(?)
+              AND {sql_inicio_entre_dias()}
         """
         row = self._con().execute(query, (*_ESTADOS_CERRADOS, desde.isoformat(), hasta.isoformat())).fetchone()
         return int(row["total"] if row else 0)
 
     def contar_completas(self, desde: date, hasta: date) -> int:
-        query = """
+        query = f"""
             SELECT COUNT(1) AS total
             FROM citas c
             WHERE c.activo = 1
               AND c.estado IN (?, ?, ?)
-              AND date(c.inicio) BETWEEN date(?) AND date(?)
+              AND {sql_inicio_entre_dias()}
               AND c.check_in_at IS NOT NULL
               AND c.consulta_inicio_at IS NOT NULL
               AND c.consulta_fin_at IS NOT NULL
@@ -52,7 +53,7 @@ class CalidadDatosQueries:
         return int(row["total"] if row else 0)
 
     def contar_faltantes(self, desde: date, hasta: date) -> FaltantesCalidadDatos:
-        query = """
+        query = f"""
             SELECT
                 SUM(CASE WHEN c.check_in_at IS NULL THEN 1 ELSE 0 END) AS faltan_check_in,
                 SUM(CASE WHEN c.consulta_inicio_at IS NULL OR c.consulta_fin_at IS NULL THEN 1 ELSE 0 END) AS faltan_inicio_fin,
@@ -60,7 +61,7 @@ class CalidadDatosQueries:
             FROM citas c
             WHERE c.activo = 1
               AND c.estado IN (?, ?, ?)
-              AND date(c.inicio) BETWEEN date(?) AND date(?)
+              AND {sql_inicio_entre_dias()}
         """
         row = self._con().execute(query, (*_ESTADOS_CERRADOS, desde.isoformat(), hasta.isoformat())).fetchone()
         return FaltantesCalidadDatos(
@@ -9,6 +9,7 @@ import logging
 from clinicdesk.app.application.citas.filtros import FiltrosCitasDTO, normalizar_filtros_citas
 from clinicdesk.app.common.search_utils import normalize_search_text
 from clinicdesk.app.container import AppContainer
+from clinicdesk.app.infrastructure.sqlite.citas_rango_sql import sql_inicio_entre_dias, sql_inicio_entre_instantes
 
 
 logger = logging.getLogger(__name__)
@@ -83,6 +84,31 @@ class CitasQueries:
         total = int(self._c.connection.execute(_sql_count(where_sql), params).fetchone()["total"])
         return ([dict(row) for row in rows], total)
 
+    def buscar_citas_listado_keyset(
+        self,
+        filtros_norm: FiltrosCitasDTO,
+        campos_requeridos: tuple[str, ...],
+        limit: int,
+        clave: tuple[int, ...] | None,
+        hacia_atras: bool,
+        contar_total: bool,
+    ) -> tuple[list[dict[str, object]], int | None]:
+        """Página por (inicio_ts, id) sin OFFSET; las filas vuelven siempre en orden ascendente."""
+        where_sql, params = self._build_common_filters(filtros_norm)
+        total = None
+        if contar_total:
+            total = int(self._c.connection.execute(_sql_count(where_sql), params).fetchone()["total"])
+        if clave is not None:
+            where_sql += f" AND (c.inicio_ts, c.id) {'<' if hacia_atras else '>'} (?, ?)"
+            params = (*params, *clave)
+        campos = (*self._resolver_select_fields(campos_requeridos), "c.inicio_ts AS inicio_ts")
+        orden = "DESC" if hacia_atras else "ASC"
+        sql = f"{_sql_base_listado(where_sql, campos)} ORDER BY c.inicio_ts {orden}, c.id {orden} LIMIT ?"
+        rows = [dict(row) for row in self._c.connection.execute(sql, (*params, limit)).fetchall()]
+        if hacia_atras:
+            rows.reverse()
+        return rows, total
+
     def buscar_citas_calendario(
         self,
         filtros_norm: FiltrosCitasDTO,
@@ -100,7 +126,7 @@ class CitasQueries:
             logger.info("citas_list_by_date_skip", extra={"reason_code": "fecha_vacia"})
             return []
         try:
-            rows = self._c.connection.execute(_sql_by_date(), (f"{yyyy_mm_dd}%",)).fetchall()
+            rows = self._c.connection.execute(_sql_by_date(), (yyyy_mm_dd, yyyy_mm_dd)).fetchall()
         except Exception as exc:  # noqa: BLE001
             logger.error("citas_list_by_date_sql_error", extra={"reason_code": "sql_error", "error": str(exc)})
             return []
@@ -141,7 +167,7 @@ class CitasQueries:
         if filtros.desde is None or filtros.hasta is None:
             raise ValueError("Los filtros de citas deben llegar normalizados con rango cerrado.")
 
-        clauses = ["c.activo = 1", "datetime(c.inicio) >= datetime(?)", "datetime(c.inicio) <= datetime(?)"]
+        clauses = ["c.activo = 1", sql_inicio_entre_instantes()]
         params: list[object] = [filtros.desde.isoformat(sep=" "), filtros.hasta.isoformat(sep=" ")]
 
         if filtros.estado_cita:
@@ -220,7 +246,7 @@ def _obtener_columnas_tabla(connection, table: str) -> set[str]:
 
 
 def _sql_by_date() -> str:
-    return """
+    return f"""
         SELECT c.id, c.inicio, c.fin, c.paciente_id,
                (p.nombre || ' ' || p.apellidos) AS paciente_nombre,
                c.medico_id, (m.nombre || ' ' || m.apellidos) AS medico_nombre,
@@ -229,8 +255,8 @@ def _sql_by_date() -> str:
         JOIN pacientes p ON p.id = c.paciente_id
         JOIN medicos m ON m.id = c.medico_id
         JOIN salas s ON s.id = c.sala_id
-        WHERE c.inicio LIKE ? AND c.activo = 1
-        ORDER BY c.inicio
+        WHERE {sql_inicio_entre_dias()} AND c.activo = 1
+        ORDER BY c.inicio_ts
     """
 
 
@@ -243,20 +269,19 @@ def _sql_text_search() -> str:
 
 
 def _sql_calendario(where_sql: str, campos: tuple[str, ...]) -> str:
+    return f"{_sql_base_listado(where_sql, campos)} ORDER BY c.inicio_ts"
+
+
+def _sql_base_listado(where_sql: str, campos: tuple[str, ...]) -> str:
     return (
-        "WITH recordatorios_agg AS ("
-        "SELECT cita_id, CASE "
-        "WHEN max(CASE WHEN estado = 'ENVIADO' THEN 1 ELSE 0 END) = 1 THEN 'ENVIADO' "
-        "WHEN max(CASE WHEN estado = 'PREPARADO' THEN 1 ELSE 0 END) = 1 THEN 'PREPARADO' "
-        "ELSE 'SIN_PREPARAR' END AS estado_global FROM recordatorios_citas GROUP BY cita_id"
-        "), incidencias_agg AS (SELECT DISTINCT cita_id FROM incidencias WHERE activo = 1) "
+        "WITH incidencias_agg AS (SELECT DISTINCT cita_id FROM incidencias WHERE activo = 1) "
         f"SELECT {', '.join(campos)} FROM citas c "
         "JOIN pacientes p ON p.id = c.paciente_id "
         "JOIN medicos m ON m.id = c.medico_id "
         "JOIN salas s ON s.id = c.sala_id "
-        "LEFT JOIN recordatorios_agg r ON r.cita_id = c.id "
+        "LEFT JOIN recordatorios_citas_resumen r ON r.cita_id = c.id "
         "LEFT JOIN incidencias_agg i ON i.cita_id = c.id "
-        f"WHERE {where_sql} ORDER BY c.inicio"
+        f"WHERE {where_sql}"
     )
 
 
@@ -266,16 +291,11 @@ def _sql_lista(where_sql: str, campos: tuple[str, ...]) -> str:
 
 def _sql_count(where_sql: str) -> str:
     return (
-        "WITH recordatorios_agg AS ("
-        "SELECT cita_id, CASE "
-        "WHEN max(CASE WHEN estado = 'ENVIADO' THEN 1 ELSE 0 END) = 1 THEN 'ENVIADO' "
-        "WHEN max(CASE WHEN estado = 'PREPARADO' THEN 1 ELSE 0 END) = 1 THEN 'PREPARADO' "
-        "ELSE 'SIN_PREPARAR' END AS estado_global FROM recordatorios_citas GROUP BY cita_id"
-        ") SELECT count(1) AS total FROM citas c "
+        "SELECT count(1) AS total FROM citas c "
         "JOIN pacientes p ON p.id = c.paciente_id "
         "JOIN medicos m ON m.id = c.medico_id "
         "JOIN salas s ON s.id = c.sala_id "
-        "LEFT JOIN recordatorios_agg r ON r.cita_id = c.id "
+        "LEFT JOIN recordatorios_citas_resumen r ON r.cita_id = c.id "
         f"WHERE {where_sql}"
     )
 
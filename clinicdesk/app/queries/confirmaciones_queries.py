@@ -3,6 +3,11 @@ from __future__ import annotations
 from dataclasses import dataclass
 import sqlite3
 
+from clinicdesk.app.infrastructure.sqlite.citas_rango_sql import sql_inicio_entre_dias
+
+# Solo cuentan las puntuaciones del modelo activo; el resto se muestra como NO_DISPONIBLE.
+_SQL_JOIN_RIESGO = "LEFT JOIN riesgo_ausencia_citas ra ON ra.cita_id = c.id AND ra.modelo_version = ?"
+
 
 @dataclass(frozen=True, slots=True)
 class FiltrosConfirmacionesQuery:
@@ -10,6 +15,8 @@ class FiltrosConfirmacionesQuery:
     hasta: str
     texto_paciente: str = ""
     recordatorio_filtro: str = "TODOS"
+    riesgo_filtro: str = "TODOS"
+    modelo_version: str | None = None
 
 
 @dataclass(frozen=True, slots=True)
@@ -23,6 +30,7 @@ class CitaConfirmacionRow:
     medico_id: int
     recordatorio_estado_global: str
     tiene_telefono: bool
+    riesgo: str = "NO_DISPONIBLE"
 
 
 class ConfirmacionesQueries:
@@ -35,7 +43,8 @@ class ConfirmacionesQueries:
         limit: int,
         offset: int,
     ) -> tuple[list[CitaConfirmacionRow], int]:
-        where_sql, params = self._build_filters(filtros)
+        where_sql, filtros_params = self._build_filters(filtros)
+        params = (filtros.modelo_version or "", *filtros_params)
         rows = self._con.execute(
             self._sql_busqueda(where_sql),
             (*params, limit, offset),
@@ -45,7 +54,7 @@ class ConfirmacionesQueries:
         return ([self._map_row(row) for row in rows], total)
 
     def _build_filters(self, filtros: FiltrosConfirmacionesQuery) -> tuple[str, tuple[object, ...]]:
-        clauses = ["c.activo = 1", "date(c.inicio) >= date(?)", "date(c.inicio) <= date(?)"]
+        clauses = ["c.activo = 1", sql_inicio_entre_dias()]
         params: list[object] = [filtros.desde, filtros.hasta]
         texto = filtros.texto_paciente.strip().lower()
         if texto:
@@ -56,47 +65,39 @@ class ConfirmacionesQueries:
             clauses.append("coalesce(r.estado_global, 'SIN_PREPARAR') = 'SIN_PREPARAR'")
         if recordatorio == "NO_ENVIADO":
             clauses.append("coalesce(r.estado_global, 'SIN_PREPARAR') != 'ENVIADO'")
+        riesgo = filtros.riesgo_filtro.upper().strip()
+        if riesgo == "SOLO_ALTO":
+            clauses.append("ra.bucket = 'ALTO'")
+        if riesgo == "ALTO_MEDIO":
+            clauses.append("ra.bucket IN ('ALTO', 'MEDIO')")
         return (" AND ".join(clauses), tuple(params))
 
     @staticmethod
     def _sql_busqueda(where_sql: str) -> str:
         return (
-            "WITH recordatorios_agg AS ("
-            "SELECT cita_id, "
-            "CASE "
-            "WHEN max(CASE WHEN estado = 'ENVIADO' THEN 1 ELSE 0 END) = 1 THEN 'ENVIADO' "
-            "WHEN max(CASE WHEN estado = 'PREPARADO' THEN 1 ELSE 0 END) = 1 THEN 'PREPARADO' "
-            "ELSE 'SIN_PREPARAR' END AS estado_global "
-            "FROM recordatorios_citas GROUP BY cita_id"
-            ") "
             "SELECT c.id AS cita_id, c.inicio, "
             "p.nombre || ' ' || p.apellidos AS paciente_nombre, "
             "m.nombre || ' ' || m.apellidos AS medico_nombre, "
             "c.estado AS estado_cita, c.paciente_id, c.medico_id, "
-            "coalesce(r.estado_global, 'SIN_PREPARAR') AS recordatorio_estado_global, CASE WHEN p.telefono IS NOT NULL AND trim(p.telefono) != '' THEN 1 ELSE 0 END AS tiene_telefono "
+            "coalesce(r.estado_global, 'SIN_PREPARAR') AS recordatorio_estado_global, CASE WHEN p.telefono IS NOT NULL AND trim(p.telefono) != '' THEN 1 ELSE 0 END AS tiene_telefono, "
+            "coalesce(ra.bucket, 'NO_DISPONIBLE') AS riesgo "
             "FROM citas c "
             "JOIN pacientes p ON p.id = c.paciente_id "
             "JOIN medicos m ON m.id = c.medico_id "
-            "LEFT JOIN recordatorios_agg r ON r.cita_id = c.id "
+            "LEFT JOIN recordatorios_citas_resumen r ON r.cita_id = c.id "
+            f"{_SQL_JOIN_RIESGO} "
             f"WHERE {where_sql} "
-            "ORDER BY c.inicio ASC LIMIT ? OFFSET ?"
+            "ORDER BY c.inicio_ts ASC LIMIT ? OFFSET ?"
         )
 
     @staticmethod
     def _sql_total(where_sql: str) -> str:
         return (
-            "WITH recordatorios_agg AS ("
-            "SELECT cita_id, "
-            "CASE "
-            "WHEN max(CASE WHEN estado = 'ENVIADO' THEN 1 ELSE 0 END) = 1 THEN 'ENVIADO' "
-            "WHEN max(CASE WHEN estado = 'PREPARADO' THEN 1 ELSE 0 END) = 1 THEN 'PREPARADO' "
-            "ELSE 'SIN_PREPARAR' END AS estado_global "
-            "FROM recordatorios_citas GROUP BY cita_id"
-            ") "
             "SELECT count(1) AS total "
             "FROM citas c "
             "JOIN pacientes p ON p.id = c.paciente_id "
-            "LEFT JOIN recordatorios_agg r ON r.cita_id = c.id "
+            "LEFT JOIN recordatorios_citas_resumen r ON r.cita_id = c.id "
+            f"{_SQL_JOIN_RIESGO} "
             f"WHERE {where_sql}"
         )
 
@@ -112,4 +113,5 @@ class ConfirmacionesQueries:
             medico_id=int(row["medico_id"]),
             recordatorio_estado_global=str(row["recordatorio_estado_global"]),
             tiene_telefono=bool(row["tiene_telefono"]),
+            riesgo=str(row["riesgo"]),
         )
@@ -5,9 +5,12 @@ from datetime import date
 import sqlite3
 
 from clinicdesk.app.application.usecases.dashboard_gestion_prediccion import CitaGestionHoyDTO
+from clinicdesk.app.infrastructure.sqlite.citas_rango_sql import sql_epoch, sql_inicio_entre_dias
 from clinicdesk.app.infrastructure.sqlite.proveedor_conexion_sqlite import ProveedorConexionSqlitePorHilo
 
 _ESTADOS_PROXIMOS = ("PROGRAMADA", "CONFIRMADA", "EN_CURSO")
+_SQL_EPOCH_HOY = sql_epoch("'now'", "'start of day'")
+_SQL_EPOCH_MANANA = sql_epoch("'now'", "'start of day'", "'+1 day'")
 
 
 @dataclass(frozen=True, slots=True)
@@ -49,7 +52,7 @@ class DashboardGestionQueries:
         rows = (
             self._con()
             .execute(
-                """
+                f"""
             SELECT
                 c.id AS cita_id,
                 time(c.inicio) AS hora,
@@ -63,9 +66,9 @@ class DashboardGestionQueries:
             JOIN medicos m ON m.id = c.medico_id
             WHERE c.activo = 1
               AND c.estado IN (?, ?, ?)
-              AND datetime(c.inicio) >= datetime('now', 'start of day')
-              AND datetime(c.inicio) < datetime('now', 'start of day', '+1 day')
-            ORDER BY datetime(c.inicio) ASC
+              AND c.inicio_ts >= {_SQL_EPOCH_HOY}
+              AND c.inicio_ts < {_SQL_EPOCH_MANANA}
+            ORDER BY c.inicio_ts ASC
             LIMIT ?
             """,
                 (*_ESTADOS_PROXIMOS, limite),
@@ -154,13 +157,13 @@ class DashboardGestionQueries:
         row = (
             self._con()
             .execute(
-                """
+                f"""
             SELECT COUNT(1) AS total
             FROM (
                 SELECT c.paciente_id
                 FROM citas c
                 WHERE c.activo = 1
-                  AND date(c.inicio) BETWEEN date(?) AND date(?)
+                  AND {sql_inicio_entre_dias()}
                 GROUP BY c.paciente_id
                 HAVING SUM(CASE WHEN c.estado IN ('NO_PRESENTADO', 'CANCELADA') THEN 1 ELSE 0 END) >= 2
             ) x
@@ -196,7 +199,7 @@ class DashboardGestionQueries:
 def _build_where_operativa(
     desde: date, hasta: date, medico_id: int | None, sala_id: int | None, estado: str | None
 ) -> tuple[str, list[object]]:
-    clauses = ["c.activo = 1", "date(c.inicio) BETWEEN date(?) AND date(?)"]
+    clauses = ["c.activo = 1", sql_inicio_entre_dias()]
     params: list[object] = [desde.isoformat(), hasta.isoformat()]
     if medico_id is not None:
         clauses.append("c.medico_id = ?")
@@ -0,0 +1,84 @@
+"""
+Descifrado bajo demanda de los campos protegidos de un listado.
+
+Las filas guardan el par (legacy, cifrado) de cada campo protegido y solo lo descifran
+cuando se lee el atributo. Los valores en claro quedan en una caché que comparten las
+filas de un mismo listado y que desaparece con él. Quien sabe de antemano qué campos
+va a mostrar o exportar los pide en lote con `precargar_campos`.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Protocol, Sequence
+
+ParCifrado = tuple[str | None, str | None]
+
+
+class _Decodificador(Protocol):
+    def decode(self, field: str, *, legacy: str | None, encrypted: str | None) -> str | None: ...
+
+    def decode_many(self, field: str, values: Iterable[ParCifrado]) -> list[str | None]: ...
+
+
+class DescifradoListado:
+    __slots__ = ("_decodificador", "_campos", "_claros")
+
+    def __init__(self, decodificador: _Decodificador, campos: Sequence[str]) -> None:
+        self._decodificador = decodificador
+        self._campos = tuple(campos)
+        self._claros: dict[tuple[str, str], str] = {}
+
+    @property
+    def campos(self) -> tuple[str, ...]:
+        return self._campos
+
+    @property
+    def total_descifrados(self) -> int:
+        return len(self._claros)
+
+    def valor(self, campo: str, par: ParCifrado) -> str:
+        legacy, cifrado = par
+        if not cifrado:
+            return legacy or ""
+        clave = (campo, cifrado)
+        claro = self._claros.get(clave)
+        if claro is None:
+            claro = self._decodificador.decode(campo, legacy=legacy, encrypted=cifrado) or ""
+            self._claros[clave] = claro
+        return claro
+
+    def precargar(self, campo: str, pares: Iterable[ParCifrado]) -> None:
+        pendientes = [par for par in pares if par[1] and (campo, par[1]) not in self._claros]
+        if not pendientes:
+            return
+        for (_, cifrado), claro in zip(pendientes, self._decodificador.decode_many(campo, pendientes)):
+            self._claros[(campo, cifrado)] = claro or ""
+
+
+class FilaConPii(Protocol):
+    @property
+    def pii(self) -> tuple[ParCifrado, ...]: ...
+
+    @property
+    def descifrado(self) -> DescifradoListado: ...
+
+
+def campo_protegido(campo: str, indice: int) -> property:
+    """Atributo de solo lectura que descifra `pii[indice]` al leerlo."""
+
+    def _leer(fila: FilaConPii) -> str:
+        return fila.descifrado.valor(campo, fila.pii[indice])
+
+    return property(_leer, doc=f"`{campo}` en claro (se descifra al leerlo).")
+
+
+def precargar_campos(filas: Sequence[FilaConPii], campos: Iterable[str]) -> None:
+    """Descifra en lote los `campos` pedidos de las filas; los que no están protegidos se ignoran."""
+    por_listado: dict[int, tuple[DescifradoListado, list[FilaConPii]]] = {}
+    for fila in filas:
+        por_listado.setdefault(id(fila.descifrado), (fila.descifrado, []))[1].append(fila)
+    pedidos = set(campos)
+    for descifrado, del_listado in por_listado.values():
+        for indice, campo in enumerate(descifrado.campos):
+            if campo in pedidos:
+                descifrado.precargar(campo, (fila.pii[indice] for fila in del_listado))
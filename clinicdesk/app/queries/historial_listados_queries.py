@@ -6,6 +6,7 @@ import logging
 import sqlite3
 
 from clinicdesk.app.application.historial_paciente.usecases import ResumenRaw
+from clinicdesk.app.infrastructure.sqlite.citas_rango_sql import SQL_EPOCH_PARAM
 
 logger = logging.getLogger(__name__)
 
@@ -97,7 +98,7 @@ class HistorialListadosQueries:
             "CASE WHEN EXISTS (SELECT 1 FROM incidencias i WHERE i.cita_id = c.id AND i.activo = 1) THEN 1 ELSE 0 END AS tiene_incidencias "
             "FROM citas c JOIN medicos m ON m.id = c.medico_id "
             f"{where_sql} "
-            "ORDER BY c.inicio DESC, c.id DESC LIMIT ? OFFSET ?"
+            "ORDER BY c.inicio_ts DESC, c.id DESC LIMIT ? OFFSET ?"
         )
 
     @staticmethod
@@ -135,10 +136,10 @@ def _build_where_citas(
     filtros = ["c.activo = 1", "c.paciente_id = ?"]
     params: list[object] = [paciente_id]
     if desde is not None:
-        filtros.append("c.inicio >= ?")
+        filtros.append(f"c.inicio_ts >= {SQL_EPOCH_PARAM}")
         params.append(desde.isoformat(sep=" "))
     if hasta is not None:
-        filtros.append("c.inicio <= ?")
+        filtros.append(f"c.inicio_ts <= {SQL_EPOCH_PARAM}")
         params.append(hasta.isoformat(sep=" "))
     if texto:
         like = f"%{texto}%"
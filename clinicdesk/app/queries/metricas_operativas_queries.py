@@ -4,8 +4,10 @@ from dataclasses import dataclass
 from datetime import date
 import sqlite3
 
+from clinicdesk.app.infrastructure.sqlite.citas_rango_sql import sql_inicio_entre_dias
 
-_SQL_KPIS_POR_DIA = """
+
+_SQL_KPIS_POR_DIA = f"""
 WITH base AS (
     SELECT
         id,
@@ -31,9 +33,9 @@ WITH base AS (
             WHEN consulta_inicio_at IS NOT NULL AND inicio IS NOT NULL
             THEN (julianday(consulta_inicio_at) - julianday(inicio)) * 24.0 * 60.0
         END AS retraso_min
-    FROM citas
-    WHERE activo = 1
-      AND date(inicio) BETWEEN date(?) AND date(?)
+    FROM citas c
+    WHERE c.activo = 1
+      AND {sql_inicio_entre_dias()}
 )
 SELECT
     fecha,
@@ -61,7 +63,7 @@ GROUP BY fecha
 ORDER BY fecha ASC
 """
 
-_SQL_KPIS_POR_MEDICO = """
+_SQL_KPIS_POR_MEDICO = f"""
 WITH base AS (
     SELECT
         c.medico_id,
@@ -82,7 +84,7 @@ WITH base AS (
     FROM citas c
     JOIN medicos m ON m.id = c.medico_id
     WHERE c.activo = 1
-      AND date(c.inicio) BETWEEN date(?) AND date(?)
+      AND {sql_inicio_entre_dias()}
 )
 SELECT
     medico_id,
@@ -1,40 +1,56 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional
 
 import logging
 import sqlite3
 
 from clinicdesk.app.common.search_utils import like_value, normalize_search_text
+from clinicdesk.app.infrastructure.sqlite.pacientes.busqueda_fts import (
+    TABLA_FTS_PACIENTES,
+    expresion_busqueda_fts,
+    indice_busqueda_disponible,
+)
 from clinicdesk.app.infrastructure.sqlite.pacientes_field_protection import PacientesFieldProtection
+from clinicdesk.app.queries.descifrado_listado import DescifradoListado, ParCifrado, campo_protegido
 
 
 logger = logging.getLogger(__name__)
 
+CAMPOS_PROTEGIDOS = ("documento", "telefono", "email", "direccion")
+# Los que pinta el listado (tabla y tooltip); email y dirección se descifran al leerlos.
+CAMPOS_VISIBLES_LISTADO = ("documento", "telefono")
+
 
 @dataclass(frozen=True, slots=True)
 class PacienteRow:
+    """Fila de listado; los campos protegidos se descifran al leerlos (ver `descifrado_listado`)."""
+
     id: int
     tipo_documento: str
-    documento: str
     nombre: str
     apellidos: str
     nombre_completo: str
-    telefono: str
-    email: str
     fecha_nacimiento: str
-    direccion: str
     activo: bool
     num_historia: str
     alergias: str
     observaciones: str
+    pii: tuple[ParCifrado, ...] = field(repr=False)
+    descifrado: DescifradoListado = field(repr=False, compare=False)
+
+    documento = campo_protegido("documento", 0)
+    telefono = campo_protegido("telefono", 1)
+    email = campo_protegido("email", 2)
+    direccion = campo_protegido("direccion", 3)
 
 
 class PacientesQueries:
     def __init__(self, connection: sqlite3.Connection) -> None:
         self._conn = connection
         self._field_protection = PacientesFieldProtection(connection)
+        self._usar_fts = indice_busqueda_disponible(connection)
 
     def list_all(
         self,
@@ -59,7 +75,7 @@ class PacientesQueries:
         except sqlite3.Error as exc:
             logger.error("Error SQL en PacientesQueries.list_all: %s", exc)
             return []
-        return [self._to_row(row) for row in rows]
+        return self._to_rows(rows)
 
     def search(
         self,
@@ -74,47 +90,29 @@ class PacientesQueries:
         documento = normalize_search_text(documento)
         tipo_documento = normalize_search_text(tipo_documento)
 
-        clauses = []
+        clauses: List[str] = []
         params: List[object] = []
-
-        if texto:
-            like = like_value(texto)
-            if self._field_protection.enabled:
-                clauses.append("(nombre LIKE ? COLLATE NOCASE OR apellidos LIKE ? COLLATE NOCASE)")
-                params.extend([like, like])
-            else:
-                clauses.append(
-                    "(nombre LIKE ? COLLATE NOCASE OR apellidos LIKE ? COLLATE NOCASE "
-                    "OR documento LIKE ? COLLATE NOCASE OR telefono LIKE ? COLLATE NOCASE)"
-                )
-                params.extend([like, like, like, like])
-                cleaned = texto.replace(" ", "").replace("-", "")
-                if cleaned:
-                    clauses[-1] = (
-                        clauses[-1][:-1] + " OR REPLACE(REPLACE(telefono, ' ', ''), '-', '') LIKE ? COLLATE NOCASE)"
-                    )
-                    params.append(like_value(cleaned))
-
-        if tipo_documento:
-            clauses.append("tipo_documento LIKE ? COLLATE NOCASE")
-            params.append(like_value(tipo_documento))
-
-        if documento:
-            if self._field_protection.enabled:
-                clauses.append("documento_hash = ?")
-                params.append(self._field_protection.hash_for_lookup("documento", documento))
-            else:
-                clauses.append("documento LIKE ? COLLATE NOCASE")
-                params.append(like_value(documento))
-
+        desde = "pacientes"
+        orden = "apellidos, nombre"
+
+        expresion_fts = expresion_busqueda_fts(texto, self._field_protection) if texto and self._usar_fts else None
+        if expresion_fts:
+            desde = f"{TABLA_FTS_PACIENTES} JOIN pacientes ON pacientes.id = {TABLA_FTS_PACIENTES}.rowid"
+            orden = f"{TABLA_FTS_PACIENTES}.rank, apellidos, nombre"
+            clauses.append(f"{TABLA_FTS_PACIENTES} MATCH ?")
+            params.append(expresion_fts)
+        elif texto:
+            self._append_texto_like(clauses, params, texto)
+
+        self._append_filtros_documento(clauses, params, tipo_documento, documento)
         if activo is not None:
             clauses.append("activo = ?")
             params.append(int(activo))
 
-        sql = self._base_select_sql()
+        sql = self._base_select_sql(desde)
         if clauses:
             sql += " WHERE " + " AND ".join(clauses)
-        sql += " ORDER BY apellidos, nombre LIMIT ?"
+        sql += f" ORDER BY {orden} LIMIT ?"
         params.append(int(limit))
 
         try:
@@ -122,50 +120,68 @@ class PacientesQueries:
         except sqlite3.Error as exc:
             logger.error("Error SQL en PacientesQueries.search: %s", exc)
             return []
-        return [self._to_row(row) for row in rows]
+        return self._to_rows(rows)
+
+    def _append_filtros_documento(
+        self,
+        clauses: List[str],
+        params: List[object],
+        tipo_documento: Optional[str],
+        documento: Optional[str],
+    ) -> None:
+        if tipo_documento:
+            clauses.append("tipo_documento LIKE ? COLLATE NOCASE")
+            params.append(like_value(tipo_documento))
+        if not documento:
+            return
+        if self._field_protection.enabled:
+            clauses.append("documento_hash = ?")
+            params.append(self._field_protection.hash_for_lookup("documento", documento))
+        else:
+            clauses.append("documento LIKE ? COLLATE NOCASE")
+            params.append(like_value(documento))
+
+    def _append_texto_like(self, clauses: List[str], params: List[object], texto: str) -> None:
+        like = like_value(texto)
+        if self._field_protection.enabled:
+            clauses.append("(nombre LIKE ? COLLATE NOCASE OR apellidos LIKE ? COLLATE NOCASE)")
+            params.extend([like, like])
+            return
+        clauses.append(
+            "(nombre LIKE ? COLLATE NOCASE OR apellidos LIKE ? COLLATE NOCASE "
+            "OR documento LIKE ? COLLATE NOCASE OR telefono LIKE ? COLLATE NOCASE)"
+        )
+        params.extend([like, like, like, like])
+        cleaned = texto.replace(" ", "").replace("-", "")
+        if cleaned:
+            clauses[-1] = clauses[-1][:-1] + " OR REPLACE(REPLACE(telefono, ' ', ''), '-', '') LIKE ? COLLATE NOCASE)"
+            params.append(like_value(cleaned))
 
     @staticmethod
-    def _base_select_sql() -> str:
+    def _base_select_sql(desde: str = "pacientes") -> str:
         return (
-            "SELECT id, tipo_documento, documento, documento_enc, nombre, apellidos, "
+            "SELECT pacientes.id, tipo_documento, documento, documento_enc, nombre, apellidos, "
             "telefono, telefono_enc, email, email_enc, fecha_nacimiento, direccion, direccion_enc, "
-            "activo, num_historia, alergias, observaciones FROM pacientes"
+            f"activo, num_historia, alergias, observaciones FROM {desde}"
         )
 
-    def _to_row(self, row: sqlite3.Row) -> PacienteRow:
-        documento = self._field_protection.decode(
-            "documento",
-            legacy=row["documento"],
-            encrypted=row["documento_enc"],
-        )
-        telefono = self._field_protection.decode(
-            "telefono",
-            legacy=row["telefono"],
-            encrypted=row["telefono_enc"],
-        )
-        email = self._field_protection.decode(
-            "email",
-            legacy=row["email"],
-            encrypted=row["email_enc"],
-        )
-        direccion = self._field_protection.decode(
-            "direccion",
-            legacy=row["direccion"],
-            encrypted=row["direccion_enc"],
-        )
+    def _to_rows(self, rows: List[sqlite3.Row]) -> List[PacienteRow]:
+        descifrado = DescifradoListado(self._field_protection, CAMPOS_PROTEGIDOS)
+        return [self._to_row(row, descifrado) for row in rows]
+
+    @staticmethod
+    def _to_row(row: sqlite3.Row, descifrado: DescifradoListado) -> PacienteRow:
         return PacienteRow(
             id=row["id"],
             tipo_documento=row["tipo_documento"],
-            documento=documento or "",
             nombre=row["nombre"],
             apellidos=row["apellidos"],
             nombre_completo=f"{row['nombre']} {row['apellidos']}".strip(),
-            telefono=telefono or "",
-            email=email or "",
             fecha_nacimiento=row["fecha_nacimiento"] or "",
-            direccion=direccion or "",
             activo=bool(row["activo"]),
             num_historia=row["num_historia"] or "",
             alergias=row["alergias"] or "",
             observaciones=row["observaciones"] or "",
+            pii=tuple((row[campo], row[f"{campo}_enc"]) for campo in CAMPOS_PROTEGIDOS),
+            descifrado=descifrado,
         )
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional
 
 import logging
@@ -8,18 +8,24 @@ import sqlite3
 
 from clinicdesk.app.common.search_utils import like_value, normalize_search_text
 from clinicdesk.app.infrastructure.sqlite.personal_field_protection import PersonalFieldProtection
+from clinicdesk.app.queries.descifrado_listado import DescifradoListado, ParCifrado, campo_protegido
 
 logger = logging.getLogger(__name__)
 
+CAMPOS_PROTEGIDOS = ("documento", "telefono")
+
 
 @dataclass(frozen=True, slots=True)
 class PersonalRow:
     id: int
-    documento: str
     nombre_completo: str
-    telefono: str
     puesto: str
     activo: bool
+    pii: tuple[ParCifrado, ...] = field(repr=False)
+    descifrado: DescifradoListado = field(repr=False, compare=False)
+
+    documento = campo_protegido("documento", 0)
+    telefono = campo_protegido("telefono", 1)
 
 
 class PersonalQueries:
@@ -122,18 +128,18 @@ class PersonalQueries:
         except sqlite3.Error as exc:
             logger.error("Error SQL en %s: %s", context, exc)
             return []
-        return [self._to_row(row) for row in rows]
+        descifrado = DescifradoListado(self._field_protection, CAMPOS_PROTEGIDOS)
+        return [self._to_row(row, descifrado) for row in rows]
 
-    def _to_row(self, row: sqlite3.Row) -> PersonalRow:
-        documento = self._field_protection.decode("documento", legacy=row["documento"], encrypted=row["documento_enc"])
-        telefono = self._field_protection.decode("telefono", legacy=row["telefono"], encrypted=row["telefono_enc"])
+    @staticmethod
+    def _to_row(row: sqlite3.Row, descifrado: DescifradoListado) -> PersonalRow:
         return PersonalRow(
             id=row["id"],
-            documento=documento or "",
             nombre_completo=f"{row['nombre']} {row['apellidos']}".strip(),
-            telefono=telefono or "",
             puesto=row["puesto"],
             activo=bool(row["activo"]),
+            pii=((row["documento"], row["documento_enc"]), (row["telefono"], row["telefono_enc"])),
+            descifrado=descifrado,
         )
 
 
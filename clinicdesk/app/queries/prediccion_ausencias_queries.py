@@ -3,11 +3,15 @@ from __future__ import annotations
 from dataclasses import dataclass
 import sqlite3
 
+from clinicdesk.app.infrastructure.sqlite.citas_rango_sql import sql_epoch
 from clinicdesk.app.infrastructure.sqlite.proveedor_conexion_sqlite import ProveedorConexionSqlitePorHilo
 
 
 _ESTADOS_VALIDOS = ("REALIZADA", "NO_PRESENTADO")
 _ESTADOS_FINALES_CIERRE = ("REALIZADA", "NO_PRESENTADO", "CANCELADA")
+_SQL_EPOCH_AHORA = sql_epoch("'now'")
+_SQL_EPOCH_AHORA_DESPLAZADO = sql_epoch("'now'", "?")
+_SQL_EPOCH_HACE_24H = sql_epoch("'now'", "'-24 hours'")
 
 
 @dataclass(frozen=True, slots=True)
@@ -57,11 +61,11 @@ class _CierreCitasLoteMixin:
         total_row = (
             self._con()
             .execute(
-                """
+                f"""
             SELECT COUNT(1) AS total
             FROM citas c
             WHERE c.activo = 1
-              AND datetime(c.inicio) < datetime('now', '-24 hours')
+              AND c.inicio_ts < {_SQL_EPOCH_HACE_24H}
               AND c.estado NOT IN (?, ?, ?)
             """,
                 _ESTADOS_FINALES_CIERRE,
@@ -71,7 +75,7 @@ class _CierreCitasLoteMixin:
         rows = (
             self._con()
             .execute(
-                """
+                f"""
             SELECT
                 c.id AS cita_id,
                 datetime(c.inicio) AS inicio_local,
@@ -82,9 +86,9 @@ class _CierreCitasLoteMixin:
             JOIN pacientes p ON p.id = c.paciente_id
             JOIN medicos m ON m.id = c.medico_id
             WHERE c.activo = 1
-              AND datetime(c.inicio) < datetime('now', '-24 hours')
+              AND c.inicio_ts < {_SQL_EPOCH_HACE_24H}
               AND c.estado NOT IN (?, ?, ?)
-            ORDER BY datetime(c.inicio) ASC
+            ORDER BY c.inicio_ts ASC
             LIMIT ? OFFSET ?
             """,
                 (*_ESTADOS_FINALES_CIERRE, limite, offset),
@@ -155,12 +159,12 @@ class PrediccionAusenciasQueries(_CierreCitasLoteMixin):
         row = (
             self._con()
             .execute(
-                """
+                f"""
             SELECT COUNT(1) AS total
             FROM citas c
             WHERE c.activo = 1
               AND c.estado IN (?, ?)
-              AND datetime(c.inicio) >= datetime('now', ?)
+              AND c.inicio_ts >= {_SQL_EPOCH_AHORA_DESPLAZADO}
             """,
                 (*_ESTADOS_VALIDOS, f"-{dias} days"),
             )
@@ -205,7 +209,7 @@ class PrediccionAusenciasQueries(_CierreCitasLoteMixin):
         rows = (
             self._con()
             .execute(
-                """
+                f"""
             SELECT
                 c.id AS cita_id,
                 date(c.inicio) AS fecha,
@@ -222,7 +226,7 @@ class PrediccionAusenciasQueries(_CierreCitasLoteMixin):
             JOIN pacientes p ON p.id = c.paciente_id
             JOIN medicos m ON m.id = c.medico_id
             WHERE c.activo = 1
-              AND datetime(c.inicio) >= datetime('now')
+              AND c.inicio_ts >= {_SQL_EPOCH_AHORA}
               AND c.estado IN ('PROGRAMADA', 'CONFIRMADA', 'EN_CURSO')
             ORDER BY c.inicio
             LIMIT ?
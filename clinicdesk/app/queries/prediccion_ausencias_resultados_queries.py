@@ -3,11 +3,13 @@ from __future__ import annotations
 from dataclasses import dataclass
 import sqlite3
 from datetime import datetime, timezone
+from clinicdesk.app.infrastructure.sqlite.citas_rango_sql import sql_epoch
 from clinicdesk.app.infrastructure.sqlite.proveedor_conexion_sqlite import ProveedorConexionSqlitePorHilo
 
 
 _ESTADOS_CERRADOS = ("REALIZADA", "NO_PRESENTADO")
 _RIESGOS_VALIDOS = ("BAJO", "MEDIO", "ALTO")
+_SQL_EPOCH_AHORA_DESPLAZADO = sql_epoch("'now'", "?")
 
 
 @dataclass(frozen=True, slots=True)
@@ -84,13 +86,13 @@ class PrediccionAusenciasResultadosQueries:
         rows = (
             self._con()
             .execute(
-                """
+                f"""
             WITH citas_cerradas_ventana AS (
                 SELECT id, estado
                 FROM citas
                 WHERE activo = 1
                   AND estado IN (?, ?)
-                  AND datetime(inicio) >= datetime('now', ?)
+                  AND inicio_ts >= {_SQL_EPOCH_AHORA_DESPLAZADO}
             )
             SELECT
                 pl.riesgo AS riesgo,
@@ -123,12 +125,12 @@ class PrediccionAusenciasResultadosQueries:
         row = (
             self._con()
             .execute(
-                """
+                f"""
             WITH citas_ventana AS (
                 SELECT id, estado
                 FROM citas
                 WHERE activo = 1
-                  AND datetime(inicio) >= datetime('now', ?)
+                  AND inicio_ts >= {_SQL_EPOCH_AHORA_DESPLAZADO}
             ),
             predicciones_ventana AS (
                 SELECT DISTINCT pl.cita_id
@@ -3,10 +3,13 @@ from __future__ import annotations
 from dataclasses import dataclass
 import sqlite3
 
+from clinicdesk.app.infrastructure.sqlite.citas_rango_sql import SQL_EPOCH_PARAM, sql_epoch
 from clinicdesk.app.infrastructure.sqlite.proveedor_conexion_sqlite import ProveedorConexionSqlitePorHilo
 
 _ESTADOS_CERRADOS = ("REALIZADA",)
 _ESTADOS_PROXIMOS = ("PROGRAMADA", "CONFIRMADA", "EN_CURSO")
+_SQL_INICIO_EN_VENTANA = f"c.inicio_ts >= {SQL_EPOCH_PARAM} AND c.inicio_ts < {SQL_EPOCH_PARAM}"
+_SQL_EPOCH_AHORA_DESPLAZADO = sql_epoch("'now'", "?")
 
 
 @dataclass(frozen=True, slots=True)
@@ -53,13 +56,13 @@ class PrediccionOperativaQueries:
         rows = (
             self._con()
             .execute(
-                """
+                f"""
             SELECT c.medico_id, c.tipo_cita,
                    (julianday(c.consulta_fin_at) - julianday(c.consulta_inicio_at)) * 24.0 * 60.0 AS duracion_min
             FROM citas c
             WHERE c.activo = 1
               AND c.estado IN (?)
-              AND datetime(c.inicio) BETWEEN datetime(?) AND datetime(?)
+              AND {_SQL_INICIO_EN_VENTANA}
               AND c.consulta_inicio_at IS NOT NULL
               AND c.consulta_fin_at IS NOT NULL
               AND (julianday(c.consulta_fin_at) - julianday(c.consulta_inicio_at)) >= 0
@@ -74,7 +77,7 @@ class PrediccionOperativaQueries:
         rows = (
             self._con()
             .execute(
-                """
+                f"""
             SELECT c.medico_id,
                    CASE
                      WHEN CAST(strftime('%H', c.inicio) AS INTEGER) < 12 THEN '08-12'
@@ -86,7 +89,7 @@ class PrediccionOperativaQueries:
             FROM citas c
             WHERE c.activo = 1
               AND c.estado IN (?)
-              AND datetime(c.inicio) BETWEEN datetime(?) AND datetime(?)
+              AND {_SQL_INICIO_EN_VENTANA}
               AND c.check_in_at IS NOT NULL
               AND c.llamado_a_consulta_at IS NOT NULL
               AND (julianday(c.llamado_a_consulta_at) - julianday(c.check_in_at)) >= 0
@@ -106,7 +109,7 @@ class PrediccionOperativaQueries:
         rows = (
             self._con()
             .execute(
-                """
+                f"""
             SELECT c.id AS cita_id, c.medico_id, c.tipo_cita,
                    CASE
                      WHEN CAST(strftime('%H', c.inicio) AS INTEGER) < 12 THEN '08-12'
@@ -117,8 +120,8 @@ class PrediccionOperativaQueries:
             FROM citas c
             WHERE c.activo = 1
               AND c.estado IN (?, ?, ?)
-              AND datetime(c.inicio) BETWEEN datetime(?) AND datetime(?)
-            ORDER BY datetime(c.inicio) ASC
+              AND {_SQL_INICIO_EN_VENTANA}
+            ORDER BY c.inicio_ts ASC
             """,
                 (*_ESTADOS_PROXIMOS, desde, hasta),
             )
@@ -135,7 +138,7 @@ class PrediccionOperativaQueries:
         rows = (
             self._con()
             .execute(
-                """
+                f"""
             SELECT c.id AS cita_id,
                    date(c.inicio) AS fecha,
                    time(c.inicio) AS hora,
@@ -146,8 +149,8 @@ class PrediccionOperativaQueries:
             JOIN medicos m ON m.id = c.medico_id
             WHERE c.activo = 1
               AND c.estado IN (?, ?, ?)
-              AND datetime(c.inicio) BETWEEN datetime(?) AND datetime(?)
-            ORDER BY datetime(c.inicio) ASC
+              AND {_SQL_INICIO_EN_VENTANA}
+            ORDER BY c.inicio_ts ASC
             LIMIT ?
             """,
                 (*_ESTADOS_PROXIMOS, desde, hasta, limite),
@@ -169,11 +172,11 @@ class PrediccionOperativaQueries:
         row = (
             self._con()
             .execute(
-                """
+                f"""
             SELECT COUNT(1) AS total FROM citas c
             WHERE c.activo = 1 AND c.estado = 'REALIZADA'
               AND c.consulta_inicio_at IS NOT NULL AND c.consulta_fin_at IS NOT NULL
-              AND datetime(c.inicio) >= datetime('now', ?)
+              AND c.inicio_ts >= {_SQL_EPOCH_AHORA_DESPLAZADO}
             """,
                 (f"-{dias} days",),
             )
@@ -185,11 +188,11 @@ class PrediccionOperativaQueries:
         row = (
             self._con()
             .execute(
-                """
+                f"""
             SELECT COUNT(1) AS total FROM citas c
             WHERE c.activo = 1 AND c.estado = 'REALIZADA'
               AND c.check_in_at IS NOT NULL AND c.llamado_a_consulta_at IS NOT NULL
-              AND datetime(c.inicio) >= datetime('now', ?)
+              AND c.inicio_ts >= {_SQL_EPOCH_AHORA_DESPLAZADO}
             """,
                 (f"-{dias} days",),
             )
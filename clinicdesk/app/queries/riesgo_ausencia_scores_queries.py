@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Sequence
+
+from clinicdesk.app.infrastructure.sqlite.citas_rango_sql import sql_epoch, sql_inicio_entre_dias
+from clinicdesk.app.infrastructure.sqlite.proveedor_conexion_sqlite import ProveedorConexionSqlitePorHilo
+from clinicdesk.app.queries.prediccion_ausencias_queries import FilaCitaRiesgoAgenda
+
+_SQL_UPSERT_SCORE = """
+INSERT INTO riesgo_ausencia_citas (cita_id, modelo_version, score, bucket, scored_at_utc)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(cita_id) DO UPDATE SET
+    modelo_version = excluded.modelo_version,
+    score = excluded.score,
+    bucket = excluded.bucket,
+    scored_at_utc = excluded.scored_at_utc
+"""
+
+
+_SQL_COLUMNAS_CITA = """
+    c.id AS cita_id,
+    c.paciente_id,
+    CAST(julianday(substr(c.inicio, 1, 10)) - julianday('now') AS INTEGER) AS dias_antelacion
+"""
+
+
+class RiesgoAusenciaScoresQueries:
+    """Lectura de citas sin puntuación vigente y escritura en lote de `riesgo_ausencia_citas`."""
+
+    def __init__(self, proveedor_conexion: ProveedorConexionSqlitePorHilo | sqlite3.Connection) -> None:
+        self._proveedor_conexion = proveedor_conexion
+
+    def _con(self) -> sqlite3.Connection:
+        return (
+            self._proveedor_conexion
+            if isinstance(self._proveedor_conexion, sqlite3.Connection)
+            else self._proveedor_conexion.obtener()
+        )
+
+    def listar_citas_sin_score_vigente(
+        self,
+        modelo_version: str,
+        *,
+        desde: str | None,
+        hasta: str | None,
+        despues_de_id: int,
+        limite: int,
+    ) -> list[FilaCitaRiesgoAgenda]:
+        """
+        Citas activas sin puntuación o puntuadas con otro modelo.
+
+        Si cambian los datos de la cita, el trigger de `citas` borra su puntuación. Sin rango
+        se limitan a las citas desde hoy. Se recorren por id para poder paginar aunque alguna
+        cita quede sin puntuar.
+        """
+        if desde and hasta:
+            rango_sql, params = sql_inicio_entre_dias(), [desde, hasta]
+        else:
+            rango_sql, params = f"c.inicio_ts >= {sql_epoch('date(?)')}", ["now"]
+        rows = (
+            self._con()
+            .execute(
+                f"""
+            SELECT {_SQL_COLUMNAS_CITA}
+            FROM citas c
+            LEFT JOIN riesgo_ausencia_citas s ON s.cita_id = c.id
+            WHERE c.activo = 1
+              AND {rango_sql}
+              AND c.id > ?
+              AND (s.cita_id IS NULL OR s.modelo_version != ?)
+            ORDER BY c.id
+            LIMIT ?
+            """,
+                (*params, despues_de_id, modelo_version, limite),
+            )
+            .fetchall()
+        )
+        return [_mapear_cita(row) for row in rows]
+
+    def listar_citas_por_id(self, cita_ids: Sequence[int]) -> list[FilaCitaRiesgoAgenda]:
+        if not cita_ids:
+            return []
+        placeholders = ", ".join("?" for _ in cita_ids)
+        rows = (
+            self._con()
+            .execute(
+                f"SELECT {_SQL_COLUMNAS_CITA} FROM citas c WHERE c.activo = 1 AND c.id IN ({placeholders}) ORDER BY c.id",
+                tuple(int(cita_id) for cita_id in cita_ids),
+            )
+            .fetchall()
+        )
+        return [_mapear_cita(row) for row in rows]
+
+    def guardar_scores(
+        self,
+        modelo_version: str,
+        scored_at_utc: str,
+        items: list[tuple[int, float | None, str]],
+    ) -> int:
+        if not items:
+            return 0
+        params = [(cita_id, modelo_version, score, bucket, scored_at_utc) for cita_id, score, bucket in items]
+        con = self._con()
+        with con:
+            con.executemany(_SQL_UPSERT_SCORE, params)
+        return len(params)
+
+    def eliminar_scores_de_otros_modelos(self, modelo_version: str) -> int:
+        con = self._con()
+        with con:
+            cursor = con.execute("DELETE FROM riesgo_ausencia_citas WHERE modelo_version != ?", (modelo_version,))
+        return int(cursor.rowcount)
+
+
+def _mapear_cita(row: sqlite3.Row) -> FilaCitaRiesgoAgenda:
+    return FilaCitaRiesgoAgenda(
+        cita_id=int(row["cita_id"]),
+        paciente_id=int(row["paciente_id"]),
+        dias_antelacion=max(0, int(row["dias_antelacion"] or 0)),
+    )
@@ -24,6 +24,7 @@ from clinicdesk.app.application.csv.csv_service import CsvService
 from clinicdesk.app.controllers.csv_controller import CsvController
 from clinicdesk.app.application.preferencias.preferencias_usuario import PreferenciasUsuario
 from clinicdesk.app.container import AppContainer
+from clinicdesk.app.infrastructure.sqlite.db_path import resolver_db_path_desde_conexion
 from clinicdesk.app.application.citas.navigation_intent import CitasNavigationIntentDTO
 from clinicdesk.app.i18n import I18nManager
 from clinicdesk.app.pages.pages_registry import get_pages
@@ -90,6 +91,7 @@ class MainWindow(QMainWindow):
             self,
             CsvService(container),
             on_import_complete=self._on_csv_imported,
+            db_path=resolver_db_path_desde_conexion(container.connection),
         )
 
         self.resize(1200, 800)
@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-import sqlite3
-
 from PySide6.QtCore import QObject, Signal
 
 from clinicdesk.app.application.confirmaciones import (
@@ -10,8 +8,10 @@ from clinicdesk.app.application.confirmaciones import (
     PaginacionConfirmacionesDTO,
 )
 from clinicdesk.app.common.search_utils import has_search_values
+from clinicdesk.app.infrastructure.sqlite.pool_conexiones_sqlite import obtener_pool_compartido
 from clinicdesk.app.queries.confirmaciones_queries import ConfirmacionesQueries
-from clinicdesk.app.queries.pacientes_queries import PacientesQueries
+from clinicdesk.app.queries.descifrado_listado import precargar_campos
+from clinicdesk.app.queries.pacientes_queries import CAMPOS_VISIBLES_LISTADO, PacientesQueries
 
 
 class CargaPacientesWorker(QObject):
@@ -28,23 +28,22 @@ class CargaPacientesWorker(QObject):
 
     def run(self) -> None:
         self.started.emit()
-        connection: sqlite3.Connection | None = None
         try:
-            connection = sqlite3.connect(self._db_path)
-            connection.row_factory = sqlite3.Row
-            queries = PacientesQueries(connection)
-            base_rows = queries.list_all(activo=self._activo)
-            rows = (
-                base_rows
-                if not has_search_values(self._texto)
-                else queries.search(texto=self._texto, activo=self._activo)
-            )
+            with obtener_pool_compartido(self._db_path).conexion() as connection:
+                queries = PacientesQueries(connection)
+                base_rows = queries.list_all(activo=self._activo)
+                rows = (
+                    base_rows
+                    if not has_search_values(self._texto)
+                    else queries.search(texto=self._texto, activo=self._activo)
+                )
+                # Documento y teléfono se descifran aquí, fuera del hilo de UI, porque los pinta la tabla;
+                # email y dirección siguen perezosos hasta que alguien los lee.
+                precargar_campos(rows, CAMPOS_VISIBLES_LISTADO)
             self.finished_ok.emit({"rows": rows, "total_base": len(base_rows)})
         except Exception as exc:  # noqa: BLE001
             self.finished_error.emit(exc.__class__.__name__)
         finally:
-            if connection is not None:
-                connection.close()
             self.finished.emit()
 
 
@@ -72,20 +71,16 @@ class CargaConfirmacionesWorker(QObject):
 
     def run(self) -> None:
         self.started.emit()
-        connection: sqlite3.Connection | None = None
         try:
-            connection = sqlite3.connect(self._db_path)
-            connection.row_factory = sqlite3.Row
-            use_case = ObtenerConfirmacionesCitas(
-                queries=ConfirmacionesQueries(connection),
-                obtener_riesgo_uc=self._riesgo_uc,
-                obtener_salud_uc=self._salud_uc,
-            )
-            result = use_case.ejecutar(self._filtros, self._paginacion)
+            with obtener_pool_compartido(self._db_path).conexion() as connection:
+                use_case = ObtenerConfirmacionesCitas(
+                    queries=ConfirmacionesQueries(connection),
+                    puntuar_riesgo_uc=self._riesgo_uc,
+                    obtener_salud_uc=self._salud_uc,
+                )
+                result = use_case.ejecutar(self._filtros, self._paginacion)
             self.finished_ok.emit(result)
         except Exception as exc:  # noqa: BLE001
             self.finished_error.emit(exc.__class__.__name__)
         finally:
-            if connection is not None:
-                connection.close()
             self.finished.emit()
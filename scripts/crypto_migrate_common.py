@@ -10,6 +10,7 @@ from clinicdesk.app.infrastructure.sqlite import db
 from clinicdesk.app.infrastructure.sqlite.pii_crypto import get_connection_pii_cipher
 
 REQUIRED_CONFIRMATION = "WIPE-LEGACY"
+BATCH_SIZE = 500
 
 
 @dataclass(frozen=True)
@@ -91,25 +92,34 @@ def migrate_connection(
     if not protection.enabled:
         raise RuntimeError("CLINICDESK_FIELD_CRYPTO=1 y CLINICDESK_CRYPTO_KEY son obligatorios")
 
-    rows = con.execute(f"SELECT * FROM {config.table}").fetchall()
     nullable_columns = nullable_columns_for_table(con, config.table)
-    stats = MigrationStats(scanned=len(rows))
-    for row in rows:
-        stats = migrate_row(
-            con,
-            row=row,
-            protection=protection,
-            wipe_legacy=wipe_legacy,
-            nullable_columns=nullable_columns,
-            config=config,
-            stats=stats,
-        )
-    con.commit()
+    select_batch = (
+        f"SELECT * FROM {config.table} WHERE {config.id_field} > ? ORDER BY {config.id_field} LIMIT {BATCH_SIZE}"
+    )
+    stats = MigrationStats()
+    last_id = 0
+    while rows := con.execute(select_batch, (last_id,)).fetchall():
+        batch_updates: list[tuple[int, dict[str, str | None]]] = []
+        for row in rows:
+            stats, updates = plan_row(
+                con,
+                row=row,
+                protection=protection,
+                wipe_legacy=wipe_legacy,
+                nullable_columns=nullable_columns,
+                config=config,
+                stats=stats,
+            )
+            if updates:
+                batch_updates.append((int(row[config.id_field]), updates))
+        execute_updates(con, table=config.table, id_field=config.id_field, updates=batch_updates)
+        con.commit()
+        last_id = int(rows[-1][config.id_field])
     logger.info("crypto_migration.completed", extra=stats.__dict__)
     return stats
 
 
-def migrate_row(
+def plan_row(
     con: sqlite3.Connection,
     *,
     row: sqlite3.Row,
@@ -118,14 +128,10 @@ def migrate_row(
     nullable_columns: set[str],
     config: MigrationConfig,
     stats: MigrationStats,
-) -> MigrationStats:
-    row_id = int(row[config.id_field])
+) -> tuple[MigrationStats, dict[str, str | None]]:
+    """Columnas a actualizar en la fila (backfill y, con `wipe_legacy`, borrado del legacy) y stats acumuladas."""
     backfill_updates = build_backfill_updates(row, protection, con, config.fields)
-    backfilled = stats.backfilled + int(bool(backfill_updates))
-    if backfill_updates:
-        execute_update(con, table=config.table, id_field=config.id_field, row_id=row_id, updates=backfill_updates)
-
-    wiped = stats.wiped
+    wipe_updates: dict[str, None] = {}
     if wipe_legacy:
         wipe_updates = build_wipe_updates(
             row=row,
@@ -134,10 +140,12 @@ def migrate_row(
             fields=config.fields,
             wipe_policy=config.wipe_policy,
         )
-        wiped += int(bool(wipe_updates))
-        if wipe_updates:
-            execute_update(con, table=config.table, id_field=config.id_field, row_id=row_id, updates=wipe_updates)
-    return MigrationStats(scanned=stats.scanned, backfilled=backfilled, wiped=wiped)
+    stats = MigrationStats(
+        scanned=stats.scanned + 1,
+        backfilled=stats.backfilled + int(bool(backfill_updates)),
+        wiped=stats.wiped + int(bool(wipe_updates)),
+    )
+    return stats, {**backfill_updates, **wipe_updates}
 
 
 def build_backfill_updates(
@@ -195,15 +203,18 @@ def nullable_columns_for_table(con: sqlite3.Connection, table: str) -> set[str]:
     return {row["name"] for row in rows if int(row["notnull"]) == 0}
 
 
-def execute_update(
+def execute_updates(
     con: sqlite3.Connection,
     *,
     table: str,
     id_field: str,
-    row_id: int,
-    updates: dict[str, str | None],
+    updates: list[tuple[int, dict[str, str | None]]],
 ) -> None:
-    columns = list(updates.keys())
-    assignments = ", ".join(f"{column} = ?" for column in columns)
-    values = [updates[column] for column in columns]
-    con.execute(f"UPDATE {table} SET {assignments} WHERE {id_field} = ?", (*values, row_id))
+    """Un `executemany` por conjunto de columnas del lote, en vez de un UPDATE por fila."""
+    por_columnas: dict[tuple[str, ...], list[tuple[str | None | int, ...]]] = {}
+    for row_id, row_updates in updates:
+        columns = tuple(row_updates)
+        por_columnas.setdefault(columns, []).append((*row_updates.values(), row_id))
+    for columns, params in por_columnas.items():
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        con.executemany(f"UPDATE {table} SET {assignments} WHERE {id_field} = ?", params)
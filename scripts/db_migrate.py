@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+from clinicdesk.app.infrastructure.sqlite.db import get_connection
+from clinicdesk.app.infrastructure.sqlite.migraciones_sqlite import PlanMigracionSqlite, aplicar_migraciones
+
+
+def construir_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Aplica o previsualiza las migraciones versionadas de SQLite.")
+    parser.add_argument("--db-path", default="data/clinicdesk.sqlite", help="Ruta de base SQLite")
+    parser.add_argument(
+        "--schema-path",
+        default="clinicdesk/app/infrastructure/sqlite/schema.sql",
+        help="Ruta de schema.sql",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Lista los pasos pendientes sin modificar datos")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = construir_parser().parse_args(argv)
+    try:
+        con = get_connection(Path(args.db_path))
+    except sqlite3.Error as exc:
+        sys.stderr.write(f"ERROR: SQLite inválida o inaccesible: {exc}\n")
+        return 1
+    try:
+        plan = aplicar_migraciones(con, Path(args.schema_path), dry_run=args.dry_run)
+    except (FileNotFoundError, RuntimeError, sqlite3.Error) as exc:
+        sys.stderr.write(f"ERROR: {exc}\n")
+        return 1
+    finally:
+        con.close()
+    sys.stdout.write(_renderizar_plan(plan, dry_run=args.dry_run))
+    return 0
+
+
+def _renderizar_plan(plan: PlanMigracionSqlite, *, dry_run: bool) -> str:
+    prefijo = "DRY-RUN" if dry_run else "APPLY"
+    if plan.al_dia:
+        return f"{prefijo} OK: esquema al día (version={plan.version_actual})\n"
+    lineas = [f"{prefijo} OK: version_actual={plan.version_actual} version_objetivo={plan.version_objetivo}"]
+    lineas.extend(f"  - {nombre}" for nombre in plan.pendientes)
+    if plan.cifrado_pii_pendiente:
+        lineas.append("  - cifrado PII de filas existentes")
+    return "\n".join(lineas) + "\n"
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+
+from clinicdesk.app.infrastructure.sqlite.pii_migracion_lotes import (
+    MigracionPiiEnSegundoPlano,
+    ProgresoMigracionPii,
+)
+from clinicdesk.app.infrastructure.sqlite.pool_conexiones_sqlite import cerrar_pools_compartidos
+
+
+def construir_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Cifra (enc:v2) la PII en reposo por lotes, reanudable y con cifrado en paralelo."
+    )
+    parser.add_argument("--db-path", default="data/clinicdesk.sqlite", help="Ruta de base SQLite")
+    parser.add_argument("--batch-size", type=int, default=500, help="Filas por lote (una transacción por lote)")
+    parser.add_argument("--workers", type=int, default=0, help="Procesos de cifrado (0/1 = en el propio proceso)")
+    parser.add_argument("--desde-cero", action="store_true", help="Ignora la marca de agua y recorre todo")
+    return parser
+
+
+def _mostrar_progreso(progreso: ProgresoMigracionPii) -> None:
+    sys.stdout.write(
+        f"{progreso.tabla}: id<={progreso.ultimo_id} leidas={progreso.filas_leidas} "
+        f"actualizadas={progreso.filas_actualizadas} filas/s={progreso.filas_por_segundo:.0f}\n"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = construir_parser().parse_args(argv)
+    try:
+        migracion = MigracionPiiEnSegundoPlano.para_db(
+            args.db_path,
+            tamano_lote=args.batch_size,
+            workers=args.workers,
+            desde_cero=args.desde_cero,
+            al_progresar=_mostrar_progreso,
+        )
+        migracion.iniciar()
+        try:
+            resumen = migracion.esperar()
+        except KeyboardInterrupt:
+            migracion.detener()
+            resumen = migracion.esperar()
+    except (sqlite3.Error, RuntimeError, ValueError) as exc:
+        sys.stderr.write(f"ERROR: {exc}\n")
+        return 1
+    finally:
+        cerrar_pools_compartidos()
+    if resumen is None or not resumen.completada:
+        sys.stdout.write("INTERRUMPIDA: se reanudará desde el último lote escrito.\n")
+        return 2
+    sys.stdout.write(
+        f"OK: PII migrada (leidas={resumen.filas_leidas} actualizadas={resumen.filas_actualizadas} "
+        f"segundos={resumen.segundos:.1f})\n"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -24,7 +24,7 @@ from clinicdesk.app.application.usecases.export_kpis_csv import ExportKpisCSV, E
 from clinicdesk.app.application.usecases.score_citas import ScoreCitas, ScoreCitasRequest
 from clinicdesk.app.application.usecases.seed_demo_data import SeedDemoData, SeedDemoDataRequest
 from clinicdesk.app.application.usecases.train_citas_model import TrainCitasModel, TrainCitasModelRequest
-from clinicdesk.app.infrastructure.feature_store.local_json_feature_store import LocalJsonFeatureStore
+from clinicdesk.app.infrastructure.feature_store.local_columnar_feature_store import LocalColumnarFeatureStore
 from clinicdesk.app.infrastructure.model_store.local_json_model_store import LocalJsonModelStore
 from clinicdesk.app.infrastructure.sqlite.demo_data_seeder import DemoDataSeeder
 from clinicdesk.app.infrastructure.sqlite.reset_safety import (
@@ -67,6 +67,7 @@ def build_parser() -> argparse.ArgumentParser:
     _add_train_parser(subparsers)
     _add_score_parser(subparsers)
     _add_drift_parser(subparsers)
+    _add_migrate_features_parser(subparsers)
     add_export_parser(subparsers, _DEFAULT_FEATURE_STORE_PATH, _DEFAULT_MODEL_STORE_PATH, _DEFAULT_MODEL_NAME)
     _add_seed_demo_parser(subparsers)
     return parser
@@ -109,6 +110,12 @@ def _add_drift_parser(subparsers: argparse._SubParsersAction) -> None:
     parser.add_argument("--feature-store-path", default=_DEFAULT_FEATURE_STORE_PATH)
 
 
+def _add_migrate_features_parser(subparsers: argparse._SubParsersAction) -> None:
+    parser = subparsers.add_parser("migrate-features", help="Migra versiones JSON del feature store a columnar")
+    parser.add_argument("--dataset-version", default=None, help="Versión a migrar; por defecto, todas")
+    parser.add_argument("--feature-store-path", default=_DEFAULT_FEATURE_STORE_PATH)
+
+
 def _add_seed_demo_parser(subparsers: argparse._SubParsersAction) -> None:
     parser = subparsers.add_parser("seed-demo", help="Genera dataset demo reproducible en SQLite")
     parser.add_argument("--seed", type=int, default=123)
@@ -158,6 +165,7 @@ def _dispatch_command(args: argparse.Namespace) -> int:
         "train": _handle_train,
         "score": _handle_score,
         "drift": _handle_drift,
+        "migrate-features": _handle_migrate_features,
         "export": _handle_export,
         "seed-demo": _handle_seed_demo,
     }
@@ -178,7 +186,7 @@ def _handle_build_features(args: argparse.Namespace) -> int:
     dataset_rows = BuildCitasDataset(read_adapter).execute(desde, hasta)
     features = build_citas_features(dataset_rows)
     quality = compute_citas_quality_report(features)
-    store = FeatureStoreService(LocalJsonFeatureStore(args.store_path))
+    store = FeatureStoreService(LocalColumnarFeatureStore(args.store_path))
     version = store.save_citas_features_with_artifacts(features, quality, version=args.version)
     _LOGGER.info("saved_version=%s row_count=%s suspicious_count=%s", version, quality.total, quality.suspicious_count)
     return 0
@@ -186,7 +194,7 @@ def _handle_build_features(args: argparse.Namespace) -> int:
 
 def _handle_train(args: argparse.Namespace) -> int:
     _require_default_model_name(args.model_name)
-    feature_store = FeatureStoreService(LocalJsonFeatureStore(args.feature_store_path))
+    feature_store = FeatureStoreService(LocalColumnarFeatureStore(args.feature_store_path))
     model_store = LocalJsonModelStore(args.model_store_path)
     response = TrainCitasModel(feature_store, model_store).execute(
         TrainCitasModelRequest(dataset_version=args.dataset_version, model_version=args.model_version)
@@ -203,7 +211,7 @@ def _handle_train(args: argparse.Namespace) -> int:
 
 def _handle_score(args: argparse.Namespace) -> int:
     _require_default_model_name(args.model_name)
-    feature_store = FeatureStoreService(LocalJsonFeatureStore(args.feature_store_path))
+    feature_store = FeatureStoreService(LocalColumnarFeatureStore(args.feature_store_path))
     model_store = LocalJsonModelStore(args.model_store_path)
     use_case = ScoreCitas(feature_store, BaselineCitasPredictor(), model_store=model_store)
     response = use_case.execute(
@@ -232,7 +240,7 @@ def _truncate(value: str, max_len: int) -> str:
 
 
 def _handle_drift(args: argparse.Namespace) -> int:
-    feature_store = FeatureStoreService(LocalJsonFeatureStore(args.feature_store_path))
+    feature_store = FeatureStoreService(LocalColumnarFeatureStore(args.feature_store_path))
     report = DriftCitasFeatures(feature_store).execute(
         DriftCitasFeaturesRequest(from_version=args.from_version, to_version=args.to_version)
     )
@@ -242,6 +250,15 @@ def _handle_drift(args: argparse.Namespace) -> int:
     return 0
 
 
+def _handle_migrate_features(args: argparse.Namespace) -> int:
+    store = LocalColumnarFeatureStore(args.feature_store_path)
+    dataset_name = FeatureStoreService.CITAS_DATASET_NAME
+    versions = [args.dataset_version] if args.dataset_version else store.list_versions(dataset_name)
+    migradas = [version for version in versions if store.migrar_version_a_columnar(dataset_name, version)]
+    _LOGGER.info("migrated_versions=%s total=%s", migradas, len(versions))
+    return 0
+
+
 def _require_default_model_name(model_name: str) -> None:
     if model_name != _DEFAULT_MODEL_NAME:
         raise ValueError(f"model-name no soportado todavía: '{model_name}' (use '{_DEFAULT_MODEL_NAME}')")
@@ -264,7 +281,7 @@ def _handle_export(args: argparse.Namespace) -> int:
 
 
 def _export_features(args: argparse.Namespace) -> int:
-    feature_store = FeatureStoreService(LocalJsonFeatureStore(args.feature_store_path))
+    feature_store = FeatureStoreService(LocalColumnarFeatureStore(args.feature_store_path))
     rows = feature_store.load_citas_features(args.dataset_version)
     output = ExportFeaturesCSV().execute(args.dataset_version, rows, args.output)
     _LOGGER.info(output)
@@ -302,7 +319,7 @@ def _resolve_threshold_used(predictor_kind: str, model_version: str | None, mode
 
 
 def _export_scoring(args: argparse.Namespace) -> int:
-    feature_store = FeatureStoreService(LocalJsonFeatureStore(args.feature_store_path))
+    feature_store = FeatureStoreService(LocalColumnarFeatureStore(args.feature_store_path))
     model_store = LocalJsonModelStore(args.model_store_path)
     score_response = ScoreCitas(feature_store, BaselineCitasPredictor(), model_store=model_store).execute(
         ScoreCitasRequest(
@@ -324,7 +341,7 @@ def _export_scoring(args: argparse.Namespace) -> int:
 
 
 def _export_drift(args: argparse.Namespace) -> int:
-    feature_store = FeatureStoreService(LocalJsonFeatureStore(args.feature_store_path))
+    feature_store = FeatureStoreService(LocalColumnarFeatureStore(args.feature_store_path))
     report = DriftCitasFeatures(feature_store).execute(
         DriftCitasFeaturesRequest(from_version=args.from_version, to_version=args.to_version)
     )
@@ -334,7 +351,7 @@ def _export_drift(args: argparse.Namespace) -> int:
 
 
 def _export_kpis(args: argparse.Namespace) -> int:
-    feature_store = FeatureStoreService(LocalJsonFeatureStore(args.feature_store_path))
+    feature_store = FeatureStoreService(LocalColumnarFeatureStore(args.feature_store_path))
     model_store = LocalJsonModelStore(args.model_store_path)
     score_response = ScoreCitas(feature_store, BaselineCitasPredictor(), model_store=model_store).execute(
         ScoreCitasRequest(
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+from clinicdesk.app.infrastructure.sqlite.db import get_connection
+from clinicdesk.app.infrastructure.sqlite.recordatorios_resumen import reconstruir_resumen_recordatorios
+
+
+def construir_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Recalcula recordatorios_citas_resumen desde el historial de recordatorios."
+    )
+    parser.add_argument("--db-path", default="data/clinicdesk.sqlite", help="Ruta de base SQLite")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = construir_parser().parse_args(argv)
+    try:
+        con = get_connection(Path(args.db_path))
+    except sqlite3.Error as exc:
+        sys.stderr.write(f"ERROR: SQLite inválida o inaccesible: {exc}\n")
+        return 1
+    try:
+        total = reconstruir_resumen_recordatorios(con)
+    except sqlite3.Error as exc:
+        sys.stderr.write(f"ERROR: {exc}\n")
+        return 1
+    finally:
+        con.close()
+    sys.stdout.write(f"OK: resumen de recordatorios reconstruido (citas={total})\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -17,7 +17,7 @@ def main() -> int:
     try:
         with sqlite3.connect(_db_path()) as con:
             con.row_factory = sqlite3.Row
-            resultado = verificar_cadena(con)
+            resultado = verificar_cadena(con, completa=True)
     except sqlite3.Error:
         LOGGER.error("verify_audit_chain_db_error")
         return 2
@@ -43,7 +43,7 @@ def build_report(db_path: Path) -> dict[str, Any]:
     with sqlite3.connect(db_path.as_posix()) as con:
         con.row_factory = sqlite3.Row
 
-        estado_auditoria = verificar_cadena(con)
+        estado_auditoria = verificar_cadena(con, completa=True)
         if estado_auditoria.ok:
             controles.append(_control("auditoria.chain", "ok", "cadena integra", critical=True))
         else:
@@ -72,7 +72,7 @@ def build_report(db_path: Path) -> dict[str, Any]:
             )
         )
 
-        estado_telemetria = verificar_cadena_telemetria(con)
+        estado_telemetria = verificar_cadena_telemetria(con, completa=True)
         if estado_telemetria.ok:
             controles.append(_control("telemetria.chain", "ok", "cadena integra", critical=True))
         else:
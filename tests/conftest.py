@@ -28,6 +28,8 @@ from clinicdesk.app.infrastructure.sqlite.repos_turnos import Turno
 from clinicdesk.app.infrastructure.sqlite.field_crypto_migrations import (
     ensure_pacientes_field_crypto_columns,
 )
+from clinicdesk.app.infrastructure.sqlite.recordatorios_resumen import asegurar_resumen_recordatorios
+from clinicdesk.app.infrastructure.sqlite.riesgo_ausencia_scores import asegurar_scores_riesgo
 
 
 TEST_DB_PATH = Path(__file__).resolve().parent / "tmp" / "clinicdesk_test.sqlite"
@@ -71,6 +73,8 @@ def _ensure_test_migrations(con: sqlite3.Connection) -> None:
         "notas_incidencia TEXT",
     )
     ensure_pacientes_field_crypto_columns(con)
+    asegurar_resumen_recordatorios(con)
+    asegurar_scores_riesgo(con)
 
 
 @pytest.fixture()
@@ -31,8 +31,9 @@ CONTRATOS_SANEAMIENTO_POR_MODULO: dict[Path, tuple[str, ...]] = {
 }
 
 CONTRATOS_INTEGRIDAD_POR_MODULO: dict[Path, tuple[str, ...]] = {
-    Path("clinicdesk/app/infrastructure/sqlite/repos_auditoria_accesos.py"): ("siguiente_hash_acceso",),
-    Path("clinicdesk/app/infrastructure/sqlite/repos_auditoria_eventos.py"): ("siguiente_hash_evento",),
+    Path("clinicdesk/app/infrastructure/sqlite/repos_auditoria_accesos.py"): ("registrar_encadenado",),
+    Path("clinicdesk/app/infrastructure/sqlite/repos_auditoria_eventos.py"): ("registrar_encadenado",),
+    Path("clinicdesk/app/infrastructure/sqlite/repos_telemetria_eventos.py"): ("registrar_encadenado",),
     Path("clinicdesk/app/application/usecases/buscar_auditoria_accesos.py"): ("exigir_integridad_auditoria",),
     Path("clinicdesk/app/application/usecases/exportar_auditoria_csv.py"): ("exigir_integridad_auditoria",),
     Path("clinicdesk/app/application/usecases/obtener_resumen_telemetria_semana.py"): ("exigir_integridad_telemetria",),
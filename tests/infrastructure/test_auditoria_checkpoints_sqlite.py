@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from clinicdesk.app.application.auditoria.audit_service import AuditEvent
+from clinicdesk.app.infrastructure.sqlite.auditoria_checkpoints import TABLA_CHECKPOINTS, leer_checkpoint_vigente
+from clinicdesk.app.infrastructure.sqlite.auditoria_integridad import (
+    ensure_auditoria_integridad_schema,
+    verificar_cadena,
+)
+from clinicdesk.app.infrastructure.sqlite.repos_auditoria_eventos import RepositorioAuditoriaEventosSqlite
+from tests.support_tampering_sqlite import simular_tampering_privilegiado_sqlite
+
+SCHEMA_PATH = Path(__file__).resolve().parents[2] / "clinicdesk" / "app" / "infrastructure" / "sqlite" / "schema.sql"
+
+
+@pytest.fixture()
+def con(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> sqlite3.Connection:
+    monkeypatch.setenv("CLINICDESK_CRYPTO_KEY", "checkpoint-test-key")
+    conexion = sqlite3.connect((tmp_path / "audit.sqlite").as_posix())
+    conexion.row_factory = sqlite3.Row
+    conexion.executescript(SCHEMA_PATH.read_text(encoding="utf-8"))
+    ensure_auditoria_integridad_schema(conexion)
+    conexion.commit()
+    yield conexion
+    conexion.close()
+
+
+def _registrar(con: sqlite3.Connection, cantidad: int) -> None:
+    repo = RepositorioAuditoriaEventosSqlite(con)
+    for indice in range(cantidad):
+        repo.append(
+            AuditEvent(
+                action="LOGIN",
+                outcome="ok",
+                actor_username="admin",
+                actor_role="ADMIN",
+                correlation_id=f"cid-{indice}",
+                metadata={},
+                timestamp_utc="2026-01-01T10:00:00+00:00",
+            )
+        )
+
+
+def test_verificacion_incremental_parte_del_checkpoint(con: sqlite3.Connection) -> None:
+    _registrar(con, 3)
+    assert verificar_cadena(con).ok is True
+    assert leer_checkpoint_vigente(con, "auditoria_eventos").ultimo_id == 3
+
+    simular_tampering_privilegiado_sqlite(
+        con,
+        trigger_no_update="trg_auditoria_eventos_no_update",
+        sentencia_update="UPDATE auditoria_eventos SET action = 'ALTERADO' WHERE id = 2",
+    )
+    _registrar(con, 2)
+
+    assert verificar_cadena(con).ok is True
+    assert leer_checkpoint_vigente(con, "auditoria_eventos").ultimo_id == 5
+    completa = verificar_cadena(con, completa=True)
+    assert completa.ok is False
+    assert completa.primer_fallo_id == 2
+
+
+def test_checkpoint_con_firma_falsa_fuerza_verificacion_completa(con: sqlite3.Connection) -> None:
+    _registrar(con, 3)
+    assert verificar_cadena(con).ok is True
+    simular_tampering_privilegiado_sqlite(
+        con,
+        trigger_no_update="trg_auditoria_eventos_no_update",
+        sentencia_update="UPDATE auditoria_eventos SET action = 'ALTERADO' WHERE id = 1",
+    )
+    with con:
+        con.execute(f"UPDATE {TABLA_CHECKPOINTS} SET firma = 'forjada' WHERE tabla = 'auditoria_eventos'")
+
+    assert leer_checkpoint_vigente(con, "auditoria_eventos") is None
+    resultado = verificar_cadena(con)
+    assert resultado.ok is False
+    assert resultado.primer_fallo_id == 1
+
+
+def test_ancla_alterada_invalida_el_checkpoint(con: sqlite3.Connection) -> None:
+    _registrar(con, 3)
+    assert verificar_cadena(con).ok is True
+    simular_tampering_privilegiado_sqlite(
+        con,
+        trigger_no_update="trg_auditoria_eventos_no_update",
+        sentencia_update="UPDATE auditoria_eventos SET entry_hash = 'otro' WHERE id = 3",
+    )
+
+    assert leer_checkpoint_vigente(con, "auditoria_eventos") is None
+    assert verificar_cadena(con).primer_fallo_id == 3
+
+
+def test_sin_clave_no_se_guardan_checkpoints(con: sqlite3.Connection, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("CLINICDESK_CRYPTO_KEY")
+    _registrar(con, 2)
+
+    assert verificar_cadena(con).ok is True
+    assert con.execute(f"SELECT count(*) FROM {TABLA_CHECKPOINTS}").fetchone()[0] == 0
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+
+from clinicdesk.app.application.telemetria import EventoTelemetriaDTO
+from clinicdesk.app.infrastructure.sqlite.auditoria_integridad import verificar_cadena_telemetria
+from clinicdesk.app.infrastructure.sqlite.escritor_eventos_sqlite import EscritorEventosSqliteEnLote
+from clinicdesk.app.infrastructure.sqlite.repos_telemetria_eventos import RepositorioTelemetriaEventosSqlite
+
+
+def _crear_db(path: Path) -> sqlite3.Connection:
+    con = sqlite3.connect(path.as_posix())
+    con.row_factory = sqlite3.Row
+    con.executescript(
+        """
+        CREATE TABLE telemetria_eventos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp_utc TEXT NOT NULL,
+            usuario TEXT NOT NULL,
+            modo_demo INTEGER NOT NULL,
+            evento TEXT NOT NULL,
+            contexto TEXT,
+            entidad_tipo TEXT,
+            entidad_id TEXT,
+            prev_hash TEXT,
+            entry_hash TEXT NOT NULL DEFAULT ''
+        );
+        """
+    )
+    return con
+
+
+def _evento(indice: int) -> EventoTelemetriaDTO:
+    return EventoTelemetriaDTO(
+        timestamp_utc=f"2026-01-10T12:00:{indice % 60:02d}+00:00",
+        usuario="tester",
+        modo_demo=False,
+        evento="recordatorio_enviado",
+        contexto="page=recordatorios",
+        entidad_tipo="cita",
+        entidad_id=str(indice),
+    )
+
+
+def _abrir(path: Path):
+    def _abrir_conexion() -> sqlite3.Connection:
+        con = sqlite3.connect(path.as_posix())
+        con.row_factory = sqlite3.Row
+        return con
+
+    return _abrir_conexion
+
+
+def test_escritor_agrupa_rafaga_en_lotes_y_mantiene_la_cadena(tmp_path: Path) -> None:
+    db_path = tmp_path / "eventos.sqlite"
+    con = _crear_db(db_path)
+    escritor = EscritorEventosSqliteEnLote(_abrir(db_path), tamano_lote=50)
+    escritor.iniciar()
+    repo = RepositorioTelemetriaEventosSqlite(con, escritor)
+    repo_sincrono = RepositorioTelemetriaEventosSqlite(con)
+
+    for indice in range(300):
+        repo.registrar(_evento(indice))
+    assert escritor.flush(timeout=10)
+    repo_sincrono.registrar(_evento(300))
+    for indice in range(301, 400):
+        repo.registrar(_evento(indice))
+    escritor.cerrar()
+
+    filas = con.execute("SELECT entidad_id FROM telemetria_eventos ORDER BY id").fetchall()
+    assert [fila["entidad_id"] for fila in filas] == [str(indice) for indice in range(400)]
+    assert verificar_cadena_telemetria(con).ok
+    metricas = escritor.metricas()
+    assert metricas.escritos == 399
+    assert metricas.descartados == 0
+    assert metricas.lotes < metricas.escritos
+
+
+def test_cola_llena_aplica_back_pressure_y_lo_registra(tmp_path: Path) -> None:
+    db_path = tmp_path / "eventos.sqlite"
+    con = _crear_db(db_path)
+    liberar = threading.Event()
+
+    def _abrir_lento() -> sqlite3.Connection:
+        liberar.wait(5)
+        return _abrir(db_path)()
+
+    escritor = EscritorEventosSqliteEnLote(_abrir_lento, capacidad_cola=2)
+    escritor.iniciar()
+    repo = RepositorioTelemetriaEventosSqlite(con, escritor)
+    temporizador = threading.Timer(0.3, liberar.set)
+    temporizador.start()
+
+    for indice in range(5):
+        repo.registrar(_evento(indice))
+    escritor.cerrar()
+
+    metricas = escritor.metricas()
+    assert metricas.esperas_cola_llena >= 1
+    assert metricas.segundos_espera_cola_llena > 0
+    assert metricas.profundidad_maxima <= 2
+    assert con.execute("SELECT count(*) FROM telemetria_eventos").fetchone()[0] == 5
+
+
+def test_tras_cerrar_el_repositorio_escribe_de_forma_sincrona(tmp_path: Path) -> None:
+    db_path = tmp_path / "eventos.sqlite"
+    con = _crear_db(db_path)
+    escritor = EscritorEventosSqliteEnLote(_abrir(db_path))
+    escritor.iniciar()
+    escritor.cerrar()
+
+    RepositorioTelemetriaEventosSqlite(con, escritor).registrar(_evento(1))
+
+    assert con.execute("SELECT count(*) FROM telemetria_eventos").fetchone()[0] == 1
+    assert escritor.metricas().encolados == 0
+
+
+def test_lote_que_falla_queda_pendiente_y_se_vuelca_al_cerrar(tmp_path: Path) -> None:
+    db_path = tmp_path / "eventos.sqlite"
+    con = _crear_db(db_path)
+    otra_db = tmp_path / "sin_tabla.sqlite"
+    volcado = tmp_path / "pendientes.jsonl"
+    escritor = EscritorEventosSqliteEnLote(_abrir(otra_db), reintentos_lote=1, ruta_volcado=volcado)
+    escritor.iniciar()
+    repo = RepositorioTelemetriaEventosSqlite(con, escritor)
+
+    repo.registrar(_evento(1))
+    assert escritor.flush(timeout=5) is False
+    assert escritor.metricas().pendientes == 1
+    escritor.cerrar()
+
+    metricas = escritor.metricas()
+    assert metricas.descartados == 0
+    assert metricas.reintentos >= 1
+    assert volcado.exists()
+
+    recuperador = EscritorEventosSqliteEnLote(_abrir(db_path), ruta_volcado=volcado)
+    recuperador.iniciar()
+    repo_recuperado = RepositorioTelemetriaEventosSqlite(con, recuperador)
+    repo_recuperado.registrar(_evento(2))
+    assert recuperador.flush(timeout=5)
+    recuperador.cerrar()
+
+    filas = con.execute("SELECT entidad_id FROM telemetria_eventos ORDER BY id").fetchall()
+    assert [fila["entidad_id"] for fila in filas] == ["1", "2"]
+    assert verificar_cadena_telemetria(con).ok
+    assert not volcado.exists()
+
+
+def test_flush_respeta_el_timeout_con_el_escritor_ocupado(tmp_path: Path) -> None:
+    db_path = tmp_path / "eventos.sqlite"
+    con = _crear_db(db_path)
+    liberar = threading.Event()
+
+    def _abrir_lento() -> sqlite3.Connection:
+        liberar.wait(5)
+        return _abrir(db_path)()
+
+    escritor = EscritorEventosSqliteEnLote(_abrir_lento)
+    escritor.iniciar()
+    RepositorioTelemetriaEventosSqlite(con, escritor).registrar(_evento(1))
+
+    assert escritor.flush(timeout=0.1) is False
+    liberar.set()
+    assert escritor.flush(timeout=5)
+    escritor.cerrar()
+
+
+def test_escritura_sincrona_no_confirma_la_transaccion_del_llamador(tmp_path: Path) -> None:
+    db_path = tmp_path / "eventos.sqlite"
+    con = _crear_db(db_path)
+    con.execute("BEGIN IMMEDIATE")
+
+    RepositorioTelemetriaEventosSqlite(con).registrar(_evento(1))
+
+    assert con.in_transaction
+    con.rollback()
+    assert con.execute("SELECT count(*) FROM telemetria_eventos").fetchone()[0] == 0
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from clinicdesk.app.infrastructure.sqlite import sqlite_tuning_produccion
+from clinicdesk.app.infrastructure.sqlite.sqlite_connection_config import configurar_conexion
+from clinicdesk.app.infrastructure.sqlite.sqlite_tuning_produccion import (
+    ConfigTuningSqlite,
+    aplicar_tuning_produccion,
+    calcular_tuning_sqlite,
+    config_tuning_desde_env,
+    TuningSqliteEfectivo,
+    leer_tuning_efectivo,
+)
+
+_MB = 1024 * 1024
+_GB = 1024 * _MB
+
+
+def test_calcular_tuning_escala_con_tamano_db_y_respeta_limite_ram() -> None:
+    config = ConfigTuningSqlite()
+
+    pequena = calcular_tuning_sqlite(tamano_db_bytes=4 * _MB, memoria_disponible_bytes=8 * _GB, config=config)
+    grande = calcular_tuning_sqlite(tamano_db_bytes=600 * _MB, memoria_disponible_bytes=8 * _GB, config=config)
+    poca_ram = calcular_tuning_sqlite(tamano_db_bytes=600 * _MB, memoria_disponible_bytes=512 * _MB, config=config)
+
+    assert pequena.mmap_size == 5 * _MB
+    assert pequena.cache_size_kib == 2000
+    assert pequena.wal_autocheckpoint == 1000
+    assert grande.mmap_size == 750 * _MB
+    assert grande.cache_size_kib == 60 * 1024
+    assert grande.wal_autocheckpoint > pequena.wal_autocheckpoint
+    assert grande.journal_size_limit >= 4 * grande.wal_autocheckpoint * 4096
+    assert poca_ram.mmap_size == 128 * _MB
+    assert poca_ram.cache_size_kib <= (512 * _MB // 20) // 1024
+
+
+def test_calcular_tuning_aplica_overrides_de_despliegue() -> None:
+    config = ConfigTuningSqlite(
+        mmap_max_bytes=64 * _MB,
+        wal_autocheckpoint=2500,
+        journal_size_limit_bytes=16 * _MB,
+    )
+
+    parametros = calcular_tuning_sqlite(tamano_db_bytes=2 * _GB, memoria_disponible_bytes=None, config=config)
+
+    assert parametros.mmap_size == 64 * _MB
+    assert parametros.wal_autocheckpoint == 2500
+    assert parametros.journal_size_limit == 16 * _MB
+
+
+def test_config_desde_env(monkeypatch) -> None:
+    monkeypatch.setenv("CLINICDESK_SQLITE_TUNING", "off")
+    monkeypatch.setenv("CLINICDESK_SQLITE_MMAP_MAX_MB", "128")
+    monkeypatch.setenv("CLINICDESK_SQLITE_WAL_AUTOCHECKPOINT", "no-numero")
+
+    config = config_tuning_desde_env()
+
+    assert config.habilitado is False
+    assert config.mmap_max_bytes == 128 * _MB
+    assert config.wal_autocheckpoint is None
+
+
+def test_aplicar_tuning_reporta_valores_efectivos(tmp_path: Path) -> None:
+    db_path = tmp_path / "tuning.sqlite"
+    con = sqlite3.connect(db_path.as_posix())
+    try:
+        con.execute("CREATE TABLE t(x BLOB)")
+        con.execute("INSERT INTO t(x) VALUES (zeroblob(3 * 1024 * 1024))")
+        con.commit()
+
+        parametros = aplicar_tuning_produccion(con, db_path, config=ConfigTuningSqlite(), cache_minimo_kib=16000)
+        efectivo = leer_tuning_efectivo(con)
+    finally:
+        con.close()
+
+    assert parametros is not None
+    assert efectivo.mmap_size == parametros.mmap_size
+    assert efectivo.cache_size == -16000
+    assert efectivo.wal_autocheckpoint == parametros.wal_autocheckpoint
+    assert efectivo.journal_size_limit == parametros.journal_size_limit
+
+
+def test_aplicar_tuning_deshabilitado_no_toca_pragmas(tmp_path: Path) -> None:
+    db_path = tmp_path / "tuning_off.sqlite"
+    con = sqlite3.connect(db_path.as_posix())
+    try:
+        resultado = aplicar_tuning_produccion(con, db_path, config=ConfigTuningSqlite(habilitado=False))
+        efectivo = leer_tuning_efectivo(con)
+    finally:
+        con.close()
+
+    assert resultado is None
+    assert efectivo.mmap_size == 0
+
+
+def _crear_db_citas_sintetica(db_path: Path, total: int) -> None:
+    con = sqlite3.connect(db_path.as_posix())
+    con.executescript(
+        """
+        CREATE TABLE citas (
+            id INTEGER PRIMARY KEY,
+            paciente_id INTEGER NOT NULL,
+            medico_id INTEGER NOT NULL,
+            sala_id INTEGER NOT NULL,
+            inicio TEXT NOT NULL,
+            fin TEXT NOT NULL,
+            estado TEXT NOT NULL,
+            motivo TEXT,
+            activo INTEGER NOT NULL DEFAULT 1
+        );
+        CREATE INDEX idx_citas_medico_inicio ON citas(medico_id, inicio);
+        """
+    )
+    base = datetime(2024, 1, 1, 8, 0)
+    filas = (
+        (
+            idx % 5000,
+            idx % 40,
+            idx % 12,
+            (base + timedelta(minutes=15 * idx)).isoformat(timespec="seconds"),
+            (base + timedelta(minutes=15 * idx + 15)).isoformat(timespec="seconds"),
+            "REALIZADA" if idx % 7 else "NO_PRESENTADO",
+            "Revisión periódica de control",
+        )
+        for idx in range(total)
+    )
+    con.executemany(
+        "INSERT INTO citas(paciente_id, medico_id, sala_id, inicio, fin, estado, motivo) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        filas,
+    )
+    con.commit()
+    con.close()
+
+
+def _abrir_y_leer_agenda(db_path: Path) -> tuple[TuningSqliteEfectivo, list[tuple]]:
+    con = sqlite3.connect(db_path.as_posix())
+    configurar_conexion(con, db_path)
+    try:
+        filas = con.execute(
+            "SELECT id, paciente_id, inicio, fin, estado FROM citas WHERE medico_id = ? AND inicio >= ? AND inicio < ?",
+            (7, "2024-02-01T00:00:00", "2024-03-01T00:00:00"),
+        ).fetchall()
+        return leer_tuning_efectivo(con), filas
+    finally:
+        con.close()
+
+
+def test_conexion_con_tuning_aplica_pragmas_calculados_frente_a_defaults(tmp_path: Path, monkeypatch) -> None:
+    db_path = tmp_path / "citas.sqlite"
+    _crear_db_citas_sintetica(db_path, total=50_000)
+    monkeypatch.setattr(sqlite_tuning_produccion, "memoria_disponible_bytes", lambda: 8 * _GB)
+
+    monkeypatch.setenv("CLINICDESK_SQLITE_TUNING", "off")
+    defaults, filas_defaults = _abrir_y_leer_agenda(db_path)
+    monkeypatch.setenv("CLINICDESK_SQLITE_TUNING", "auto")
+    tuning, filas_tuning = _abrir_y_leer_agenda(db_path)
+
+    esperado = calcular_tuning_sqlite(
+        tamano_db_bytes=db_path.stat().st_size,
+        memoria_disponible_bytes=8 * _GB,
+        config=ConfigTuningSqlite(),
+        page_size=tuning.page_size,
+    )
+    assert (defaults.mmap_size, defaults.journal_size_limit) == (0, -1)
+    assert tuning.mmap_size == esperado.mmap_size > db_path.stat().st_size
+    assert tuning.cache_size <= -esperado.cache_size_kib
+    assert tuning.wal_autocheckpoint == esperado.wal_autocheckpoint
+    assert tuning.journal_size_limit == esperado.journal_size_limit
+    assert filas_tuning == filas_defaults
+    assert filas_tuning
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import pytest
+
+from clinicdesk.app.application.citas import (
+    BuscarHuecosLibres,
+    BuscarHuecosRequest,
+    ReservarSerieCitas,
+    SerieCitasRequest,
+    SerieConConflictosError,
+)
+from clinicdesk.app.application.usecases.crear_cita import CrearCitaRequest, CrearCitaUseCase
+from clinicdesk.app.domain.agenda_disponibilidad import AgendaDisponibilidad, Intervalo
+from clinicdesk.app.domain.exceptions import ValidationError
+from clinicdesk.app.infrastructure.sqlite.repos_ausencias_medico import AusenciaMedico
+from clinicdesk.app.infrastructure.sqlite.repos_calendario_medico import BloqueCalendarioMedico
+from clinicdesk.app.queries.agenda_disponibilidad_queries import AgendaDisponibilidadQueries
+
+
+def _dt(texto: str) -> datetime:
+    return datetime.fromisoformat(texto)
+
+
+def test_huecos_saltan_citas_y_ausencias_alineados_al_paso() -> None:
+    agenda = AgendaDisponibilidad.construir(
+        citas_medico=[(1, Intervalo(_dt("2024-05-20 08:20:00"), _dt("2024-05-20 08:50:00")))],
+        citas_sala=[(10, Intervalo(_dt("2024-05-20 09:00:00"), _dt("2024-05-20 09:30:00")))],
+        turnos=[(1, Intervalo(_dt("2024-05-20 08:00:00"), _dt("2024-05-20 11:00:00")))],
+        ausencias=[(1, Intervalo(_dt("2024-05-20 09:45:00"), _dt("2024-05-20 10:15:00")))],
+    )
+
+    huecos = agenda.huecos_libres(
+        medico_ids=[1],
+        sala_ids=[10],
+        desde=_dt("2024-05-20 00:00:00"),
+        hasta=_dt("2024-05-20 23:59:00"),
+        duracion=timedelta(minutes=15),
+        paso=timedelta(minutes=15),
+        limite=10,
+    )
+
+    assert [hueco.inicio.strftime("%H:%M") for hueco in huecos] == ["08:00", "10:30", "10:45"]
+    assert agenda.conflictos(1, 10, _dt("2024-05-21 08:00:00"), _dt("2024-05-21 08:15:00")) == ("MEDICO_SIN_CUADRANTE",)
+
+
+def test_buscar_huecos_carga_la_agenda_una_vez(container, seed_data) -> None:
+    CrearCitaUseCase(container).execute(
+        CrearCitaRequest(
+            paciente_id=seed_data["paciente_activo_id"],
+            medico_id=seed_data["medico_activo_id"],
+            sala_id=seed_data["sala_activa_id"],
+            inicio="2024-05-20 09:00:00",
+            fin="2024-05-20 09:30:00",
+        )
+    )
+    sentencias: list[str] = []
+    container.connection.set_trace_callback(sentencias.append)
+    try:
+        huecos = BuscarHuecosLibres(AgendaDisponibilidadQueries(container.connection)).ejecutar(
+            BuscarHuecosRequest(
+                medico_ids=(seed_data["medico_activo_id"],),
+                desde=_dt("2024-05-20 00:00:00"),
+                hasta=_dt("2024-05-22 00:00:00"),
+                duracion_minutos=30,
+                limite=4,
+            )
+        )
+    finally:
+        container.connection.set_trace_callback(None)
+
+    assert [hueco.inicio.strftime("%H:%M") for hueco in huecos] == ["08:00", "08:15", "08:30", "09:30"]
+    assert {hueco.sala_id for hueco in huecos} == {seed_data["sala_activa_id"]}
+    assert len(sentencias) == 5
+
+
+def _reservar_serie(container) -> ReservarSerieCitas:
+    return ReservarSerieCitas(
+        agenda=container.queries.agenda_disponibilidad,
+        citas_repo=container.citas_repo,
+        unidad_trabajo=container.unidad_trabajo,
+        user_context=container.user_context,
+        autorizador_acciones=container.autorizador_acciones,
+        audit_service=container.audit_service,
+    )
+
+
+def _serie(seed_data, primer_inicio: str) -> SerieCitasRequest:
+    return SerieCitasRequest(
+        paciente_id=seed_data["paciente_activo_id"],
+        medico_id=seed_data["medico_activo_id"],
+        sala_id=seed_data["sala_activa_id"],
+        primer_inicio=_dt(primer_inicio),
+        duracion_minutos=30,
+        repeticiones=3,
+        motivo="Rehabilitación",
+    )
+
+
+def _contar_citas(container) -> int:
+    return container.connection.execute("SELECT COUNT(*) FROM citas").fetchone()[0]
+
+
+def test_reservar_serie_guarda_todas_en_una_transaccion(container, seed_data) -> None:
+    turno_id = container.connection.execute("SELECT id FROM turnos LIMIT 1").fetchone()[0]
+    for fecha in ("2024-05-27", "2024-06-03"):
+        container.calendario_medico_repo.create(
+            BloqueCalendarioMedico(medico_id=seed_data["medico_activo_id"], fecha=fecha, turno_id=turno_id)
+        )
+
+    cita_ids = _reservar_serie(container).ejecutar(_serie(seed_data, "2024-05-20 10:00:00"))
+
+    assert len(cita_ids) == 3
+    inicios = container.connection.execute(
+        f"SELECT inicio FROM citas WHERE id IN ({', '.join('?' for _ in cita_ids)}) ORDER BY inicio", cita_ids
+    ).fetchall()
+    assert [row["inicio"] for row in inicios] == [
+        "2024-05-20 10:00:00",
+        "2024-05-27 10:00:00",
+        "2024-06-03 10:00:00",
+    ]
+
+
+def test_reservar_serie_con_conflictos_no_guarda_ninguna(container, seed_data) -> None:
+    container.ausencias_medico_repo.create(
+        AusenciaMedico(
+            medico_id=seed_data["medico_activo_id"],
+            inicio="2024-05-20 10:15:00",
+            fin="2024-05-20 12:00:00",
+            tipo="BAJA",
+            motivo="Formación",
+            aprobado_por_personal_id=seed_data["personal_activo_id"],
+            creado_en="2024-05-19 08:00:00",
+        )
+    )
+    citas_antes = _contar_citas(container)
+
+    with pytest.raises(SerieConConflictosError) as exc_info:
+        _reservar_serie(container).ejecutar(_serie(seed_data, "2024-05-20 10:00:00"))
+
+    assert [(c.inicio.date().isoformat(), c.codigos) for c in exc_info.value.conflictos] == [
+        ("2024-05-20", ("MEDICO_CON_AUSENCIA",)),
+        ("2024-05-27", ("MEDICO_SIN_CUADRANTE",)),
+        ("2024-06-03", ("MEDICO_SIN_CUADRANTE",)),
+    ]
+    assert _contar_citas(container) == citas_antes
+    assert container.connection.in_transaction is False
+
+
+def test_reservar_serie_rechaza_sala_inactiva(container, seed_data) -> None:
+    citas_antes = _contar_citas(container)
+    request = replace(_serie(seed_data, "2024-05-20 10:00:00"), sala_id=seed_data["sala_inactiva_id"])
+
+    with pytest.raises(ValidationError, match="La sala no existe o está inactiva."):
+        _reservar_serie(container).ejecutar(request)
+
+    assert _contar_citas(container) == citas_antes
+    assert container.connection.in_transaction is False
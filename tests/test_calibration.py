@@ -1,6 +1,11 @@
 from __future__ import annotations
 
-from clinicdesk.app.application.ml.calibration import ThresholdPolicy, calibrate_threshold, compute_metrics_at_threshold
+from clinicdesk.app.application.ml.calibration import (
+    ThresholdPolicy,
+    _metrics_grid,
+    calibrate_threshold,
+    compute_metrics_at_threshold,
+)
 
 
 def test_calibrate_threshold_min_recall_prioritizes_precision_and_f1() -> None:
@@ -14,3 +19,21 @@ def test_calibrate_threshold_min_recall_prioritizes_precision_and_f1() -> None:
     assert threshold == 0.7
     assert metrics.recall >= 0.66
     assert metrics.precision == 1.0
+
+
+def test_calibrate_threshold_barrido_coincide_con_metricas_por_umbral() -> None:
+    scores = [0.9, 0.7000004, 0.69999996, 0.7, 0.4, 0.4, 1.3, -0.2]
+    y_true = [1, 0, 1, 1, 0, 1, 1, 0]
+
+    for thr, metrics, _ in _metrics_grid(scores, y_true):
+        assert metrics == compute_metrics_at_threshold(scores, y_true, thr)
+
+
+def test_calibrate_threshold_fbeta_y_coste() -> None:
+    scores = [0.9, 0.8, 0.7, 0.6, 0.5, 0.4, 0.3]
+    y_true = [1, 1, 0, 0, 1, 0, 1]
+
+    assert calibrate_threshold(scores, y_true, ThresholdPolicy(0.5, "fbeta_max", 0.5)) == 0.8
+    assert calibrate_threshold(scores, y_true, ThresholdPolicy(0.5, "fbeta_max", 2.0)) == 0.3
+    assert calibrate_threshold(scores, y_true, ThresholdPolicy(0.5, "min_cost", 0.2)) == 0.3
+    assert calibrate_threshold(scores, y_true, ThresholdPolicy(0.5, "min_cost", 5.0)) == 0.8
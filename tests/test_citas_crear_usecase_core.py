@@ -169,3 +169,42 @@ def test_crear_cita_exito_sin_warnings_no_crea_incidencia(container, seed_data)
     assert result.cita_id > 0
     assert result.warnings == []
     assert result.incidencia_id is None
+
+
+def test_crear_cita_con_incidencia_confirma_una_sola_vez(container, seed_data) -> None:
+    usecase = CrearCitaUseCase(container)
+    request = _request_base(seed_data, inicio="2024-05-21 10:00:00", fin="2024-05-21 10:20:00")
+    request.override = True
+    request.nota_override = "Autorizado por coordinación"
+    request.confirmado_por_personal_id = seed_data["personal_activo_id"]
+    sentencias: list[str] = []
+    container.connection.set_trace_callback(sentencias.append)
+    try:
+        resultado = usecase.execute(request)
+    finally:
+        container.connection.set_trace_callback(None)
+
+    assert resultado.incidencia_id is not None
+    reserva = sentencias[: sentencias.index("COMMIT") + 1]
+    assert reserva[0] == "BEGIN IMMEDIATE"
+    assert sum(sentencia.lstrip().startswith("SELECT") for sentencia in reserva) == 1
+    assert reserva.count("COMMIT") == 1
+
+
+def test_crear_cita_deshace_la_cita_si_falla_la_incidencia(container, seed_data, monkeypatch) -> None:
+    usecase = CrearCitaUseCase(container)
+    request = _request_base(seed_data, inicio="2024-05-21 11:00:00", fin="2024-05-21 11:20:00")
+    request.override = True
+    request.nota_override = "Autorizado por coordinación"
+    request.confirmado_por_personal_id = seed_data["personal_activo_id"]
+    citas_antes = container.connection.execute("SELECT COUNT(*) FROM citas").fetchone()[0]
+
+    def _falla(_incidencia) -> int:
+        raise RuntimeError("disco lleno")
+
+    monkeypatch.setattr(container.incidencias_repo, "create", _falla)
+    with pytest.raises(RuntimeError, match="disco lleno"):
+        usecase.execute(request)
+
+    assert container.connection.execute("SELECT COUNT(*) FROM citas").fetchone()[0] == citas_antes
+    assert container.connection.in_transaction is False
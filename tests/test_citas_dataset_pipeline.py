@@ -14,6 +14,7 @@ from clinicdesk.app.application.ports.citas_read_port import CitaReadModel
 from clinicdesk.app.domain.enums import EstadoCita
 from clinicdesk.app.domain.modelos import Cita
 from clinicdesk.app.infrastructure.sqlite.citas_read_adapter import SqliteCitasReadAdapter
+from clinicdesk.app.infrastructure.sqlite.repos_incidencias import Incidencia, ResumenIncidenciasCita
 
 
 class FakeCitasReadPort:
@@ -160,10 +161,12 @@ class FakeCitasRepo:
 class FakeIncidenciasRepo:
     cita_ids_with_incidencias: set[int]
 
-    def search(self, *, cita_id: int | None = None, **_) -> list[object]:
-        if cita_id is None:
-            return []
-        return [object()] if cita_id in self.cita_ids_with_incidencias else []
+    def resumen_por_citas(self, cita_ids: list[int]) -> dict[int, ResumenIncidenciasCita]:
+        return {
+            cita_id: ResumenIncidenciasCita(total=1, ultimo_tipo="CITA")
+            for cita_id in cita_ids
+            if cita_id in self.cita_ids_with_incidencias
+        }
 
 
 def test_sqlite_adapter_contract_maps_repositories_to_port_model() -> None:
@@ -191,3 +194,55 @@ def test_sqlite_adapter_contract_maps_repositories_to_port_model() -> None:
     assert rows[0].cita_id == "101"
     assert rows[0].estado == "PROGRAMADA"
     assert rows[0].has_incidencias is True
+    assert rows[0].n_incidencias == 1
+
+
+def _incidencia(seed_data, cita_id: int, tipo: str, fecha_hora: str) -> Incidencia:
+    return Incidencia(
+        tipo=tipo,
+        severidad="MEDIA",
+        estado="ABIERTA",
+        fecha_hora=fecha_hora,
+        descripcion="Incidencia de prueba",
+        medico_id=seed_data["medico_activo_id"],
+        personal_id=None,
+        cita_id=cita_id,
+        dispensacion_id=None,
+        receta_id=None,
+        confirmado_por_personal_id=seed_data["personal_activo_id"],
+        nota_override="Confirmado",
+    )
+
+
+def test_sqlite_adapter_resuelve_incidencias_con_una_consulta(container, seed_data) -> None:
+    cita_ids = [
+        container.citas_repo.create(
+            Cita(
+                paciente_id=seed_data["paciente_activo_id"],
+                medico_id=seed_data["medico_activo_id"],
+                sala_id=seed_data["sala_activa_id"],
+                inicio=datetime(2024, 5, 20, hora, 0),
+                fin=datetime(2024, 5, 20, hora, 30),
+                estado=EstadoCita.PROGRAMADA,
+            )
+        )
+        for hora in (8, 9, 10)
+    ]
+    container.incidencias_repo.create(_incidencia(seed_data, cita_ids[0], "CITA", "2024-05-20 08:00:00"))
+    container.incidencias_repo.create(_incidencia(seed_data, cita_ids[0], "RETRASO", "2024-05-20 08:40:00"))
+    container.incidencias_repo.create(_incidencia(seed_data, cita_ids[2], "CITA", "2024-05-20 10:00:00"))
+    adapter = SqliteCitasReadAdapter(container.citas_repo, container.incidencias_repo)
+
+    sentencias: list[str] = []
+    container.connection.set_trace_callback(sentencias.append)
+    try:
+        rows = adapter.list_in_range(datetime(2024, 5, 20, 0, 0), datetime(2024, 5, 20, 23, 59))
+    finally:
+        container.connection.set_trace_callback(None)
+
+    assert [(r.has_incidencias, r.n_incidencias, r.ultima_incidencia_tipo) for r in rows] == [
+        (True, 2, "RETRASO"),
+        (False, 0, None),
+        (True, 1, "CITA"),
+    ]
+    assert sum("FROM incidencias" in sentencia for sentencia in sentencias) == 1
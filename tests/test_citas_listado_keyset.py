@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from clinicdesk.app.application.citas.filtros import FiltrosCitasDTO
+from clinicdesk.app.application.citas.usecases import BuscarCitasParaLista, PaginacionCitasKeysetDTO
+from clinicdesk.app.application.usecases.paginacion_incremental import (
+    DIRECCION_ANTERIOR,
+    CursorPaginacionInvalidoError,
+    codificar_cursor,
+    decodificar_cursor,
+)
+from clinicdesk.app.infrastructure.sqlite.citas_rango_sql import asegurar_epoch_citas
+from clinicdesk.app.queries.citas_queries import CitasQueries
+
+_FILTROS = FiltrosCitasDTO(
+    rango_preset="PERSONALIZADO",
+    desde=datetime(2024, 5, 20, 0, 0, 0),
+    hasta=datetime(2024, 5, 20, 23, 59, 59),
+)
+
+
+def _sembrar_citas(container, seed_data) -> list[int]:
+    con = container.connection
+    # Dos citas comparten inicio para forzar el desempate por id.
+    inicios = ["09:00", "09:00", "09:30", "10:00", "10:30", "11:00", "11:30"]
+    ids = []
+    for hora in inicios:
+        cur = con.execute(
+            "INSERT INTO citas (paciente_id, medico_id, sala_id, inicio, fin, estado, activo) "
+            "VALUES (?, ?, ?, ?, ?, 'PROGRAMADA', 1)",
+            (
+                seed_data["paciente_activo_id"],
+                seed_data["medico_activo_id"],
+                seed_data["sala_activa_id"],
+                f"2024-05-20 {hora}:00",
+                f"2024-05-20 {hora}:15",
+            ),
+        )
+        ids.append(int(cur.lastrowid))
+    con.execute(
+        "INSERT INTO citas (paciente_id, medico_id, sala_id, inicio, fin, estado, activo) "
+        "VALUES (?, ?, ?, '2024-05-21 09:00:00', '2024-05-21 09:15:00', 'PROGRAMADA', 1)",
+        (seed_data["paciente_activo_id"], seed_data["medico_activo_id"], seed_data["sala_activa_id"]),
+    )
+    con.commit()
+    return ids
+
+
+def test_keyset_recorre_adelante_y_atras_sin_huecos(container, seed_data) -> None:
+    ids = _sembrar_citas(container, seed_data)
+    uc = BuscarCitasParaLista(CitasQueries(container))
+    columnas = ("estado",)
+
+    primera = uc.ejecutar_keyset(_FILTROS, columnas, PaginacionCitasKeysetDTO(limit=3, incluir_total=True))
+    segunda = uc.ejecutar_keyset(
+        _FILTROS, columnas, PaginacionCitasKeysetDTO(limit=3, cursor=primera.cursor_siguiente, total_conocido=7)
+    )
+    tercera = uc.ejecutar_keyset(_FILTROS, columnas, PaginacionCitasKeysetDTO(limit=3, cursor=segunda.cursor_siguiente))
+    vuelta = uc.ejecutar_keyset(
+        _FILTROS,
+        columnas,
+        PaginacionCitasKeysetDTO(limit=3, cursor=segunda.cursor_anterior, direccion=DIRECCION_ANTERIOR),
+    )
+
+    def _ids(resultado) -> list[int]:
+        return [int(item["cita_id"]) for item in resultado.items]
+
+    assert _ids(primera) + _ids(segunda) + _ids(tercera) == ids
+    assert primera.total == 7 and segunda.total == 7 and tercera.total is None
+    assert primera.cursor_anterior is None
+    assert tercera.cursor_siguiente is None
+    assert _ids(vuelta) == _ids(primera)
+    assert vuelta.cursor_anterior is None
+    assert vuelta.cursor_siguiente == primera.cursor_siguiente
+
+
+def test_keyset_usa_indice_y_no_offset(container, seed_data) -> None:
+    _sembrar_citas(container, seed_data)
+    con = container.connection
+    # El fixture crea la base desde schema.sql; los índices de epoch llegan con la migración.
+    asegurar_epoch_citas(con)
+    sentencias: list[str] = []
+    con.set_trace_callback(sentencias.append)
+    try:
+        CitasQueries(container).buscar_citas_listado_keyset(
+            _FILTROS, ("estado",), 3, (0, 0), hacia_atras=False, contar_total=False
+        )
+    finally:
+        con.set_trace_callback(None)
+
+    (sql,) = [sentencia for sentencia in sentencias if "FROM citas c" in sentencia]
+    plan = " | ".join(str(fila["detail"]) for fila in con.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall())
+    assert "OFFSET" not in sql.upper()
+    assert "count(1)" not in sql
+    assert "inicio_ts" in plan
+    assert "SCAN c " not in f"{plan} "
+
+
+def test_cursor_es_opaco_y_valida_formato() -> None:
+    cursor = codificar_cursor(1716195600, 42)
+
+    assert "1716195600" not in cursor
+    assert decodificar_cursor(cursor, aridad=2) == (1716195600, 42)
+    with pytest.raises(CursorPaginacionInvalidoError):
+        decodificar_cursor(cursor, aridad=3)
+    with pytest.raises(CursorPaginacionInvalidoError):
+        decodificar_cursor("no-es-un-cursor", aridad=2)
+
+
+class _QueriesConInicioNulo:
+    def buscar_citas_listado_keyset(self, **_kwargs) -> tuple[list[dict[str, object]], int | None]:
+        filas = [
+            {"cita_id": 1, "inicio_ts": None},
+            {"cita_id": 2, "inicio_ts": 1716195600},
+            {"cita_id": 3, "inicio_ts": 1716197400},
+        ]
+        return filas, None
+
+
+def test_keyset_descarta_filas_sin_inicio_ts() -> None:
+    resultado = BuscarCitasParaLista(_QueriesConInicioNulo()).ejecutar_keyset(
+        _FILTROS, ("estado",), PaginacionCitasKeysetDTO(limit=5)
+    )
+
+    assert [item["cita_id"] for item in resultado.items] == [2, 3]
+    assert resultado.cursor_siguiente is None
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+
+from clinicdesk.app.infrastructure.sqlite import db
+from clinicdesk.app.infrastructure.sqlite.citas_rango_sql import asegurar_epoch_citas
+from clinicdesk.app.queries.calidad_datos_queries import CalidadDatosQueries
+from clinicdesk.app.queries.confirmaciones_queries import ConfirmacionesQueries, FiltrosConfirmacionesQuery
+from clinicdesk.app.queries.dashboard_gestion_queries import DashboardGestionQueries
+from clinicdesk.app.queries.historial_listados_queries import HistorialListadosQueries
+from clinicdesk.app.queries.metricas_operativas_queries import MetricasOperativasQueries
+from clinicdesk.app.queries.prediccion_ausencias_queries import PrediccionAusenciasQueries
+from clinicdesk.app.queries.prediccion_operativa_queries import PrediccionOperativaQueries
+
+
+def _schema_path() -> Path:
+    return Path("clinicdesk/app/infrastructure/sqlite/schema.sql").resolve()
+
+
+@pytest.fixture()
+def con(tmp_path: Path) -> sqlite3.Connection:
+    conexion = db.bootstrap(tmp_path / "citas_rango.sqlite", _schema_path(), apply=True)
+    conexion.execute(
+        "INSERT INTO pacientes (id, tipo_documento, documento, nombre, apellidos, telefono, activo) "
+        "VALUES (1, 'DNI', '1', 'Ana', 'Uno', '600111222', 1)"
+    )
+    conexion.execute(
+        "INSERT INTO medicos (id, tipo_documento, documento, nombre, apellidos, num_colegiado, especialidad, activo) "
+        "VALUES (1, 'DNI', '10', 'Marta', 'Med', 'COL1', 'General', 1)"
+    )
+    conexion.execute("INSERT INTO salas (id, nombre, tipo, activa) VALUES (1, 'S1', 'CONSULTA', 1)")
+    conexion.executemany(
+        "INSERT INTO citas (paciente_id, medico_id, sala_id, inicio, fin, estado, activo) "
+        "VALUES (1, 1, 1, ?, ?, 'PROGRAMADA', 1)",
+        [
+            ("2026-01-31 23:30:00", "2026-01-31 23:59:00"),
+            ("2026-02-01T09:00:00", "2026-02-01T09:30:00"),
+            ("2026-02-28 18:00:00", "2026-02-28 18:30:00"),
+            ("2026-03-01 00:00:00", "2026-03-01 00:30:00"),
+        ],
+    )
+    conexion.commit()
+    yield conexion
+    conexion.close()
+
+
+def _planes_sobre_citas(con: sqlite3.Connection, ejecutar) -> list[str]:
+    sentencias: list[str] = []
+    con.set_trace_callback(sentencias.append)
+    try:
+        ejecutar()
+    finally:
+        con.set_trace_callback(None)
+    planes: list[str] = []
+    for sql in sentencias:
+        if "citas c" not in sql:
+            continue
+        filas = con.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        planes.extend(str(fila["detail"]) for fila in filas if " c " in f"{fila['detail']} ")
+    return planes
+
+
+def _assert_usa_indice_epoch(planes: list[str]) -> None:
+    assert planes
+    for detalle in planes:
+        assert "SCAN c" not in detalle, detalle
+        assert "inicio_ts" in detalle, detalle
+
+
+def test_rango_por_dias_incluye_formatos_mixtos_y_excluye_limites(con: sqlite3.Connection) -> None:
+    items, total = ConfirmacionesQueries(con).buscar_citas_confirmaciones(
+        FiltrosConfirmacionesQuery(desde="2026-02-01", hasta="2026-02-28"),
+        limit=10,
+        offset=0,
+    )
+
+    assert total == 2
+    assert [item.inicio for item in items] == ["2026-02-01T09:00:00", "2026-02-28 18:00:00"]
+
+
+def test_confirmaciones_usa_indice_epoch(con: sqlite3.Connection) -> None:
+    queries = ConfirmacionesQueries(con)
+    filtros = FiltrosConfirmacionesQuery(desde="2026-02-01", hasta="2026-02-28")
+
+    planes = _planes_sobre_citas(con, lambda: queries.buscar_citas_confirmaciones(filtros, limit=10, offset=0))
+
+    _assert_usa_indice_epoch(planes)
+
+
+def test_historial_usa_indice_paciente_epoch(con: sqlite3.Connection) -> None:
+    queries = HistorialListadosQueries(con)
+
+    planes = _planes_sobre_citas(
+        con,
+        lambda: queries.buscar_historial_citas(
+            1, datetime(2026, 2, 1), datetime(2026, 2, 28, 23, 59), None, None, limit=10, offset=0
+        ),
+    )
+
+    _assert_usa_indice_epoch(planes)
+    assert any("idx_citas_paciente_inicio_ts" in detalle for detalle in planes)
+
+
+def test_dashboard_usa_indice_epoch(con: sqlite3.Connection) -> None:
+    queries = DashboardGestionQueries(con)
+
+    planes = _planes_sobre_citas(
+        con,
+        lambda: (
+            queries.obtener_resumen_centro_salud(date(2026, 2, 1), date(2026, 2, 28), 1, None, None),
+            queries.contar_pacientes_riesgo_operativo(date(2026, 2, 1), date(2026, 2, 28)),
+            queries.listar_citas_hoy_gestion(10),
+        ),
+    )
+
+    _assert_usa_indice_epoch(planes)
+
+
+def test_metricas_y_calidad_usan_indice_epoch(con: sqlite3.Connection) -> None:
+    con.execute("UPDATE citas SET estado = 'REALIZADA'")
+    metricas = MetricasOperativasQueries(con)
+    calidad = CalidadDatosQueries(con)
+    desde, hasta = date(2026, 2, 1), date(2026, 2, 28)
+
+    assert [fila.fecha for fila in metricas.kpis_por_dia(desde, hasta)] == ["2026-02-01", "2026-02-28"]
+    assert [fila.total_citas for fila in metricas.kpis_por_medico(desde, hasta)] == [2]
+    assert calidad.contar_citas_cerradas(desde, hasta) == 2
+    planes = _planes_sobre_citas(
+        con,
+        lambda: (
+            metricas.kpis_por_dia(desde, hasta),
+            metricas.kpis_por_medico(desde, hasta),
+            calidad.contar_citas_cerradas(desde, hasta),
+            calidad.contar_completas(desde, hasta),
+            calidad.contar_faltantes(desde, hasta),
+        ),
+    )
+
+    _assert_usa_indice_epoch(planes)
+
+
+def test_prediccion_operativa_filtra_ventana_por_epoch(con: sqlite3.Connection) -> None:
+    queries = PrediccionOperativaQueries(con)
+    desde, hasta = "2026-02-01 09:00:00", "2026-03-01 00:00:00"
+
+    assert [fila.cita_id for fila in queries.obtener_proximas_citas_para_prediccion(desde, hasta)] == [2, 3]
+    planes = _planes_sobre_citas(
+        con,
+        lambda: (
+            queries.obtener_dataset_duracion(desde, hasta),
+            queries.obtener_dataset_espera(desde, hasta),
+            queries.obtener_proximas_citas_para_prediccion(desde, hasta),
+            queries.obtener_proximas_citas_detalle(desde, hasta, 10),
+            queries.contar_citas_validas_recientes_duracion(90),
+            queries.contar_citas_validas_recientes_espera(90),
+        ),
+    )
+
+    _assert_usa_indice_epoch(planes)
+
+
+def test_prediccion_ausencias_usa_indice_epoch(con: sqlite3.Connection) -> None:
+    queries = PrediccionAusenciasQueries(con)
+
+    assert queries.listar_citas_pendientes_cierre(limite=10, offset=0)[1] == 4
+    planes = _planes_sobre_citas(
+        con,
+        lambda: (
+            queries.listar_citas_pendientes_cierre(limite=10, offset=0),
+            queries.contar_citas_validas_recientes(90),
+            queries.listar_proximas_citas(10),
+        ),
+    )
+
+    _assert_usa_indice_epoch(planes)
+
+
+def test_asegurar_epoch_citas_anade_columnas_a_tabla_existente() -> None:
+    conexion = sqlite3.connect(":memory:")
+    conexion.execute(
+        "CREATE TABLE citas (id INTEGER PRIMARY KEY, paciente_id INTEGER, medico_id INTEGER, sala_id INTEGER, "
+        "inicio TEXT NOT NULL, fin TEXT NOT NULL, activo INTEGER NOT NULL DEFAULT 1)"
+    )
+    conexion.execute("INSERT INTO citas (inicio, fin) VALUES ('1970-01-01T00:01:00', '1970-01-01 00:02:30')")
+
+    asegurar_epoch_citas(conexion)
+    asegurar_epoch_citas(conexion)
+
+    assert conexion.execute("SELECT inicio_ts, fin_ts FROM citas").fetchone() == (60, 150)
+    conexion.close()
@@ -196,3 +196,10 @@ def test_on_estado_vm_no_renderiza_si_pagina_no_visible_runtime(container, monke
     page._on_estado_vm(EstadoListado(estado_pantalla=EstadoPantalla.LOADING))
 
     assert llamado["render"] is False
+
+
+def test_listar_confirmaciones_sync_construye_usecase_del_vm(container) -> None:
+    _app()
+    page = PageConfirmaciones(container, I18nManager("es"))
+
+    assert page._listar_confirmaciones_sync(filtro_texto="") == []
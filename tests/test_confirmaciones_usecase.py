@@ -14,20 +14,29 @@ from clinicdesk.app.queries.confirmaciones_queries import CitaConfirmacionRow
 @dataclass
 class FakeQueries:
     items: list[CitaConfirmacionRow]
+    ultimo_filtro: object | None = None
 
     def buscar_citas_confirmaciones(self, filtros, limit, offset):
-        _ = filtros
-        return self.items[offset : offset + limit], len(self.items)
+        self.ultimo_filtro = filtros
+        items = self.items
+        if filtros.riesgo_filtro == "SOLO_ALTO":
+            items = [item for item in items if item.riesgo == "ALTO"]
+        if filtros.riesgo_filtro == "ALTO_MEDIO":
+            items = [item for item in items if item.riesgo in {"ALTO", "MEDIO"}]
+        return items[offset : offset + limit], len(items)
 
 
-class FakeRiesgo:
-    def __init__(self, riesgos: dict[int, str]) -> None:
-        self.riesgos = riesgos
-        self.calls = 0
+class FakePuntuarRiesgo:
+    def __init__(self, version: str | None) -> None:
+        self.version = version
+        self.puntuaciones = 0
 
-    def ejecutar(self, citas):
-        self.calls += 1
-        return {cita.id: self.riesgos.get(cita.id, "NO_DISPONIBLE") for cita in citas}
+    def version_activa(self):
+        return self.version
+
+    def ejecutar(self, desde=None, hasta=None):
+        self.puntuaciones += 1
+        return self.version
 
 
 class FakeSalud:
@@ -45,15 +54,16 @@ class FakeSalud:
         )
 
 
-def test_obtener_confirmaciones_mapea_filtra_y_ejecuta_en_lote() -> None:
+def test_obtener_confirmaciones_lee_puntuaciones_y_filtra_en_la_consulta() -> None:
     rows = [
-        CitaConfirmacionRow(1, "2030-01-01T09:00:00", "A", "M", "PENDIENTE", 11, 21, "SIN_PREPARAR", True),
-        CitaConfirmacionRow(2, "2030-01-02T09:00:00", "B", "M", "PENDIENTE", 12, 21, "PREPARADO", False),
-        CitaConfirmacionRow(3, "2030-01-03T09:00:00", "C", "M", "PENDIENTE", 13, 21, "ENVIADO", True),
+        CitaConfirmacionRow(1, "2030-01-01T09:00:00", "A", "M", "PENDIENTE", 11, 21, "SIN_PREPARAR", True, "ALTO"),
+        CitaConfirmacionRow(2, "2030-01-02T09:00:00", "B", "M", "PENDIENTE", 12, 21, "PREPARADO", False, "MEDIO"),
+        CitaConfirmacionRow(3, "2030-01-03T09:00:00", "C", "M", "PENDIENTE", 13, 21, "ENVIADO", True, "BAJO"),
     ]
-    riesgo = FakeRiesgo({1: "ALTO", 2: "MEDIO", 3: "BAJO"})
+    riesgo = FakePuntuarRiesgo("2030-01-01T00:00:00+00:00")
     salud = FakeSalud()
-    uc = ObtenerConfirmacionesCitas(FakeQueries(rows), riesgo, salud)
+    queries = FakeQueries(rows)
+    uc = ObtenerConfirmacionesCitas(queries, riesgo, salud)
 
     result = uc.ejecutar(
         FiltrosConfirmacionesDTO(
@@ -65,11 +75,14 @@ def test_obtener_confirmaciones_mapea_filtra_y_ejecuta_en_lote() -> None:
     )
 
     assert [item.cita_id for item in result.items] == [1, 2]
-    assert result.total == 3
+    assert [item.riesgo for item in result.items] == ["ALTO", "MEDIO"]
+    assert result.total == 2
     assert result.mostrados == 2
     assert result.items[0].tiene_telefono is True
     assert result.items[1].tiene_telefono is False
-    assert riesgo.calls == 1
+    assert riesgo.puntuaciones == 0
+    assert queries.ultimo_filtro.modelo_version == "2030-01-01T00:00:00+00:00"
+    assert queries.ultimo_filtro.riesgo_filtro == "ALTO_MEDIO"
     assert salud.calls == 1
 
     alto = uc.ejecutar(
@@ -81,3 +94,16 @@ def test_obtener_confirmaciones_mapea_filtra_y_ejecuta_en_lote() -> None:
         PaginacionConfirmacionesDTO(limit=10, offset=0),
     )
     assert [item.cita_id for item in alto.items] == [1]
+
+
+def test_obtener_confirmaciones_sin_puntuador_no_filtra_por_version() -> None:
+    queries = FakeQueries([])
+    uc = ObtenerConfirmacionesCitas(queries, None, FakeSalud())
+
+    result = uc.ejecutar(
+        FiltrosConfirmacionesDTO(desde="2030-01-01", hasta="2030-01-31"),
+        PaginacionConfirmacionesDTO(limit=10, offset=0),
+    )
+
+    assert result.items == []
+    assert queries.ultimo_filtro.modelo_version is None
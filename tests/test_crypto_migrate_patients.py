@@ -16,6 +16,7 @@ from clinicdesk.app.domain.enums import TipoDocumento
 from clinicdesk.app.domain.modelos import Paciente
 from clinicdesk.app.infrastructure.sqlite import db
 from clinicdesk.app.infrastructure.sqlite.repos_pacientes import PacientesRepository
+from scripts import crypto_migrate_common
 from scripts.crypto_migrate_patients import (
     MigrationOptions,
     _migrate,
@@ -87,6 +88,31 @@ def test_backfill_migrates_legacy_patient_and_can_wipe(tmp_path: Path, monkeypat
     con.close()
 
 
+def test_backfill_recorre_la_tabla_en_lotes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CLINICDESK_FIELD_CRYPTO", "0")
+    monkeypatch.delenv("CLINICDESK_CRYPTO_KEY", raising=False)
+    monkeypatch.setenv("CLINICDESK_PII_ENCRYPTION_ENABLED", "0")
+    monkeypatch.delenv("CLINICDESK_PII_ENCRYPTION_KEY", raising=False)
+    con = db.bootstrap(tmp_path / "patients.sqlite", _schema_path(), apply=True)
+    repo = PacientesRepository(con)
+    for indice in range(5):
+        paciente = _legacy_paciente()
+        paciente.documento = f"1000000{indice}"
+        repo.create(paciente)
+    monkeypatch.setenv("CLINICDESK_FIELD_CRYPTO", "1")
+    monkeypatch.setenv("CLINICDESK_CRYPTO_KEY", "migration-test-key")
+    monkeypatch.setattr(crypto_migrate_common, "BATCH_SIZE", 2)
+
+    stats = _migrate(con, wipe_legacy=True)
+
+    assert (stats.scanned, stats.backfilled, stats.wiped) == (5, 5, 5)
+    pendientes = con.execute(
+        "SELECT COUNT(*) FROM pacientes WHERE documento_enc IS NULL OR telefono IS NOT NULL"
+    ).fetchone()[0]
+    assert pendientes == 0
+    con.close()
+
+
 def test_wipe_option_requires_data_path_and_confirmation(tmp_path: Path) -> None:
     options = MigrationOptions(
         db_path=tmp_path / "outside-data.sqlite",
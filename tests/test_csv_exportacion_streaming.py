@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from clinicdesk.app.application.csv.csv_io import ExportacionCsvCancelada, read_csv
+from clinicdesk.app.application.csv.csv_service import CsvService, OpcionesExportacionCsv
+from clinicdesk.app.controllers.workers_csv import crear_worker_exportacion_csv
+from clinicdesk.app.infrastructure.sqlite.db_path import resolver_db_path_desde_conexion
+from clinicdesk.app.infrastructure.sqlite.pool_conexiones_sqlite import (
+    cerrar_pools_compartidos,
+    obtener_pool_compartido,
+)
+from clinicdesk.app.infrastructure.sqlite.sqlite_connection_config import PERFIL_ANALITICA
+from clinicdesk.app.ui.jobs.job_manager import JobCancelledError
+
+
+def test_exporta_pacientes_por_lotes_con_progreso(container, seed_data, tmp_path: Path, monkeypatch) -> None:
+    repo = container.pacientes_repo
+    iterar_todos = repo.iterar_todos
+    monkeypatch.setattr(repo, "iterar_todos", lambda **kwargs: iterar_todos(**kwargs, tamano_lote=1))
+    progresos: list[int] = []
+    path = tmp_path / "pacientes.csv"
+
+    filas = CsvService(container).export_pacientes(str(path), OpcionesExportacionCsv(al_progresar=progresos.append))
+
+    esperados = repo.list_all(solo_activos=False)
+    assert filas == len(esperados) > 1
+    assert progresos == list(range(1, filas + 1))
+    exportadas = read_csv(path).rows
+    assert [fila["documento"] for fila in exportadas] == [paciente.documento for paciente in esperados]
+
+
+def test_exportacion_cancelada_conserva_el_fichero_previo(container, seed_data, tmp_path: Path) -> None:
+    path = tmp_path / "salas.csv"
+    path.write_text("previo\n", encoding="utf-8")
+
+    with pytest.raises(ExportacionCsvCancelada):
+        CsvService(container).export_salas(str(path), OpcionesExportacionCsv(debe_cancelar=lambda: True))
+
+    assert path.read_text(encoding="utf-8") == "previo\n"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+class _CancelToken:
+    def __init__(self, cancelado: bool = False) -> None:
+        self.is_cancelled = cancelado
+
+
+def _db_path(container) -> str:
+    return resolver_db_path_desde_conexion(container.connection)
+
+
+def test_worker_exporta_en_una_conexion_del_pool(container, seed_data, tmp_path: Path) -> None:
+    path = tmp_path / "salas.csv"
+    progresos: list[tuple[int, str]] = []
+    worker = crear_worker_exportacion_csv(
+        db_path=_db_path(container), exportar=CsvService.export_salas, ruta_guardado=str(path)
+    )
+
+    try:
+        filas = worker(_CancelToken(), lambda valor, clave: progresos.append((valor, clave)))
+        estadisticas = obtener_pool_compartido(_db_path(container), perfil=PERFIL_ANALITICA).estadisticas()
+    finally:
+        cerrar_pools_compartidos()
+
+    assert filas == len(container.salas_repo.list_all(solo_activas=False)) > 0
+    assert len(read_csv(path).rows) == filas
+    assert progresos[-1] == (100, "job.export_csv.progress.done")
+    assert estadisticas.creadas == 1 and estadisticas.en_uso == 0
+
+
+def test_worker_cancelado_lanza_job_cancelado_sin_tocar_el_fichero(container, seed_data, tmp_path: Path) -> None:
+    path = tmp_path / "salas.csv"
+    path.write_text("previo\n", encoding="utf-8")
+    worker = crear_worker_exportacion_csv(
+        db_path=_db_path(container), exportar=CsvService.export_salas, ruta_guardado=str(path)
+    )
+
+    try:
+        with pytest.raises(JobCancelledError):
+            worker(_CancelToken(cancelado=True), lambda *_: None)
+    finally:
+        cerrar_pools_compartidos()
+
+    assert path.read_text(encoding="utf-8") == "previo\n"
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from clinicdesk.app.application.csv.csv_service import CsvService, OpcionesImportacionCsv
+
+_CABECERA = "tipo_documento;documento;nombre;apellidos;telefono\n"
+
+
+def _escribir_csv(tmp_path: Path, filas: list[str]) -> Path:
+    path = tmp_path / "pacientes.csv"
+    path.write_text(_CABECERA + "".join(f"{fila}\n" for fila in filas), encoding="utf-8")
+    return path
+
+
+def _contar_pacientes(container) -> int:
+    return container.connection.execute("SELECT COUNT(*) FROM pacientes").fetchone()[0]
+
+
+def test_importa_pacientes_por_lotes_con_una_transaccion_por_lote(container, seed_data, tmp_path: Path) -> None:
+    path = _escribir_csv(
+        tmp_path,
+        [
+            "DNI;12345678;Laura;Gomez Ruiz;600000001",
+            "DNI;30000001;Ana;Nueva;600000002",
+            "XXX;30000002;Sin;Tipo;600000003",
+            "DNI;30000001;Ana;Repetida;600000004",
+            "DNI;30000003;Eva;Otra;600000005",
+        ],
+    )
+    antes = _contar_pacientes(container)
+    progresos = []
+    sentencias: list[str] = []
+    container.connection.set_trace_callback(sentencias.append)
+    try:
+        resultado = CsvService(container).import_pacientes(
+            str(path), OpcionesImportacionCsv(tamano_lote=2, al_progresar=progresos.append)
+        )
+    finally:
+        container.connection.set_trace_callback(None)
+
+    assert (resultado.created, resultado.updated) == (2, 2)
+    assert [(error.row_number, error.raw["documento"]) for error in resultado.errors] == [(4, "30000002")]
+    assert [(p.lote, p.filas, p.errores_lote) for p in progresos] == [(1, 2, 0), (2, 4, 1), (3, 5, 0)]
+    assert sentencias.count("BEGIN IMMEDIATE") == 3
+    assert sum("FROM pacientes WHERE (tipo_documento, documento) IN" in s for s in sentencias) == 3
+    assert _contar_pacientes(container) == antes + 2
+    actualizado = container.pacientes_repo.get_by_id(seed_data["paciente_activo_id"])
+    assert actualizado.apellidos == "Gomez Ruiz"
+    assert container.connection.in_transaction is False
+
+
+def test_dry_run_valida_y_cuenta_sin_escribir(container, seed_data, tmp_path: Path) -> None:
+    path = _escribir_csv(
+        tmp_path,
+        [
+            "DNI;12345678;Laura;Gomez;600000001",
+            "DNI;30000001;Ana;Nueva;600000002",
+            "DNI;30000001;Ana;Repetida;600000003",
+            "DNI;30000004;;SinNombre;600000004",
+        ],
+    )
+    antes = _contar_pacientes(container)
+
+    resultado = CsvService(container).import_pacientes(str(path), OpcionesImportacionCsv(dry_run=True))
+
+    assert resultado.dry_run is True
+    assert (resultado.created, resultado.updated) == (1, 2)
+    assert [error.row_number for error in resultado.errors] == [5]
+    assert _contar_pacientes(container) == antes
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 from clinicdesk.app.application.features.citas_features import CitasFeatureRow
-from clinicdesk.app.application.ml.drift import compute_citas_drift
+from dataclasses import asdict
+
+from clinicdesk.app.application.ml.drift import DRIFT_FEATURES, compute_citas_drift
+from clinicdesk.app.application.usecases.drift_citas_features import DriftCitasFeatures, DriftCitasFeaturesRequest
 
 
 def _row(cita_id: str, duracion_bucket: str) -> CitasFeatureRow:
@@ -33,3 +36,29 @@ def test_compute_citas_drift_detects_strong_shift_and_psi_flag() -> None:
     assert report.feature_shifts["duracion_bucket"]["41+"] == 1.0
     assert report.psi_by_feature["duracion_bucket"] > 0.2
     assert report.overall_flag is True
+
+
+class _FeatureStoreServiceSoloColumnas:
+    def __init__(self, rows_by_version: dict[str, list[CitasFeatureRow]]) -> None:
+        self._rows_by_version = rows_by_version
+        self.columnas_pedidas: list[tuple[str, ...]] = []
+
+    def load_citas_feature_columns(self, version: str, columns) -> dict[str, list[object]]:
+        self.columnas_pedidas.append(tuple(columns))
+        rows = [asdict(row) for row in self._rows_by_version[version]]
+        return {column: [row[column] for row in rows] for column in columns}
+
+    def load_citas_features(self, version: str) -> list[object]:
+        raise AssertionError("drift no debe cargar filas completas")
+
+
+def test_drift_citas_features_lee_solo_las_columnas_del_drift() -> None:
+    from_rows = [_row(f"f{idx}", "11-20") for idx in range(12)]
+    to_rows = [_row(f"t{idx}", "41+") for idx in range(12)]
+    service = _FeatureStoreServiceSoloColumnas({"v1": from_rows, "v2": to_rows})
+
+    report = DriftCitasFeatures(service).execute(DriftCitasFeaturesRequest(from_version="v1", to_version="v2"))
+
+    assert service.columnas_pedidas == [DRIFT_FEATURES, DRIFT_FEATURES]
+    assert report == compute_citas_drift(from_rows, to_rows, from_version="v1", to_version="v2")
+    assert (report.total_from, report.total_to) == (12, 12)
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import csv
 from io import StringIO
-from typing import Any
+from pathlib import Path
+from typing import Any, Iterator
 
 import pytest
 
@@ -10,9 +11,11 @@ from clinicdesk.app.application.auditoria.audit_service import AuditEvent, Audit
 from clinicdesk.app.application.security import AutorizadorAcciones, Role, UserContext
 from clinicdesk.app.application.usecases.exportar_auditoria_csv import (
     COLUMNAS_EXPORTACION_AUDITORIA,
+    ExportacionAuditoriaCanceladaError,
     ExportacionAuditoriaDemasiadasFilasError,
     ExportacionAuditoriaError,
     ExportarAuditoriaCSV,
+    OpcionesExportacionAuditoria,
 )
 from clinicdesk.app.application.usecases.preflight_integridad_auditoria import (
     EstadoIntegridadAuditoria,
@@ -44,6 +47,15 @@ class GatewayFake:
         assert max_filas == 10_000
         return self.rows
 
+    def iterar_auditoria_accesos(
+        self,
+        filtros: FiltrosAuditoriaAccesos,
+        max_filas: int | None = None,
+    ) -> Iterator[list[AuditoriaAccesoItemQuery | dict[str, Any]]]:
+        assert max_filas == 10_000
+        for inicio in range(0, len(self.rows), 2):
+            yield self.rows[inicio : inicio + 2]
+
 
 class VerificadorIntegridadOkFake:
     def verificar_integridad_auditoria(self) -> EstadoIntegridadAuditoria:
@@ -234,3 +246,56 @@ def test_exportar_auditoria_csv_bloquea_si_cadena_comprometida() -> None:
     assert excinfo.value.reason_code == "auditoria_integridad_comprometida"
     assert excinfo.value.tabla == "auditoria_accesos"
     assert excinfo.value.primer_fallo_id == 3
+
+
+def test_exportar_auditoria_a_archivo_escribe_por_lotes_lo_mismo_que_execute(tmp_path: Path) -> None:
+    rows = [
+        AuditoriaAccesoItemQuery(
+            timestamp_utc=f"2026-01-01T08:0{indice}:00+00:00",
+            usuario="ana",
+            modo_demo=False,
+            accion="VER_DETALLE_CITA",
+            entidad_tipo="CITA",
+            entidad_id=str(indice),
+        )
+        for indice in range(5)
+    ]
+    usecase = ExportarAuditoriaCSV(
+        GatewayFake(total=5, rows=rows), verificador_integridad=VerificadorIntegridadOkFake()
+    )
+    ruta = tmp_path / "auditoria.csv"
+    progresos: list[tuple[int, int]] = []
+
+    filas = usecase.exportar_a_archivo(
+        FiltrosAuditoriaAccesos(accion="VER_DETALLE_CITA"),
+        ruta,
+        opciones=OpcionesExportacionAuditoria(al_progresar=lambda escritas, total: progresos.append((escritas, total))),
+    )
+
+    assert filas == 5
+    assert progresos == [(2, 5), (4, 5), (5, 5)]
+    dto = usecase.execute(FiltrosAuditoriaAccesos(accion="VER_DETALLE_CITA"))
+    assert ruta.read_bytes().decode("utf-8") == dto.csv_texto
+
+
+def test_exportar_auditoria_a_archivo_cancelada_no_deja_fichero(tmp_path: Path) -> None:
+    rows = [{"usuario": "ana", "accion": "VER_DETALLE_CITA"}] * 3
+    repo = _RepoAuditoriaFake()
+    usecase = ExportarAuditoriaCSV(
+        GatewayFake(total=3, rows=rows),
+        user_context=UserContext(role=Role.ADMIN, username="admin"),
+        audit_service=AuditService(repo),
+        verificador_integridad=VerificadorIntegridadOkFake(),
+    )
+    consultas = iter([False, True])
+    ruta = tmp_path / "auditoria.csv"
+
+    with pytest.raises(ExportacionAuditoriaCanceladaError):
+        usecase.exportar_a_archivo(
+            FiltrosAuditoriaAccesos(accion="VER_DETALLE_CITA"),
+            ruta,
+            opciones=OpcionesExportacionAuditoria(debe_cancelar=lambda: next(consultas)),
+        )
+
+    assert list(tmp_path.iterdir()) == []
+    assert repo.events[-1].metadata["reason_code"] == "cancelled"
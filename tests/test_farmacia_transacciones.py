@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import pytest
+
+from clinicdesk.app.application.usecases.ajustar_stock_material import (
+    AjustarStockMaterialRequest,
+    AjustarStockMaterialUseCase,
+)
+from clinicdesk.app.application.usecases.ajustar_stock_medicamento import (
+    AjustarStockMedicamentoRequest,
+    AjustarStockMedicamentoUseCase,
+)
+from clinicdesk.app.application.usecases.dispensar_medicamento import (
+    DispensarMedicamentoRequest,
+    DispensarMedicamentoUseCase,
+)
+from clinicdesk.app.domain.exceptions import ValidationError
+from clinicdesk.app.infrastructure.sqlite.repos_calendario_personal import BloqueCalendarioPersonal
+
+_FECHA_HORA = "2024-05-21 10:00:00"
+
+
+def _contar(container, tabla: str) -> int:
+    return container.connection.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+
+
+def _stock_medicamento(container, medicamento_id: int) -> int:
+    return container.medicamentos_repo.get_by_id(medicamento_id).cantidad_en_almacen
+
+
+def _dispensacion(seed_data, cantidad: int) -> DispensarMedicamentoRequest:
+    return DispensarMedicamentoRequest(
+        receta_id=seed_data["receta_id"],
+        receta_linea_id=seed_data["receta_linea_id"],
+        personal_id=seed_data["personal_activo_id"],
+        cantidad=cantidad,
+        fecha_hora=_FECHA_HORA,
+    )
+
+
+@pytest.fixture()
+def personal_con_cuadrante(container, seed_data) -> None:
+    container.calendario_personal_repo.create(
+        BloqueCalendarioPersonal(
+            personal_id=seed_data["personal_activo_id"],
+            fecha=_FECHA_HORA[:10],
+            turno_id=seed_data["turno_id"],
+        )
+    )
+
+
+@pytest.mark.usefixtures("personal_con_cuadrante")
+def test_dispensar_lote_usa_una_transaccion(container, seed_data) -> None:
+    sentencias: list[str] = []
+    container.connection.set_trace_callback(sentencias.append)
+    try:
+        resultados = DispensarMedicamentoUseCase(container).execute_lote(
+            [_dispensacion(seed_data, 5), _dispensacion(seed_data, 3)]
+        )
+    finally:
+        container.connection.set_trace_callback(None)
+
+    assert [resultado.stock_nuevo for resultado in resultados] == [15, 12]
+    assert _stock_medicamento(container, seed_data["medicamento_activo_id"]) == 12
+    assert _contar(container, "movimientos_medicamentos") == 2
+    assert sentencias.count("BEGIN IMMEDIATE") == 1
+    assert sentencias.count("COMMIT") == 1
+
+
+@pytest.mark.usefixtures("personal_con_cuadrante")
+def test_dispensar_lote_sin_stock_no_guarda_nada(container, seed_data) -> None:
+    with pytest.raises(ValidationError, match="Stock insuficiente"):
+        DispensarMedicamentoUseCase(container).execute_lote(
+            [_dispensacion(seed_data, 15), _dispensacion(seed_data, 10)]
+        )
+
+    assert _stock_medicamento(container, seed_data["medicamento_activo_id"]) == 20
+    assert _contar(container, "dispensaciones") == 0
+    assert _contar(container, "movimientos_medicamentos") == 0
+    assert container.connection.in_transaction is False
+
+
+def test_ajuste_stock_deshace_movimiento_si_falla_la_incidencia(container, seed_data, monkeypatch) -> None:
+    def _falla(_incidencia):
+        raise RuntimeError("incidencias no disponible")
+
+    monkeypatch.setattr(container.incidencias_repo, "create", _falla)
+    req = AjustarStockMedicamentoRequest(
+        medicamento_id=seed_data["medicamento_activo_id"],
+        tipo="ENTRADA",
+        cantidad=150,
+        personal_id=seed_data["personal_activo_id"],
+        override=True,
+        nota_override="Pedido anual",
+        confirmado_por_personal_id=seed_data["personal_activo_id"],
+    )
+
+    with pytest.raises(RuntimeError):
+        AjustarStockMedicamentoUseCase(container).execute(req)
+
+    assert _stock_medicamento(container, seed_data["medicamento_activo_id"]) == 20
+    assert _contar(container, "movimientos_medicamentos") == 0
+
+
+def test_reposicion_de_material_en_lote(container, seed_data) -> None:
+    def _req(tipo: str, cantidad: int) -> AjustarStockMaterialRequest:
+        return AjustarStockMaterialRequest(
+            material_id=seed_data["material_activo_id"],
+            tipo=tipo,
+            cantidad=cantidad,
+            personal_id=seed_data["personal_activo_id"],
+            fecha_hora=_FECHA_HORA,
+        )
+
+    resultados = AjustarStockMaterialUseCase(container).execute_lote([_req("SALIDA", 30), _req("AJUSTE", 90)])
+
+    assert [(r.stock_anterior, r.stock_nuevo) for r in resultados] == [(100, 70), (70, 90)]
+    assert container.materiales_repo.get_by_id(seed_data["material_activo_id"]).cantidad_en_almacen == 90
+    assert container.materiales_repo.aplicar_delta_stock(seed_data["material_activo_id"], -91) is None
+    assert container.connection.in_transaction is False
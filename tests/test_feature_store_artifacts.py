@@ -123,3 +123,21 @@ def test_score_citas_raises_when_metadata_row_count_mismatch(tmp_path) -> None:
     usecase = ScoreCitas(service, BaselineCitasPredictor())
     with pytest.raises(ScoringValidationError, match="row_count"):
         usecase.execute(ScoreCitasRequest(dataset_version="v1"))
+
+
+def test_content_hash_se_reutiliza_del_sidecar_y_detecta_cambios_en_el_fichero(tmp_path) -> None:
+    store = LocalJsonFeatureStore(tmp_path)
+    service = FeatureStoreService(store)
+    service.save_citas_features_with_artifacts([_row("c1"), _row("c2")], _quality(2), version="v1")
+    metadata = service.load_citas_features_metadata("v1")
+    dataset_path = tmp_path / "citas_features" / "v1.json"
+
+    assert metadata.content_size == dataset_path.stat().st_size
+    assert service.load_citas_features_content_hash("v1") == metadata.content_hash
+    assert service.load_citas_features_content_hash("v1", verify=True) == metadata.content_hash
+
+    dataset_path.write_bytes(canonical_json_bytes([asdict(_row("c1")), asdict(_row("cX"))]))
+
+    assert service.load_citas_features_content_hash("v1") != metadata.content_hash
+    with pytest.raises(ScoringValidationError, match="content_hash"):
+        ScoreCitas(service, BaselineCitasPredictor()).execute(ScoreCitasRequest(dataset_version="v1"))
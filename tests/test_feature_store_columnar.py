@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import importlib.util
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+from clinicdesk.app.application.features.citas_features import CitasFeatureQualityReport, CitasFeatureRow
+from clinicdesk.app.application.ml.baseline_citas_predictor import BaselineCitasPredictor
+from clinicdesk.app.application.services.feature_store_service import FeatureStoreService
+from clinicdesk.app.application.usecases.score_citas import ScoreCitas, ScoreCitasRequest
+from clinicdesk.app.application.usecases.train_citas_model import TrainCitasModel, TrainCitasModelRequest
+from clinicdesk.app.infrastructure.feature_store import formato_columnar
+from clinicdesk.app.infrastructure.feature_store.formato_columnar import escribir_columnar, iterar_tramos
+from clinicdesk.app.infrastructure.feature_store.local_columnar_feature_store import (
+    FeatureStoreMigracionError,
+    LocalColumnarFeatureStore,
+)
+from clinicdesk.app.infrastructure.feature_store.local_json_feature_store import LocalJsonFeatureStore
+from clinicdesk.app.infrastructure.model_store.local_json_model_store import LocalJsonModelStore
+
+
+def _rows(size: int) -> list[CitasFeatureRow]:
+    return [
+        CitasFeatureRow(
+            cita_id=f"c{idx}",
+            duracion_min=20 + idx % 3,
+            duracion_bucket="11-20" if idx % 3 == 0 else "21-40",
+            hora_inicio=8 + idx % 10,
+            dia_semana=idx % 7,
+            is_weekend=(idx % 7) >= 5,
+            notas_len=idx,
+            notas_len_bucket="1-20" if idx <= 20 else "21-100",
+            has_incidencias=idx % 2 == 0,
+            estado_norm="realizada" if idx % 4 == 0 else "programada",
+            is_suspicious=idx % 11 == 0,
+            inicio_ts=1_700_000_000 + idx,
+        )
+        for idx in range(size)
+    ]
+
+
+def _quality(total: int) -> CitasFeatureQualityReport:
+    return CitasFeatureQualityReport(
+        total=total,
+        suspicious_count=0,
+        missing_count=0,
+        by_estado={"programada": total},
+        by_duracion_bucket={"21-40": total},
+        by_notas_bucket={"1-20": total},
+    )
+
+
+def test_formato_columnar_proyecta_columnas_por_tramos(tmp_path) -> None:
+    rows = [asdict(row) for row in _rows(25)]
+    path = tmp_path / "v1.cols"
+
+    escribir_columnar(path, rows, tuple(rows[0]), filas_por_tramo=10)
+    tramos = list(iterar_tramos(path, ["cita_id", "is_weekend"]))
+
+    assert [len(tramo["cita_id"]) for tramo in tramos] == [10, 10, 5]
+    assert set(tramos[0]) == {"cita_id", "is_weekend"}
+    assert [valor for tramo in tramos for valor in tramo["is_weekend"]] == [row["is_weekend"] for row in rows]
+
+
+def test_store_columnar_lee_versiones_json_sin_escribir(tmp_path) -> None:
+    FeatureStoreService(LocalJsonFeatureStore(tmp_path)).save_citas_features_with_artifacts(
+        _rows(30), _quality(30), version="v1"
+    )
+    service = FeatureStoreService(LocalColumnarFeatureStore(tmp_path))
+    base = tmp_path / "citas_features"
+    antes = sorted(path.name for path in base.iterdir())
+
+    assert service.load_citas_features("v1") == [asdict(row) for row in _rows(30)]
+    assert service.load_citas_feature_columns("v1", ["estado_norm"])["estado_norm"][:2] == ["realizada", "programada"]
+    assert service.list_citas_versions() == ["v1"]
+    assert service.load_citas_features_content_hash("v1", verify=True) == (
+        service.load_citas_features_metadata("v1").content_hash
+    )
+    assert sorted(path.name for path in base.iterdir()) == antes
+    assert FeatureStoreService(LocalJsonFeatureStore(tmp_path)).list_citas_versions() == ["v1"]
+
+
+def test_store_columnar_append_actualiza_metadata_y_sigue_puntuando(tmp_path) -> None:
+    store = LocalColumnarFeatureStore(tmp_path)
+    service = FeatureStoreService(store)
+    service.save_citas_features_with_artifacts(_rows(30), _quality(30), version="v1")
+    assert (tmp_path / "citas_features" / "v1.cols").exists()
+    model_store = LocalJsonModelStore(tmp_path / "models")
+    TrainCitasModel(service, model_store).execute(TrainCitasModelRequest(dataset_version="v1", model_version="m1"))
+
+    store.append(service.CITAS_DATASET_NAME, "v1", [asdict(row) for row in _rows(32)[30:]])
+
+    metadata = service.load_citas_features_metadata("v1")
+    assert metadata.row_count == 32
+    assert service.load_citas_features_content_hash("v1", verify=True) == metadata.content_hash
+    response = ScoreCitas(service, BaselineCitasPredictor(), model_store=model_store).execute(
+        ScoreCitasRequest(dataset_version="v1", predictor_kind="trained", model_version="m1")
+    )
+    assert response.total == 32
+
+
+def test_append_fallido_deja_la_version_intacta(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "v1.cols"
+    rows = [{"a": idx} for idx in range(5)]
+    escribir_columnar(path, rows, ("a",))
+    original = path.read_bytes()
+
+    def _falla(*_args, **_kwargs):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(formato_columnar, "_escribir_pie", _falla)
+    with pytest.raises(OSError, match="disco lleno"):
+        formato_columnar.anadir_columnar(path, [{"a": 99}])
+
+    assert path.read_bytes() == original
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_store_columnar_append_y_filas_heterogeneas(tmp_path) -> None:
+    store = LocalColumnarFeatureStore(tmp_path)
+    store.save("ds", "v1", [{"a": 1, "b": "x"}])
+    store.append("ds", "v1", [{"b": "y", "a": 2}])
+    store.save("ds", "v2", [{"a": 1}, {"otra": True}])
+
+    assert store.load("ds", "v1") == [{"a": 1, "b": "x"}, {"a": 2, "b": "y"}]
+    assert store.load("ds", "v2") == [{"a": 1}, {"otra": True}]
+    assert (tmp_path / "ds" / "v2.json").exists()
+    with pytest.raises(ValueError, match="columnas"):
+        store.append("ds", "v1", [{"a": 3}])
+
+
+def test_migrate_features_cli_pasa_a_columnar_conservando_content_hash(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    store_path = tmp_path / "feature_store"
+    json_service = FeatureStoreService(LocalJsonFeatureStore(store_path))
+    json_service.save_citas_features_with_artifacts(_rows(30), _quality(30), version="v1")
+    hash_original = json_service.load_citas_features_metadata("v1").content_hash
+
+    assert _load_ml_cli_module().main(["migrate-features", "--feature-store-path", str(store_path)]) == 0
+
+    base = store_path / "citas_features"
+    assert (base / "v1.cols").exists()
+    assert not (base / "v1.json").exists()
+    service = FeatureStoreService(LocalColumnarFeatureStore(store_path))
+    assert service.load_citas_features_metadata("v1").content_hash == hash_original
+    assert service.load_citas_features_content_hash("v1", verify=True) == hash_original
+    assert service.load_citas_features("v1") == [asdict(row) for row in _rows(30)]
+    assert LocalColumnarFeatureStore(store_path).migrar_version_a_columnar(service.CITAS_DATASET_NAME, "v1") is False
+
+
+def test_migrar_version_a_columnar_rechaza_filas_que_no_cuadran_con_el_hash(tmp_path) -> None:
+    FeatureStoreService(LocalJsonFeatureStore(tmp_path)).save_citas_features_with_artifacts(
+        _rows(5), _quality(5), version="v1"
+    )
+    version_file = tmp_path / "citas_features" / "v1.json"
+    version_file.write_text(version_file.read_text(encoding="utf-8").replace("c0", "cX"), encoding="utf-8")
+
+    with pytest.raises(FeatureStoreMigracionError, match="content_hash"):
+        LocalColumnarFeatureStore(tmp_path).migrar_version_a_columnar("citas_features", "v1")
+
+    assert version_file.exists()
+    assert not (tmp_path / "citas_features" / "v1.cols").exists()
+
+
+def _load_ml_cli_module():
+    script_path = Path(__file__).resolve().parents[1] / "scripts" / "ml_cli.py"
+    spec = importlib.util.spec_from_file_location("scripts.ml_cli", script_path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from clinicdesk.app.container import build_container
+from clinicdesk.app.infrastructure.sqlite import db
+from clinicdesk.app.infrastructure.sqlite.migraciones_sqlite import (
+    MIGRACIONES,
+    VERSION_ESQUEMA,
+    aplicar_migraciones,
+    leer_version_esquema,
+    planificar_migraciones,
+)
+from scripts import db_migrate
+
+
+def _schema_path() -> Path:
+    return Path("clinicdesk/app/infrastructure/sqlite/schema.sql").resolve()
+
+
+def _tablas(con: sqlite3.Connection) -> set[str]:
+    return {row[0] for row in con.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()}
+
+
+def test_base_nueva_aplica_todos_los_pasos_y_sella_version(tmp_path: Path) -> None:
+    con = db.get_connection(tmp_path / "nueva.sqlite")
+
+    plan = aplicar_migraciones(con, _schema_path())
+
+    assert plan.version_actual == 0
+    assert plan.pendientes == tuple(paso.nombre for paso in MIGRACIONES)
+    assert leer_version_esquema(con) == VERSION_ESQUEMA
+    historial = {row["nombre"] for row in con.execute("SELECT nombre FROM schema_migraciones").fetchall()}
+    assert historial == {paso.nombre for paso in MIGRACIONES}
+    con.close()
+
+
+def test_base_al_dia_solo_lee_user_version(tmp_path: Path) -> None:
+    con = db.get_connection(tmp_path / "al_dia.sqlite")
+    aplicar_migraciones(con, _schema_path())
+    sentencias: list[str] = []
+    con.set_trace_callback(sentencias.append)
+
+    plan = db.apply_schema(con, _schema_path())
+
+    con.set_trace_callback(None)
+    assert plan.al_dia
+    assert sentencias == ["PRAGMA user_version"]
+    con.close()
+
+
+def test_dry_run_no_modifica_la_base(tmp_path: Path) -> None:
+    con = db.get_connection(tmp_path / "dry_run.sqlite")
+
+    plan = aplicar_migraciones(con, _schema_path(), dry_run=True)
+
+    assert not plan.al_dia
+    assert plan.pendientes[0] == "schema_base"
+    assert leer_version_esquema(con) == 0
+    assert "pacientes" not in _tablas(con)
+    con.close()
+
+
+def test_base_legacy_sin_version_recibe_columnas_nuevas(tmp_path: Path) -> None:
+    db_path = tmp_path / "legacy.sqlite"
+    con = db.get_connection(db_path)
+    con.execute(
+        "CREATE TABLE medicamentos (id INTEGER PRIMARY KEY, nombre_compuesto TEXT, nombre_comercial TEXT,"
+        " cantidad_almacen INTEGER NOT NULL DEFAULT 0, activo INTEGER NOT NULL DEFAULT 1)"
+    )
+    con.execute("INSERT INTO medicamentos(nombre_compuesto, nombre_comercial, cantidad_almacen) VALUES ('a', 'b', 7)")
+    con.commit()
+
+    aplicar_migraciones(con, _schema_path())
+
+    fila = con.execute("SELECT cantidad_en_almacen FROM medicamentos").fetchone()
+    assert fila["cantidad_en_almacen"] == 7
+    assert planificar_migraciones(con).al_dia
+    con.close()
+
+
+def test_version_mas_nueva_que_la_aplicacion_falla(tmp_path: Path) -> None:
+    con = db.get_connection(tmp_path / "futura.sqlite")
+    con.execute(f"PRAGMA user_version = {VERSION_ESQUEMA + 1}")
+
+    with pytest.raises(RuntimeError, match="esquema más nuevo"):
+        aplicar_migraciones(con, _schema_path())
+    con.close()
+
+
+def test_cifrado_pii_queda_pendiente_en_el_arranque_hasta_la_migracion_en_segundo_plano(
+    tmp_path: Path, monkeypatch
+) -> None:
+    db_path = tmp_path / "pii_tardio.sqlite"
+    monkeypatch.delenv("CLINICDESK_PII_ENCRYPTION_ENABLED", raising=False)
+    con = db.bootstrap(db_path, _schema_path())
+    con.close()
+
+    monkeypatch.setenv("CLINICDESK_PII_ENCRYPTION_ENABLED", "true")
+    monkeypatch.setenv("CLINICDESK_PII_ENCRYPTION_KEY", "clave-tardia")
+    con = db.get_connection(db_path)
+    assert planificar_migraciones(con).cifrado_pii_pendiente
+
+    aplicar_migraciones(con, _schema_path())
+    assert planificar_migraciones(con).cifrado_pii_pendiente
+
+    container = build_container(con)
+    container.iniciar_migracion_pii_pendiente()
+    assert container.migracion_pii is not None
+    assert container.migracion_pii.esperar(timeout=30).completada
+
+    assert planificar_migraciones(con).al_dia
+    container.close()
+
+
+def test_cli_dry_run_lista_pasos_pendientes(tmp_path: Path, capsys) -> None:
+    db_path = tmp_path / "cli.sqlite"
+
+    codigo = db_migrate.main(["--db-path", db_path.as_posix(), "--schema-path", _schema_path().as_posix(), "--dry-run"])
+
+    salida = capsys.readouterr().out
+    assert codigo == 0
+    assert "DRY-RUN OK: version_actual=0" in salida
+    assert "schema_base" in salida
@@ -28,7 +28,7 @@ def test_build_features_demo_fake(tmp_path: Path) -> None:
         ]
     )
     assert rc == 0
-    assert (tmp_path / "citas_features" / "v_demo.json").exists()
+    assert (tmp_path / "citas_features" / "v_demo.cols").exists()
     assert (tmp_path / "citas_features" / "v_demo.metadata.json").exists()
 
 
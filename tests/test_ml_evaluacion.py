@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from clinicdesk.app.application.features.citas_features import CitasFeatureRow
+from clinicdesk.app.application.ml.calibration import compute_metrics_at_threshold
+from clinicdesk.app.application.ml.evaluation import (
+    BinCalibracion,
+    ConjuntoEvaluacion,
+    evaluar_candidatos,
+)
+
+
+def _row(idx: int, estado: str, has_incidencias: bool) -> CitasFeatureRow:
+    return CitasFeatureRow(
+        cita_id=f"c{idx}",
+        duracion_min=20,
+        duracion_bucket="11-20",
+        hora_inicio=9,
+        dia_semana=1,
+        is_weekend=False,
+        notas_len=0,
+        notas_len_bucket="0",
+        has_incidencias=has_incidencias,
+        estado_norm=estado,
+        is_suspicious=False,
+    )
+
+
+def test_evaluar_candidatos_calcula_confusion_segmentos_y_bins_en_una_pasada() -> None:
+    rows = [
+        _row(0, "programada", True),
+        _row(1, "programada", False),
+        _row(2, "realizada", True),
+        _row(3, "realizada", False),
+    ]
+    conjunto = ConjuntoEvaluacion.desde_filas(rows, lambda row: int(row.has_incidencias))
+    scores = {"trained": [0.9, 0.6, 0.3, 0.1], "baseline": [0.55, 0.55, 0.55, 0.55]}
+
+    informes = evaluar_candidatos(scores, conjunto, bins=2)
+
+    for nombre, candidato in scores.items():
+        assert informes[nombre].metrics == compute_metrics_at_threshold(candidato, list(conjunto.targets), 0.5)
+    trained = informes["trained"]
+    assert (trained.metrics.tp, trained.metrics.fp, trained.metrics.tn, trained.metrics.fn) == (1, 1, 1, 1)
+    assert trained.por_segmento["estado_norm"]["realizada"].fn == 1
+    assert trained.por_segmento["estado_norm"]["programada"].precision == 0.5
+    assert trained.bins_calibracion == (
+        BinCalibracion(desde=0.0, hasta=0.5, filas=2, score_medio=0.2, tasa_positivos=0.5),
+        BinCalibracion(desde=0.5, hasta=1.0, filas=2, score_medio=0.75, tasa_positivos=0.5),
+    )
+    assert informes["baseline"].metrics.recall == 1.0
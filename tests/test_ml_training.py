@@ -72,6 +72,8 @@ def test_train_usecase_trains_evaluates_and_registers_model(tmp_path) -> None:
     assert metadata["train_metrics"]["accuracy"] == asdict(response.train_metrics)["accuracy"]
     assert metadata["test_metrics"]["accuracy"] == asdict(response.test_metrics)["accuracy"]
     assert metadata["test_row_count"] == 6
+    assert set(metadata["test_evaluation"]) == {"trained", "baseline"}
+    assert metadata["test_evaluation"]["trained"]["metrics"] == metadata["test_metrics"]
     assert metadata["split_config"] == {"test_ratio": 0.2, "min_train": 20, "time_field": "inicio_ts"}
     assert metadata["pipeline_stage"] == "train"
     assert metadata["predictor_kind"] == "trained"
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import math
+from dataclasses import replace
+
+import pytest
+
+from clinicdesk.app.application.features.citas_features import CitasFeatureRow
+from clinicdesk.app.application.ml.naive_bayes_citas import (
+    TrainedModel,
+    model_from_dict,
+    model_to_dict,
+    predict_batch,
+    predict_one,
+    train,
+)
+
+
+def _rows(size: int) -> list[CitasFeatureRow]:
+    return [
+        CitasFeatureRow(
+            cita_id=f"c{idx}",
+            duracion_min=20,
+            duracion_bucket=("0-10", "11-20", "21-40")[idx % 3],
+            hora_inicio=8,
+            dia_semana=idx % 7,
+            is_weekend=(idx % 7) >= 5,
+            notas_len=idx,
+            notas_len_bucket="1-20" if idx % 5 else "0",
+            has_incidencias=idx % 4 == 0,
+            estado_norm=("programada", "realizada", "no_presentado")[idx % 3],
+            is_suspicious=idx % 9 == 0,
+        )
+        for idx in range(size)
+    ]
+
+
+def _probabilidad_referencia(model: TrainedModel, row: CitasFeatureRow) -> float:
+    """Fórmula original, feature a feature, para contrastar con las tablas precalculadas."""
+    total = model.class_counts["0"] + model.class_counts["1"]
+    tokens = {
+        "duracion_bucket": row.duracion_bucket,
+        "notas_len_bucket": row.notas_len_bucket,
+        "is_weekend": str(int(row.is_weekend)),
+        "estado_norm": row.estado_norm,
+        "has_incidencias": str(int(row.has_incidencias)),
+        "is_suspicious": str(int(row.is_suspicious)),
+    }
+    log_probs = []
+    for klass in ("0", "1"):
+        log_prob = math.log((model.class_counts[klass] + model.alpha) / (total + 2 * model.alpha))
+        for name, token in tokens.items():
+            per_class = model.feature_counts[name].get(klass, {})
+            cardinality = model.feature_value_cardinality[name]
+            log_prob += math.log(
+                (per_class.get(token, 0) + model.alpha) / (sum(per_class.values()) + model.alpha * cardinality)
+            )
+        log_probs.append(log_prob)
+    return 1.0 / (1.0 + math.exp(log_probs[0] - log_probs[1]))
+
+
+def test_predict_batch_coincide_con_la_formula_feature_a_feature() -> None:
+    entrenamiento = _rows(200)
+    model = train(entrenamiento)
+    nuevas = _rows(30) + [replace(entrenamiento[0], estado_norm="desconocido", duracion_bucket="90+")]
+
+    scores = [resultado.score for resultado in predict_batch(model, nuevas)]
+
+    assert model.class_counts == {"0": 133, "1": 67}
+    assert scores == pytest.approx([_probabilidad_referencia(model, row) for row in nuevas], abs=1e-12)
+    assert predict_one(model, nuevas[-1]).score == scores[-1]
+
+
+def test_modelo_serializado_puntua_igual() -> None:
+    model = train(_rows(60))
+
+    restaurado = model_from_dict(model_to_dict(model))
+
+    assert restaurado == model
+    assert predict_batch(restaurado, _rows(10)) == predict_batch(model, _rows(10))
+    assert predict_one(train([]), _rows(1)[0]).score == 0.5
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from clinicdesk.app.domain.enums import TipoDocumento
+from clinicdesk.app.domain.modelos import Paciente
+from clinicdesk.app.infrastructure.sqlite import db
+from clinicdesk.app.infrastructure.sqlite.pacientes.busqueda_fts import (
+    indice_busqueda_disponible,
+    reconstruir_indice_busqueda_pacientes,
+)
+from clinicdesk.app.infrastructure.sqlite.repos_pacientes import PacientesRepository
+from clinicdesk.app.queries.pacientes_queries import PacientesQueries
+
+
+def _schema_path() -> Path:
+    return Path("clinicdesk/app/infrastructure/sqlite/schema.sql").resolve()
+
+
+def _paciente(documento: str, nombre: str, apellidos: str, telefono: str) -> Paciente:
+    return Paciente(
+        tipo_documento=TipoDocumento.DNI,
+        documento=documento,
+        nombre=nombre,
+        apellidos=apellidos,
+        telefono=telefono,
+        email=None,
+        fecha_nacimiento=date(1990, 1, 1),
+        direccion=None,
+        activo=True,
+        num_historia=None,
+        alergias=None,
+        observaciones=None,
+    )
+
+
+@pytest.fixture()
+def _sin_cifrado(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CLINICDESK_FIELD_CRYPTO", "0")
+    monkeypatch.setenv("CLINICDESK_PII_ENCRYPTION_ENABLED", "0")
+
+
+def _poblar(con) -> PacientesRepository:
+    repo = PacientesRepository(con)
+    repo.create(_paciente("11111111", "José", "Núñez Pérez", "600111222"))
+    repo.create(_paciente("22222222", "Josefina", "García", "611222333"))
+    repo.create(_paciente("33333333", "Mariana", "Jiménez", "622333444"))
+    return repo
+
+
+def test_busqueda_fts_prefijo_sin_tildes_y_ranking(tmp_path: Path, _sin_cifrado) -> None:
+    con = db.bootstrap(tmp_path / "fts.sqlite", _schema_path(), apply=True)
+    _poblar(con)
+    queries = PacientesQueries(con)
+
+    assert indice_busqueda_disponible(con)
+    assert sorted(r.nombre for r in queries.search(texto="jose")) == ["Josefina", "José"]
+    assert [r.apellidos for r in queries.search(texto="nun pe")] == ["Núñez Pérez"]
+    assert [r.nombre for r in queries.search(texto="jimenez")] == ["Mariana"]
+    assert queries.search(texto="ana") == []
+
+
+def test_busqueda_fts_por_documento_y_telefono_legacy(tmp_path: Path, _sin_cifrado) -> None:
+    con = db.bootstrap(tmp_path / "fts.sqlite", _schema_path(), apply=True)
+    repo = _poblar(con)
+    queries = PacientesQueries(con)
+
+    assert [r.documento for r in queries.search(texto="2222")] == ["22222222"]
+    assert [r.documento for r in queries.search(texto="611 222")] == ["22222222"]
+    assert [p.documento for p in repo.search(texto="600-111")] == ["11111111"]
+
+
+def test_busqueda_fts_sigue_actualizaciones_y_bajas(tmp_path: Path, _sin_cifrado) -> None:
+    con = db.bootstrap(tmp_path / "fts.sqlite", _schema_path(), apply=True)
+    repo = _poblar(con)
+    queries = PacientesQueries(con)
+    paciente = repo.get_by_id(queries.search(texto="mariana")[0].id)
+    assert paciente is not None
+
+    paciente.apellidos = "Ortega"
+    repo.update(paciente)
+    repo.delete(queries.search(texto="josefina")[0].id)
+
+    assert queries.search(texto="jimenez") == []
+    assert [r.nombre for r in queries.search(texto="orte")] == ["Mariana"]
+    assert [r.nombre for r in queries.search(texto="jose")] == ["José"]
+    assert sorted(r.nombre for r in queries.search(texto="jose", activo=None)) == ["Josefina", "José"]
+    con.execute("DELETE FROM pacientes_fts")
+    assert reconstruir_indice_busqueda_pacientes(con) == 3
+    assert [r.nombre for r in queries.search(texto="orte")] == ["Mariana"]
+
+
+def test_busqueda_fts_con_cifrado_usa_hash_exacto(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CLINICDESK_FIELD_CRYPTO", "1")
+    monkeypatch.setenv("CLINICDESK_CRYPTO_KEY", "fts-test-key")
+    monkeypatch.setenv("CLINICDESK_PII_ENCRYPTION_ENABLED", "0")
+    con = db.bootstrap(tmp_path / "fts.sqlite", _schema_path(), apply=True)
+    repo = _poblar(con)
+    queries = PacientesQueries(con)
+
+    assert [r.documento for r in queries.search(texto="33333333")] == ["33333333"]
+    assert [p.documento for p in repo.search(texto="611 222 333")] == ["22222222"]
+    assert queries.search(texto="3333") == []
+    assert [r.nombre for r in queries.search(texto="garc")] == ["Josefina"]
+
+
+def test_busqueda_sin_indice_fts_usa_like(db_connection, _sin_cifrado) -> None:
+    _poblar(db_connection)
+
+    assert not indice_busqueda_disponible(db_connection)
+    assert [r.nombre for r in PacientesQueries(db_connection).search(texto="ariana")] == ["Mariana"]
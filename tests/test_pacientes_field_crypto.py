@@ -1,17 +1,28 @@
 from __future__ import annotations
 
+from dataclasses import replace
 from datetime import date
 from pathlib import Path
+import sqlite3
 
 import pytest
 
 pytest.importorskip("cryptography", reason="Falta dependencia opcional cryptography en este entorno")
 
-from clinicdesk.app.common.crypto_field_protection import decrypt, encrypt, hash_lookup
+from clinicdesk.app.common.crypto_field_protection import (
+    CryptoFieldProtectionError,
+    anillo_claves,
+    decrypt,
+    decrypt_many,
+    encrypt,
+    encrypt_many,
+    hash_lookup,
+)
 from clinicdesk.app.common.sensitive_field_canonicalization import canonicalize_sensitive_value
 from clinicdesk.app.domain.enums import TipoDocumento
 from clinicdesk.app.domain.modelos import Paciente
 from clinicdesk.app.infrastructure.sqlite import db
+from clinicdesk.app.infrastructure.sqlite.pacientes_field_protection import PacientesFieldProtection
 from clinicdesk.app.infrastructure.sqlite.repos_pacientes import PacientesRepository
 
 
@@ -43,6 +54,43 @@ def test_crypto_field_roundtrip(monkeypatch: pytest.MonkeyPatch) -> None:
     assert decrypt(token) == "valor-secreto"
 
 
+def _token_legacy_v1(material: str, valor: str) -> str:
+    import base64
+    import hashlib
+    import os
+
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    nonce = os.urandom(12)
+    cifrado = AESGCM(hashlib.sha256(material.encode("utf-8")).digest()).encrypt(nonce, valor.encode("utf-8"), None)
+    return "cfp:v1:" + base64.urlsafe_b64encode(nonce + cifrado).decode("ascii")
+
+
+def test_tokens_llevan_id_de_clave_y_se_leen_tras_rotar(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CLINICDESK_CRYPTO_KEY", "clave-antigua")
+    monkeypatch.delenv("CLINICDESK_CRYPTO_KEY_PREVIOUS", raising=False)
+    token_antiguo = encrypt("600111222")
+    legacy = _token_legacy_v1("clave-antigua", "ana@clinic.test")
+    assert token_antiguo.startswith(f"cfp:v2:{anillo_claves().key_id_activa}:")
+
+    monkeypatch.setenv("CLINICDESK_CRYPTO_KEY", "clave-nueva")
+    with pytest.raises(CryptoFieldProtectionError, match="clave no configurada"):
+        decrypt(token_antiguo)
+
+    monkeypatch.setenv("CLINICDESK_CRYPTO_KEY_PREVIOUS", "clave-antigua")
+    anillo = anillo_claves()
+    assert anillo is anillo_claves()
+    assert decrypt_many([token_antiguo, None, "", legacy, "en claro"]) == [
+        "600111222",
+        None,
+        "",
+        "ana@clinic.test",
+        "en claro",
+    ]
+    assert anillo.requiere_recifrado(token_antiguo) and anillo.requiere_recifrado(legacy)
+    assert not any(anillo.requiere_recifrado(token) for token in encrypt_many(["a", "b"]))
+
+
 def test_hash_lookup_is_stable_after_normalization(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setenv("CLINICDESK_CRYPTO_KEY", "test-key-material")
     left = hash_lookup("  Ana   Paredes@example.test ")
@@ -161,3 +209,55 @@ def test_decrypt_falla_con_error_controlado_si_no_hay_clave_valida(monkeypatch:
 
     with pytest.raises(RuntimeError, match="No se pudo descifrar"):
         decrypt(token)
+
+
+def test_listado_descifra_solo_los_campos_que_se_leen(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from clinicdesk.app.queries.descifrado_listado import precargar_campos
+    from clinicdesk.app.queries.pacientes_queries import CAMPOS_VISIBLES_LISTADO, PacientesQueries
+
+    monkeypatch.setenv("CLINICDESK_PII_ENCRYPTION_ENABLED", "0")
+    monkeypatch.delenv("CLINICDESK_PII_ENCRYPTION_KEY", raising=False)
+    monkeypatch.setenv("CLINICDESK_FIELD_CRYPTO", "1")
+    monkeypatch.setenv("CLINICDESK_CRYPTO_KEY", "test-key-material")
+    con = db.bootstrap(tmp_path / "field-crypto-lazy.sqlite", _schema_path(), apply=True)
+    repo = PacientesRepository(con)
+    for documento in ("12345678", "87654321", "11223344"):
+        repo.create(replace(_build_paciente(), documento=documento))
+
+    rows = PacientesQueries(con).list_all()
+
+    assert rows[0].descifrado.total_descifrados == 0
+    assert "600999888" not in repr(rows[0])
+    assert rows[0].telefono == "600999888"
+    assert rows[0].descifrado.total_descifrados == 1
+    precargar_campos(rows[:2], ("documento", "nombre"))
+    assert rows[0].descifrado.total_descifrados == 3
+    assert sorted(row.documento for row in rows) == ["11223344", "12345678", "87654321"]
+    assert (rows[2].email, rows[2].direccion) == ("ana@clinic.test", "Calle Secreta 123")
+
+    visibles = PacientesQueries(con).list_all()
+    precargar_campos(visibles, CAMPOS_VISIBLES_LISTADO)
+    assert visibles[0].descifrado.total_descifrados == 2 * len(visibles)
+    con.close()
+
+
+def _conexion_pacientes(columnas: str) -> sqlite3.Connection:
+    con = sqlite3.connect(":memory:")
+    con.row_factory = sqlite3.Row
+    con.execute(f"CREATE TABLE pacientes (id INTEGER PRIMARY KEY, {columnas})")
+    return con
+
+
+def test_soporte_de_columnas_no_se_arrastra_entre_conexiones() -> None:
+    columnas_cripto = ", ".join(
+        f"{campo}_enc TEXT, {campo}_hash TEXT" for campo in ("documento", "email", "telefono", "direccion")
+    )
+    for _ in range(20):
+        # Misma `schema_version` en ambas bases y, a menudo, el mismo id() de conexión reciclado.
+        sin_columnas = _conexion_pacientes("documento TEXT")
+        assert PacientesFieldProtection(sin_columnas).has_columns is False
+        sin_columnas.close()
+
+        con_columnas = _conexion_pacientes(f"documento TEXT, {columnas_cripto}")
+        assert PacientesFieldProtection(con_columnas).has_columns is True
+        con_columnas.close()
@@ -8,6 +8,8 @@ import pytest
 from clinicdesk.app.domain.enums import TipoDocumento
 from clinicdesk.app.domain.modelos import Paciente
 from clinicdesk.app.infrastructure.sqlite import db
+from clinicdesk.app.infrastructure.sqlite.pii_migracion_lotes import MigracionPiiEnSegundoPlano
+from clinicdesk.app.infrastructure.sqlite.pool_conexiones_sqlite import cerrar_pools_compartidos
 from clinicdesk.app.infrastructure.sqlite.repos_pacientes import PacientesRepository
 
 
@@ -47,7 +49,7 @@ def test_encrypts_pii_and_decrypts_on_read(tmp_path: Path, monkeypatch: pytest.M
     ).fetchone()
 
     for column in ("telefono", "email", "direccion", "alergias", "observaciones"):
-        assert str(stored[column]).startswith("enc:v1:")
+        assert str(stored[column]).startswith("enc:v2:")
 
     read_back = repo.get_by_id(paciente_id)
     assert read_back is not None
@@ -91,15 +93,71 @@ def test_migrates_legacy_plaintext_rows(tmp_path: Path, monkeypatch: pytest.Monk
     monkeypatch.setenv("CLINICDESK_PII_ENCRYPTION_KEY", "migration-key")
 
     secured_con = db.bootstrap(db_path, _schema_path(), apply=True)
+    secured_repo = PacientesRepository(secured_con)
+    assert secured_repo.get_by_id(paciente_id).telefono == "600999888"
+
+    migracion = MigracionPiiEnSegundoPlano.para_db(db_path)
+    migracion.iniciar()
+    assert migracion.esperar(timeout=30).completada
+    cerrar_pools_compartidos()
     migrated = secured_con.execute(
         "SELECT telefono, email FROM pacientes WHERE id = ?",
         (paciente_id,),
     ).fetchone()
-    assert str(migrated["telefono"]).startswith("enc:v1:")
-    assert str(migrated["email"]).startswith("enc:v1:")
+    assert str(migrated["telefono"]).startswith("enc:v2:")
+    assert str(migrated["email"]).startswith("enc:v2:")
 
-    secured_repo = PacientesRepository(secured_con)
     read_back = secured_repo.get_by_id(paciente_id)
     assert read_back is not None
     assert read_back.telefono == "600999888"
     assert read_back.email == "ana@clinic.test"
+
+
+def _token_legacy_v1(key_material: str, valor: str) -> str:
+    import base64
+    import hashlib
+    import hmac
+    import os
+
+    enc_key = hashlib.sha256(f"enc:{key_material}".encode("utf-8")).digest()
+    mac_key = hashlib.sha256(f"mac:{key_material}".encode("utf-8")).digest()
+    nonce = os.urandom(16)
+    datos = valor.encode("utf-8")
+    cifrado = bytearray()
+    for contador in range(0, len(datos), 32):
+        bloque = hashlib.sha256(enc_key + nonce + (contador // 32).to_bytes(4, "big")).digest()
+        cifrado.extend(b ^ k for b, k in zip(datos[contador : contador + 32], bloque))
+    tag = hmac.new(mac_key, nonce + bytes(cifrado), hashlib.sha256).digest()[:16]
+    return "enc:v1:" + base64.urlsafe_b64encode(nonce + bytes(cifrado) + tag).decode("ascii")
+
+
+def test_lee_tokens_v1_y_el_job_los_recifra_a_v2(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from clinicdesk.app.infrastructure.sqlite.pii_crypto import get_connection_pii_cipher
+    from clinicdesk.app.infrastructure.sqlite.pii_migracion_lotes import migrar_pii_en_lotes
+    from scripts import migrar_pii_en_lotes as script_migrar
+
+    monkeypatch.setenv("CLINICDESK_PII_ENCRYPTION_ENABLED", "true")
+    monkeypatch.setenv("CLINICDESK_PII_ENCRYPTION_KEY", "legacy-key")
+    db_path = tmp_path / "pii-v1.sqlite"
+    con = db.bootstrap(db_path, _schema_path(), apply=True)
+    repo = PacientesRepository(con)
+    ids = [repo.create(_build_paciente(documento=f"1000000{i}")) for i in range(3)]
+    direccion_larga = "Avenida de los Cifrados Antiguos 1234, escalera B, piso 5"
+    for paciente_id in ids:
+        con.execute(
+            "UPDATE pacientes SET telefono = ?, direccion = ? WHERE id = ?",
+            (_token_legacy_v1("legacy-key", "600999888"), _token_legacy_v1("legacy-key", direccion_larga), paciente_id),
+        )
+    con.commit()
+
+    assert repo.get_by_id(ids[0]).direccion == direccion_larga
+    assert migrar_pii_en_lotes(con, get_connection_pii_cipher(con), tamano_lote=2).filas_actualizadas == 3
+    con.close()
+    assert script_migrar.main(["--db-path", str(db_path), "--desde-cero"]) == 0
+
+    con = db.bootstrap(db_path, _schema_path(), apply=True)
+    filas = con.execute("SELECT telefono, email, direccion FROM pacientes").fetchall()
+    assert all(str(fila[columna]).startswith("enc:v2:") for fila in filas for columna in fila.keys())
+    paciente = PacientesRepository(con).get_by_id(ids[2])
+    assert (paciente.telefono, paciente.email, paciente.direccion) == ("600999888", "ana@clinic.test", direccion_larga)
+    con.close()
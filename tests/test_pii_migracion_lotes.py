@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from clinicdesk.app.domain.enums import TipoDocumento
+from clinicdesk.app.domain.modelos import Paciente
+from clinicdesk.app.infrastructure.sqlite import db
+from clinicdesk.app.infrastructure.sqlite.pii_crypto import PiiCipher
+from clinicdesk.app.infrastructure.sqlite.pii_migracion_lotes import (
+    TABLA_PROGRESO,
+    ProgresoMigracionPii,
+    migrar_pii_en_lotes,
+)
+from clinicdesk.app.infrastructure.sqlite.repos_pacientes import PacientesRepository
+
+_CLAVE = "lotes-key"
+
+
+def _schema_path() -> Path:
+    return Path("clinicdesk/app/infrastructure/sqlite/schema.sql").resolve()
+
+
+def _db_en_claro(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, total: int) -> Path:
+    monkeypatch.setenv("CLINICDESK_PII_ENCRYPTION_ENABLED", "0")
+    monkeypatch.delenv("CLINICDESK_PII_ENCRYPTION_KEY", raising=False)
+    db_path = tmp_path / "pii-lotes.sqlite"
+    con = db.bootstrap(db_path, _schema_path(), apply=True)
+    repo = PacientesRepository(con)
+    for indice in range(total):
+        repo.create(
+            Paciente(
+                tipo_documento=TipoDocumento.DNI,
+                documento=f"2000000{indice}",
+                nombre="Ana",
+                apellidos="Paredes",
+                telefono=f"60000000{indice}",
+                email=f"ana{indice}@clinic.test",
+                fecha_nacimiento=date(1990, 1, 1),
+                direccion="Calle Mayor 1",
+                activo=True,
+                num_historia=None,
+                alergias=None,
+                observaciones=None,
+            )
+        )
+    con.close()
+    return db_path
+
+
+def _telefonos(con) -> list[str]:
+    return [str(fila[0]) for fila in con.execute("SELECT telefono FROM pacientes ORDER BY id")]
+
+
+def test_migracion_se_reanuda_desde_la_marca_de_agua(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    db_path = _db_en_claro(tmp_path, monkeypatch, total=5)
+    con = db.get_connection(db_path)
+    cipher = PiiCipher(_CLAVE)
+    detener = threading.Event()
+    progresos: list[ProgresoMigracionPii] = []
+
+    def _parar_tras_primer_lote(progreso: ProgresoMigracionPii) -> None:
+        progresos.append(progreso)
+        detener.set()
+
+    parcial = migrar_pii_en_lotes(con, cipher, tamano_lote=2, detener=detener, al_progresar=_parar_tras_primer_lote)
+
+    assert parcial.completada is False
+    assert [(p.tabla, p.ultimo_id, p.filas_actualizadas) for p in progresos] == [("pacientes", 2, 2)]
+    assert [t.startswith("enc:v2:") for t in _telefonos(con)] == [True, True, False, False, False]
+
+    # Una fila ya cifrada por la aplicación entre lotes no se vuelve a escribir.
+    con.execute("UPDATE pacientes SET telefono = ? WHERE id = 3", (cipher.encrypt("699111222"),))
+    con.commit()
+    final = migrar_pii_en_lotes(con, cipher, tamano_lote=2)
+
+    assert final.completada is True
+    assert final.filas_leidas == 3
+    assert all(t.startswith("enc:v2:") for t in _telefonos(con))
+    assert [cipher.decrypt(t) for t in _telefonos(con)][2:] == ["699111222", "600000003", "600000004"]
+    marca = con.execute(
+        f"SELECT ultimo_id, filas_actualizadas FROM {TABLA_PROGRESO} WHERE tabla = 'pacientes'"
+    ).fetchone()
+    assert tuple(marca) == (5, 5)
+    assert migrar_pii_en_lotes(con, cipher).filas_leidas == 0
+    con.close()
+
+
+def test_migracion_no_pisa_escrituras_concurrentes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    db_path = _db_en_claro(tmp_path, monkeypatch, total=2)
+    con = db.get_connection(db_path)
+    cipher = PiiCipher(_CLAVE)
+    escrito_por_la_app = cipher.encrypt("699111222")
+    recifrar_original = PiiCipher.recifrar
+
+    def _recifrar_con_escritura_de_la_app(self: PiiCipher, value: str) -> str:
+        otra = sqlite3.connect(db_path.as_posix())
+        otra.execute("UPDATE pacientes SET telefono = ? WHERE id = 1", (escrito_por_la_app,))
+        otra.commit()
+        otra.close()
+        return recifrar_original(self, value)
+
+    monkeypatch.setattr(PiiCipher, "recifrar", _recifrar_con_escritura_de_la_app)
+    resumen = migrar_pii_en_lotes(con, cipher)
+
+    assert resumen.filas_actualizadas == 1
+    assert _telefonos(con)[0] == escrito_por_la_app
+    con.close()
+
+
+def test_script_migra_en_segundo_plano_con_workers(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    from scripts import migrar_pii_en_lotes as script
+
+    db_path = _db_en_claro(tmp_path, monkeypatch, total=7)
+    monkeypatch.setenv("CLINICDESK_PII_ENCRYPTION_ENABLED", "true")
+    monkeypatch.setenv("CLINICDESK_PII_ENCRYPTION_KEY", _CLAVE)
+
+    assert script.main(["--db-path", str(db_path), "--batch-size", "2", "--workers", "2"]) == 0
+
+    salida = capsys.readouterr().out
+    assert "filas/s=" in salida
+    assert "OK: PII migrada (leidas=7 actualizadas=7" in salida
+    con = db.get_connection(db_path)
+    cipher = PiiCipher(_CLAVE)
+    emails = [str(fila[0]) for fila in con.execute("SELECT email FROM pacientes ORDER BY id")]
+    assert [cipher.decrypt(email) for email in emails] == [f"ana{i}@clinic.test" for i in range(7)]
+    con.close()
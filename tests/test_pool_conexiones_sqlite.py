@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from clinicdesk.app.infrastructure.sqlite import pool_conexiones_sqlite
+from clinicdesk.app.infrastructure.sqlite.pool_conexiones_sqlite import (
+    PoolConexionesAgotadoError,
+    PoolConexionesCerradoError,
+    PoolConexionesSqlite,
+)
+from clinicdesk.app.infrastructure.sqlite.sqlite_connection_config import (
+    PERFIL_ANALITICA,
+    PERFIL_ESCRITURA_MASIVA,
+    obtener_perfil_conexion,
+)
+
+
+class _RelojManual:
+    def __init__(self) -> None:
+        self.ahora = 1000.0
+
+    def __call__(self) -> float:
+        return self.ahora
+
+
+def test_pool_reutiliza_conexion_liberada(tmp_path: Path) -> None:
+    pool = PoolConexionesSqlite(tmp_path / "pool.sqlite", max_conexiones=2)
+
+    with pool.conexion() as primera:
+        id_primera = id(primera)
+    with pool.conexion() as segunda:
+        id_segunda = id(segunda)
+
+    stats = pool.estadisticas()
+    pool.cerrar()
+    assert id_primera == id_segunda
+    assert stats.creadas == 1
+    assert stats.reutilizadas == 1
+    assert stats.en_uso == 0
+
+
+def test_pool_acotado_lanza_timeout_si_no_hay_conexiones_libres(tmp_path: Path) -> None:
+    pool = PoolConexionesSqlite(tmp_path / "pool.sqlite", max_conexiones=1, timeout_checkout_segundos=0.05)
+    conexion = pool.adquirir()
+
+    with pytest.raises(PoolConexionesAgotadoError):
+        pool.adquirir()
+
+    pool.liberar(conexion)
+    pool.cerrar()
+
+
+def test_pool_entrega_conexion_a_hilo_en_espera_al_liberar(tmp_path: Path) -> None:
+    pool = PoolConexionesSqlite(tmp_path / "pool.sqlite", max_conexiones=1, timeout_checkout_segundos=5)
+    conexion = pool.adquirir()
+    resultados: list[int] = []
+
+    def _worker() -> None:
+        with pool.conexion() as conexion_worker:
+            resultados.append(conexion_worker.execute("SELECT 7").fetchone()[0])
+
+    hilo = threading.Thread(target=_worker)
+    hilo.start()
+    pool.liberar(conexion)
+    hilo.join(timeout=5)
+    pool.cerrar()
+
+    assert resultados == [7]
+
+
+def test_pool_descarta_conexion_no_sana_y_abre_otra(tmp_path: Path) -> None:
+    pool = PoolConexionesSqlite(tmp_path / "pool.sqlite", max_conexiones=1)
+    conexion = pool.adquirir()
+    pool.liberar(conexion)
+    conexion.close()
+
+    with pool.conexion() as nueva:
+        assert nueva.execute("SELECT 1").fetchone()[0] == 1
+
+    stats = pool.estadisticas()
+    pool.cerrar()
+    assert stats.descartadas_por_salud == 1
+    assert stats.creadas == 2
+
+
+def _lock_libre_desde_otro_hilo(pool: PoolConexionesSqlite) -> bool:
+    resultado: list[bool] = []
+
+    def _probar() -> None:
+        adquirido = pool._condicion.acquire(blocking=False)
+        if adquirido:
+            pool._condicion.release()
+        resultado.append(adquirido)
+
+    hilo = threading.Thread(target=_probar)
+    hilo.start()
+    hilo.join(timeout=5)
+    return resultado == [True]
+
+
+def test_pool_hace_health_check_y_rollback_fuera_del_lock(tmp_path: Path, monkeypatch) -> None:
+    pool = PoolConexionesSqlite(tmp_path / "pool.sqlite", max_conexiones=1)
+    observaciones: list[tuple[str, bool]] = []
+    conexion_sana = pool_conexiones_sqlite._conexion_sana
+    restablecer = pool_conexiones_sqlite._restablecer_conexion
+
+    def _sana(conexion) -> bool:
+        observaciones.append(("health_check", _lock_libre_desde_otro_hilo(pool)))
+        return conexion_sana(conexion)
+
+    def _restablecer(conexion) -> bool:
+        observaciones.append(("rollback", _lock_libre_desde_otro_hilo(pool)))
+        return restablecer(conexion)
+
+    monkeypatch.setattr(pool_conexiones_sqlite, "_conexion_sana", _sana)
+    monkeypatch.setattr(pool_conexiones_sqlite, "_restablecer_conexion", _restablecer)
+
+    with pool.conexion():
+        pass
+    with pool.conexion():
+        pass
+    pool.cerrar()
+
+    assert observaciones == [("rollback", True), ("health_check", True), ("rollback", True)]
+
+
+def test_pool_expulsa_conexiones_inactivas(tmp_path: Path) -> None:
+    reloj = _RelojManual()
+    pool = PoolConexionesSqlite(tmp_path / "pool.sqlite", max_inactividad_segundos=30, reloj=reloj)
+    with pool.conexion():
+        pass
+
+    reloj.ahora += 31
+    expulsadas = pool.purgar_inactivas()
+
+    stats = pool.estadisticas()
+    pool.cerrar()
+    assert expulsadas == 1
+    assert stats.abiertas == 0
+    assert stats.expulsadas_por_inactividad == 1
+
+
+def test_pool_revierte_transaccion_pendiente_al_liberar(tmp_path: Path) -> None:
+    pool = PoolConexionesSqlite(tmp_path / "pool.sqlite", max_conexiones=1)
+    with pool.conexion() as conexion:
+        conexion.execute("CREATE TABLE t(x INTEGER)")
+        conexion.commit()
+        conexion.execute("INSERT INTO t(x) VALUES (1)")
+        assert conexion.in_transaction
+
+    with pool.conexion() as conexion:
+        total = conexion.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+    pool.cerrar()
+    assert total == 0
+
+
+def test_pool_aplica_perfil_de_pragmas_una_vez_por_conexion(tmp_path: Path) -> None:
+    pool = PoolConexionesSqlite(tmp_path / "pool.sqlite", perfil=PERFIL_ESCRITURA_MASIVA)
+    with pool.conexion() as conexion:
+        busy_timeout = conexion.execute("PRAGMA busy_timeout").fetchone()[0]
+        cache_size = conexion.execute("PRAGMA cache_size").fetchone()[0]
+        foreign_keys = conexion.execute("PRAGMA foreign_keys").fetchone()[0]
+    pool.cerrar()
+
+    assert busy_timeout == PERFIL_ESCRITURA_MASIVA.busy_timeout_ms
+    assert cache_size == PERFIL_ESCRITURA_MASIVA.cache_size
+    assert foreign_keys == 1
+
+
+def test_pool_cerrado_rechaza_checkout(tmp_path: Path) -> None:
+    pool = PoolConexionesSqlite(tmp_path / "pool.sqlite")
+    pool.cerrar()
+
+    with pytest.raises(PoolConexionesCerradoError):
+        pool.adquirir()
+
+
+def test_obtener_perfil_conexion_por_nombre() -> None:
+    assert obtener_perfil_conexion("Analitica") is PERFIL_ANALITICA
+    with pytest.raises(ValueError):
+        obtener_perfil_conexion("desconocido")
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import sqlite3
 
+from clinicdesk.app.infrastructure.sqlite.citas_rango_sql import sql_epoch
 from clinicdesk.app.queries.prediccion_operativa_queries import PrediccionOperativaQueries
 
 
@@ -9,7 +10,7 @@ def _con() -> sqlite3.Connection:
     con = sqlite3.connect(":memory:")
     con.row_factory = sqlite3.Row
     con.execute(
-        """
+        f"""
         CREATE TABLE citas (
           id INTEGER PRIMARY KEY,
           activo INTEGER,
@@ -20,7 +21,8 @@ def _con() -> sqlite3.Connection:
           check_in_at TEXT,
           llamado_a_consulta_at TEXT,
           consulta_inicio_at TEXT,
-          consulta_fin_at TEXT
+          consulta_fin_at TEXT,
+          inicio_ts INTEGER GENERATED ALWAYS AS ({sql_epoch("inicio")}) VIRTUAL
         )
         """
     )
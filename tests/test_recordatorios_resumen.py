@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+from clinicdesk.app.infrastructure.sqlite import db
+from clinicdesk.app.infrastructure.sqlite.recordatorios_citas_gateway import RecordatoriosCitasSqliteGateway
+from clinicdesk.app.infrastructure.sqlite.recordatorios_resumen import (
+    asegurar_resumen_recordatorios,
+    reconstruir_resumen_recordatorios,
+)
+from clinicdesk.app.infrastructure.sqlite.riesgo_ausencia_scores import asegurar_scores_riesgo
+from clinicdesk.app.queries.confirmaciones_queries import ConfirmacionesQueries, FiltrosConfirmacionesQuery
+from scripts import reconstruir_resumen_recordatorios as script_reconstruir
+
+
+_SCHEMA_PATH = Path("clinicdesk/app/infrastructure/sqlite/schema.sql")
+
+
+def _build_connection(path: Path | str = ":memory:") -> sqlite3.Connection:
+    con = sqlite3.connect(str(path))
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA foreign_keys = ON")
+    con.executescript(_SCHEMA_PATH.read_text(encoding="utf-8"))
+    asegurar_resumen_recordatorios(con)
+    asegurar_scores_riesgo(con)
+    con.execute(
+        "INSERT INTO pacientes (id, tipo_documento, documento, nombre, apellidos, telefono, activo) "
+        "VALUES (1, 'DNI', '1', 'Ana', 'Uno', '600111222', 1)"
+    )
+    con.execute(
+        "INSERT INTO medicos (id, tipo_documento, documento, nombre, apellidos, num_colegiado, especialidad, activo) "
+        "VALUES (1, 'DNI', '10', 'Marta', 'Med', 'COL1', 'General', 1)"
+    )
+    con.execute("INSERT INTO salas (id, nombre, tipo, activa) VALUES (1, 'S1', 'CONSULTA', 1)")
+    con.executemany(
+        "INSERT INTO citas (id, paciente_id, medico_id, sala_id, inicio, fin, estado, activo) "
+        "VALUES (?, 1, 1, 1, ?, ?, 'PROGRAMADA', 1)",
+        [(1, "2026-01-03 10:00:00", "2026-01-03 10:30:00"), (2, "2026-01-04 10:00:00", "2026-01-04 10:30:00")],
+    )
+    con.commit()
+    return con
+
+
+def _resumen(con: sqlite3.Connection, cita_id: int) -> dict[str, object] | None:
+    fila = con.execute("SELECT * FROM recordatorios_citas_resumen WHERE cita_id = ?", (cita_id,)).fetchone()
+    return dict(fila) if fila else None
+
+
+def test_triggers_del_resumen_solo_los_crea_la_migracion(tmp_path: Path) -> None:
+    assert "trg_recordatorios_resumen" not in _SCHEMA_PATH.read_text(encoding="utf-8")
+    con = db.bootstrap(tmp_path / "resumen.sqlite", _SCHEMA_PATH.resolve(), apply=True)
+
+    triggers = {
+        fila[0]
+        for fila in con.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'recordatorios_citas'"
+        )
+    }
+
+    assert triggers == {"trg_recordatorios_resumen_ai", "trg_recordatorios_resumen_ad", "trg_recordatorios_resumen_au"}
+    con.close()
+
+
+def test_gateway_mantiene_resumen_por_cita() -> None:
+    con = _build_connection()
+    gateway = RecordatoriosCitasSqliteGateway(con)
+
+    gateway.upsert_recordatorios_lote(
+        [
+            (1, "WHATSAPP", "PREPARADO", "2026-01-01T10:00:00+00:00"),
+            (1, "EMAIL", "PREPARADO", "2026-01-01T10:00:01+00:00"),
+        ]
+    )
+    gateway.upsert_recordatorio_cita(1, "WHATSAPP", "ENVIADO", "2026-01-01T11:00:00+00:00")
+
+    assert _resumen(con, 1) == {
+        "cita_id": 1,
+        "estado_global": "ENVIADO",
+        "ultimo_canal": "WHATSAPP",
+        "ultimo_estado": "ENVIADO",
+        "total_preparados": 1,
+        "total_enviados": 1,
+        "ultimo_envio_utc": "2026-01-01T11:00:00+00:00",
+        "actualizado_en_utc": "2026-01-01T11:00:00+00:00",
+    }
+    assert _resumen(con, 2) is None
+    assert not con.in_transaction
+
+
+def test_resumen_sigue_borrados_y_reconstruccion_coincide() -> None:
+    con = _build_connection()
+    gateway = RecordatoriosCitasSqliteGateway(con)
+    gateway.upsert_recordatorio_cita(1, "EMAIL", "PREPARADO", "2026-01-01T10:00:00+00:00")
+    gateway.upsert_recordatorio_cita(2, "EMAIL", "ENVIADO", "2026-01-01T10:00:00+00:00")
+    esperado = [dict(fila) for fila in con.execute("SELECT * FROM recordatorios_citas_resumen ORDER BY cita_id")]
+
+    con.execute("UPDATE recordatorios_citas_resumen SET estado_global = 'CORRUPTO'")
+    con.commit()
+
+    assert reconstruir_resumen_recordatorios(con) == 2
+    reconstruido = [dict(fila) for fila in con.execute("SELECT * FROM recordatorios_citas_resumen ORDER BY cita_id")]
+    assert reconstruido == esperado
+
+    with con:
+        con.execute("DELETE FROM citas WHERE id = 2")
+    assert _resumen(con, 2) is None
+
+
+def test_confirmaciones_no_agrega_historial_de_recordatorios() -> None:
+    con = _build_connection()
+    RecordatoriosCitasSqliteGateway(con).upsert_recordatorio_cita(1, "EMAIL", "ENVIADO", "2026-01-01T10:00:00+00:00")
+    queries = ConfirmacionesQueries(con)
+    sentencias: list[str] = []
+    con.set_trace_callback(sentencias.append)
+    try:
+        items, total = queries.buscar_citas_confirmaciones(
+            FiltrosConfirmacionesQuery(desde="2026-01-01", hasta="2026-01-31"), limit=10, offset=0
+        )
+    finally:
+        con.set_trace_callback(None)
+
+    assert total == 2
+    assert [item.recordatorio_estado_global for item in items] == ["ENVIADO", "SIN_PREPARAR"]
+    for sql in sentencias:
+        assert "recordatorios_citas " not in f"{sql} "
+        plan = " | ".join(str(fila["detail"]) for fila in con.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall())
+        assert "GROUP BY" not in plan
+
+
+def test_cli_reconstruye_resumen(tmp_path: Path, capsys) -> None:
+    db_path = tmp_path / "resumen.sqlite"
+    con = _build_connection(db_path)
+    con.execute(
+        "INSERT INTO recordatorios_citas (cita_id, canal, estado, created_at_utc, updated_at_utc) "
+        "VALUES (1, 'EMAIL', 'PREPARADO', '2026-01-01T00:00:00', '2026-01-01T00:00:00')"
+    )
+    con.execute("DELETE FROM recordatorios_citas_resumen")
+    con.commit()
+    con.close()
+
+    assert script_reconstruir.main(["--db-path", db_path.as_posix()]) == 0
+    assert "citas=1" in capsys.readouterr().out
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+from clinicdesk.app.application.confirmaciones.dtos import FiltrosConfirmacionesDTO
+from clinicdesk.app.application.confirmaciones.usecases import ObtenerConfirmacionesCitas, PaginacionConfirmacionesDTO
+from clinicdesk.app.application.prediccion_ausencias.scores_riesgo import (
+    PuntuarRiesgoAusenciaCitas,
+    notificar_modelo_activado,
+    puntuar_citas_nuevas,
+)
+from clinicdesk.app.domain.prediccion_ausencias import CitaParaPrediccion, NivelRiesgo, PrediccionAusencia
+from clinicdesk.app.infrastructure.sqlite import db
+from clinicdesk.app.infrastructure.sqlite.recordatorios_resumen import asegurar_resumen_recordatorios
+from clinicdesk.app.infrastructure.sqlite.riesgo_ausencia_scores import asegurar_scores_riesgo
+from clinicdesk.app.queries.confirmaciones_queries import ConfirmacionesQueries, FiltrosConfirmacionesQuery
+from clinicdesk.app.queries.riesgo_ausencia_scores_queries import RiesgoAusenciaScoresQueries
+
+_SCHEMA_PATH = Path("clinicdesk/app/infrastructure/sqlite/schema.sql")
+_RIESGOS = {1: NivelRiesgo.ALTO, 2: NivelRiesgo.MEDIO, 3: NivelRiesgo.BAJO, 4: NivelRiesgo.ALTO}
+
+
+@dataclass(frozen=True, slots=True)
+class _Metadata:
+    fecha_entrenamiento: str
+
+
+class _FakePredictor:
+    def __init__(self) -> None:
+        self.citas_puntuadas: list[int] = []
+
+    def predecir(self, citas: list[CitaParaPrediccion]) -> list[PrediccionAusencia]:
+        self.citas_puntuadas.extend(cita.cita_id for cita in citas)
+        return [
+            PrediccionAusencia(cita_id=cita.cita_id, riesgo=_RIESGOS[cita.cita_id], explicacion_corta="", score=0.5)
+            for cita in citas
+        ]
+
+
+class _FakeAlmacenamiento:
+    def __init__(self, version: str) -> None:
+        self.version = version
+        self.predictor = _FakePredictor()
+
+    def cargar_metadata(self) -> _Metadata:
+        return _Metadata(self.version)
+
+    def cargar(self) -> tuple[_FakePredictor, _Metadata]:
+        return self.predictor, _Metadata(self.version)
+
+
+def _dia(offset: int) -> str:
+    return (date.today() + timedelta(days=offset)).isoformat()
+
+
+def _build_connection() -> sqlite3.Connection:
+    con = sqlite3.connect(":memory:")
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA foreign_keys = ON")
+    con.executescript(_SCHEMA_PATH.read_text(encoding="utf-8"))
+    asegurar_resumen_recordatorios(con)
+    asegurar_scores_riesgo(con)
+    con.execute(
+        "INSERT INTO pacientes (id, tipo_documento, documento, nombre, apellidos, telefono, activo) "
+        "VALUES (1, 'DNI', '1', 'Ana', 'Uno', '600111222', 1)"
+    )
+    con.execute(
+        "INSERT INTO medicos (id, tipo_documento, documento, nombre, apellidos, num_colegiado, especialidad, activo) "
+        "VALUES (1, 'DNI', '10', 'Marta', 'Med', 'COL1', 'General', 1)"
+    )
+    con.execute("INSERT INTO salas (id, nombre, tipo, activa) VALUES (1, 'S1', 'CONSULTA', 1)")
+    con.executemany(
+        "INSERT INTO citas (id, paciente_id, medico_id, sala_id, inicio, fin, estado, activo) "
+        "VALUES (?, 1, 1, 1, ?, ?, 'PROGRAMADA', 1)",
+        [(cita_id, f"{_dia(cita_id)} 10:00:00", f"{_dia(cita_id)} 10:30:00") for cita_id in (1, 2, 3, 4)],
+    )
+    con.commit()
+    return con
+
+
+def _scores(con: sqlite3.Connection) -> dict[int, tuple[str, str]]:
+    rows = con.execute("SELECT cita_id, modelo_version, bucket FROM riesgo_ausencia_citas").fetchall()
+    return {int(row["cita_id"]): (row["modelo_version"], row["bucket"]) for row in rows}
+
+
+def test_puntuacion_incremental_solo_procesa_citas_sin_score_vigente() -> None:
+    con = _build_connection()
+    almacenamiento = _FakeAlmacenamiento("v1")
+    uc = PuntuarRiesgoAusenciaCitas(almacenamiento, RiesgoAusenciaScoresQueries(con), tamano_lote=3)
+
+    assert uc.ejecutar(_dia(0), _dia(10)) == "v1"
+    assert sorted(almacenamiento.predictor.citas_puntuadas) == [1, 2, 3, 4]
+    assert _scores(con)[1] == ("v1", "ALTO")
+
+    almacenamiento.predictor.citas_puntuadas.clear()
+    uc.ejecutar(_dia(0), _dia(10))
+    assert almacenamiento.predictor.citas_puntuadas == []
+
+    with con:
+        con.execute("UPDATE citas SET inicio = ? WHERE id = 2", (f"{_dia(5)} 12:00:00",))
+    assert 2 not in _scores(con)
+    uc.ejecutar(_dia(0), _dia(10))
+    assert almacenamiento.predictor.citas_puntuadas == [2]
+
+
+def test_puntuacion_vigente_no_caduca_con_el_dia() -> None:
+    con = _build_connection()
+    almacenamiento = _FakeAlmacenamiento("v1")
+    uc = PuntuarRiesgoAusenciaCitas(almacenamiento, RiesgoAusenciaScoresQueries(con))
+    uc.ejecutar(_dia(0), _dia(10))
+    with con:
+        con.execute("UPDATE riesgo_ausencia_citas SET scored_at_utc = '2000-01-01T00:00:00+00:00'")
+
+    almacenamiento.predictor.citas_puntuadas.clear()
+    uc.ejecutar(_dia(0), _dia(10))
+
+    assert almacenamiento.predictor.citas_puntuadas == []
+
+
+def test_citas_nuevas_se_puntuan_solas_y_un_fallo_no_rompe_la_reserva() -> None:
+    con = _build_connection()
+    almacenamiento = _FakeAlmacenamiento("v1")
+    uc = PuntuarRiesgoAusenciaCitas(almacenamiento, RiesgoAusenciaScoresQueries(con))
+
+    puntuar_citas_nuevas(uc, [3])
+
+    assert almacenamiento.predictor.citas_puntuadas == [3]
+    assert _scores(con) == {3: ("v1", "BAJO")}
+    con.close()
+    puntuar_citas_nuevas(uc, [4])
+    puntuar_citas_nuevas(None, [4])
+
+
+def test_listado_de_confirmaciones_solo_lee_las_puntuaciones() -> None:
+    class _Salud:
+        def ejecutar(self) -> None:
+            return None
+
+    con = _build_connection()
+    almacenamiento = _FakeAlmacenamiento("v1")
+    uc = PuntuarRiesgoAusenciaCitas(almacenamiento, RiesgoAusenciaScoresQueries(con))
+    listado = ObtenerConfirmacionesCitas(
+        queries=ConfirmacionesQueries(con), puntuar_riesgo_uc=uc, obtener_salud_uc=_Salud()
+    )
+    filtros = FiltrosConfirmacionesDTO(desde=_dia(0), hasta=_dia(10))
+    paginacion = PaginacionConfirmacionesDTO(limit=10, offset=0)
+
+    antes = listado.ejecutar(filtros, paginacion)
+    uc.ejecutar()
+    despues = listado.ejecutar(filtros, paginacion)
+
+    assert {item.riesgo for item in antes.items} == {"NO_DISPONIBLE"}
+    assert sorted(almacenamiento.predictor.citas_puntuadas) == [1, 2, 3, 4]
+    assert [item.riesgo for item in despues.items] == ["ALTO", "MEDIO", "BAJO", "ALTO"]
+
+
+def test_tabla_de_scores_solo_la_crea_la_migracion(tmp_path: Path) -> None:
+    schema = _SCHEMA_PATH.read_text(encoding="utf-8")
+    assert "CREATE TABLE IF NOT EXISTS riesgo_ausencia_citas" not in schema
+    assert "trg_riesgo_ausencia_citas_invalidar" not in schema
+    con = db.bootstrap(tmp_path / "scores.sqlite", _SCHEMA_PATH.resolve(), apply=True)
+
+    objetos = {
+        fila[0] for fila in con.execute("SELECT name FROM sqlite_master WHERE tbl_name = 'riesgo_ausencia_citas'")
+    }
+    triggers = {fila[0] for fila in con.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+
+    assert {"riesgo_ausencia_citas", "idx_riesgo_ausencia_citas_modelo_bucket_score"} <= objetos
+    assert "trg_riesgo_ausencia_citas_invalidar" in triggers
+    con.close()
+
+
+def test_recalcular_todo_descarta_scores_de_otros_modelos() -> None:
+    con = _build_connection()
+    almacenamiento = _FakeAlmacenamiento("v1")
+    uc = PuntuarRiesgoAusenciaCitas(almacenamiento, RiesgoAusenciaScoresQueries(con))
+    uc.ejecutar(_dia(0), _dia(10))
+
+    almacenamiento.version = "v2"
+    assert uc.recalcular_todo() == "v2"
+
+    assert {version for version, _ in _scores(con).values()} == {"v2"}
+
+
+def test_fallo_al_recalcular_no_rompe_el_entrenamiento() -> None:
+    def _falla() -> None:
+        raise RuntimeError("db locked")
+
+    notificar_modelo_activado(_falla)
+    notificar_modelo_activado(None)
+
+
+def test_confirmaciones_filtra_riesgo_en_sql_antes_de_paginar() -> None:
+    con = _build_connection()
+    uc = PuntuarRiesgoAusenciaCitas(_FakeAlmacenamiento("v1"), RiesgoAusenciaScoresQueries(con))
+    uc.ejecutar(_dia(0), _dia(10))
+    queries = ConfirmacionesQueries(con)
+
+    solo_alto, total_alto = queries.buscar_citas_confirmaciones(
+        FiltrosConfirmacionesQuery(desde=_dia(0), hasta=_dia(10), riesgo_filtro="SOLO_ALTO", modelo_version="v1"),
+        limit=1,
+        offset=1,
+    )
+    alto_medio, total_alto_medio = queries.buscar_citas_confirmaciones(
+        FiltrosConfirmacionesQuery(desde=_dia(0), hasta=_dia(10), riesgo_filtro="ALTO_MEDIO", modelo_version="v1"),
+        limit=10,
+        offset=0,
+    )
+    otro_modelo, _ = queries.buscar_citas_confirmaciones(
+        FiltrosConfirmacionesQuery(desde=_dia(0), hasta=_dia(10), modelo_version="v0"),
+        limit=10,
+        offset=0,
+    )
+
+    assert total_alto == 2
+    assert [(item.cita_id, item.riesgo) for item in solo_alto] == [(4, "ALTO")]
+    assert total_alto_medio == 3
+    assert [item.riesgo for item in alto_medio] == ["ALTO", "MEDIO", "ALTO"]
+    assert {item.riesgo for item in otro_modelo} == {"NO_DISPONIBLE"}
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import FrozenInstanceError, dataclass
 from datetime import datetime, timedelta, timezone
 
+import pytest
+
 from clinicdesk.app.application.prediccion_ausencias.salud_prediccion import ObtenerSaludPrediccionAusencias
 
 
@@ -63,3 +65,33 @@ def test_salud_rojo_con_conteo_muy_bajo_aunque_sea_reciente() -> None:
     salud = _ejecutar(metadata=_FakeMetadata(fecha_entrenamiento=_fecha_hace(1)), total=10)
 
     assert salud.estado == "ROJO"
+
+
+def test_salud_reutiliza_resultado_hasta_que_caduca_o_cambia_el_modelo() -> None:
+    class _ConteoQueries(_FakeQueries):
+        def __init__(self) -> None:
+            super().__init__(80)
+            self.llamadas = 0
+
+        def contar_citas_validas_recientes(self, dias: int = 90) -> int:
+            self.llamadas += 1
+            return super().contar_citas_validas_recientes(dias)
+
+    ahora = [0.0]
+    storage = _FakeStorage(_FakeMetadata(_fecha_hace(1)))
+    queries = _ConteoQueries()
+    uc = ObtenerSaludPrediccionAusencias(storage, queries, ttl_segundos=60, reloj=lambda: ahora[0])
+
+    uc.ejecutar()
+    uc.ejecutar()
+    assert queries.llamadas == 1
+
+    storage._metadata = _FakeMetadata(_fecha_hace(0))
+    uc.ejecutar()
+    assert queries.llamadas == 2
+
+    ahora[0] = 61.0
+    uc.ejecutar()
+    assert queries.llamadas == 3
+    with pytest.raises(FrozenInstanceError):
+        uc.ttl_segundos = 0
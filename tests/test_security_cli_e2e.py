@@ -179,7 +179,7 @@ def test_rotate_apply_recifra_mantiene_lectura_y_audita_sin_pii(
     assert "campos_recifrados=4" in captured.out
     _assert_sin_fuga(f"{captured.out}\n{captured.err}")
     assert row["documento_enc"] != documento_antes
-    assert all(row[campo] and row[campo].startswith("cfp:v1:") for campo in row.keys())
+    assert all(row[campo] and row[campo].startswith("cfp:v2:") for campo in row.keys())
     assert paciente is not None
     assert paciente.documento == "11112222"
     assert paciente.telefono == "612000111"
@@ -177,16 +177,16 @@ def test_script_reutiliza_verificadores_oficiales(monkeypatch, tmp_path: Path) -
     original_auditoria = verify_audit_runtime_controls.verificar_cadena
     original_telemetria = verify_audit_runtime_controls.verificar_cadena_telemetria
 
-    def _spy_auditoria(con):
-        llamadas.append("auditoria")
-        return original_auditoria(con)
+    def _spy_auditoria(con, *, completa=False):
+        llamadas.append(f"auditoria:{completa}")
+        return original_auditoria(con, completa=completa)
 
-    def _spy_telemetria(con):
-        llamadas.append("telemetria")
-        return original_telemetria(con)
+    def _spy_telemetria(con, *, completa=False):
+        llamadas.append(f"telemetria:{completa}")
+        return original_telemetria(con, completa=completa)
 
     monkeypatch.setattr(verify_audit_runtime_controls, "verificar_cadena", _spy_auditoria)
     monkeypatch.setattr(verify_audit_runtime_controls, "verificar_cadena_telemetria", _spy_telemetria)
 
     assert verify_audit_runtime_controls.main(["--db-path", db_path.as_posix()]) == 0
-    assert llamadas == ["auditoria", "telemetria"]
+    assert llamadas == ["auditoria:True", "telemetria:True"]